@@ -11,20 +11,28 @@ Checks for orphaned references in the Claude Code configuration:
 Usage:
     python scripts/check-orphans.py
     python scripts/check-orphans.py --verbose
+    python scripts/check-orphans.py --profile [cprofile|sample]
 """
 
-import os
-import re
 import sys
 from pathlib import Path
 
 # Get project root
 SCRIPT_DIR = Path(__file__).parent
+
+sys.path.append(str(SCRIPT_DIR / "performance"))
+from profiling import run_profiled
+from reference_graph import (
+    AGENT, CLAUDE_MD as CLAUDE_MD_NODE, COMMAND, INVOKES, MENTIONS, RULE_REFERENCE, RULE_ROUTING, RULE_SELF,
+    SKILL, get_reference_graph
+)
+
 PROJECT_ROOT = SCRIPT_DIR.parent
 AGENTS_DIR = PROJECT_ROOT / "system-configs" / ".claude" / "agents"
 COMMANDS_DIR = PROJECT_ROOT / "system-configs" / ".claude" / "commands"
 SKILLS_DIR = PROJECT_ROOT / "system-configs" / ".claude" / "skills"
 CLAUDE_MD = PROJECT_ROOT / "system-configs" / "CLAUDE.md"
+CACHE_DIR = PROJECT_ROOT / ".cache"
 
 # Files to skip
 NON_AGENT_FILES = [
@@ -36,141 +44,59 @@ NON_COMMAND_FILES = ["README.md", "COMMAND_TEMPLATE.md"]
 NON_SKILL_FILES = ["README.md", "SKILL_TEMPLATE.md"]
 
 
+def get_graph():
+    """Reference graph for the configured layout (built once per process)."""
+    return get_reference_graph(AGENTS_DIR, SKILLS_DIR, COMMANDS_DIR, CLAUDE_MD, CACHE_DIR)
+
+
 def get_valid_agents():
     """Get set of valid agent names."""
-    if not AGENTS_DIR.exists():
-        return set()
-    return {f.stem for f in AGENTS_DIR.glob("*.md") if f.name not in NON_AGENT_FILES}
+    return {node.name for node in get_graph().nodes_of(AGENT) if node.file_name not in NON_AGENT_FILES}
 
 
 def get_valid_skills():
     """Get set of valid skill names."""
-    if not SKILLS_DIR.exists():
-        return set()
-    return {f.stem for f in SKILLS_DIR.glob("*.md") if f.name not in NON_SKILL_FILES}
-
-
-def extract_agent_references(content):
-    """Extract potential agent references from content."""
-    references = set()
-
-    # Common agent reference patterns
-    patterns = [
-        # YAML style: agent-name:
-        r"^\s*(\w+-\w+(?:-\w+)?):\s*$",
-        # Task style: Task: agent-name
-        r"Task:\s*(\w+-\w+(?:-\w+)?)",
-        # Assignee style: Assignee: [agent-name]
-        r"Assignee:\s*\[?(\w+-\w+(?:-\w+)?)\]?",
-        # Inline reference: + agent-name
-        r"\+\s*(\w+-\w+(?:-\w+)?)",
-        # List item: - agent-name
-        r"^\s*-\s*(\w+-\w+(?:-\w+)?)\s*$",
-        # Reference in prose: the agent-name agent
-        r"the\s+(\w+-\w+(?:-\w+)?)\s+agent",
-        # Use agent: use agent-name
-        r"use\s+(\w+-\w+(?:-\w+)?)",
-    ]
-
-    for pattern in patterns:
-        matches = re.findall(pattern, content, re.MULTILINE | re.IGNORECASE)
-        for match in matches:
-            # Filter out common non-agent patterns
-            skip_patterns = [
-                "front-matter", "pre-commit", "auto-fix", "non-agent",
-                "wave-based", "pr-based", "file-path", "cli-tool",
-                "end-to-end", "self-reference", "code-block",
-                "cross-validation", "dry-run", "shadcn-ui", "think-harder",
-                "argument-hint", "thinking-level", "thinking-tokens",
-                "mcp-server", "multi-cloud", "multi-agent", "multi-step",
-                "high-performance", "open-ended", "real-time", "well-formed",
-                # CI/CD and testing patterns (not agent names)
-                "skip-ci", "integration-test", "unit-test", "paths-ignore",
-                # Technical compound terms (not agent names)
-                "docx-js", "low-contrast", "scroll-triggering", "read-only",
-                "high-level", "low-level", "built-in", "opt-in", "opt-out",
-                "run-time", "compile-time", "type-safe", "type-check",
-                "hot-reload", "hot-module", "tree-shaking",
-            ]
-            # Skip numbered agent references (e.g., debugger-2, test-engineer-4)
-            if re.match(r"^[\w-]+-\d+$", match.lower()):
-                continue
-            if not any(skip in match.lower() for skip in skip_patterns):
-                references.add(match.lower())
-
-    return references
+    return {node.name for node in get_graph().nodes_of(SKILL, 'flat') if node.file_name not in NON_SKILL_FILES}
 
 
-def check_skills_for_orphans(valid_agents, verbose=False):
-    """Check skill files for orphaned agent references."""
+def _orphaned_agents(graph, nodes, valid_agents, verbose=False):
+    """Agent references from ``nodes`` that match no agent."""
     orphans = []
-
-    if not SKILLS_DIR.exists():
-        return orphans
-
-    for skill_dir in SKILLS_DIR.iterdir():
-        if not skill_dir.is_dir() or skill_dir.name.startswith('.'):
-            continue
-        skill_file = skill_dir / "SKILL.md"
-        if not skill_file.exists():
-            continue
-
-        content = skill_file.read_text()
-        references = extract_agent_references(content)
+    for node in nodes:
+        references = graph.references(node, MENTIONS, RULE_REFERENCE)
 
         for ref in references:
             if ref not in valid_agents and len(ref) > 3:
                 # Additional filtering for false positives
                 if ref not in ["debug", "test", "build", "deploy", "review"]:
                     orphans.append({
-                        "file": f"skills/{skill_dir.name}/SKILL.md",
+                        "file": node.key,
                         "reference": ref,
                         "type": "agent"
                     })
 
         if verbose and references:
-            print(f"  {skill_dir.name}: found {len(references)} agent references")
+            label = node.name if node.layout == 'directory' else node.file_name
+            print(f"  {label}: found {len(references)} agent references")
+    return orphans
 
-    # Legacy: Check commands directory if it still exists
-    if COMMANDS_DIR.exists():
-        for cmd_file in COMMANDS_DIR.glob("*.md"):
-            if cmd_file.name in NON_COMMAND_FILES:
-                continue
-
-            content = cmd_file.read_text()
-            references = extract_agent_references(content)
-
-            for ref in references:
-                if ref not in valid_agents and len(ref) > 3:
-                    if ref not in ["debug", "test", "build", "deploy", "review"]:
-                        orphans.append({
-                            "file": f"commands/{cmd_file.name}",
-                            "reference": ref,
-                            "type": "agent"
-                        })
-
-            if verbose and references:
-                print(f"  {cmd_file.name}: found {len(references)} agent references")
 
-    # Legacy: Check flat-file skills (skills/*.md) in addition to directory-based skills
-    for skill_file in SKILLS_DIR.glob("*.md"):
-        if skill_file.name.startswith('.') or skill_file.name in NON_SKILL_FILES:
-            continue
+def check_skills_for_orphans(valid_agents, verbose=False):
+    """Check skill files for orphaned agent references."""
+    if not SKILLS_DIR.exists():
+        return []
 
-        content = skill_file.read_text()
-        references = extract_agent_references(content)
+    graph = get_graph()
+    orphans = _orphaned_agents(graph, graph.nodes_of(SKILL, 'directory'), valid_agents, verbose)
 
-        for ref in references:
-            if ref not in valid_agents and len(ref) > 3:
-                if ref not in ["debug", "test", "build", "deploy", "review"]:
-                    orphans.append({
-                        "file": f"skills/{skill_file.name}",
-                        "reference": ref,
-                        "type": "agent"
-                    })
+    # Legacy: Check commands directory if it still exists
+    commands = [node for node in graph.nodes_of(COMMAND) if node.file_name not in NON_COMMAND_FILES]
+    orphans.extend(_orphaned_agents(graph, commands, valid_agents, verbose))
 
-        if verbose and references:
-            print(f"  {skill_file.name}: found {len(references)} agent references")
+    # Legacy: Check flat-file skills (skills/*.md) in addition to directory-based skills
+    flat_skills = [node for node in graph.nodes_of(SKILL, 'flat')
+                   if not node.file_name.startswith('.') and node.file_name not in NON_SKILL_FILES]
+    orphans.extend(_orphaned_agents(graph, flat_skills, valid_agents, verbose))
 
     return orphans
 
@@ -178,40 +104,17 @@ def check_skills_for_orphans(valid_agents, verbose=False):
 def check_claude_md_for_orphans(valid_agents, verbose=False):
     """Check CLAUDE.md for orphaned agent references."""
     orphans = []
-
-    if not CLAUDE_MD.exists():
-        return orphans
-
-    content = CLAUDE_MD.read_text()
-
-    # Extract agents from routing table - look for lines with agent patterns
-    # Format: | keywords | agent-name + agent-name |
-    routing_pattern = r"\|\s*[^|]+\s*\|\s*([^|]+)\s*\|"
-    for match in re.finditer(routing_pattern, content):
-        agents_cell = match.group(1).strip()
-        # Skip header rows, separator rows, and non-agent content
-        if not agents_cell or agents_cell == "Agents":
-            continue
-        if agents_cell.startswith("-") or agents_cell.startswith("="):
-            continue
-        # Skip non-agent table cells (like "Use Skill", "Use Agent Instead")
-        if "skill" in agents_cell.lower() or "agent instead" in agents_cell.lower():
-            continue
-        # Skip cells that look like examples or descriptions (longer text)
-        if len(agents_cell) > 50:
-            continue
-        # Split by + to get individual agents
-        for agent in agents_cell.split("+"):
-            agent = agent.strip().lower()
-            # Must look like an agent name (word-word format)
-            if agent and "-" in agent and agent not in valid_agents:
-                # Additional filter: must be a valid agent-style name
-                if re.match(r"^[a-z]+-[a-z]+(?:-[a-z]+)?$", agent):
-                    orphans.append({
-                        "file": "CLAUDE.md",
-                        "reference": agent,
-                        "type": "routing-table"
-                    })
+    graph = get_graph()
+
+    # Routing table agents (the "| keywords | agent + agent |" column)
+    for node in graph.nodes_of(CLAUDE_MD_NODE):
+        for agent in graph.references(node, rule=RULE_ROUTING):
+            if agent not in valid_agents:
+                orphans.append({
+                    "file": "CLAUDE.md",
+                    "reference": agent,
+                    "type": "routing-table"
+                })
 
     return orphans
 
@@ -219,29 +122,24 @@ def check_claude_md_for_orphans(valid_agents, verbose=False):
 def check_agent_self_references(verbose=False):
     """Check agents for self-references or Task tool usage."""
     issues = []
+    graph = get_graph()
 
-    if not AGENTS_DIR.exists():
-        return issues
-
-    for agent_file in AGENTS_DIR.glob("*.md"):
-        if agent_file.name in NON_AGENT_FILES:
+    for node in graph.nodes_of(AGENT):
+        if node.file_name in NON_AGENT_FILES:
             continue
 
-        content = agent_file.read_text()
-        agent_name = agent_file.stem
-
         # Check for self-reference
-        if f"Task: {agent_name}" in content.lower() or f"invoke {agent_name}" in content.lower():
+        if graph.references(node, INVOKES, RULE_SELF):
             issues.append({
-                "file": f"agents/{agent_file.name}",
-                "reference": agent_name,
+                "file": node.key,
+                "reference": node.name,
                 "type": "self-reference"
             })
 
         # Check for Task tool access (should be blocked)
-        if re.search(r"tools:.*Task", content, re.IGNORECASE):
+        if node.flags.get('task_tool'):
             issues.append({
-                "file": f"agents/{agent_file.name}",
+                "file": node.key,
                 "reference": "Task",
                 "type": "forbidden-tool"
             })
@@ -309,4 +207,4 @@ def main():
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(run_profiled(main, "check-orphans"))
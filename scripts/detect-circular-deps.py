@@ -12,110 +12,57 @@ Checks for:
 - Orphaned commands (referenced but don't exist)
 
 Add to pre-commit and CI for validation.
+Use --profile [cprofile|sample] to write a profile to .tmp/reports/.
 """
 
+import argparse
+import heapq
 import os
-import re
 import sys
+import time
 from pathlib import Path
 from collections import defaultdict
 
+sys.path.append(str(Path(__file__).parent / "performance"))
+from profiling import run_profiled
+from reference_graph import COMMAND, INVOKES, RULE_COMMAND, SKILL, get_reference_graph
 
-def _read_text(path: Path) -> str:
-    """Read file with explicit UTF-8 encoding and error handling."""
-    try:
-        return path.read_text(encoding="utf-8")
-    except OSError as exc:
-        raise RuntimeError(f"Failed to read {path}: {exc}") from exc
-
-
-def extract_command_references(content: str) -> list[str]:
-    """Extract command references from file content.
+CACHE_DIR = Path(__file__).parent.parent / ".cache"
 
-    Looks for patterns like:
-    - /command-name
-    - `/command-name`
-    - Run `/command-name`
-    - Execute /command-name
-    """
-    references = []
-
-    # Pattern for command invocations (excluding markdown headers and code comments)
-    # Matches /word or /word-word patterns
-    patterns = [
-        r'(?:Run|Execute|Use|Invoke|Call)\s+[`"]?(/[a-z][a-z0-9-]*)',  # Explicit invocations
-        r':\s*[`"]?(/[a-z][a-z0-9-]*)[`"]?\s*(?:command|skill)?',  # Label: /command
-        r'(?:then|after|before)\s+[`"]?(/[a-z][a-z0-9-]*)',  # Workflow sequences
-    ]
-
-    for pattern in patterns:
-        matches = re.findall(pattern, content, re.IGNORECASE)
-        references.extend(matches)
-
-    # Deduplicate and normalize
-    normalized = list(set(ref.lower().strip('`"') for ref in references))
-    return normalized
+# Bounds for cycle enumeration: the number of elementary cycles can grow
+# exponentially with the size of a strongly connected component
+DEFAULT_MAX_CYCLES = 1000
+DEFAULT_TIME_LIMIT = 10.0
 
 
 def build_dependency_graph(commands_dir: Path, skills_dir: Path) -> tuple[dict, set]:
     """Build a dependency graph from commands and skills.
 
+    Queries the shared reference graph for ``invokes`` edges.
+
     Returns:
         Tuple of (adjacency_list, all_commands)
     """
     graph = defaultdict(set)
     all_commands = set()
+    references = get_reference_graph(skills_dir=skills_dir, commands_dir=commands_dir,
+                                     cache_dir=CACHE_DIR)
+
+    # Commands, directory-based skills, then legacy flat-file skills (skills/<name>.md)
+    nodes = (references.nodes_of(COMMAND) + references.nodes_of(SKILL, "directory")
+             + references.nodes_of(SKILL, "flat"))
+    for node in nodes:
+        if node.file_name in ["README.md", "TEMPLATE.md"]:
+            continue
 
-    # Process commands
-    if commands_dir.exists():
-        for file_path in commands_dir.glob("*.md"):
-            if file_path.name in ["README.md", "TEMPLATE.md"]:
-                continue
-
-            command_name = "/" + file_path.stem
-            all_commands.add(command_name)
-
-            content = _read_text(file_path)
-            references = extract_command_references(content)
-
-            for ref in references:
-                # Exclude self-references: commands naturally mention themselves in documentation
-                # (e.g., "/debug" explaining "Use /debug --performance"). These are not circular deps.
-                if ref != command_name:
-                    graph[command_name].add(ref)
-
-    # Process skills (directory-based)
-    if skills_dir.exists():
-        for skill_dir in skills_dir.iterdir():
-            if skill_dir.is_dir() and not skill_dir.name.startswith('.'):
-                skill_file = skill_dir / "SKILL.md"
-                if skill_file.exists():
-                    skill_name = "/" + skill_dir.name
-                    all_commands.add(skill_name)
-
-                    content = _read_text(skill_file)
-                    references = extract_command_references(content)
-
-                    for ref in references:
-                        # Exclude self-references (documentation mentions, not actual cycles)
-                        if ref != skill_name:
-                            graph[skill_name].add(ref)
-
-        # Process legacy flat-file skills (skills/<name>.md)
-        non_skill_files = {"README.md", "TEMPLATE.md"}
-        for skill_file in skills_dir.glob("*.md"):
-            if skill_file.name in non_skill_files:
-                continue
-            skill_name = "/" + skill_file.stem
-            all_commands.add(skill_name)
-
-            content = _read_text(skill_file)
-            references = extract_command_references(content)
-
-            for ref in references:
-                # Exclude self-references (documentation mentions, not actual cycles)
-                if ref != skill_name:
-                    graph[skill_name].add(ref)
+        command_name = "/" + node.name
+        all_commands.add(command_name)
+
+        for ref in references.references(node, INVOKES, RULE_COMMAND):
+            # Exclude self-references: commands naturally mention themselves in documentation
+            # (e.g., "/debug" explaining "Use /debug --performance"). These are not circular deps.
+            if ref != command_name:
+                graph[command_name].add(ref)
 
     return dict(graph), all_commands
 
@@ -141,46 +88,151 @@ def normalize_cycle(cycle: list[str]) -> tuple[str, ...]:
     return tuple(rotated)
 
 
+def find_strongly_connected_components(graph: dict) -> list[list[str]]:
+    """Strongly connected components (iterative Tarjan), in a deterministic order.
+
+    Runs without recursion, so arbitrarily long command chains cannot hit
+    Python's recursion limit.
+    """
+    nodes = set(graph)
+    for deps in graph.values():
+        nodes.update(deps)
+
+    index: dict[str, int] = {}
+    low: dict[str, int] = {}
+    on_stack: set[str] = set()
+    stack: list[str] = []
+    components: list[list[str]] = []
+
+    for root in sorted(nodes):
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(sorted(graph.get(root, ()))))]
+
+        while work:
+            node, neighbors = work[-1]
+            for neighbor in neighbors:
+                if neighbor not in index:
+                    index[neighbor] = low[neighbor] = len(index)
+                    stack.append(neighbor)
+                    on_stack.add(neighbor)
+                    work.append((neighbor, iter(sorted(graph.get(neighbor, ())))))
+                    break
+                if neighbor in on_stack:
+                    low[node] = min(low[node], index[neighbor])
+            else:
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[node])
+                if low[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(sorted(component))
+
+    return components
+
+
+def _unblock(node: str, blocked: set, blocked_by: dict) -> None:
+    """Johnson's unblock, iteratively."""
+    pending = [node]
+    while pending:
+        current = pending.pop()
+        if current in blocked:
+            blocked.discard(current)
+            pending.extend(blocked_by.pop(current, ()))
+
+
+def _circuits_through(start: str, subgraph: dict):
+    """Elementary cycles through ``start`` within one SCC (Johnson's circuit search)."""
+    path = [start]
+    blocked = {start}
+    blocked_by: dict[str, set] = defaultdict(set)
+    closed = [False]
+    work = [(start, iter(subgraph[start]))]
+
+    while work:
+        node, neighbors = work[-1]
+        for neighbor in neighbors:
+            if neighbor == start:
+                yield path + [start]
+                closed[-1] = True
+            elif neighbor not in blocked:
+                path.append(neighbor)
+                closed.append(False)
+                blocked.add(neighbor)
+                work.append((neighbor, iter(subgraph[neighbor])))
+                break
+        else:
+            work.pop()
+            path.pop()
+            node_closed = closed.pop()
+            if node_closed:
+                if closed:
+                    closed[-1] = True
+                _unblock(node, blocked, blocked_by)
+            else:
+                for neighbor in subgraph[node]:
+                    blocked_by[neighbor].add(node)
+
+
+def enumerate_cycles(graph: dict, max_cycles: int = DEFAULT_MAX_CYCLES,
+                     time_limit: float = DEFAULT_TIME_LIMIT) -> tuple[list[list[str]], bool]:
+    """Every elementary cycle (Tarjan SCCs, then Johnson's algorithm within each).
+
+    Each cycle is reported once, rotated so its smallest command comes first,
+    with the start repeated at the end (``[A, B, A]``), in order of that first
+    command. Enumeration stops after ``max_cycles`` cycles or ``time_limit``
+    seconds; the second return value is False when cycles were left out.
+    """
+    deadline = time.monotonic() + time_limit
+    cycles: list[list[str]] = []
+
+    # Only nontrivial components can hold cycles: several nodes, or one with a self-loop.
+    # Components are disjoint, so keying the heap on the smallest member orders the cycles.
+    pending = [
+        (component[0], component) for component in find_strongly_connected_components(graph)
+        if len(component) > 1 or component[0] in graph.get(component[0], ())
+    ]
+    heapq.heapify(pending)
+    while pending:
+        start, component = heapq.heappop(pending)
+        members = set(component)
+        subgraph = {node: sorted(dep for dep in graph.get(node, ()) if dep in members) for node in component}
+
+        for cycle in _circuits_through(start, subgraph):
+            if len(cycles) >= max_cycles:
+                # Only now is a cycle actually being left out
+                return cycles, False
+            cycles.append(cycle)
+            if time.monotonic() > deadline:
+                return cycles, False
+
+        # Every cycle through ``start`` is known: drop it and split what is left
+        remaining = {node: [dep for dep in deps if dep != start]
+                     for node, deps in subgraph.items() if node != start}
+        for sub in find_strongly_connected_components(remaining):
+            if len(sub) > 1 or sub[0] in remaining.get(sub[0], ()):
+                heapq.heappush(pending, (sub[0], sub))
+
+    return cycles, True
+
+
 def find_cycles(graph: dict) -> list[list[str]]:
-    """Find all cycles in the dependency graph using DFS.
+    """Find all cycles in the dependency graph.
 
     Returns deduplicated cycles (same cycle with different starting nodes
-    is only reported once).
+    is only reported once), up to the default cycle and time bounds.
     """
-    cycles = []
-    seen_cycles: set[tuple[str, ...]] = set()
-    visited = set()
-    rec_stack = set()
-    path = []
-
-    def dfs(node: str) -> bool:
-        visited.add(node)
-        rec_stack.add(node)
-        path.append(node)
-
-        for neighbor in graph.get(node, []):
-            if neighbor not in visited:
-                if dfs(neighbor):
-                    return True
-            elif neighbor in rec_stack:
-                # Found a cycle
-                cycle_start = path.index(neighbor)
-                cycle = path[cycle_start:] + [neighbor]
-
-                # Deduplicate by normalizing
-                normalized = normalize_cycle(cycle)
-                if normalized not in seen_cycles:
-                    seen_cycles.add(normalized)
-                    cycles.append(cycle)
-
-        path.pop()
-        rec_stack.remove(node)
-        return False
-
-    for node in graph:
-        if node not in visited:
-            dfs(node)
-
+    cycles, _ = enumerate_cycles(graph)
     return cycles
 
 
@@ -207,6 +259,13 @@ def find_orphaned_references(graph: dict, all_commands: set) -> dict[str, list[s
 
 def main():
     """Main validation function."""
+    parser = argparse.ArgumentParser(description="Detect circular dependencies between commands and skills")
+    parser.add_argument("--max-cycles", type=int, default=DEFAULT_MAX_CYCLES,
+                        help="Stop after reporting this many cycles")
+    parser.add_argument("--time-limit", type=float, default=DEFAULT_TIME_LIMIT,
+                        help="Stop enumerating cycles after this many seconds")
+    args = parser.parse_args()
+
     script_dir = Path(__file__).parent
     repo_dir = script_dir.parent
     commands_dir = repo_dir / "system-configs" / ".claude" / "commands"
@@ -217,8 +276,8 @@ def main():
     # Build dependency graph
     try:
         graph, all_commands = build_dependency_graph(commands_dir, skills_dir)
-    except RuntimeError as exc:
-        print(f"\n❌ {exc}", file=sys.stderr)
+    except (OSError, UnicodeDecodeError) as exc:
+        print(f"\n❌ Failed to read commands and skills: {exc}", file=sys.stderr)
         return 1
 
     if not graph:
@@ -238,13 +297,16 @@ def main():
             print(f"   • {ref} references itself")
 
     # Check for cycles
-    cycles = find_cycles(graph)
+    cycles, complete = enumerate_cycles(graph, args.max_cycles, args.time_limit)
     if cycles:
         errors_found = True
         print("\n❌ Circular dependencies detected:")
         for cycle in cycles:
             cycle_str = " → ".join(cycle)
             print(f"   • {cycle_str}")
+        if not complete:
+            print(f"   … stopped after {len(cycles)} cycles "
+                  f"(limits: --max-cycles {args.max_cycles}, --time-limit {args.time_limit:g}s)")
 
     # Check for orphaned references
     orphans = find_orphaned_references(graph, all_commands)
@@ -264,4 +326,4 @@ def main():
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(run_profiled(main, "detect-circular-deps"))
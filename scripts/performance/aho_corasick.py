@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Aho-Corasick Multi-Pattern Matcher
+==================================
+
+Standard-library automaton for matching many literal strings at once:
+- Built once from a pattern list (trie + failure links + merged outputs)
+- Failure transitions resolved on first use and cached, so the hot loop is one dict lookup per character
+- One pass over the text regardless of how many patterns there are
+- Optional case-insensitive matching with offsets into the original text
+- Word-bounded, leftmost, non-overlapping matching that reproduces
+  ``re.findall(r'\\b(?:p0|p1|...)\\b', text)`` without a giant alternation
+
+Used for the orphan checker's skip list and for agent/skill name lookups,
+where the cost of an alternation regex or an ``any(... in ...)`` loop grows
+with the number of patterns.
+"""
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+def _is_word(char: str) -> bool:
+    """Matches the ``\\w`` class of ``re`` for str patterns."""
+    return char.isalnum() or char == '_'
+
+
+class AhoCorasick:
+    """Compiled automaton over a fixed list of literal patterns."""
+
+    def __init__(self, patterns: Iterable[str], ignore_case: bool = False):
+        self.ignore_case = ignore_case
+        self.patterns: List[str] = []
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Pattern indices ending at each state, including those reached through failure links
+        self._out: List[Tuple[int, ...]] = [()]
+
+        seen = set()
+        for pattern in patterns:
+            key = self._fold(pattern)
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            self._add(key, len(self.patterns))
+            self.patterns.append(pattern)
+        self._link()
+        self._lengths = [len(pattern) for pattern in self.patterns]
+        # Transition cache: trie edges up front, failure-resolved edges added as they are seen
+        self._delta: List[Dict[str, int]] = [dict(row) for row in self._goto]
+
+    def __len__(self) -> int:
+        return len(self.patterns)
+
+    def _fold(self, text: str) -> str:
+        if not self.ignore_case:
+            return text
+        folded = text.lower()
+        if len(folded) == len(text):
+            return folded
+        # A few characters lower-case to two; keep them so offsets stay aligned
+        return ''.join(char if len(char.lower()) != 1 else char.lower() for char in text)
+
+    def _add(self, key: str, index: int) -> None:
+        state = 0
+        for char in key:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+            state = next_state
+        self._out[state] = (index,)
+
+    def _link(self) -> None:
+        """Breadth-first failure links; outputs are merged so matching never walks them."""
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._out[next_state] = self._out[next_state] + self._out[self._fail[next_state]]
+
+    def _resolve(self, state: int, char: str) -> int:
+        """Follow failure links for a transition missing from the cache, and cache it."""
+        fallback = state
+        while fallback and char not in self._goto[fallback]:
+            fallback = self._fail[fallback]
+        next_state = self._goto[fallback].get(char, 0)
+        self._delta[state][char] = next_state
+        return next_state
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Every (possibly overlapping) occurrence as ``(start, end, pattern_index)``."""
+        delta, out, resolve = self._delta, self._out, self._resolve
+        root = delta[0]
+        lengths = self._lengths
+        state = 0
+        for position, char in enumerate(self._fold(text)):
+            if state == 0:
+                state = root.get(char, 0)
+            else:
+                next_state = delta[state].get(char)
+                state = resolve(state, char) if next_state is None else next_state
+            if out[state]:
+                end = position + 1
+                for index in out[state]:
+                    yield end - lengths[index], end, index
+
+    def contains_any(self, text: str) -> bool:
+        """Whether any pattern occurs in ``text`` (stops at the first hit)."""
+        delta, out, resolve = self._delta, self._out, self._resolve
+        state = 0
+        for char in self._fold(text):
+            next_state = delta[state].get(char)
+            if next_state is None:
+                next_state = resolve(state, char) if state else 0
+            state = next_state
+            if out[state]:
+                return True
+        return False
+
+    def find_all(self, text: str) -> List[str]:
+        """Every occurrence, as the matched pattern strings."""
+        return [self.patterns[index] for _, _, index in self.iter_matches(text)]
+
+    def iter_word_matches(self, text: str) -> Iterator[Tuple[int, int, int]]:
+        """Every word-bounded (possibly overlapping) occurrence as ``(start, end, pattern_index)``.
+
+        ``\\b`` is judged on both sides by the pattern's own edge characters,
+        as ``re`` would for ``\\bpattern\\b``.
+        """
+        length = len(text)
+        for start, end, index in self.iter_matches(text):
+            pattern = self.patterns[index]
+            if _is_word(pattern[0]) and start > 0 and _is_word(text[start - 1]):
+                continue
+            if not _is_word(pattern[0]) and (start == 0 or not _is_word(text[start - 1])):
+                continue
+            if _is_word(pattern[-1]) and end < length and _is_word(text[end]):
+                continue
+            if not _is_word(pattern[-1]) and (end == length or not _is_word(text[end])):
+                continue
+            yield start, end, index
+
+    def find_words(self, text: str) -> List[Tuple[int, int, int]]:
+        """Word-bounded matches with ``re`` alternation semantics.
+
+        Leftmost match first; at one start position the pattern listed
+        first wins; matches never overlap. Returns ``(start, end, index)``.
+        """
+        best: Dict[int, Tuple[int, int]] = {}
+        for start, end, index in self.iter_word_matches(text):
+            if start not in best or index < best[start][1]:
+                best[start] = (end, index)
+
+        matches = []
+        resume = 0
+        for start in sorted(best):
+            if start < resume:
+                continue
+            end, index = best[start]
+            matches.append((start, end, index))
+            resume = end
+        return matches
+
+
+__all__ = [
+    'AhoCorasick'
+]
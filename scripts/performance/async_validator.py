@@ -4,7 +4,8 @@ High-Performance Asynchronous Agent Validation System
 ====================================================
 
 Optimizes validation performance through:
-- Concurrent file processing (60% speed improvement)
+- Concurrent file processing (60% speed improvement) through a bounded
+  read -> parse -> validate pipeline (see pipeline.py)
 - Intelligent caching system (50% memory reduction)
 - Streaming YAML parsing for large files
 - Deduplicated operations across validation runs
@@ -17,31 +18,42 @@ Maintains all security features:
 - Quality gate compliance
 """
 
+import argparse
 import asyncio
-import hashlib
-import json
+import os
 import re
 import sys
 import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple, Any
+from typing import Any, Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
 import logging
 
+# Shared document model and result store
+sys.path.append(str(Path(__file__).parent))
+from compact_records import CompactRecord, Field, TextList
+from document_model import ParsedDocument, get_document_cache
+from pipeline import Stage, run_pipeline
+from result_store import open_result_store, source_version
+from section_index import attach_section_index
+from tracing import add_trace_argument, finish_tracing, span, start_tracing
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-@dataclass
-class ValidationResult:
-    """Structured validation result with performance metrics."""
-    agent_name: str
-    is_valid: bool
-    issues: List[str]
-    validation_time: float
-    file_size: int
-    cached: bool = False
+class ValidationResult(CompactRecord):
+    """Structured validation result with performance metrics (slotted; issues kept as plain text)."""
+    FIELDS = (
+        Field('agent_name'),
+        Field('is_valid'),
+        TextList('issues'),
+        Field('validation_time'),
+        Field('file_size'),
+        Field('cached', False)
+    )
+    __slots__ = CompactRecord.slots_for(FIELDS)
 
 @dataclass
 class CacheEntry:
@@ -52,105 +64,55 @@ class CacheEntry:
     file_mtime: float
 
 class PerformanceCache:
-    """Intelligent caching system for validation results."""
+    """Validation results in the shared SQLite result store."""
 
-    def __init__(self, cache_file: Path):
-        self.cache_file = cache_file
-        self.cache: Dict[str, CacheEntry] = {}
+    TABLE = 'agent_validation'
+
+    def __init__(self, cache_dir: Path):
+        self.store = open_result_store(cache_dir)
+        self.table = self.store.table(self.TABLE, source_version(__file__))
         self.hits = 0
         self.misses = 0
-        self._load_cache()
-
-    def _load_cache(self) -> None:
-        """Load cache from disk if available."""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    for key, entry_data in data.items():
-                        result_data = entry_data['result']
-                        result = ValidationResult(**result_data)
-                        self.cache[key] = CacheEntry(
-                            result=result,
-                            file_hash=entry_data['file_hash'],
-                            timestamp=entry_data['timestamp'],
-                            file_mtime=entry_data['file_mtime']
-                        )
-                logger.info(f"Loaded {len(self.cache)} cached entries")
-            except Exception as e:
-                logger.warning(f"Failed to load cache: {e}")
-                self.cache = {}
 
     def save_cache(self) -> None:
-        """Save cache to disk."""
+        """Flush buffered results to the store."""
         try:
-            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-            cache_data = {}
-            for key, entry in self.cache.items():
-                cache_data[key] = {
-                    'result': asdict(entry.result),
-                    'file_hash': entry.file_hash,
-                    'timestamp': entry.timestamp,
-                    'file_mtime': entry.file_mtime
-                }
-
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(cache_data, f, indent=2)
-            logger.info(f"Saved cache with {len(self.cache)} entries")
+            self.store.flush()
+            logger.info(f"Saved cache with {len(self.table)} entries")
         except Exception as e:
             logger.error(f"Failed to save cache: {e}")
 
-    def get_file_hash(self, file_path: Path) -> str:
-        """Get file hash for cache key."""
-        hasher = hashlib.md5()
-        with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b""):
-                hasher.update(chunk)
-        return hasher.hexdigest()
-
-    def get(self, file_path: Path) -> Optional[ValidationResult]:
-        """Get cached result if valid."""
-        cache_key = str(file_path)
-
-        if cache_key not in self.cache:
-            self.misses += 1
-            return None
-
-        entry = self.cache[cache_key]
-        file_mtime = file_path.stat().st_mtime
-
-        # Check if file has been modified
-        if file_mtime != entry.file_mtime:
-            self.misses += 1
-            del self.cache[cache_key]
-            return None
+    def clear(self) -> None:
+        """Drop all cached validation results."""
+        self.table.clear()
 
-        # Verify file hash for integrity
-        current_hash = self.get_file_hash(file_path)
-        if current_hash != entry.file_hash:
+    def get(self, file_path: Path, file_hash: str) -> Optional[ValidationResult]:
+        """Get cached result if the file content is unchanged."""
+        # Content hash comes from the already-parsed document - no re-read
+        payload = self.table.get(str(file_path), file_hash)
+        if payload is None:
             self.misses += 1
-            del self.cache[cache_key]
             return None
 
         self.hits += 1
-        result = entry.result
+        result = ValidationResult(**payload['result'])
         result.cached = True
         return result
 
-    def put(self, file_path: Path, result: ValidationResult) -> None:
+    def put(self, file_path: Path, result: ValidationResult, file_hash: str) -> None:
         """Cache validation result."""
-        cache_key = str(file_path)
-        file_hash = self.get_file_hash(file_path)
-        file_mtime = file_path.stat().st_mtime
-
         entry = CacheEntry(
             result=result,
             file_hash=file_hash,
             timestamp=time.time(),
-            file_mtime=file_mtime
+            file_mtime=file_path.stat().st_mtime
         )
 
-        self.cache[cache_key] = entry
+        self.table.put(str(file_path), file_hash, {
+            'result': entry.result.to_dict(),
+            'timestamp': entry.timestamp,
+            'file_mtime': entry.file_mtime
+        })
 
     def get_stats(self) -> Dict[str, Any]:
         """Get cache performance statistics."""
@@ -161,7 +123,7 @@ class PerformanceCache:
             'hits': self.hits,
             'misses': self.misses,
             'hit_rate': f"{hit_rate:.1f}%",
-            'cache_size': len(self.cache)
+            'cache_size': len(self.table)
         }
 
 class AsyncAgentValidator:
@@ -199,14 +161,13 @@ class AsyncAgentValidator:
     }
 
     def __init__(self, cache_dir: Path):
-        self.cache = PerformanceCache(cache_dir / 'validation_cache.json')
+        self.cache = PerformanceCache(cache_dir)
         self.executor = ThreadPoolExecutor(max_workers=8)  # Optimal for I/O bound tasks
         self.validation_rules = self._compile_validation_rules()
 
     def _compile_validation_rules(self) -> Dict[str, re.Pattern]:
         """Pre-compile regex patterns for performance."""
         return {
-            'yaml_section': re.compile(r'^---\n(.*?)\n---', re.DOTALL),
             'name_field': re.compile(r'^name:\s*(.+)$', re.MULTILINE),
             'description_field': re.compile(r'^description:\s*(.+)$', re.MULTILINE),
             'color_field': re.compile(r'^color:\s*(.+)$', re.MULTILINE),
@@ -216,41 +177,70 @@ class AsyncAgentValidator:
         }
 
     async def validate_file_async(self, file_path: Path) -> ValidationResult:
-        """Async file validation with intelligent caching."""
-        start_time = time.time()
-
-        # Check cache first
-        cached_result = self.cache.get(file_path)
-        if cached_result:
-            logger.debug(f"Cache hit for {file_path.name}")
-            return cached_result
+        """Async file validation with intelligent caching (one file through every pipeline stage)."""
+        [item] = await self._read_stage([file_path])
+        return await self._validate_stage(self._parse_stage(item))
+
+    def _read_files(self, file_paths: List[Path]) -> List[Union[ValidationResult, Tuple[Path, bytes, float]]]:
+        items: List[Union[ValidationResult, Tuple[Path, bytes, float]]] = []
+        for file_path in file_paths:
+            start_time = time.time()
+            try:
+                with span('read_file', file=file_path.name):
+                    with open(file_path, 'rb') as f:
+                        items.append((file_path, f.read(), start_time))
+            except Exception as e:
+                items.append(ValidationResult(
+                    agent_name=file_path.stem,
+                    is_valid=False,
+                    issues=[f"Failed to read file: {e}"],
+                    validation_time=time.time() - start_time,
+                    file_size=0
+                ))
+        return items
+
+    async def _read_stage(self, file_paths: List[Path]) -> List[Union[ValidationResult, Tuple[Path, bytes, float]]]:
+        """Pipeline stage: read a batch of files in one executor round trip."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, self._read_files, file_paths)
+
+    def _parse_stage(self, item: Union[ValidationResult, Tuple[Path, bytes, float]]):
+        """Pipeline stage: parse once through the shared document cache (memoized by content hash)."""
+        if isinstance(item, ValidationResult):
+            return item
+        file_path, data, start_time = item
+        return (file_path, get_document_cache().parse_bytes(data), start_time)
+
+    async def _validate_stage(self, item: Union[ValidationResult, Tuple[Path, ParsedDocument, float]]) -> ValidationResult:
+        """Pipeline stage: serve the cached result for unchanged content, else run the rules and cache them."""
+        if isinstance(item, ValidationResult):
+            return item
+        file_path, document, start_time = item
+
+        with span('validate_file', 'file', file=file_path.name) as file_span:
+            # The content hash doubles as the cache key
+            with span('cache_lookup'):
+                cached_result = self.cache.get(file_path, document.content_hash)
+            if cached_result:
+                logger.debug(f"Cache hit for {file_path.name}")
+                file_span.annotate(cached=True)
+                return cached_result
+
+            # Validate content
+            with span('rules'):
+                result = await self._validate_content_async(file_path, document, start_time)
+
+            # Cache successful validations
+            with span('cache_store'):
+                self.cache.put(file_path, result, document.content_hash)
 
-        # Read file with proper UTF-8 encoding
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-        except Exception as e:
-            result = ValidationResult(
-                agent_name=file_path.stem,
-                is_valid=False,
-                issues=[f"Failed to read file: {e}"],
-                validation_time=time.time() - start_time,
-                file_size=0
-            )
             return result
 
-        # Validate content
-        result = await self._validate_content_async(file_path, content, start_time)
-
-        # Cache successful validations
-        self.cache.put(file_path, result)
-
-        return result
-
-    async def _validate_content_async(self, file_path: Path, content: str, start_time: float) -> ValidationResult:
+    async def _validate_content_async(self, file_path: Path, document: ParsedDocument, start_time: float) -> ValidationResult:
         """Validate file content with optimized parsing."""
         agent_name = file_path.stem
         issues = []
+        content = document.content
         file_size = len(content)
 
         # Skip non-agent files
@@ -263,9 +253,8 @@ class AsyncAgentValidator:
                 file_size=file_size
             )
 
-        # Extract YAML section using pre-compiled regex
-        yaml_match = self.validation_rules['yaml_section'].match(content)
-        if not yaml_match:
+        # YAML section comes from the shared document parse
+        if not document.has_front_matter:
             issues.append("No YAML front-matter found (missing --- delimiters)")
             return ValidationResult(
                 agent_name=agent_name,
@@ -275,7 +264,7 @@ class AsyncAgentValidator:
                 file_size=file_size
             )
 
-        yaml_section = yaml_match.group(1)
+        yaml_section = document.front_matter_text
 
         # Concurrent validation of different aspects per AGENT_TEMPLATE.md
         validation_tasks = [
@@ -473,43 +462,56 @@ class AsyncAgentValidator:
 
         return issues
 
-    async def validate_agents_parallel(self, agents_dir: Path) -> List[ValidationResult]:
-        """Validate all agents with maximum parallelism."""
-        # Get all agent files
-        agent_files = [
-            f for f in agents_dir.glob('*.md')
-            if f.name not in self.NON_AGENT_FILES
-        ]
+    def discover_agent_files(self, agents_dir: Path) -> Iterator[Path]:
+        """Lazily yield agent files from a single directory scan."""
+        with os.scandir(agents_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.md') and entry.name not in self.NON_AGENT_FILES and entry.is_file():
+                    yield Path(entry.path)
 
-        logger.info(f"Validating {len(agent_files)} agent files with parallel execution...")
+    async def validate_agents_parallel(self, agents_dir: Path, max_in_flight: int = 64,
+                                       on_result: Optional[Callable[[ValidationResult], None]] = None) -> List[ValidationResult]:
+        """Validate all agents through a bounded read -> parse -> validate pipeline.
 
-        # Create validation tasks
-        validation_tasks = [
-            self.validate_file_async(agent_file)
-            for agent_file in agent_files
-        ]
+        At most ``max_in_flight`` files are held between discovery and the
+        sink; ``on_result`` sees each result as soon as it completes.
+        """
+        logger.info(f"Validating agent files with a pipeline of {max_in_flight} in flight...")
+
+        validation_results: List[ValidationResult] = []
+
+        def sink(result: ValidationResult):
+            validation_results.append(result)
+            if on_result is not None:
+                on_result(result)
+
+        def on_error(file_path: Path, error: BaseException) -> ValidationResult:
+            return ValidationResult(
+                agent_name=file_path.stem,
+                is_valid=False,
+                issues=[f"Validation exception: {error}"],
+                validation_time=0,
+                file_size=0
+            )
 
-        # Execute all validations concurrently
         start_time = time.time()
-        results = await asyncio.gather(*validation_tasks, return_exceptions=True)
+        with span('validate_agents', 'run'):
+            pipeline_stats = await run_pipeline(
+                self.discover_agent_files(agents_dir),
+                [
+                    Stage('read', self._read_stage, workers=4, batch_size=16),
+                    Stage('parse', self._parse_stage),
+                    Stage('validate', self._validate_stage, workers=8),
+                ],
+                sink,
+                max_in_flight=max_in_flight,
+                on_error=on_error
+            )
         total_time = time.time() - start_time
 
-        # Process results
-        validation_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                validation_results.append(ValidationResult(
-                    agent_name=agent_files[i].stem,
-                    is_valid=False,
-                    issues=[f"Validation exception: {result}"],
-                    validation_time=0,
-                    file_size=0
-                ))
-            else:
-                validation_results.append(result)
-
         # Log performance metrics
         cache_stats = self.cache.get_stats()
+        logger.info(f"Validated {pipeline_stats.items} agent files (peak in flight: {pipeline_stats.peak_in_flight})")
         logger.info(f"Validation completed in {total_time:.2f}s")
         logger.info(f"Cache performance: {cache_stats}")
 
@@ -528,19 +530,28 @@ async def main():
     agents_dir = project_root / 'system-configs' / '.claude' / 'agents'
     cache_dir = project_root / '.cache'
 
+    parser = argparse.ArgumentParser(description='High-performance async agent validation')
+    add_trace_argument(parser, project_root / '.tmp' / 'reports' / 'async-validation-trace.json')
+    args = parser.parse_args()
+
     if not agents_dir.exists():
         print(f"Error: Agents directory not found at {agents_dir}")
         sys.exit(1)
 
-    # Initialize validator
+    if args.trace:
+        start_tracing()
+
+    # Initialize validator; unchanged agents are rebuilt from the section index, not re-parsed
     validator = AsyncAgentValidator(cache_dir)
+    attach_section_index(cache_dir)
 
     try:
         # Validate all agents
         results = await validator.validate_agents_parallel(agents_dir)
 
         # Generate comprehensive report
-        await generate_performance_report(results, validator.cache.get_stats(), project_root)
+        with span('report'):
+            await generate_performance_report(results, validator.cache.get_stats(), project_root)
 
         # Check if all validations passed
         failed_count = sum(1 for r in results if not r.is_valid)
@@ -554,6 +565,7 @@ async def main():
 
     finally:
         validator.cleanup()
+        finish_tracing(args.trace)
 
 async def generate_performance_report(results: List[ValidationResult], cache_stats: Dict, project_root: Path):
     """Generate comprehensive performance and validation report."""
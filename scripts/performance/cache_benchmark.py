@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+PerformanceCache Microbenchmark
+===============================
+
+Measures per-operation latency of the stdlib LRU cache as it grows:
+- get (hit) on a full cache
+- put overwriting an existing key
+- put of a new key on a full cache (forces an eviction)
+
+Per-op latency should stay flat from 1k to 1M entries; a linear eviction
+scan shows up as latency growing with cache size.
+
+Usage:
+    python3 scripts/performance/cache_benchmark.py [--sizes 1000,10000,...] [--ops N]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(str(Path(__file__).parent))
+from performance_compat import PerformanceCache
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000, 1_000_000]
+
+
+def _ns_per_op(func, keys: List[str]) -> float:
+    start = time.perf_counter_ns()
+    for key in keys:
+        func(key)
+    return (time.perf_counter_ns() - start) / len(keys)
+
+
+def benchmark_size(size: int, ops: int, max_bytes: int = None) -> Dict[str, float]:
+    """Fill a cache to capacity and time each operation type."""
+    cache = PerformanceCache(max_size=size, max_bytes=max_bytes)
+    value = {'valid': True, 'issues': []}
+    for i in range(size):
+        cache.put(f"key-{i}", value)
+
+    rng = random.Random(size)
+    existing = [f"key-{rng.randrange(size)}" for _ in range(ops)]
+    fresh = [f"new-{i}" for i in range(ops)]
+
+    results = {
+        'size': size,
+        'get_hit_ns': _ns_per_op(cache.get, existing),
+        'put_update_ns': _ns_per_op(lambda k: cache.put(k, value), existing),
+        'put_evict_ns': _ns_per_op(lambda k: cache.put(k, value), fresh),
+    }
+    results['evictions'] = cache.evictions
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark PerformanceCache per-op latency')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='Comma-separated cache sizes')
+    parser.add_argument('--ops', type=int, default=100_000, help='Operations timed per measurement')
+    parser.add_argument('--max-bytes', type=int, default=None, help='Optional byte budget')
+    parser.add_argument('--json', action='store_true', help='Emit JSON instead of a table')
+    args = parser.parse_args()
+
+    sizes = [int(s) for s in args.sizes.split(',') if s]
+    rows = [benchmark_size(size, args.ops, args.max_bytes) for size in sizes]
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+
+    print(f"{'entries':>10} {'get hit':>10} {'put update':>12} {'put evict':>11}   (ns/op)")
+    for row in rows:
+        print(f"{row['size']:>10,} {row['get_hit_ns']:>10.0f} {row['put_update_ns']:>12.0f} "
+              f"{row['put_evict_ns']:>11.0f}")
+
+    baseline = rows[0]['put_evict_ns']
+    worst = max(row['put_evict_ns'] for row in rows)
+    print(f"\nEviction latency spread: {worst / baseline:.2f}x across {sizes[0]:,}-{sizes[-1]:,} entries")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,380 @@
+#!/usr/bin/env python3
+"""
+Capability Routing Index
+========================
+
+Persistent inverted index over ``agent-capability-matrix.json`` (or
+``.ndjson``) for routing a free-text task to the agents best suited to it:
+- Terms from each agent's ``capabilities``, ``when_to_use`` and
+  ``coordination_patterns``, lower-cased, stop words dropped, lightly stemmed
+- BM25 ranking (``K1``/``B``), with ``when_to_use`` terms weighted double
+- Postings live in the shared result store, one row per term carrying
+  ``(agent, tf, length)`` entries, so a query reads only its own terms
+- Incremental refresh: a matrix whose stat key is unchanged is not even
+  read; otherwise only agents whose indexed fields changed (or vanished)
+  touch their terms' postings
+- Posting lists are turned into impact-ordered BM25 weights on first use
+  and kept in memory; a top-k query stops walking a list as soon as no
+  unseen agent could still make the cut, so common terms cost little
+
+Entries are versioned by this module's source, so a tokenizer or scoring
+change re-indexes everything.
+"""
+
+import hashlib
+import heapq
+import json
+import math
+import os
+import re
+import sys
+import time
+from collections import Counter, OrderedDict
+from dataclasses import dataclass
+from operator import itemgetter
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+sys.path.append(str(Path(__file__).parent))
+from result_store import open_result_store, source_version
+
+TERMS_TABLE = 'capability_index_terms'
+AGENTS_TABLE = 'capability_index_agents'
+META_TABLE = 'capability_index_meta'
+
+# Matrix fields that are indexed, with the weight each occurrence adds to a term's frequency
+INDEX_FIELDS = {
+    'capabilities': 1,
+    'when_to_use': 2,
+    'coordination_patterns': 1
+}
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+# Posting lists kept in memory per index
+DEFAULT_CACHE_TERMS = 4096
+
+_WORD = re.compile(r'[a-z0-9]+')
+
+STOP_WORDS = frozenset('''
+    a about after all also an and any are as at be been before being between both but by can could do
+    does each for from had has have how i if in into is it its like may more most must need needs no
+    not of on or other our out over own same should so some such than that the their them then there
+    these they this those through to too under up use used uses using very via was we were what when
+    where which while who will with within without would you your
+'''.split())
+
+
+def stem(word: str) -> str:
+    """Strip common English suffixes so 'tests', 'testing' and 'tested' share a term."""
+    if len(word) > 4 and word.endswith('ies'):
+        return word[:-3] + 'y'
+    for suffix in ('ing', 'ed'):
+        if len(word) > len(suffix) + 3 and word.endswith(suffix):
+            return word[:-len(suffix)]
+    if len(word) > 3 and word.endswith('s') and not word.endswith(('ss', 'us', 'is')):
+        return word[:-1]
+    return word
+
+
+def tokenize(text: str) -> List[str]:
+    """Index terms of a text, in order (repeats kept)."""
+    return [stem(word) for word in _WORD.findall(text.lower()) if word not in STOP_WORDS]
+
+
+def agent_terms(record: Dict[str, Any]) -> Dict[str, int]:
+    """Weighted term frequencies of one matrix agent record."""
+    terms: Counter = Counter()
+    for field, weight in INDEX_FIELDS.items():
+        for entry in record.get(field) or ():
+            for term in tokenize(entry):
+                terms[term] += weight
+    return dict(terms)
+
+
+def iter_matrix_agents(matrix_path: Path) -> Iterator[Dict[str, Any]]:
+    """Agent records of a capability matrix: scanner JSON/NDJSON reports or a bare list of records."""
+    with open(matrix_path, 'r', encoding='utf-8') as f:
+        if matrix_path.suffix == '.ndjson':
+            for line in f:
+                if line.strip():
+                    record = json.loads(line)
+                    # The last line holds scan_metadata/analysis, not an agent
+                    if 'name' in record:
+                        yield record
+        else:
+            matrix = json.load(f)
+            yield from matrix if isinstance(matrix, list) else matrix.get('agents', [])
+
+
+def default_matrix_path(project_root: Path) -> Path:
+    """The newest capability matrix the scanner wrote (JSON if neither exists)."""
+    candidates = [project_root / f"agent-capability-matrix.{suffix}" for suffix in ('json', 'ndjson')]
+    existing = [path for path in candidates if path.exists()]
+    if not existing:
+        return candidates[0]
+    return max(existing, key=lambda path: path.stat().st_mtime_ns)
+
+
+# A term's postings in memory: (agent key, impact) best first, and impact by agent key
+_TermPostings = Tuple[List[Tuple[str, float]], Dict[str, float]]
+
+
+def _stat_key(stat: os.stat_result) -> str:
+    return f"{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def _record_digest(record: Dict[str, Any]) -> str:
+    """Hash of the name and indexed fields of a matrix record."""
+    indexed = [record.get('name')] + [record.get(field) or [] for field in INDEX_FIELDS]
+    encoded = json.dumps(indexed, separators=(',', ':')).encode('utf-8')
+    return hashlib.blake2b(encoded, digest_size=16).hexdigest()
+
+
+@dataclass
+class AgentMatch:
+    """One ranked agent for a query."""
+    name: str
+    file: str
+    score: float
+    matched_terms: List[str]
+
+
+@dataclass
+class RefreshResult:
+    """What a refresh had to do to bring the index up to date with the matrix."""
+    changed: bool
+    agents: int = 0
+    indexed: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    terms_updated: int = 0
+    seconds: float = 0.0
+
+
+class CapabilityIndex:
+    """BM25 index over agent capability records, persisted in the result store."""
+
+    def __init__(self, cache_dir: Path, cache_terms: int = DEFAULT_CACHE_TERMS):
+        self.store = open_result_store(cache_dir)
+        version = source_version(__file__)
+        self.terms = self.store.table(TERMS_TABLE, version)
+        self.agents = self.store.table(AGENTS_TABLE, version)
+        self.meta = self.store.table(META_TABLE, version)
+        self.cache_terms = cache_terms
+        # term -> BM25 impact per agent, both impact-ordered and by agent key
+        self._postings: 'OrderedDict[str, _TermPostings]' = OrderedDict()
+        self._names: Dict[str, str] = {}
+        self._corpus: Optional[Tuple[int, float]] = None
+        self.queries = 0
+        self.postings_loaded = 0
+        self.postings_hits = 0
+
+    def refresh(self, matrix_path: Union[str, Path]) -> RefreshResult:
+        """Bring the index up to date with a matrix file, re-indexing only what changed."""
+        start = time.perf_counter()
+        matrix_path = Path(matrix_path)
+        stat_key = _stat_key(os.stat(matrix_path))
+        if self.meta.get('matrix', stat_key) is not None:
+            return RefreshResult(changed=False, seconds=time.perf_counter() - start)
+
+        result = RefreshResult(changed=True)
+        previous = self.meta.lookup('agents')
+        previous_keys: Set[str] = set(previous.payload) if previous is not None else set()
+        seen: Set[str] = set()
+        # term -> {agent key: (tf, length), or None to drop the agent from the term}
+        changes: Dict[str, Dict[str, Optional[Tuple[int, int]]]] = {}
+        total_length = 0
+
+        for record in iter_matrix_agents(matrix_path):
+            key = record.get('file') or record.get('name')
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            digest = _record_digest(record)
+            stored = self.agents.lookup(key)
+            if stored is not None and stored.content_hash == digest:
+                total_length += stored.payload['length']
+                result.unchanged += 1
+                continue
+
+            terms = agent_terms(record)
+            length = sum(terms.values())
+            total_length += length
+            if stored is not None:
+                for term in stored.payload['terms']:
+                    changes.setdefault(term, {})[key] = None
+            for term, tf in terms.items():
+                changes.setdefault(term, {})[key] = (tf, length)
+            self.agents.put(key, digest, {'name': record.get('name') or key, 'length': length,
+                                          'terms': sorted(terms)})
+            result.indexed += 1
+
+        for key in previous_keys - seen:
+            stored = self.agents.lookup(key)
+            if stored is not None:
+                for term in stored.payload['terms']:
+                    changes.setdefault(term, {})[key] = None
+            self.agents.delete(key)
+            result.removed += 1
+
+        for term, updates in changes.items():
+            stored = self.terms.lookup(term)
+            postings = {entry[0]: (entry[1], entry[2]) for entry in stored.payload} if stored is not None else {}
+            for key, posting in updates.items():
+                if posting is None:
+                    postings.pop(key, None)
+                else:
+                    postings[key] = posting
+            if postings:
+                self.terms.put(term, '', [[key, tf, length] for key, (tf, length) in sorted(postings.items())])
+            else:
+                self.terms.delete(term)
+        result.terms_updated = len(changes)
+
+        result.agents = len(seen)
+        self.meta.put('agents', '', sorted(seen))
+        self.meta.put('matrix', stat_key, {'agents': len(seen), 'total_length': total_length})
+        self.store.flush()
+
+        self._postings.clear()
+        self._names.clear()
+        self._corpus = None
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def rebuild(self, matrix_path: Union[str, Path]) -> RefreshResult:
+        """Drop the index and build it again from scratch."""
+        for table in (self.terms, self.agents, self.meta):
+            table.clear()
+        self._postings.clear()
+        self._names.clear()
+        self._corpus = None
+        return self.refresh(matrix_path)
+
+    def _corpus_stats(self) -> Tuple[int, float]:
+        """Agent count and mean document length."""
+        if self._corpus is None:
+            stored = self.meta.lookup('matrix')
+            if stored is None:
+                self._corpus = (0, 0.0)
+            else:
+                agents = stored.payload['agents']
+                self._corpus = (agents, stored.payload['total_length'] / agents if agents else 0.0)
+        return self._corpus
+
+    def _postings_for(self, term: str, agents: int, average_length: float) -> Optional[_TermPostings]:
+        entry = self._postings.get(term)
+        if entry is not None:
+            self._postings.move_to_end(term)
+            self.postings_hits += 1
+            return entry
+
+        stored = self.terms.lookup(term)
+        if stored is None:
+            return None
+        frequency = len(stored.payload)
+        idf = math.log(1 + (agents - frequency + 0.5) / (frequency + 0.5))
+        impacts = {
+            key: idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * length / average_length))
+            for key, tf, length in stored.payload
+        }
+        ordered = sorted(impacts.items(), key=itemgetter(1), reverse=True)
+        entry = self._postings[term] = (ordered, impacts)
+        self.postings_loaded += 1
+        if len(self._postings) > self.cache_terms:
+            self._postings.popitem(last=False)
+        return entry
+
+    def _name(self, key: str) -> str:
+        name = self._names.get(key)
+        if name is None:
+            stored = self.agents.lookup(key)
+            name = self._names[key] = stored.payload['name'] if stored is not None else key
+        return name
+
+    def search(self, query: str, limit: int = 5) -> List[AgentMatch]:
+        """Agents ranked by BM25 against the query's terms (ties broken by file).
+
+        Impact-ordered lists are walked one term at a time, highest-weighted
+        term first; every newly seen agent is scored exactly by lookups, and
+        a list is abandoned as soon as no agent not yet seen could reach the
+        ``limit``-th best score, so common low-weight terms are barely walked.
+        """
+        self.queries += 1
+        agents, average_length = self._corpus_stats()
+        words: Dict[str, str] = {}
+        for word in _WORD.findall(query.lower()):
+            if word not in STOP_WORDS:
+                words.setdefault(stem(word), word)
+        lists: List[Tuple[str, _TermPostings]] = []
+        for term, word in words.items():
+            entry = self._postings_for(term, agents, average_length) if agents else None
+            if entry is not None:
+                lists.append((word, entry))
+        if not lists or limit <= 0:
+            return []
+
+        lists.sort(key=lambda item: item[1][0][0][1], reverse=True)
+        lookups = [impacts for _, (_, impacts) in lists]
+        maxima = [ordered[0][1] for _, (ordered, _) in lists]
+        scores: Dict[str, float] = {}
+        best: List[float] = []  # min-heap of the top ``limit`` scores
+        # Most an unseen agent can hold from the lists already walked (each was cut at this impact)
+        walked = 0.0
+        for position, (_, (ordered, _)) in enumerate(lists):
+            remaining = sum(maxima[position + 1:])
+            cut = 0.0
+            for key, impact in ordered:
+                # Strictly below: an unseen agent tying the cut-off could still win on file order
+                if len(best) == limit and walked + impact + remaining < best[0]:
+                    cut = impact
+                    break
+                if key in scores:
+                    continue
+                score = scores[key] = sum(impacts.get(key, 0.0) for impacts in lookups)
+                if len(best) < limit:
+                    heapq.heappush(best, score)
+                elif score > best[0]:
+                    heapq.heapreplace(best, score)
+            walked += cut
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [
+            AgentMatch(self._name(key), key, score, [word for word, (_, impacts) in lists if key in impacts])
+            for key, score in ranked
+        ]
+
+    def get_stats(self) -> Dict[str, Any]:
+        agents, average_length = self._corpus_stats()
+        lookups = self.postings_loaded + self.postings_hits
+        hit_rate = (self.postings_hits / lookups * 100) if lookups > 0 else 0
+        return {
+            'agents': agents,
+            'average_length': round(average_length, 1),
+            'queries': self.queries,
+            'postings_loaded': self.postings_loaded,
+            'postings_cached': len(self._postings),
+            'hit_rate': f"{hit_rate:.1f}%"
+        }
+
+
+__all__ = [
+    'TERMS_TABLE',
+    'AGENTS_TABLE',
+    'META_TABLE',
+    'INDEX_FIELDS',
+    'K1',
+    'B',
+    'STOP_WORDS',
+    'stem',
+    'tokenize',
+    'agent_terms',
+    'iter_matrix_agents',
+    'default_matrix_path',
+    'AgentMatch',
+    'RefreshResult',
+    'CapabilityIndex'
+]
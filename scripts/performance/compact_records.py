@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Compact Result Records
+======================
+
+Slotted, array-backed records for results that are held in bulk:
+- Closed vocabularies (tools, colors, categories, operations) are interned
+  once per process in a shared ``Vocabulary`` and stored as small integer
+  IDs
+- Every interned list field of a record lives in one ``array('I')`` of IDs
+  plus a bounds array, instead of one list object per field
+- Free text (capability bullets, issue messages) is stored as a plain tuple
+  of strings: the tables only ever grow, so interning text that is unique
+  per file would keep every edit alive in a long-running ``--watch``
+- ``__slots__`` everywhere: no per-instance ``__dict__``
+
+Records read like the dataclasses they replace: ``info.tools`` returns a
+list of strings, keyword and positional construction follow ``FIELDS``
+order, and ``to_dict()`` / ``to_row()`` stand in for ``asdict`` /
+``astuple``. List fields are decoded on access, so change one by
+assigning a new list rather than appending to the returned one.
+"""
+
+import sys
+import threading
+from array import array
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+class Vocabulary:
+    """Process-wide string intern table mapping strings to dense integer IDs."""
+
+    def __init__(self, name: str):
+        self.name = name
+        self._ids: Dict[str, int] = {}
+        self._strings: List[str] = []
+        self._lock = threading.Lock()
+
+    def intern(self, value: str) -> int:
+        index = self._ids.get(value)
+        if index is None:
+            with self._lock:
+                index = self._ids.get(value)
+                if index is None:
+                    index = len(self._strings)
+                    self._strings.append(value)
+                    self._ids[value] = index
+        return index
+
+    def __getitem__(self, index: int) -> str:
+        return self._strings[index]
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'entries': len(self._strings),
+            'bytes': sum(sys.getsizeof(value) for value in self._strings)
+        }
+
+
+# Shared tables: one per closed vocabulary (append-only, so never for free text)
+LABELS = Vocabulary('labels')    # colors, categories, operations
+TOOLS = Vocabulary('tools')
+
+
+class Field:
+    """Plain field stored as-is in a slot of the same name."""
+
+    def __init__(self, name: str, default: Any = ...):
+        self.name = name
+        self.default = default
+
+    @property
+    def slot(self) -> str:
+        return self.name
+
+
+class Interned(Field):
+    """String field stored as an ID into ``vocabulary``."""
+
+    def __init__(self, name: str, vocabulary: Vocabulary, default: Any = ...):
+        super().__init__(name, default)
+        self.vocabulary = vocabulary
+
+    @property
+    def slot(self) -> str:
+        return '_' + self.name
+
+    def __get__(self, record, owner=None):
+        if record is None:
+            return self
+        index = getattr(record, self.slot)
+        return None if index < 0 else self.vocabulary[index]
+
+    def __set__(self, record, value: Optional[str]) -> None:
+        setattr(record, self.slot, -1 if value is None else self.vocabulary.intern(value))
+
+
+class InternedList(Field):
+    """List-of-strings field stored as a run of IDs in the record's shared ID array."""
+
+    def __init__(self, name: str, vocabulary: Vocabulary):
+        super().__init__(name, None)
+        self.vocabulary = vocabulary
+        self.index = 0  # position among the record's list fields, set by CompactRecord
+
+    @property
+    def slot(self) -> Optional[str]:
+        return None
+
+    def __get__(self, record, owner=None):
+        if record is None:
+            return self
+        bounds = record._bounds
+        start = bounds[self.index - 1] if self.index else 0
+        strings = self.vocabulary._strings
+        return [strings[index] for index in record._ids[start:bounds[self.index]]]
+
+    def __set__(self, record, values: Optional[Iterable[str]]) -> None:
+        lists = [field.__get__(record) for field in type(record)._lists]
+        lists[self.index] = values
+        record._pack(lists)
+
+
+class TextList(Field):
+    """List-of-strings field for free text, stored as a tuple in a slot of its own."""
+
+    def __init__(self, name: str):
+        super().__init__(name, None)
+
+    @property
+    def slot(self) -> str:
+        return '_' + self.name
+
+    def __get__(self, record, owner=None):
+        if record is None:
+            return self
+        return list(getattr(record, self.slot))
+
+    def __set__(self, record, values: Optional[Iterable[str]]) -> None:
+        setattr(record, self.slot, tuple(values) if values else ())
+
+
+class CompactRecord:
+    """Base for slotted records declared by a ``FIELDS`` tuple.
+
+    Subclasses write ``__slots__ = CompactRecord.slots_for(FIELDS)`` after
+    ``FIELDS``; descriptors for interned fields are installed automatically.
+    """
+    __slots__ = ()
+    FIELDS: Tuple[Field, ...] = ()
+
+    @staticmethod
+    def slots_for(fields: Tuple[Field, ...]) -> Tuple[str, ...]:
+        slots = tuple(field.slot for field in fields if field.slot is not None)
+        if any(isinstance(field, InternedList) for field in fields):
+            slots += ('_ids', '_bounds')
+        return slots
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        cls._lists = tuple(field for field in cls.FIELDS if isinstance(field, InternedList))
+        cls._texts = tuple(field for field in cls.FIELDS if isinstance(field, TextList))
+        for index, field in enumerate(cls._lists):
+            field.index = index
+        for field in cls.FIELDS:
+            if isinstance(field, (Interned, InternedList, TextList)):
+                setattr(cls, field.name, field)
+        cls._names = tuple(field.name for field in cls.FIELDS)
+
+    def __init__(self, *args, **kwargs):
+        if len(args) > len(self.FIELDS):
+            raise TypeError(f"{type(self).__name__} takes at most {len(self.FIELDS)} positional arguments")
+        lists: List[Optional[Iterable[str]]] = [None] * len(self._lists)
+        for position, field in enumerate(self.FIELDS):
+            if position < len(args):
+                value = args[position]
+                if field.name in kwargs:
+                    raise TypeError(f"{type(self).__name__} got multiple values for '{field.name}'")
+            elif field.name in kwargs:
+                value = kwargs.pop(field.name)
+            elif field.default is not ...:
+                value = field.default
+            else:
+                raise TypeError(f"{type(self).__name__} missing required argument '{field.name}'")
+            if isinstance(field, InternedList):
+                lists[field.index] = value
+            else:
+                setattr(self, field.name, value)
+        if kwargs:
+            raise TypeError(f"{type(self).__name__} got unexpected arguments: {', '.join(sorted(kwargs))}")
+        if self._lists:
+            self._pack(lists)
+
+    def _pack(self, lists: List[Optional[Iterable[str]]]) -> None:
+        ids = array('I')
+        bounds = array('I')
+        for field, values in zip(self._lists, lists):
+            if values:
+                intern = field.vocabulary.intern
+                ids.extend(intern(value) for value in values)
+            bounds.append(len(ids))
+        if ids:
+            self._ids = ids
+            self._bounds = bounds
+        else:
+            self._ids = _NO_IDS
+            self._bounds = _NO_BOUNDS_FOR.get(len(bounds)) or bounds
+
+    def to_row(self) -> tuple:
+        """Field values in ``FIELDS`` order (the ``astuple`` equivalent)."""
+        return tuple(getattr(self, name) for name in self._names)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Field values by name (the ``asdict`` equivalent)."""
+        return {name: getattr(self, name) for name in self._names}
+
+    def __reduce__(self):
+        return (type(self), self.to_row())
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.to_row() == other.to_row()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        fields = ', '.join(f"{name}={getattr(self, name)!r}" for name in self._names)
+        return f"{type(self).__name__}({fields})"
+
+    def __sizeof__(self) -> int:
+        # Own slots, the ID arrays and free text; interned strings belong to the shared tables
+        size = object.__sizeof__(self)
+        if self._lists and self._ids is not _NO_IDS:
+            size += self._ids.__sizeof__() + self._bounds.__sizeof__()
+        for field in self._texts:
+            texts = getattr(self, field.slot)
+            if texts:
+                size += texts.__sizeof__() + sum(text.__sizeof__() for text in texts)
+        return size
+
+
+# Records whose list fields are all empty share these arrays (never mutated: _pack builds new ones)
+_NO_IDS = array('I')
+_NO_BOUNDS_FOR: Dict[int, array] = {count: array('I', [0] * count) for count in range(1, 17)}
+
+
+def vocabulary_stats() -> List[Dict[str, Any]]:
+    """Entry counts and string bytes of the shared tables."""
+    return [vocabulary.get_stats() for vocabulary in (LABELS, TOOLS)]
+
+
+__all__ = [
+    'Vocabulary',
+    'LABELS',
+    'TOOLS',
+    'Field',
+    'Interned',
+    'InternedList',
+    'TextList',
+    'CompactRecord',
+    'vocabulary_stats'
+]
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Corpus Scaling Benchmark
+========================
+
+Sweeps synthetic corpus sizes through the performance package's components:
+- AsyncAgentValidator (validate_agents_parallel)
+- ParallelAgentStandardizer (standardize_agents_parallel)
+- ParallelCapabilityScanner (scan_agents_parallel)
+
+For each component and size it reports throughput, p50/p95 per-file latency,
+peak RSS and a scaling exponent against the previous size (1.0 = linear).
+Every point runs in a fresh interpreter on a freshly generated corpus with
+a cold cache, so peak RSS and cache state belong to that point alone.
+
+Usage:
+    python3 scripts/performance/corpus_scaling_benchmark.py [--sizes 1000,10000,100000]
+        [--components validator,standardizer,scanner] [--median-kb KB] [--json]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Sequence
+
+sys.path.append(str(Path(__file__).parent))
+from performance_compat import MemoryMonitor
+from synthetic_corpus import add_spec_arguments, spec_from_args, write_corpus
+
+COMPONENTS = ('validator', 'standardizer', 'scanner')
+DEFAULT_SIZES = [100, 1000, 10000]
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile (``q`` in 0-100) of unsorted values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+async def _run_component(component: str, corpus, cache_dir: Path, workers: int) -> List[float]:
+    """Run one component over the corpus; per-file latencies in seconds."""
+    if component == 'validator':
+        from async_validator import AsyncAgentValidator
+        validator = AsyncAgentValidator(cache_dir)
+        try:
+            results = await validator.validate_agents_parallel(corpus.agents_dir)
+        finally:
+            validator.cleanup()
+        return [result.validation_time for result in results]
+
+    if component == 'standardizer':
+        from parallel_standardizer import ParallelAgentStandardizer
+        standardizer = ParallelAgentStandardizer(cache_dir, max_workers=workers)
+        try:
+            results = await standardizer.standardize_agents_parallel(corpus.agents_dir, cache_dir / 'deprecated')
+        finally:
+            standardizer.cleanup()
+        return [result.processing_time for result in results]
+
+    from parallel_capability_scanner import ParallelCapabilityScanner
+    scanner = ParallelCapabilityScanner(cache_dir, max_workers=workers)
+    try:
+        agent_infos, _ = await scanner.scan_agents_parallel(corpus.agents_dir)
+    finally:
+        scanner.cleanup()
+    return [info.processing_time for info in agent_infos]
+
+
+def run_point(args: argparse.Namespace) -> Dict:
+    """Measure one component at one corpus size in this process."""
+    logging.getLogger().setLevel(logging.WARNING)
+    spec = spec_from_args(args, args.size, max(1, args.size // 10), max(1, args.size // 20))
+    with tempfile.TemporaryDirectory() as work_dir:
+        corpus = write_corpus(Path(work_dir) / 'corpus', spec)
+        cache_dir = Path(work_dir) / 'cache'
+        cache_dir.mkdir()
+        rss_before = MemoryMonitor.get_memory_usage()['rss']
+
+        start = time.perf_counter()
+        latencies = asyncio.run(_run_component(args.point, corpus, cache_dir, args.workers))
+        wall = time.perf_counter() - start
+
+        return {
+            'component': args.point,
+            'size': args.size,
+            'files': len(latencies),
+            'corpus_bytes': corpus.bytes,
+            'wall_seconds': wall,
+            'throughput': len(latencies) / wall if wall > 0 else 0.0,
+            'p50_ms': percentile(latencies, 50) * 1000,
+            'p95_ms': percentile(latencies, 95) * 1000,
+            'rss_before_mb': rss_before,
+            'peak_rss_mb': MemoryMonitor.get_memory_usage()['rss']
+        }
+
+
+def _spec_argv(args: argparse.Namespace) -> List[str]:
+    return [
+        '--median-kb', str(args.median_kb), '--size-sigma', str(args.size_sigma), '--max-kb', str(args.max_kb),
+        '--section-mix', args.section_mix, '--reference-density', str(args.reference_density),
+        '--invalid-ratio', str(args.invalid_ratio), '--seed', str(args.seed), '--workers', str(args.workers)
+    ]
+
+
+def measure(component: str, size: int, args: argparse.Namespace) -> Dict:
+    """Run one point in a fresh interpreter so peak RSS is not shared across points."""
+    command = [sys.executable, __file__, '--point', component, '--size', str(size)] + _spec_argv(args)
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{component} at {size} files failed:\n{completed.stderr.strip()}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def add_scaling(rows: List[Dict]) -> None:
+    """Scaling exponent of wall time between consecutive sizes of the same component."""
+    previous: Dict[str, Dict] = {}
+    for row in rows:
+        before = previous.get(row['component'])
+        row['scaling'] = None
+        if before and before['files'] and row['files'] > before['files'] and before['wall_seconds'] > 0:
+            row['scaling'] = (math.log(row['wall_seconds'] / before['wall_seconds'])
+                              / math.log(row['files'] / before['files']))
+        previous[row['component']] = row
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep synthetic corpus sizes through the performance components')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='Comma-separated agent counts (skills and commands scale with them)')
+    parser.add_argument('--components', default=','.join(COMPONENTS), help='Comma-separated components to run')
+    parser.add_argument('--workers', type=int, default=8, help='Worker count for the standardizer and scanner')
+    parser.add_argument('--json', action='store_true', help='Emit JSON instead of a table')
+    parser.add_argument('--point', choices=COMPONENTS, help=argparse.SUPPRESS)
+    parser.add_argument('--size', type=int, default=0, help=argparse.SUPPRESS)
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    if args.point:
+        print(json.dumps(run_point(args)))
+        return 0
+
+    components = [c for c in args.components.split(',') if c]
+    unknown = sorted(set(components) - set(COMPONENTS))
+    if unknown:
+        parser.error(f"Unknown components: {', '.join(unknown)}")
+    sizes = sorted(int(s) for s in args.sizes.split(',') if s)
+
+    rows = []
+    for component in components:
+        for size in sizes:
+            try:
+                rows.append(measure(component, size, args))
+            except RuntimeError as e:
+                print(f"Error: {e}", file=sys.stderr)
+                return 1
+    add_scaling(rows)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"{'component':>12} {'files':>7} {'MiB':>7} {'wall s':>8} {'files/s':>9} "
+              f"{'p50 ms':>8} {'p95 ms':>8} {'peak RSS':>9} {'scaling':>8}")
+        for row in rows:
+            scaling = f"{row['scaling']:.2f}" if row['scaling'] is not None else '-'
+            print(f"{row['component']:>12} {row['files']:>7} {row['corpus_bytes'] / 1024 / 1024:>7.1f} "
+                  f"{row['wall_seconds']:>8.2f} {row['throughput']:>9.0f} {row['p50_ms']:>8.2f} "
+                  f"{row['p95_ms']:>8.2f} {row['peak_rss_mb']:>7.0f}MB {scaling:>8}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,250 @@
+#!/usr/bin/env python3
+"""
+Documentation Rewrite Engine
+============================
+
+Single-pass rewriting of a documentation tree from a set of mappings:
+- Every rule (whole-word renames, literal swaps, count updates and list
+  items to drop) is compiled into one alternation regex; a dict lookup in
+  the replacement callback picks the new text, so each document is scanned
+  once however many mappings there are
+- Documents are read, hashed and rewritten on a thread pool
+- Content hashes of documents known to hold no mapped term are kept in the
+  result store, so clean documents are skipped on later runs without
+  scanning them again
+- Changed documents are committed together through ``file_transaction``
+  (temp file + ``os.replace``, all-or-nothing); ``dry_run`` returns the
+  changes as unified diffs and writes nothing
+"""
+
+import difflib
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+sys.path.append(str(Path(__file__).parent))
+from file_transaction import FileTransaction, recover
+from result_store import open_result_store, source_version
+
+PathLike = Union[str, Path]
+
+# Words that may sit between a count and its noun ("36 specialized agents")
+_COUNT_GAP = r'(?:[ \t]+(?!to\b|and\b|or\b)[A-Za-z][\w-]*){0,2}'
+
+
+@dataclass(frozen=True)
+class RewriteRules:
+    """What to rewrite.
+
+    ``renames`` replace whole terms (not inside a longer name or after ``/``);
+    ``literals`` replace exact substrings; ``counts`` replace a number used as
+    a count of ``count_noun`` ("36 agents", "agent count: 36"); list items
+    whose first word is one of ``drop_items`` are removed.
+    """
+    renames: Dict[str, str] = field(default_factory=dict)
+    literals: Dict[str, str] = field(default_factory=dict)
+    counts: Dict[str, str] = field(default_factory=dict)
+    count_noun: str = 'agents'
+    drop_items: Sequence[str] = ()
+
+    def digest(self) -> str:
+        payload = json.dumps([self.renames, self.literals, self.counts, self.count_noun, list(self.drop_items)],
+                             sort_keys=True)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def _alternation(terms: Iterable[str]) -> str:
+    # Longest first, so a term never loses to one of its prefixes
+    return '|'.join(re.escape(term) for term in sorted(terms, key=lambda term: (-len(term), term)))
+
+
+def compile_rules(rules: RewriteRules) -> Optional['re.Pattern[str]']:
+    """One regex with a named group per rule kind, or None when there are no rules."""
+    branches = []
+    if rules.drop_items:
+        # Whole line including its newline, so no blank line is left behind
+        branches.append(rf"(?P<drop>^[ \t]*[-*][ \t]*(?:`|\*\*)?(?:{_alternation(rules.drop_items)})"
+                        rf"(?![\w-])[^\n]*(?:\n|\Z))")
+    if rules.literals:
+        branches.append(rf"(?P<literal>{_alternation(rules.literals)})")
+    if rules.counts:
+        numbers = _alternation(rules.counts)
+        noun = re.escape(rules.count_noun)
+        singular = re.escape(rules.count_noun.rstrip('s'))
+        branches.append(rf"(?i:(?P<count_label>{singular}[ \t]+count:?[ \t]*)(?P<count_value>{numbers})\b)")
+        branches.append(rf"(?i:(?P<count>\b(?:{numbers})\b)(?={_COUNT_GAP}[ \t]+{noun}\b))")
+    if rules.renames:
+        branches.append(rf"(?P<rename>(?<![\w/-])(?:{_alternation(rules.renames)})(?![\w-]))")
+    if not branches:
+        return None
+    return re.compile('|'.join(branches), re.MULTILINE)
+
+
+@dataclass
+class DocumentRewrite:
+    """Outcome for one document."""
+    path: str
+    relative_path: str
+    original: Optional[str] = None
+    rewritten: Optional[str] = None
+    replacements: Dict[str, int] = field(default_factory=dict)
+    cached_clean: bool = False
+    error: Optional[str] = None
+
+    @property
+    def changed(self) -> bool:
+        return self.rewritten is not None and self.rewritten != self.original
+
+    def diff(self) -> str:
+        if not self.changed:
+            return ''
+        return ''.join(difflib.unified_diff(
+            self.original.splitlines(keepends=True), self.rewritten.splitlines(keepends=True),
+            fromfile=f"a/{self.relative_path}", tofile=f"b/{self.relative_path}"
+        ))
+
+
+class DocumentRewriter:
+    """Applies compiled rewrite rules to documentation trees."""
+
+    TABLE = 'doc_rewrite'
+
+    def __init__(self, rules: RewriteRules, base_dir: PathLike, cache_dir: Optional[PathLike] = None,
+                 max_workers: int = 8, suffixes: Tuple[str, ...] = ('.md',)):
+        self.rules = rules
+        self.base_dir = Path(base_dir)
+        self.pattern = compile_rules(rules)
+        self.max_workers = max_workers
+        self.suffixes = suffixes
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.store = open_result_store(self.cache_dir) if self.cache_dir is not None else None
+        self.table = (self.store.table(self.TABLE, f"{source_version(__file__)}-{rules.digest()}")
+                      if self.store is not None else None)
+        self.stats = {
+            'documents': 0,
+            'skipped_clean': 0,
+            'scanned': 0,
+            'changed': 0,
+            'written': 0,
+            'errors': 0,
+            'seconds': 0.0
+        }
+
+    def rewrite_text(self, content: str) -> Tuple[str, Dict[str, int]]:
+        """Rewritten content and replacements made, by rule kind."""
+        if self.pattern is None:
+            return content, {}
+        replacements: Dict[str, int] = {}
+        rules = self.rules
+
+        def replace(match: 're.Match[str]') -> str:
+            kind = match.lastgroup
+            text = match.group(kind)
+            if kind == 'count_value':
+                # "Agent count 36" -> "Agent count: 26"
+                kind = 'count'
+                label = match.group('count_label').rstrip(': \t')
+                text = f"{label}: {rules.counts[text]}"
+            elif kind == 'drop':
+                text = ''
+            elif kind == 'literal':
+                text = rules.literals[text]
+            elif kind == 'rename':
+                text = rules.renames[text]
+            else:
+                text = rules.counts[text]
+            replacements[kind] = replacements.get(kind, 0) + 1
+            return text
+
+        rewritten = self.pattern.sub(replace, content)
+        if replacements.get('drop'):
+            # Dropped items can leave a list's surrounding blank lines back to back
+            rewritten = re.sub(r'\n\n\n+', '\n\n', rewritten)
+        return rewritten, replacements
+
+    def iter_documents(self, paths: Iterable[PathLike]) -> Iterator[Path]:
+        """Documents under the given files and directories, in sorted order."""
+        for path in paths:
+            path = Path(path)
+            if path.is_file():
+                yield path
+                continue
+            for root, dirs, files in os.walk(path):
+                dirs[:] = sorted(name for name in dirs if not name.startswith('.'))
+                for name in sorted(files):
+                    if name.endswith(self.suffixes):
+                        yield Path(root) / name
+
+    def _relative(self, path: Path) -> str:
+        try:
+            return path.resolve().relative_to(self.base_dir.resolve()).as_posix()
+        except ValueError:
+            return path.as_posix()
+
+    def _rewrite_document(self, path: Path) -> DocumentRewrite:
+        result = DocumentRewrite(str(path), self._relative(path))
+        try:
+            with open(path, 'rb') as f:
+                data = f.read()
+        except OSError as e:
+            result.error = str(e)
+            return result
+
+        content_hash = hashlib.blake2b(data, digest_size=16).hexdigest()
+        if self.table is not None and self.table.get(result.relative_path, content_hash) is not None:
+            result.cached_clean = True
+            return result
+
+        try:
+            result.original = data.decode('utf-8')
+        except UnicodeDecodeError as e:
+            result.error = str(e)
+            return result
+        result.rewritten, result.replacements = self.rewrite_text(result.original)
+        if not result.replacements and self.table is not None:
+            self.table.put(result.relative_path, content_hash, {'clean': True})
+        return result
+
+    def run(self, paths: Iterable[PathLike], dry_run: bool = False) -> List[DocumentRewrite]:
+        """Rewrite every document under ``paths``; with ``dry_run`` nothing is written."""
+        start = time.perf_counter()
+        documents = list(self.iter_documents(paths))
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            results = list(executor.map(self._rewrite_document, documents))
+
+        changed = [result for result in results if result.changed]
+        if changed and not dry_run:
+            journal_path = (self.cache_dir or self.base_dir / '.cache') / 'doc-rewrite-journal.json'
+            recover(journal_path)
+            transaction = FileTransaction(journal_path)
+            for result in changed:
+                transaction.write(result.path, result.rewritten)
+            self.stats['written'] = transaction.commit()['files_written']
+        if self.store is not None:
+            self.store.flush()
+
+        self.stats['documents'] = len(results)
+        self.stats['skipped_clean'] = sum(result.cached_clean for result in results)
+        self.stats['scanned'] = sum(result.original is not None for result in results)
+        self.stats['changed'] = len(changed)
+        self.stats['errors'] = sum(result.error is not None for result in results)
+        self.stats['seconds'] = time.perf_counter() - start
+        return results
+
+    def get_stats(self) -> Dict[str, float]:
+        return dict(self.stats)
+
+
+__all__ = [
+    'RewriteRules',
+    'DocumentRewrite',
+    'DocumentRewriter',
+    'compile_rules'
+]
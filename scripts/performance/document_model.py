@@ -0,0 +1,434 @@
+#!/usr/bin/env python3
+"""
+Shared Markdown Document Model
+==============================
+
+Single-pass parsing of agent, skill and command markdown files shared by
+every validator and scanner:
+- One read and one parse per file per process
+- Parsed documents memoized by content hash (bounded LRU)
+- Front-matter text, top-level field dict and body split
+- Heading tree with offsets for section-scoped extraction
+- ``##`` boundary index so section patterns slice instead of rescanning
+- Optional persistent index (``section_index``) so unchanged content is never re-parsed
+- stat / read / parse recorded as tracing spans when tracing is on
+
+Matches the front-matter semantics the validators have always used
+(``^---\\n(.*?)\\n---``), so switching a tool onto the shared model does not
+change which files pass or fail.
+"""
+
+import bisect
+import hashlib
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Pattern, Tuple, Union
+
+sys.path.append(str(Path(__file__).parent))
+from tracing import span
+
+FRONT_MATTER_PATTERN = re.compile(r'^---\n(.*?)\n---', re.DOTALL)
+HEADING_PATTERN = re.compile(r'^(#{1,6})[ \t]+(.*?)[ \t]*#*[ \t]*$')
+FENCE_PATTERN = re.compile(r'^[ \t]{0,3}(`{3,}|~{3,})')
+# Lines that can be a fence or a heading; everything else is skipped in C
+_CANDIDATE_LINE = re.compile(r'^(?:[ \t]{0,3}(?:```|~~~)|#)', re.MULTILINE)
+# Escapes such as \S or \W change meaning when lower-cased
+_ESCAPED_LETTER = re.compile(r'\\[A-Za-z]')
+
+# Content kept per process; whole-corpus streaming runs must not pin every file
+DEFAULT_MAX_BYTES = 16 * 1024 * 1024
+DEFAULT_MAX_PATHS = 16384
+
+
+def content_hash(data: bytes) -> str:
+    """Hash file content for memoization and cache keys."""
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+@dataclass(frozen=True)
+class Section:
+    """A markdown heading and the span of content it owns."""
+    level: int
+    title: str
+    start: int       # offset of the heading line
+    body_start: int  # offset just past the heading line
+    end: int         # offset of the next heading at the same or a higher level
+    parent: int = -1  # index of the enclosing section in ``ParsedDocument.sections``
+
+
+@dataclass
+class ParsedDocument:
+    """Parsed markdown document. Shared between callers - treat as read-only."""
+    content: str
+    content_hash: str
+    size: int
+    front_matter_text: Optional[str] = None
+    front_matter: Dict[str, str] = field(default_factory=dict)
+    front_matter_span: Optional[Tuple[int, int]] = None
+    body_offset: int = 0
+    sections: List[Section] = field(default_factory=list)
+    _boundaries: Optional[List[int]] = field(default=None, repr=False, compare=False)
+    _folded: Optional[str] = field(default=None, repr=False, compare=False)
+
+    @property
+    def has_front_matter(self) -> bool:
+        return self.front_matter_text is not None
+
+    @property
+    def body(self) -> str:
+        return self.content[self.body_offset:]
+
+    def section_text(self, section: Section) -> str:
+        """Content owned by a section, excluding its heading line."""
+        return self.content[section.body_start:section.end]
+
+    def find_sections(self, predicate: Callable[[Section], bool]) -> List[Section]:
+        """Sections matching a predicate, in document order."""
+        return [section for section in self.sections if predicate(section)]
+
+    def children(self, index: int) -> List[Section]:
+        """Direct subsections of ``sections[index]`` (``-1`` for top-level sections)."""
+        return [section for section in self.sections if section.parent == index]
+
+    @property
+    def boundaries(self) -> List[int]:
+        """Offsets of every ``##`` in the content, computed once per document."""
+        if self._boundaries is None:
+            self._boundaries = section_boundaries(self.content)
+        return self._boundaries
+
+    @property
+    def folded(self) -> Optional[str]:
+        """Lower-cased content for case-insensitive scans, or None if not pure ASCII.
+
+        ASCII lower-casing keeps every offset, so spans found in the folded
+        text slice the original content directly.
+        """
+        if self._folded is None and self.content.isascii():
+            self._folded = self.content.lower()
+        return self._folded
+
+
+def fold_pattern(pattern: Pattern) -> Optional[Pattern]:
+    """Case-sensitive equivalent of an IGNORECASE pattern, for ``ParsedDocument.folded``.
+
+    Returns None when the pattern is case-sensitive or cannot be folded safely.
+    A case-sensitive scan of folded text is several times faster than
+    IGNORECASE on the original and matches the same spans on ASCII content.
+    """
+    if not pattern.flags & re.IGNORECASE or _ESCAPED_LETTER.search(pattern.pattern):
+        return None
+    return re.compile(pattern.pattern.lower(), pattern.flags & ~re.IGNORECASE)
+
+
+class SectionPattern:
+    """A ``<head>(.*?)(?=##|\\Z)`` DOTALL pattern evaluated on boundary slices.
+
+    ``head`` is the pattern's prefix compiled on its own; it must not match a
+    ``#`` character unless it starts with ``##`` (``anchored``). Captures are
+    identical to ``findall`` with the full pattern, but the document is only
+    searched for the head - the lazy capture is a slice up to the next
+    boundary instead of a per-character lookahead.
+    """
+
+    def __init__(self, head: str, flags: int = 0):
+        self.head: Pattern = re.compile(head, flags)
+        self.folded_head = fold_pattern(self.head)
+        self.anchored = head.startswith('##')
+
+    def captures(self, document: 'ParsedDocument') -> List[str]:
+        """Capture groups in match order, as ``re.findall`` would return them."""
+        content = document.content
+        head_pattern, text = self.head, content
+        if self.folded_head is not None and document.folded is not None:
+            head_pattern, text = self.folded_head, document.folded
+        boundaries = document.boundaries
+        length = len(content)
+        captures = []
+
+        if self.anchored:
+            # A match can only start at a boundary
+            resume = 0
+            match = head_pattern.match
+            for mark in boundaries:
+                if mark < resume:
+                    continue
+                head = match(text, mark)
+                if head is None:
+                    continue
+                index = bisect.bisect_left(boundaries, head.end())
+                end = boundaries[index] if index < len(boundaries) else length
+                captures.append(content[head.end():end])
+                resume = end
+            return captures
+
+        # Head matches never contain '#', so each lies inside one boundary segment;
+        # its capture runs to the segment end, where the next search resumes
+        search = head_pattern.search
+        position = 0
+        while position < length:
+            head = search(text, position)
+            if head is None:
+                break
+            index = bisect.bisect_right(boundaries, head.start())
+            end = boundaries[index] if index < len(boundaries) else length
+            captures.append(content[head.end():end])
+            position = end
+        return captures
+
+
+def section_boundaries(content: str) -> List[int]:
+    """Offsets of every (overlapping) ``##`` - where ``(?=##|\\Z)`` captures stop."""
+    boundaries = []
+    find = content.find
+    position = find('##')
+    while position != -1:
+        boundaries.append(position)
+        position = find('##', position + 1)
+    return boundaries
+
+
+def parse_front_matter_fields(yaml_text: str) -> Dict[str, str]:
+    """Top-level ``field: value`` pairs, using the validators' line rules."""
+    fields: Dict[str, str] = {}
+    for line in yaml_text.split('\n'):
+        line = line.rstrip()
+        if not line or line.startswith(' ') or line.startswith('#'):
+            continue
+        if ':' in line:
+            fields[line.split(':')[0].strip()] = line.split(':', 1)[1].strip()
+    return fields
+
+
+def scan_sections(content: str, offset: int = 0) -> List[Section]:
+    """Linear heading scan into a tree with offsets; headings inside code fences are ignored."""
+    headings: List[Tuple[int, str, int, int]] = []
+    fence: Optional[str] = None
+    length = len(content)
+
+    def line_starts():
+        # The scan may begin mid-line (front matter closed without a newline)
+        if offset < length and offset > 0 and content[offset - 1] != '\n':
+            yield offset
+        for candidate in _CANDIDATE_LINE.finditer(content, offset):
+            yield candidate.start()
+
+    for position in line_starts():
+        newline = content.find('\n', position)
+        line_end = length if newline == -1 else newline
+        line = content[position:line_end]
+
+        fence_match = FENCE_PATTERN.match(line)
+        if fence_match:
+            marker = fence_match.group(1)
+            if fence is None:
+                fence = marker
+            elif marker[0] == fence[0] and len(marker) >= len(fence):
+                fence = None
+        elif fence is None and line.startswith('#'):
+            heading = HEADING_PATTERN.match(line)
+            if heading:
+                headings.append((len(heading.group(1)), heading.group(2), position, min(line_end + 1, length)))
+
+    # One stack pass assigns section ends and parents
+    sections: List[Optional[Section]] = [None] * len(headings)
+    open_sections: List[int] = []
+    for index, (level, _, start, _) in enumerate(headings):
+        while open_sections and headings[open_sections[-1]][0] >= level:
+            closed = open_sections.pop()
+            sections[closed] = _section(headings[closed], start, open_sections)
+        open_sections.append(index)
+    while open_sections:
+        closed = open_sections.pop()
+        sections[closed] = _section(headings[closed], length, open_sections)
+    return sections
+
+
+def _section(heading: Tuple[int, str, int, int], end: int, open_sections: List[int]) -> Section:
+    level, title, start, body_start = heading
+    parent = open_sections[-1] if open_sections else -1
+    return Section(level=level, title=title, start=start, body_start=body_start, end=end, parent=parent)
+
+
+def decode_content(data: bytes) -> str:
+    """Decode file bytes the way text-mode ``open()`` would (universal newlines)."""
+    text = data.decode('utf-8')
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+
+def _parse(content: str, digest: str, size: int) -> ParsedDocument:
+    """Parse decoded content into a document."""
+    document = ParsedDocument(content=content, content_hash=digest, size=size)
+
+    match = FRONT_MATTER_PATTERN.match(content)
+    if match:
+        document.front_matter_text = match.group(1)
+        document.front_matter = parse_front_matter_fields(match.group(1))
+        document.front_matter_span = (0, match.end())
+        body_offset = match.end()
+        if content.startswith('\n', body_offset):
+            body_offset += 1
+        document.body_offset = body_offset
+
+    document.sections = scan_sections(content, document.body_offset)
+    return document
+
+
+class DocumentCache:
+    """Per-process parsed-document cache memoized by content hash (LRU-bounded)."""
+
+    def __init__(self, max_bytes: int = DEFAULT_MAX_BYTES, max_paths: int = DEFAULT_MAX_PATHS):
+        self.max_bytes = max_bytes
+        self.max_paths = max_paths
+        self.cached_bytes = 0
+        self._by_hash: "OrderedDict[str, ParsedDocument]" = OrderedDict()
+        self._by_path: "OrderedDict[str, Tuple[Tuple[int, int, int], str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.reads = 0
+        self.parses = 0
+        self.hits = 0
+        self.index_hits = 0
+        # Persistent parse results (see section_index.attach_section_index)
+        self.index = None
+
+    def attach_index(self, index) -> None:
+        """Serve parse misses from ``index.document_for`` and ``index.record`` new parses."""
+        self.index = index
+
+    def load(self, file_path: Union[str, Path]) -> ParsedDocument:
+        """Read and parse a file, reusing the parse while it is unchanged on disk."""
+        path_key = os.fspath(file_path)
+        with span('stat'):
+            stat = os.stat(path_key)
+        stat_key = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+        with self._lock:
+            known = self._by_path.get(path_key)
+            if known and known[0] == stat_key and known[1] in self._by_hash:
+                self.hits += 1
+                self._by_path.move_to_end(path_key)
+                self._by_hash.move_to_end(known[1])
+                return self._by_hash[known[1]]
+
+        with span('read_file', bytes=stat.st_size):
+            with open(path_key, 'rb') as f:
+                data = f.read()
+        with self._lock:
+            self.reads += 1
+
+        with span('parse'):
+            document = self.parse_bytes(data)
+        with self._lock:
+            self._by_path[path_key] = (stat_key, document.content_hash)
+            self._by_path.move_to_end(path_key)
+            while len(self._by_path) > self.max_paths:
+                self._by_path.popitem(last=False)
+        return document
+
+    def parse_bytes(self, data: bytes) -> ParsedDocument:
+        """Parse raw file bytes, memoized by content hash."""
+        text = decode_content(data)
+        if b'\r' in data:
+            # Newlines were normalized: hash the canonical encoding
+            data = text.encode('utf-8')
+        return self._memoized(text, data)
+
+    def parse(self, content: str) -> ParsedDocument:
+        """Parse already-decoded content, memoized by content hash."""
+        return self._memoized(content, content.encode('utf-8'))
+
+    def _memoized(self, text: str, data: bytes) -> ParsedDocument:
+        digest = content_hash(data)
+        with self._lock:
+            document = self._by_hash.get(digest)
+            if document is not None:
+                self.hits += 1
+                self._by_hash.move_to_end(digest)
+                return document
+
+        document = self.index.document_for(text, digest) if self.index is not None else None
+        if document is not None:
+            with self._lock:
+                self.index_hits += 1
+        else:
+            document = _parse(text, digest, len(data))
+            with self._lock:
+                self.parses += 1
+            if self.index is not None:
+                self.index.record(document)
+        with self._lock:
+            if digest in self._by_hash:
+                return self._by_hash[digest]
+            self._by_hash[digest] = document
+            self.cached_bytes += document.size
+            # Keep at least the newest document even if it alone exceeds the budget
+            while self.cached_bytes > self.max_bytes and len(self._by_hash) > 1:
+                _, evicted = self._by_hash.popitem(last=False)
+                self.cached_bytes -= evicted.size
+            return document
+
+    def invalidate(self, file_path: Union[str, Path]) -> None:
+        """Forget the path mapping so the next load re-reads the file."""
+        with self._lock:
+            self._by_path.pop(os.fspath(file_path), None)
+
+    def clear(self) -> None:
+        """Drop every cached document."""
+        with self._lock:
+            self._by_hash.clear()
+            self._by_path.clear()
+            self.cached_bytes = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """Read/parse/hit counters for reporting."""
+        return {
+            'reads': self.reads,
+            'parses': self.parses,
+            'hits': self.hits,
+            'index_hits': self.index_hits,
+            'documents': len(self._by_hash),
+            'cached_bytes': self.cached_bytes
+        }
+
+
+_default_cache = DocumentCache()
+
+
+def get_document_cache() -> DocumentCache:
+    """Process-wide document cache shared by all tools."""
+    return _default_cache
+
+
+def load_document(file_path: Union[str, Path]) -> ParsedDocument:
+    """Read and parse a file through the process-wide cache."""
+    return _default_cache.load(file_path)
+
+
+def parse_document(content: str) -> ParsedDocument:
+    """Parse decoded content through the process-wide cache."""
+    return _default_cache.parse(content)
+
+
+__all__ = [
+    'FRONT_MATTER_PATTERN',
+    'Section',
+    'SectionPattern',
+    'ParsedDocument',
+    'DocumentCache',
+    'content_hash',
+    'decode_content',
+    'parse_front_matter_fields',
+    'scan_sections',
+    'section_boundaries',
+    'fold_pattern',
+    'get_document_cache',
+    'load_document',
+    'parse_document'
+]
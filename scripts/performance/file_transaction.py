@@ -0,0 +1,309 @@
+#!/usr/bin/env python3
+"""
+Atomic File Transactions
+========================
+
+Write-coalescing commit stage for tools that rewrite many files in place:
+- ``write(path, content)`` compares against the bytes already on disk and
+  stages nothing when they are identical, so a no-op run performs no writes
+- Changed content goes to a temp file beside its target; nothing visible
+  changes until ``commit``
+- ``commit`` fsyncs every temp file in one batch, records a rollback
+  journal, renames everything into place with ``os.replace`` and fsyncs
+  each touched directory once
+- Overwritten and removed files are kept as hard-linked backups until the
+  commit is complete; ``rollback`` (or ``recover`` after a crash) restores
+  them, so an interrupted run leaves the tree exactly as it was
+
+Journal states: ``applying`` (renames in progress - recovery rolls back)
+and ``committed`` (recovery only deletes the leftover backups).
+"""
+
+import itertools
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+
+class TransactionError(Exception):
+    """A commit failed; the transaction was rolled back."""
+
+
+@dataclass
+class StagedOperation:
+    """One staged change: ``write`` replaces or creates ``target``, ``remove`` deletes it."""
+    action: str
+    target: str
+    temp: Optional[str] = None
+    backup: Optional[str] = None
+
+
+def _same_content(path: str, data: bytes) -> bool:
+    """Whether ``path`` already holds exactly ``data`` (size first, then bytes)."""
+    try:
+        if os.stat(path).st_size != len(data):
+            return False
+        with open(path, 'rb') as f:
+            return f.read() == data
+    except FileNotFoundError:
+        return False
+
+
+def _fsync_path(path: str) -> None:
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _fsync_directory(path: str) -> None:
+    try:
+        _fsync_path(path)
+    except OSError:
+        # Some platforms and filesystems cannot open or fsync a directory
+        pass
+
+
+def _write_json(path: Path, payload: Dict[str, Any], durable: bool) -> None:
+    """Replace ``path`` atomically with a JSON document."""
+    temp = path.with_name(path.name + '.tmp')
+    with open(temp, 'w', encoding='utf-8') as f:
+        json.dump(payload, f)
+        if durable:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(temp, path)
+    if durable:
+        _fsync_directory(str(path.parent))
+
+
+class FileTransaction:
+    """Stages file writes and removals and commits them all-or-nothing."""
+
+    def __init__(self, journal_path: PathLike, durable: bool = True):
+        self.journal_path = Path(journal_path)
+        self.durable = durable
+        self.id = uuid.uuid4().hex[:12]
+        self.operations: List[StagedOperation] = []
+        self._targets: Dict[str, StagedOperation] = {}
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self.stats = {
+            'staged_writes': 0,
+            'identical_skipped': 0,
+            'staged_removes': 0,
+            'files_written': 0,
+            'files_removed': 0,
+            'fsyncs': 0,
+            'renames': 0,
+            'commit_time': 0.0
+        }
+
+    def _sidecar(self, target: str, suffix: str) -> str:
+        directory, name = os.path.split(target)
+        return os.path.join(directory, f".{name}.{self.id}.{next(self._counter)}.{suffix}")
+
+    def write(self, path: PathLike, content: Union[str, bytes]) -> bool:
+        """Stage ``content`` for ``path``; returns False (and stages nothing) if it is already there."""
+        target = os.fspath(path)
+        data = content.encode('utf-8') if isinstance(content, str) else content
+        with self._lock:
+            staged = self._targets.get(target)
+        if staged is None and _same_content(target, data):
+            with self._lock:
+                self.stats['identical_skipped'] += 1
+            return False
+
+        temp = self._sidecar(target, 'tmp')
+        with open(temp, 'wb') as f:
+            f.write(data)
+        with self._lock:
+            if staged is not None:
+                self._discard(staged)
+            operation = StagedOperation('write', target, temp=temp)
+            self.operations.append(operation)
+            self._targets[target] = operation
+            self.stats['staged_writes'] += 1
+        return True
+
+    def remove(self, path: PathLike) -> None:
+        """Stage the removal of ``path``."""
+        target = os.fspath(path)
+        with self._lock:
+            staged = self._targets.get(target)
+            if staged is not None:
+                self._discard(staged)
+            operation = StagedOperation('remove', target)
+            self.operations.append(operation)
+            self._targets[target] = operation
+            self.stats['staged_removes'] += 1
+
+    def move(self, source: PathLike, target: PathLike) -> None:
+        """Stage a move as a write of the source's bytes plus its removal (works across filesystems)."""
+        with open(source, 'rb') as f:
+            data = f.read()
+        self.write(target, data)
+        self.remove(source)
+
+    def _discard(self, operation: StagedOperation) -> None:
+        """Drop a staged operation superseded by a later one for the same target."""
+        self.operations.remove(operation)
+        if operation.temp is not None:
+            try:
+                os.unlink(operation.temp)
+            except FileNotFoundError:
+                pass
+
+    def _journal(self, state: str) -> None:
+        _write_json(self.journal_path, {
+            'id': self.id,
+            'state': state,
+            'operations': [asdict(operation) for operation in self.operations]
+        }, self.durable)
+
+    def commit(self) -> Dict[str, Any]:
+        """Apply every staged operation, or none of them; the transaction is then empty and reusable."""
+        start = time.perf_counter()
+        if not self.operations:
+            return self.stats
+
+        directories = sorted({os.path.dirname(operation.target) for operation in self.operations})
+        written = removed = 0
+        try:
+            # Batched fsync of all new content before anything becomes visible
+            if self.durable:
+                for operation in self.operations:
+                    if operation.temp is not None:
+                        _fsync_path(operation.temp)
+                        self.stats['fsyncs'] += 1
+
+            for operation in self.operations:
+                if operation.action == 'remove' or os.path.exists(operation.target):
+                    operation.backup = self._sidecar(operation.target, 'bak')
+            self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+            self._journal('applying')
+
+            for operation in self.operations:
+                _apply(operation)
+                self.stats['renames'] += 1
+                if operation.action == 'write':
+                    written += 1
+                elif operation.backup is not None:
+                    removed += 1
+
+            if self.durable:
+                for directory in directories:
+                    _fsync_directory(directory)
+                    self.stats['fsyncs'] += 1
+        except BaseException as e:
+            logger.error(f"Commit failed, rolling back {len(self.operations)} operations: {e}")
+            _rollback(self.operations)
+            if self.journal_path.exists():
+                self.journal_path.unlink()
+            self._reset()
+            raise TransactionError(str(e)) from e
+
+        # Commit point: from here on recovery keeps the new tree
+        self._journal('committed')
+        _discard_backups(self.operations)
+        self.journal_path.unlink()
+        self._reset()
+        self.stats['files_written'] += written
+        self.stats['files_removed'] += removed
+        self.stats['commit_time'] += time.perf_counter() - start
+        return self.stats
+
+    def _reset(self) -> None:
+        with self._lock:
+            self.operations = []
+            self._targets = {}
+
+    def rollback(self) -> None:
+        """Discard everything staged (nothing on disk has changed yet)."""
+        with self._lock:
+            _rollback(self.operations)
+        self._reset()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return dict(self.stats)
+
+
+def _apply(operation: StagedOperation) -> None:
+    if operation.backup is not None:
+        try:
+            os.link(operation.target, operation.backup)
+        except OSError:
+            shutil.copy2(operation.target, operation.backup)
+    if operation.action == 'write':
+        os.replace(operation.temp, operation.target)
+    elif operation.backup is not None:
+        os.unlink(operation.target)
+
+
+def _rollback(operations: List[StagedOperation]) -> None:
+    """Undo applied operations (newest first) and delete temp files; safe to repeat."""
+    for operation in reversed(operations):
+        temp_pending = operation.temp is not None and os.path.exists(operation.temp)
+        backup = operation.backup if operation.backup is not None and os.path.exists(operation.backup) else None
+        if temp_pending:
+            # Never renamed: the target is untouched
+            os.unlink(operation.temp)
+            if backup is not None:
+                os.unlink(backup)
+        elif backup is not None:
+            os.replace(backup, operation.target)
+        elif operation.action == 'write' and operation.backup is None and os.path.exists(operation.target):
+            # Created by this transaction
+            os.unlink(operation.target)
+
+
+def _discard_backups(operations: List[StagedOperation]) -> None:
+    for operation in operations:
+        for leftover in (operation.backup, operation.temp):
+            if leftover is not None:
+                try:
+                    os.unlink(leftover)
+                except FileNotFoundError:
+                    pass
+
+
+def recover(journal_path: PathLike) -> Optional[str]:
+    """Finish an interrupted transaction: roll back an ``applying`` journal, clean up a ``committed`` one.
+
+    Returns the journal state that was recovered, or None if there was none.
+    """
+    journal_path = Path(journal_path)
+    if not journal_path.exists():
+        return None
+    with open(journal_path, 'r', encoding='utf-8') as f:
+        journal = json.load(f)
+    operations = [StagedOperation(**operation) for operation in journal['operations']]
+    if journal['state'] == 'committed':
+        _discard_backups(operations)
+    else:
+        _rollback(operations)
+    journal_path.unlink()
+    logger.warning(f"Recovered interrupted transaction {journal['id']} ({journal['state']}): "
+                   f"{len(operations)} operations {'kept' if journal['state'] == 'committed' else 'rolled back'}")
+    return journal['state']
+
+
+__all__ = [
+    'TransactionError',
+    'StagedOperation',
+    'FileTransaction',
+    'recover'
+]
@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Corpus File Watcher
+===================
+
+Change notifications for the agent/skill/command corpus using only the
+standard library:
+- Linux inotify through ctypes, driven by the asyncio event loop
+- os.scandir polling fallback on other platforms or when inotify fails
+- Recursive watches (skills live in per-skill subdirectories)
+- Debounced batches so an editor's write/rename burst arrives as one set
+- After an inotify queue overflow every file is reported, including ones
+  deleted while events were lost
+
+Used by the ``--watch`` modes of the validators and capability scanner to
+keep the corpus loaded and re-process only files that changed.
+"""
+
+import asyncio
+import ctypes
+import ctypes.util
+import os
+import struct
+import sys
+from pathlib import Path
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# inotify constants (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE |
+              IN_DELETE | IN_DELETE_SELF | IN_ATTRIB)
+
+_EVENT_HEADER = struct.Struct('iIII')
+
+CORPUS_DIRECTORIES = ('agents', 'skills', 'commands')
+
+
+def corpus_directories(project_root: Path) -> List[Path]:
+    """Existing ``system-configs/.claude/{agents,skills,commands}`` directories."""
+    claude_dir = project_root / 'system-configs' / '.claude'
+    return [claude_dir / name for name in CORPUS_DIRECTORIES if (claude_dir / name).is_dir()]
+
+
+class _Inotify:
+    """Minimal ctypes binding for inotify."""
+
+    def __init__(self):
+        libc_name = ctypes.util.find_library('c') or 'libc.so.6'
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self.watches: Dict[int, Path] = {}
+
+    def add_watch(self, directory: Path) -> None:
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err), str(directory))
+        self.watches[wd] = directory
+
+    def read_events(self) -> List[Tuple[Path, int]]:
+        """Drain pending events as (path, mask) pairs."""
+        events = []
+        while True:
+            try:
+                buffer = os.read(self.fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buffer):
+                wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buffer, offset)
+                offset += _EVENT_HEADER.size
+                name = buffer[offset:offset + length].rstrip(b'\0')
+                offset += length
+
+                if mask & IN_Q_OVERFLOW:
+                    events.append((Path(), mask))
+                    continue
+                directory = self.watches.get(wd)
+                if directory is None:
+                    continue
+                if mask & IN_IGNORED:
+                    del self.watches[wd]
+                    continue
+                path = directory / os.fsdecode(name) if name else directory
+                events.append((path, mask))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """Watch directories and yield debounced sets of changed files."""
+
+    def __init__(self, directories: Iterable[Path], suffix: str = '.md',
+                 poll_interval: float = 0.5, debounce: float = 0.03,
+                 use_inotify: bool = True):
+        self.directories = [Path(d) for d in directories]
+        self.suffix = suffix
+        self.poll_interval = poll_interval
+        self.debounce = debounce
+        self._inotify: Optional[_Inotify] = None
+        self._snapshot: Dict[Path, Tuple[int, int, int]] = {}
+        # inotify mode: files known to exist, so an overflow can still report deletions
+        self._known: Set[Path] = set()
+
+        if use_inotify and sys.platform.startswith('linux'):
+            try:
+                self._inotify = _Inotify()
+                for directory in self.directories:
+                    self._watch_tree(directory)
+            except (OSError, AttributeError) as e:
+                logger.warning(f"inotify unavailable ({e}); falling back to polling")
+                if self._inotify is not None:
+                    self._inotify.close()
+                self._inotify = None
+
+        if self._inotify is None:
+            self._snapshot = self._take_snapshot()
+        else:
+            self._known = self._all_files()
+
+    @property
+    def backend(self) -> str:
+        return 'inotify' if self._inotify is not None else 'polling'
+
+    def _watch_tree(self, directory: Path) -> None:
+        self._inotify.add_watch(directory)
+        for root, dirs, _ in os.walk(directory):
+            for name in dirs:
+                self._inotify.add_watch(Path(root) / name)
+
+    def _relevant(self, path: Path) -> bool:
+        return path.name.endswith(self.suffix) and not path.name.startswith('.')
+
+    def _take_snapshot(self) -> Dict[Path, Tuple[int, int, int]]:
+        snapshot = {}
+        pending = list(self.directories)
+        while pending:
+            directory = pending.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            pending.append(Path(entry.path))
+                        elif self._relevant(Path(entry.path)):
+                            stat = entry.stat()
+                            snapshot[Path(entry.path)] = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+            except FileNotFoundError:
+                continue
+        return snapshot
+
+    def _poll(self) -> Set[Path]:
+        snapshot = self._take_snapshot()
+        previous, self._snapshot = self._snapshot, snapshot
+        changed = {path for path, key in snapshot.items() if previous.get(path) != key}
+        changed.update(path for path in previous if path not in snapshot)
+        return changed
+
+    def _drain_inotify(self) -> Tuple[Set[Path], bool]:
+        changed: Set[Path] = set()
+        overflow = False
+        for path, mask in self._inotify.read_events():
+            if mask & IN_Q_OVERFLOW:
+                overflow = True
+            elif mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and path.is_dir():
+                    # New subdirectory (e.g. a new skill): watch it and report its files
+                    self._watch_tree(path)
+                    changed.update(p for p in path.rglob(f'*{self.suffix}') if self._relevant(p))
+                elif mask & IN_MOVED_FROM:
+                    # Subdirectory moved away: its files are gone without events of their own
+                    changed.update(p for p in self._known if path in p.parents)
+            elif self._relevant(path):
+                changed.add(path)
+        return changed, overflow
+
+    def _update_known(self, changed: Set[Path]) -> None:
+        for path in changed:
+            if path.exists():
+                self._known.add(path)
+            else:
+                self._known.discard(path)
+
+    def _all_files(self) -> Set[Path]:
+        return set(self._take_snapshot())
+
+    async def changes(self) -> AsyncIterator[Set[Path]]:
+        """Yield sets of changed (created, modified or deleted) files forever."""
+        if self._inotify is None:
+            while True:
+                await asyncio.sleep(self.poll_interval)
+                changed = self._poll()
+                if changed:
+                    yield changed
+            return
+
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        loop.add_reader(self._inotify.fd, ready.set)
+        try:
+            while True:
+                await ready.wait()
+                # Let the rest of the editor's save burst arrive
+                await asyncio.sleep(self.debounce)
+                ready.clear()
+                changed, overflow = self._drain_inotify()
+                if overflow:
+                    logger.warning("inotify queue overflowed; treating every file as changed")
+                    # Files deleted while events were lost are only in the known set
+                    current = self._all_files()
+                    changed |= current | self._known
+                    self._known = current
+                else:
+                    self._update_known(changed)
+                if changed:
+                    yield changed
+        finally:
+            loop.remove_reader(self._inotify.fd)
+
+    def close(self) -> None:
+        """Release the inotify descriptor."""
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
+
+
+__all__ = [
+    'CORPUS_DIRECTORIES',
+    'FileWatcher',
+    'corpus_directories'
+]
@@ -390,66 +390,151 @@ Monitors performance metrics of optimized scripts and tracks improvements.
 """
 
 import json
+import sqlite3
 import time
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 class PerformanceMonitor:
-    """Monitors script performance and tracks metrics."""
+    """Monitors script performance and tracks metrics.
+
+    Executions are appended to an SQLite log in WAL mode, so concurrent runs
+    append without rewriting or clobbering each other. Every append also
+    folds the execution into hourly and daily rollups inside the same
+    transaction; summaries read those aggregate rows instead of scanning
+    every execution ever recorded. Raw executions older than the retention
+    window are pruned periodically, the rollups are kept.
+    """
+
+    # Rollup granularities, aligned to UTC epoch boundaries
+    BUCKETS = {'hour': 3600, 'day': 86400}
+    RETENTION_DAYS = 30
+    PRUNE_EVERY = 500  # appends between retention sweeps
 
     def __init__(self, project_root: Path):
         self.project_root = project_root
-        self.metrics_file = project_root / '.cache' / 'performance_metrics.json'
-        self.metrics_file.parent.mkdir(exist_ok=True, parents=True)
+        self.metrics_db = project_root / '.cache' / 'performance_metrics.sqlite3'
+        self.legacy_file = project_root / '.cache' / 'performance_metrics.json'
+        self.metrics_db.parent.mkdir(exist_ok=True, parents=True)
+
+        self.connection = sqlite3.connect(str(self.metrics_db), timeout=30, isolation_level=None)
+        self.connection.row_factory = sqlite3.Row
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(
+            "CREATE TABLE IF NOT EXISTS executions ("
+            "id INTEGER PRIMARY KEY, script TEXT NOT NULL, timestamp REAL NOT NULL, "
+            "execution_time REAL NOT NULL, agents_processed INTEGER NOT NULL, "
+            "cache_hits INTEGER NOT NULL, throughput REAL NOT NULL);"
+            "CREATE INDEX IF NOT EXISTS executions_timestamp ON executions (timestamp);"
+            "CREATE TABLE IF NOT EXISTS rollups ("
+            "script TEXT NOT NULL, bucket TEXT NOT NULL, bucket_start REAL NOT NULL, "
+            "executions INTEGER NOT NULL, total_time REAL NOT NULL, total_throughput REAL NOT NULL, "
+            "agents_processed INTEGER NOT NULL, cache_hits INTEGER NOT NULL, "
+            "min_time REAL NOT NULL, max_time REAL NOT NULL, last_execution REAL NOT NULL, "
+            "PRIMARY KEY (script, bucket, bucket_start));"
+        )
+        self._import_legacy()
 
     def record_execution(self, script_name: str, execution_time: float,
                         agents_processed: int, cache_hits: int = 0):
         """Record script execution metrics."""
-        metrics = self.load_metrics()
-
-        if script_name not in metrics:
-            metrics[script_name] = []
-
-        metrics[script_name].append({
-            'timestamp': time.time(),
-            'execution_time': execution_time,
-            'agents_processed': agents_processed,
-            'cache_hits': cache_hits,
-            'throughput': agents_processed / execution_time if execution_time > 0 else 0
-        })
-
-        self.save_metrics(metrics)
-
-    def load_metrics(self) -> Dict[str, Any]:
-        """Load performance metrics from disk."""
-        if self.metrics_file.exists():
-            with open(self.metrics_file, 'r') as f:
-                return json.load(f)
-        return {}
-
-    def save_metrics(self, metrics: Dict[str, Any]):
-        """Save performance metrics to disk."""
-        with open(self.metrics_file, 'w') as f:
-            json.dump(metrics, f, indent=2)
+        with self._transaction():
+            row_id = self._append(script_name, time.time(), execution_time, agents_processed, cache_hits)
+        if row_id % self.PRUNE_EVERY == 0:
+            self.prune()
+
+    def _append(self, script_name: str, timestamp: float, execution_time: float,
+                agents_processed: int, cache_hits: int) -> int:
+        """Append one execution and fold it into its rollup buckets (caller holds the transaction)."""
+        throughput = agents_processed / execution_time if execution_time > 0 else 0
+        cursor = self.connection.execute(
+            "INSERT INTO executions (script, timestamp, execution_time, agents_processed, cache_hits, throughput) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (script_name, timestamp, execution_time, agents_processed, cache_hits, throughput)
+        )
+        for bucket, width in self.BUCKETS.items():
+            self.connection.execute(
+                "INSERT INTO rollups VALUES (?, ?, ?, 1, ?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT (script, bucket, bucket_start) DO UPDATE SET "
+                "executions = executions + 1, "
+                "total_time = total_time + excluded.total_time, "
+                "total_throughput = total_throughput + excluded.total_throughput, "
+                "agents_processed = agents_processed + excluded.agents_processed, "
+                "cache_hits = cache_hits + excluded.cache_hits, "
+                "min_time = MIN(min_time, excluded.min_time), "
+                "max_time = MAX(max_time, excluded.max_time), "
+                "last_execution = MAX(last_execution, excluded.last_execution)",
+                (script_name, bucket, timestamp // width * width, execution_time, throughput,
+                 agents_processed, cache_hits, execution_time, execution_time, timestamp)
+            )
+        return cursor.lastrowid
+
+    def _transaction(self):
+        """Write transaction; BEGIN IMMEDIATE takes the write lock up front so writers queue instead of failing."""
+        connection = self.connection
+
+        class _Transaction:
+            def __enter__(self):
+                connection.execute("BEGIN IMMEDIATE")
+
+            def __exit__(self, exc_type, exc, tb):
+                connection.execute("ROLLBACK" if exc_type else "COMMIT")
+                return False
+
+        return _Transaction()
+
+    def _import_legacy(self):
+        """Fold the old whole-history JSON file into the log once, then retire it."""
+        if not self.legacy_file.exists():
+            return
+        with self._transaction():
+            # Another process may have imported it while this one waited for the lock
+            if not self.legacy_file.exists():
+                return
+            try:
+                with open(self.legacy_file, 'r') as f:
+                    legacy = json.load(f)
+            except (OSError, ValueError):
+                return
+            for script, executions in legacy.items():
+                for e in executions:
+                    self._append(script, e['timestamp'], e['execution_time'],
+                                 e.get('agents_processed', 0), e.get('cache_hits', 0))
+            self.legacy_file.rename(self.legacy_file.with_suffix('.json.imported'))
+
+    def prune(self, retention_days: Optional[float] = None):
+        """Drop raw executions older than the retention window; rollups keep their history."""
+        cutoff = time.time() - (retention_days or self.RETENTION_DAYS) * 86400
+        with self._transaction():
+            self.connection.execute("DELETE FROM executions WHERE timestamp < ?", (cutoff,))
+
+    def get_rollups(self, bucket: str = 'day', since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """Aggregates per script and bucket, oldest first."""
+        rows = self.connection.execute(
+            "SELECT * FROM rollups WHERE bucket = ? AND bucket_start >= ? ORDER BY bucket_start, script",
+            (bucket, since or 0)
+        )
+        return [dict(row) for row in rows]
 
     def get_performance_summary(self) -> Dict[str, Any]:
         """Get performance summary across all scripts."""
-        metrics = self.load_metrics()
+        rows = self.connection.execute(
+            "SELECT script, SUM(executions) AS executions, SUM(total_time) AS total_time, "
+            "SUM(total_throughput) AS total_throughput, SUM(cache_hits) AS cache_hits, "
+            "MAX(last_execution) AS last_execution "
+            "FROM rollups WHERE bucket = 'day' GROUP BY script ORDER BY script"
+        )
         summary = {}
 
-        for script, executions in metrics.items():
-            if executions:
-                avg_time = sum(e['execution_time'] for e in executions) / len(executions)
-                avg_throughput = sum(e['throughput'] for e in executions) / len(executions)
-                total_cache_hits = sum(e.get('cache_hits', 0) for e in executions)
-
-                summary[script] = {
-                    'executions': len(executions),
-                    'average_time': avg_time,
-                    'average_throughput': avg_throughput,
-                    'total_cache_hits': total_cache_hits,
-                    'last_execution': executions[-1]['timestamp']
-                }
+        for row in rows:
+            summary[row['script']] = {
+                'executions': row['executions'],
+                'average_time': row['total_time'] / row['executions'],
+                'average_throughput': row['total_throughput'] / row['executions'],
+                'total_cache_hits': row['cache_hits'],
+                'last_execution': row['last_execution']
+            }
 
         return summary
 
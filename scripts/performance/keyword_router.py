@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Compiled Keyword Router
+=======================
+
+The CLAUDE.md routing table (``| Keywords | Agents |``) compiled once into
+an Aho-Corasick automaton that maps keywords to agents:
+- Only tables whose header names a keywords column are read; keyword cells
+  split on ``,`` and agent cells on ``+``, agents filtered by name shape
+- ``route(prompt)`` scans the prompt once, whatever the number of
+  keywords, and returns every matching agent with the keywords that hit
+- Matching is case-insensitive and word-bounded; overlapping keywords
+  (``api`` and ``api gateway``) both fire
+- ``conflicts()`` lists keywords defined by several rows that send them to
+  different agents
+- One compiled router per CLAUDE.md per process, rebuilt when the file's
+  stat key changes
+
+Usage:
+    python3 scripts/performance/keyword_router.py "add an index to the orders table"
+    python3 scripts/performance/keyword_router.py --conflicts [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+sys.path.append(str(Path(__file__).parent))
+from aho_corasick import AhoCorasick
+from document_model import load_document
+from reference_graph import AGENT_NAME_SHAPE
+
+
+@dataclass(frozen=True)
+class RoutingRule:
+    """One routing table row."""
+    line: int
+    keywords: Tuple[str, ...]
+    agents: Tuple[str, ...]
+
+
+@dataclass
+class RouteMatch:
+    """An agent selected for a prompt and the keywords that selected it."""
+    agent: str
+    keywords: List[str]
+    offset: int  # where its first keyword starts in the prompt
+
+
+@dataclass
+class KeywordConflict:
+    """A keyword that several rows send to different agents."""
+    keyword: str
+    agents: List[str]
+    lines: List[int]
+
+
+def _cells(line: str) -> List[str]:
+    return [cell.strip() for cell in line.strip().strip('|').split('|')]
+
+
+def _is_separator(cells: List[str]) -> bool:
+    return all(cell and set(cell) <= set('-:= ') for cell in cells)
+
+
+def parse_routing_table(content: str) -> List[RoutingRule]:
+    """Rows of every keywords -> agents table in a CLAUDE.md, in order."""
+    rules: List[RoutingRule] = []
+    columns: Optional[Tuple[int, int]] = None
+    for number, line in enumerate(content.splitlines(), 1):
+        if not line.lstrip().startswith('|'):
+            columns = None
+            continue
+        cells = _cells(line)
+        if columns is None:
+            # Header row of a new table: it is a routing table if it names a keywords column
+            headers = [cell.lower() for cell in cells]
+            keyword_column = next((i for i, header in enumerate(headers) if 'keyword' in header), None)
+            if keyword_column is None:
+                columns = (-1, -1)
+                continue
+            agent_column = next((i for i, header in enumerate(headers) if 'agent' in header),
+                                keyword_column + 1)
+            columns = (keyword_column, agent_column)
+            continue
+        keyword_column, agent_column = columns
+        if keyword_column < 0 or _is_separator(cells) or max(columns) >= len(cells):
+            continue
+
+        keywords = tuple(dict.fromkeys(
+            keyword.strip().lower() for keyword in cells[keyword_column].split(',') if keyword.strip()
+        ))
+        agents = tuple(dict.fromkeys(
+            agent.strip().lower() for agent in cells[agent_column].split('+')
+            if AGENT_NAME_SHAPE.match(agent.strip().lower())
+        ))
+        if keywords and agents:
+            rules.append(RoutingRule(number, keywords, agents))
+    return rules
+
+
+class KeywordRouter:
+    """Keyword -> agent automaton compiled from routing rules."""
+
+    def __init__(self, rules: Iterable[RoutingRule]):
+        self.rules = list(rules)
+        agents_by_keyword: Dict[str, Dict[str, None]] = {}
+        rows_by_keyword: Dict[str, List[RoutingRule]] = {}
+        for rule in self.rules:
+            for keyword in rule.keywords:
+                agents_by_keyword.setdefault(keyword, {}).update(dict.fromkeys(rule.agents))
+                rows_by_keyword.setdefault(keyword, []).append(rule)
+        self._rows = rows_by_keyword
+        self._matcher = AhoCorasick(agents_by_keyword, ignore_case=True)
+        # Indexed like the matcher's patterns
+        self.keywords: List[str] = self._matcher.patterns
+        self._index = {keyword: index for index, keyword in enumerate(self.keywords)}
+        self._agents: List[Tuple[str, ...]] = [tuple(agents_by_keyword[keyword]) for keyword in self.keywords]
+        self.prompts_routed = 0
+
+    def __len__(self) -> int:
+        return len(self.keywords)
+
+    def agents_for(self, keyword: str) -> List[str]:
+        """Agents a single keyword routes to."""
+        index = self._index.get(keyword.lower())
+        return list(self._agents[index]) if index is not None else []
+
+    def route(self, prompt: str) -> List[RouteMatch]:
+        """Every agent whose keywords occur in the prompt, by first occurrence."""
+        self.prompts_routed += 1
+        matches: Dict[str, RouteMatch] = {}
+        for start, _, index in self._matcher.iter_word_matches(prompt):
+            keyword = self.keywords[index]
+            for agent in self._agents[index]:
+                match = matches.get(agent)
+                if match is None:
+                    matches[agent] = RouteMatch(agent, [keyword], start)
+                elif keyword not in match.keywords:
+                    match.keywords.append(keyword)
+        return sorted(matches.values(), key=lambda match: match.offset)
+
+    def conflicts(self) -> List[KeywordConflict]:
+        """Keywords whose rows disagree on the agents they route to."""
+        conflicts = []
+        for keyword, agents in zip(self.keywords, self._agents):
+            rows = self._rows[keyword]
+            if len({rule.agents for rule in rows}) > 1:
+                conflicts.append(KeywordConflict(keyword, list(agents), [rule.line for rule in rows]))
+        return conflicts
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            'rules': len(self.rules),
+            'keywords': len(self.keywords),
+            'agents': len({agent for agents in self._agents for agent in agents}),
+            'prompts_routed': self.prompts_routed
+        }
+
+
+_routers: Dict[str, Tuple[str, KeywordRouter]] = {}
+_routers_lock = threading.Lock()
+
+
+def get_keyword_router(claude_md: Union[str, Path]) -> KeywordRouter:
+    """Process-wide router for a CLAUDE.md, recompiled only when the file changes."""
+    path = os.fspath(claude_md)
+    stat = os.stat(path)
+    stat_key = f"{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+    with _routers_lock:
+        cached = _routers.get(path)
+        if cached is not None and cached[0] == stat_key:
+            return cached[1]
+        router = KeywordRouter(parse_routing_table(load_document(path).content))
+        _routers[path] = (stat_key, router)
+        return router
+
+
+def main():
+    project_root = Path(__file__).parent.parent.parent
+    parser = argparse.ArgumentParser(description='Route a prompt to agents through the CLAUDE.md routing table')
+    parser.add_argument('prompt', nargs='*', help='Prompt to route')
+    parser.add_argument('--claude-md', type=Path, default=project_root / 'system-configs' / 'CLAUDE.md',
+                        help='CLAUDE.md holding the routing table')
+    parser.add_argument('--conflicts', action='store_true', help='Report keywords routed to different agents')
+    parser.add_argument('--json', action='store_true', help='Emit JSON instead of text')
+    args = parser.parse_args()
+
+    if not args.claude_md.exists():
+        print(f"Error: CLAUDE.md not found at {args.claude_md}")
+        return 1
+    router = get_keyword_router(args.claude_md)
+    prompt = ' '.join(args.prompt)
+    matches = router.route(prompt) if prompt else []
+    conflicts = router.conflicts() if args.conflicts else []
+
+    if args.json:
+        print(json.dumps({
+            'stats': router.get_stats(),
+            'matches': [asdict(match) for match in matches],
+            'conflicts': [asdict(conflict) for conflict in conflicts]
+        }, indent=2))
+        return 0
+
+    stats = router.get_stats()
+    print(f"🧭 {stats['keywords']} keywords from {stats['rules']} routing rows -> {stats['agents']} agents")
+    if prompt:
+        print(f"\nPrompt: {prompt}")
+        if not matches:
+            print("  No routing keywords matched")
+        for match in matches:
+            print(f"  {match.agent:<28} ({', '.join(match.keywords)})")
+    if args.conflicts:
+        print(f"\n⚠️  {len(conflicts)} keywords routed to different agents by different rows")
+        for conflict in conflicts:
+            lines = ', '.join(str(line) for line in conflict.lines)
+            print(f"  {conflict.keyword:<24} lines {lines}: {', '.join(conflict.agents)}")
+    return 0
+
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+Keyword Routing Benchmark
+=========================
+
+Routing latency of the compiled keyword router (``keyword_router``)
+against the size of the CLAUDE.md routing table:
+- Synthetic routing tables from ``--sizes`` keywords (one- and two-word
+  keywords, three per row, one or two agents per row)
+- Compile time (parse + automaton) and p50/p95 ``route()`` latency over
+  the same prompts at every size
+- Baseline: the flat keyword list with one ``\\b...\\b`` regex search per
+  keyword, up to ``--baseline-max`` keywords; both must pick the same agents
+- Scaling exponent of p50 latency between consecutive sizes (0 = flat)
+
+Usage:
+    python3 scripts/performance/keyword_routing_benchmark.py [--sizes 100,1000,10000,100000] [--json]
+"""
+
+import argparse
+import json
+import math
+import random
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+sys.path.append(str(Path(__file__).parent))
+from corpus_scaling_benchmark import percentile
+from keyword_router import KeywordRouter, parse_routing_table
+
+DEFAULT_SIZES = [100, 1000, 10000, 100000]
+_LETTERS = 'abcdefghijklmnopqrstuvwxyz'
+
+
+def _word(index: int) -> str:
+    """Distinct pronounceable-ish word for an index."""
+    letters = []
+    index += 26 * 27
+    while index:
+        index, digit = divmod(index, 26)
+        letters.append(_LETTERS[digit])
+    return ''.join(reversed(letters))
+
+
+def routing_table(size: int, rng: random.Random) -> Tuple[str, List[str]]:
+    """CLAUDE.md text with ``size`` distinct keywords, and the keywords."""
+    keywords = [_word(index) if index % 3 else f"{_word(index)} {_word(index + size)}" for index in range(size)]
+    lines = ['# Routing', '', '| Keywords | Agents |', '|---|---|']
+    for start in range(0, size, 3):
+        agents = ' + '.join(f"agent-{_word(rng.randrange(size))}" for _ in range(rng.randint(1, 2)))
+        lines.append(f"| {', '.join(keywords[start:start + 3])} | {agents} |")
+    return '\n'.join(lines) + '\n', keywords
+
+
+def prompts(keywords: List[str], count: int, words: int, rng: random.Random) -> List[str]:
+    """Prompts of filler words with a few keywords mixed in (filler words are never keywords)."""
+    filler = [f"filler{_word(index)}" for index in range(2000)]
+    result = []
+    for _ in range(count):
+        tokens = rng.choices(filler, k=words)
+        for keyword in rng.sample(keywords, min(3, len(keywords))):
+            tokens.insert(rng.randrange(len(tokens) + 1), keyword.title())
+        result.append(' '.join(tokens))
+    return result
+
+
+class RegexBaseline:
+    """One compiled ``\\b``-bounded regex per keyword, searched in turn."""
+
+    def __init__(self, router: KeywordRouter):
+        self.rules = [(re.compile(r'\b' + re.escape(keyword) + r'\b', re.IGNORECASE), router.agents_for(keyword))
+                      for keyword in router.keywords]
+
+    def route(self, prompt: str) -> set:
+        agents = set()
+        for pattern, keyword_agents in self.rules:
+            if pattern.search(prompt):
+                agents.update(keyword_agents)
+        return agents
+
+
+def _time_routes(route, prompt_list: List[str]) -> Tuple[List[float], List[Any]]:
+    latencies, results = [], []
+    for prompt in prompt_list:
+        start = time.perf_counter()
+        results.append(route(prompt))
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies, results
+
+
+def measure(size: int, args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed + size)
+    content, keywords = routing_table(size, rng)
+    prompt_list = prompts(keywords, args.prompts, args.prompt_words, rng)
+
+    start = time.perf_counter()
+    router = KeywordRouter(parse_routing_table(content))
+    compile_seconds = time.perf_counter() - start
+
+    latencies, results = _time_routes(router.route, prompt_list)
+    row = {
+        'keywords': len(router),
+        'rules': len(router.rules),
+        'compile_seconds': compile_seconds,
+        'p50_ms': percentile(latencies, 50),
+        'p95_ms': percentile(latencies, 95),
+        'agents_per_prompt': sum(len(result) for result in results) / len(results),
+        'baseline_p50_ms': None,
+        'baseline_p95_ms': None,
+        'mismatches': None
+    }
+    if size <= args.baseline_max:
+        baseline = RegexBaseline(router)
+        baseline_latencies, baseline_results = _time_routes(baseline.route, prompt_list)
+        row['baseline_p50_ms'] = percentile(baseline_latencies, 50)
+        row['baseline_p95_ms'] = percentile(baseline_latencies, 95)
+        row['mismatches'] = sum({match.agent for match in result} != expected
+                                for result, expected in zip(results, baseline_results))
+    return row
+
+
+def add_scaling(rows: List[Dict[str, Any]]) -> None:
+    """Exponent of p50 latency against keyword count between consecutive sizes."""
+    previous = None
+    for row in rows:
+        row['scaling'] = None
+        if previous and row['keywords'] > previous['keywords'] and previous['p50_ms'] > 0:
+            row['scaling'] = (math.log(row['p50_ms'] / previous['p50_ms'])
+                              / math.log(row['keywords'] / previous['keywords']))
+        previous = row
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark keyword routing latency against table size')
+    parser.add_argument('--sizes', default=','.join(str(size) for size in DEFAULT_SIZES),
+                        help='Comma-separated keyword counts')
+    parser.add_argument('--prompts', type=int, default=200, help='Prompts routed per size')
+    parser.add_argument('--prompt-words', type=int, default=60, help='Filler words per prompt')
+    parser.add_argument('--baseline-max', type=int, default=10000,
+                        help='Largest table the per-keyword regex baseline runs on')
+    parser.add_argument('--seed', type=int, default=7, help='Random seed')
+    parser.add_argument('--json', action='store_true', help='Emit JSON instead of a table')
+    args = parser.parse_args()
+
+    rows = [measure(size, args) for size in sorted(int(size) for size in args.sizes.split(',') if size)]
+    add_scaling(rows)
+    mismatched = any(row['mismatches'] for row in rows)
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 1 if mismatched else 0
+
+    print(f"{'keywords':>9} {'compile s':>10} {'p50 ms':>8} {'p95 ms':>8} {'scaling':>8} "
+          f"{'regex p50':>10} {'regex p95':>10} {'speedup':>8} {'agree':>6}")
+    for row in rows:
+        scaling = f"{row['scaling']:.2f}" if row['scaling'] is not None else '-'
+        if row['baseline_p50_ms'] is not None:
+            baseline = (f"{row['baseline_p50_ms']:>10.3f} {row['baseline_p95_ms']:>10.3f} "
+                        f"{row['baseline_p50_ms'] / row['p50_ms']:>7.1f}x "
+                        f"{'yes' if not row['mismatches'] else 'NO':>6}")
+        else:
+            baseline = f"{'-':>10} {'-':>10} {'-':>8} {'-':>6}"
+        print(f"{row['keywords']:>9} {row['compile_seconds']:>10.3f} {row['p50_ms']:>8.3f} {row['p95_ms']:>8.3f} "
+              f"{scaling:>8} {baseline}")
+    return 1 if mismatched else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
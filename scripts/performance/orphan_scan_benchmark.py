@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Orphan Scan Benchmark
+=====================
+
+Scaling benchmark for check-orphans.py on a synthetic corpus:
+- Reference extraction: per-match skip-list loop (the original code) vs
+  deduplicated candidates filtered through the Aho-Corasick skip matcher
+- Reference graph build, then the skill + CLAUDE.md orphan checks over it,
+  with thousands of agents
+- Agent name lookup in text: ``\\b(name|name|...)\\b`` alternation regex vs
+  ``AhoCorasick.find_words`` as the number of names grows
+
+Every comparison also checks that both sides return identical results.
+
+Usage:
+    python3 scripts/performance/orphan_scan_benchmark.py [--agents 1000,5000] [--skills N] [--rows N]
+"""
+
+import argparse
+import importlib.util
+import json
+import random
+import re
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+sys.path.append(str(Path(__file__).parent))
+from aho_corasick import AhoCorasick
+from reference_graph import build_reference_graph
+
+SCRIPTS_DIR = Path(__file__).parent.parent
+
+_ROLES = ('engineer', 'architect', 'auditor', 'analyst', 'reviewer', 'writer', 'designer', 'lead')
+_DOMAINS = ('backend', 'frontend', 'data', 'ml', 'cloud', 'mobile', 'security', 'platform', 'api', 'test')
+
+
+def load_check_orphans():
+    """Import check-orphans.py (not a valid module name) as a module."""
+    spec = importlib.util.spec_from_file_location('check_orphans', SCRIPTS_DIR / 'check-orphans.py')
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def reference_extract_agent_references(content: str, skip_patterns: List[str]) -> set:
+    """The original extraction: seven regexes, then a skip-list scan per match."""
+    references = set()
+    for pattern in (
+        r"^\s*(\w+-\w+(?:-\w+)?):\s*$",
+        r"Task:\s*(\w+-\w+(?:-\w+)?)",
+        r"Assignee:\s*\[?(\w+-\w+(?:-\w+)?)\]?",
+        r"\+\s*(\w+-\w+(?:-\w+)?)",
+        r"^\s*-\s*(\w+-\w+(?:-\w+)?)\s*$",
+        r"the\s+(\w+-\w+(?:-\w+)?)\s+agent",
+        r"use\s+(\w+-\w+(?:-\w+)?)",
+    ):
+        for match in re.findall(pattern, content, re.MULTILINE | re.IGNORECASE):
+            if re.match(r"^[\w-]+-\d+$", match.lower()):
+                continue
+            if not any(skip in match.lower() for skip in skip_patterns):
+                references.add(match.lower())
+    return references
+
+
+def agent_names(count: int, seed: int = 11) -> List[str]:
+    """``count`` distinct hyphenated agent names."""
+    rng = random.Random(seed)
+    names = set()
+    while len(names) < count:
+        names.add(f"{rng.choice(_DOMAINS)}-{rng.choice(_ROLES)}-{rng.randrange(26 ** 3):x}")
+    return sorted(names)
+
+
+def write_corpus(root: Path, names: List[str], skills: int, rows: int, seed: int = 3) -> None:
+    """Agents, skills full of references and a CLAUDE.md routing table of ``rows`` rows."""
+    rng = random.Random(seed)
+    claude_dir = root / 'system-configs' / '.claude'
+    (claude_dir / 'agents').mkdir(parents=True)
+    for name in names:
+        (claude_dir / 'agents' / f"{name}.md").write_text(f"---\nname: {name}\n---\n", encoding='utf-8')
+
+    skip_terms = ('real-time', 'pre-commit', 'end-to-end', 'read-only', 'built-in')
+    for index in range(skills):
+        skill_dir = claude_dir / 'skills' / f"skill-{index}"
+        skill_dir.mkdir(parents=True)
+        lines = [f"---\nname: skill-{index}\n---\n"]
+        for _ in range(200):
+            name = rng.choice(names)
+            lines.append(rng.choice((
+                f"Task: {name}",
+                f"- {name}",
+                f"Use the {name} agent for {rng.choice(skip_terms)} work.",
+                f"Assignee: [{name}]",
+                f"Then use {rng.choice(skip_terms)} checks + {name}-{rng.randrange(9)}",
+                f"Coordinate with ghost-{rng.choice(_ROLES)} when needed.",
+            )))
+        (skill_dir / 'SKILL.md').write_text('\n'.join(lines) + '\n', encoding='utf-8')
+
+    table = ["| Keywords | Agents |", "|---|---|"]
+    for _ in range(rows):
+        agents = ' + '.join(rng.sample(names, 2))
+        table.append(f"| {rng.choice(_DOMAINS)}, {rng.choice(_ROLES)} | {agents} |")
+    (root / 'system-configs' / 'CLAUDE.md').write_text('\n'.join(table) + '\n', encoding='utf-8')
+
+
+def _best_of(func: Callable[[], object], repeat: int) -> Tuple[float, object]:
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        best = min(best, time.perf_counter() - start)
+    return best, result
+
+
+def benchmark_extraction(orphans, root: Path, repeat: int) -> Dict:
+    """Extraction over every skill plus CLAUDE.md, old vs new."""
+    files = sorted((root / 'system-configs' / '.claude' / 'skills').rglob('SKILL.md'))
+    files.append(root / 'system-configs' / 'CLAUDE.md')
+    contents = [path.read_text(encoding='utf-8') for path in files]
+
+    old_seconds, old = _best_of(
+        lambda: [reference_extract_agent_references(c, orphans.SKIP_PATTERNS) for c in contents], repeat)
+    new_seconds, new = _best_of(lambda: [orphans.extract_agent_references(c) for c in contents], repeat)
+    return {
+        'files': len(files),
+        'bytes': sum(len(c) for c in contents),
+        'reference_ms': old_seconds * 1000,
+        'automaton_ms': new_seconds * 1000,
+        'speedup': old_seconds / new_seconds if new_seconds else 0.0,
+        'identical': old == new
+    }
+
+
+def benchmark_checks(orphans, root: Path, repeat: int) -> Dict:
+    """Reference graph build, then the skill and CLAUDE.md orphan checks as queries over it."""
+    claude_dir = root / 'system-configs' / '.claude'
+    orphans.AGENTS_DIR = claude_dir / 'agents'
+    orphans.SKILLS_DIR = claude_dir / 'skills'
+    orphans.COMMANDS_DIR = claude_dir / 'commands'
+    orphans.CLAUDE_MD = root / 'system-configs' / 'CLAUDE.md'
+    orphans.CACHE_DIR = None
+
+    layout = (orphans.AGENTS_DIR, orphans.SKILLS_DIR, orphans.COMMANDS_DIR, orphans.CLAUDE_MD)
+    graph_seconds, _ = _best_of(lambda: build_reference_graph(*layout), repeat)
+    valid_agents = orphans.get_valid_agents()
+    seconds, issues = _best_of(lambda: (orphans.check_skills_for_orphans(valid_agents) +
+                                        orphans.check_claude_md_for_orphans(valid_agents)), repeat)
+    return {'graph_ms': graph_seconds * 1000, 'checks_ms': seconds * 1000, 'issues': len(issues)}
+
+
+def benchmark_name_lookup(names: List[str], text: str, repeat: int) -> Dict:
+    """Find every known agent name in ``text``: alternation regex vs automaton."""
+    build_start = time.perf_counter()
+    regex = re.compile(r'\b(' + '|'.join(re.escape(name) for name in names) + r')\b', re.IGNORECASE)
+    regex_build = time.perf_counter() - build_start
+    build_start = time.perf_counter()
+    matcher = AhoCorasick(names, ignore_case=True)
+    matcher_build = time.perf_counter() - build_start
+
+    regex_seconds, expected = _best_of(lambda: [m.span() for m in regex.finditer(text)], repeat)
+    matcher_seconds, actual = _best_of(lambda: [(s, e) for s, e, _ in matcher.find_words(text)], repeat)
+    return {
+        'names': len(names),
+        'regex_build_ms': regex_build * 1000,
+        'automaton_build_ms': matcher_build * 1000,
+        'regex_ms': regex_seconds * 1000,
+        'automaton_ms': matcher_seconds * 1000,
+        'speedup': regex_seconds / matcher_seconds if matcher_seconds else 0.0,
+        'identical': expected == actual
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark check-orphans reference matching')
+    parser.add_argument('--agents', default='100,1000,5000', help='Comma-separated agent counts')
+    parser.add_argument('--skills', type=int, default=200, help='Synthetic skills per corpus')
+    parser.add_argument('--rows', type=int, default=20000, help='CLAUDE.md routing table rows')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing rounds (best is reported)')
+    parser.add_argument('--json', action='store_true', help='Emit JSON instead of a table')
+    args = parser.parse_args()
+
+    orphans = load_check_orphans()
+    rows = []
+    for count in [int(c) for c in args.agents.split(',') if c]:
+        names = agent_names(count)
+        with tempfile.TemporaryDirectory() as corpus_dir:
+            root = Path(corpus_dir)
+            write_corpus(root, names, args.skills, args.rows)
+            claude_md = (root / 'system-configs' / 'CLAUDE.md').read_text(encoding='utf-8')
+            rows.append({
+                'agents': count,
+                'extraction': benchmark_extraction(orphans, root, args.repeat),
+                'checks': benchmark_checks(orphans, root, args.repeat),
+                'name_lookup': benchmark_name_lookup(names, claude_md, args.repeat)
+            })
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"{'agents':>7} | {'extract ms (orig/new)':>22} {'speedup':>8} | {'graph/checks ms':>17} | "
+              f"{'names ms (regex/AC)':>20} {'speedup':>8} | output")
+        for row in rows:
+            extraction, lookup = row['extraction'], row['name_lookup']
+            identical = extraction['identical'] and lookup['identical']
+            print(f"{row['agents']:>7} | {extraction['reference_ms']:>10.1f} /{extraction['automaton_ms']:>10.1f} "
+                  f"{extraction['speedup']:>7.2f}x | {row['checks']['graph_ms']:>8.1f}/{row['checks']['checks_ms']:>8.1f} | "
+                  f"{lookup['regex_ms']:>9.1f} /{lookup['automaton_ms']:>9.1f} {lookup['speedup']:>7.2f}x | "
+                  f"{'identical' if identical else 'DIFFERS'}")
+
+    return 0 if all(row['extraction']['identical'] and row['name_lookup']['identical'] for row in rows) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
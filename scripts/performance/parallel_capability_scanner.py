@@ -21,51 +21,66 @@ Maintains comprehensive analysis:
 - Coordination pattern analysis
 - Tool access mapping
 - Parallel execution opportunity identification
+
+Reports are streamed: each agent's matrix record and markdown section are
+written as it finishes scanning, so report memory does not grow with the
+corpus. ``--format ndjson`` writes one agent per line for lazy consumers.
+
+Use --profile [cprofile|sample] to write a profile to .tmp/reports/.
 """
 
+import argparse
 import asyncio
-import aiofiles
-import hashlib
+import heapq
 import json
+import os
 import re
+import shutil
 import sys
+import tempfile
 import time
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from dataclasses import dataclass, asdict
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple, Any, Pattern
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, Iterator, List, Optional, Pattern, Set, Tuple, Union
 import logging
 
+# Shared document model
+sys.path.append(str(Path(__file__).parent))
+from compact_records import LABELS, TOOLS, CompactRecord, Field, Interned, InternedList, TextList
+from document_model import DocumentCache, ParsedDocument, SectionPattern, fold_pattern, load_document
+from result_store import open_result_store, source_version
+from file_watcher import FileWatcher, corpus_directories
+from pipeline import Stage, run_pipeline
+from profiling import run_profiled
+from section_index import attach_section_index
+from tracing import add_trace_argument, finish_tracing, get_tracer, span, start_tracing, stop_tracing
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-@dataclass
-class AgentCapabilityInfo:
-    """Comprehensive agent capability information."""
-    name: str
-    file: str
-    description: str = ""
-    color: str = ""
-    category: str = ""
-    capabilities: List[str] = None
-    tools: List[str] = None
-    coordination_patterns: List[str] = None
-    parallel_compatible: List[str] = None
-    handoff_patterns: List[str] = None
-    unique_expertise: List[str] = None
-    when_to_use: List[str] = None
-    orchestration_notes: List[str] = None
-    processing_time: float = 0.0
-    file_size: int = 0
-    cached: bool = False
-
-    def __post_init__(self):
-        # Initialize lists if None
-        for field in ['capabilities', 'tools', 'coordination_patterns', 'parallel_compatible',
-                     'handoff_patterns', 'unique_expertise', 'when_to_use', 'orchestration_notes']:
-            if getattr(self, field) is None:
-                setattr(self, field, [])
+class AgentCapabilityInfo(CompactRecord):
+    """Comprehensive agent capability information (slotted; tools, colors and categories interned)."""
+    FIELDS = (
+        Field('name'),
+        Field('file'),
+        Field('description', ''),
+        Interned('color', LABELS, ''),
+        Interned('category', LABELS, ''),
+        TextList('capabilities'),
+        InternedList('tools', TOOLS),
+        TextList('coordination_patterns'),
+        TextList('parallel_compatible'),
+        TextList('handoff_patterns'),
+        InternedList('unique_expertise', LABELS),
+        TextList('when_to_use'),
+        TextList('orchestration_notes'),
+        Field('processing_time', 0.0),
+        Field('file_size', 0),
+        Field('cached', False)
+    )
+    __slots__ = CompactRecord.slots_for(FIELDS)
 
 @dataclass
 class CapabilityScanResult:
@@ -83,12 +98,17 @@ class PatternCompiler:
 
     def __init__(self):
         self.patterns = self._compile_patterns()
+        self.section_patterns = self._compile_section_patterns()
+        # Whole-content case-insensitive patterns, run on the folded (lower-cased) text
+        self.folded_patterns = {
+            name: fold_pattern(self.patterns[name])
+            for name in ('you_statements', 'system_boundary', 'task_tool_restriction')
+        }
 
     def _compile_patterns(self) -> Dict[str, Pattern]:
         """Compile all regex patterns for performance."""
         return {
-            # YAML extraction
-            'yaml_section': re.compile(r'^---\n(.*?)\n---', re.DOTALL),
+            # YAML field extraction (front-matter split comes from the document model)
             'yaml_name': re.compile(r'^name:\s*(.+)$', re.MULTILINE),
             'yaml_description': re.compile(r'^description:\s*(.+)$', re.MULTILINE),
             'yaml_color': re.compile(r'^color:\s*(.+)$', re.MULTILINE),
@@ -139,90 +159,62 @@ class PatternCompiler:
             'orchestration_notes': re.compile(r'(?:orchestration|coordination|claude)(.*?)(?=##|\Z)', re.DOTALL | re.IGNORECASE)
         }
 
+    def _compile_section_patterns(self) -> Dict[str, SectionPattern]:
+        """Heads of the ``(.*?)(?=##|\\Z)`` patterns above, for boundary-sliced extraction.
+
+        Each head must stay in step with its full pattern; the section scan
+        benchmark checks that both produce identical output.
+        """
+        flags = re.IGNORECASE
+        return {
+            'capabilities_sections': SectionPattern(
+                r'## (?:Core )?(?:Capabilities|Expertise|Skills|Responsibilities)', flags),
+            'technical_capabilities': SectionPattern(r'### (?:Technical )?(?:Capabilities|Expertise|Skills)', flags),
+            'when_to_use': SectionPattern(r'(?:When to use|Ideal for|Perfect for|Use when)', flags),
+            'when_to_engage': SectionPattern(r'## When to (?:Use|Engage)', flags),
+            'coordination': SectionPattern(r'(?:Coordination|Collaboration|Works with|Handoff)', flags),
+            'parallel_execution': SectionPattern(r'(?:Parallel|Sequential|Handoff) (?:execution|patterns?)', flags),
+            'orchestration_notes': SectionPattern(r'(?:orchestration|coordination|claude)', flags)
+        }
+
 class CapabilityCache:
-    """High-performance capability analysis cache."""
+    """Capability analysis results in the shared SQLite result store."""
+
+    TABLE = 'capability_scan'
 
     def __init__(self, cache_dir: Path):
-        self.cache_file = cache_dir / 'capability_cache.json'
-        self.cache: Dict[str, Dict] = {}
+        self.store = open_result_store(cache_dir)
+        self.table = self.store.table(self.TABLE, source_version(__file__))
         self.hits = 0
         self.misses = 0
-        self._load_cache()
-
-    def _load_cache(self):
-        """Load capability cache from disk."""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r') as f:
-                    data = json.load(f)
-                    self.cache = data.get('cache', {})
-                    logger.info(f"Loaded capability cache with {len(self.cache)} entries")
-            except Exception as e:
-                logger.warning(f"Failed to load capability cache: {e}")
-                self.cache = {}
 
     def save_cache(self):
-        """Save capability cache to disk."""
+        """Flush buffered capability entries to the store."""
         try:
-            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-            cache_data = {
-                'cache': self.cache,
-                'metadata': {
-                    'hits': self.hits,
-                    'misses': self.misses,
-                    'hit_rate': f"{(self.hits / (self.hits + self.misses) * 100) if (self.hits + self.misses) > 0 else 0:.1f}%"
-                }
-            }
-            with open(self.cache_file, 'w') as f:
-                json.dump(cache_data, f, indent=2)
-            logger.info(f"Saved capability cache with {len(self.cache)} entries")
+            self.store.flush()
+            logger.info(f"Saved capability cache with {len(self.table)} entries")
         except Exception as e:
             logger.error(f"Failed to save capability cache: {e}")
 
-    def _get_file_hash(self, file_path: Path) -> str:
-        """Get file hash for cache validation."""
-        hasher = hashlib.md5()
-        try:
-            with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(8192), b""):
-                    hasher.update(chunk)
-            return hasher.hexdigest()
-        except Exception:
-            return ""
-
-    def get(self, file_path: Path) -> Optional[AgentCapabilityInfo]:
-        """Get cached capability info if valid."""
-        cache_key = str(file_path)
-
-        if cache_key not in self.cache:
-            self.misses += 1
-            return None
-
-        entry = self.cache[cache_key]
-        current_hash = self._get_file_hash(file_path)
-
-        if entry.get('file_hash') != current_hash:
-            # File changed, invalidate cache
-            del self.cache[cache_key]
+    def get(self, file_path: Path, file_hash: str) -> Optional[AgentCapabilityInfo]:
+        """Get cached capability info if the file content is unchanged."""
+        payload = self.table.get(str(file_path), file_hash)
+        if payload is None:
             self.misses += 1
             return None
 
         self.hits += 1
         # Reconstruct AgentCapabilityInfo from cached data
-        info_data = entry['capability_info'].copy()
+        info_data = payload['capability_info']
         info_data['cached'] = True
         return AgentCapabilityInfo(**info_data)
 
-    def put(self, file_path: Path, capability_info: AgentCapabilityInfo):
+    def put(self, file_path: Path, capability_info: AgentCapabilityInfo, file_hash: str):
         """Cache capability information."""
-        cache_key = str(file_path)
-        file_hash = self._get_file_hash(file_path)
-
-        self.cache[cache_key] = {
-            'capability_info': asdict(capability_info),
-            'file_hash': file_hash,
+        self.table.put(str(file_path), file_hash, {
+            'capability_info': capability_info.to_dict(),
             'cached_at': time.time()
-        }
+        })
 
     def get_stats(self) -> Dict[str, Any]:
         """Get cache performance statistics."""
@@ -232,20 +224,13 @@ class CapabilityCache:
             'hits': self.hits,
             'misses': self.misses,
             'hit_rate': f"{hit_rate:.1f}%",
-            'cache_size': len(self.cache)
+            'cache_size': len(self.table)
         }
 
-class ParallelCapabilityScanner:
-    """High-performance parallel capability scanner."""
+EXTRACTION_MODES = ('thread', 'process', 'inline')
 
-    # Non-agent files to skip
-    SKIP_FILES = {
-        'README.md', 'AGENT_CATEGORIES.md', 'AGENT_TEMPLATE.md',
-        'AUDIT_VERIFICATION_PROTOCOL.md', 'development/AGENT_SELECTION_GUIDE.md',
-        'ENHANCEMENT_SUMMARY.md', 'performance/PARALLEL_EXECUTION_GUIDE.md',
-        'development/SECURITY_ACCESS_PATTERNS.md', 'development/TOOL_ACCESS_GUIDE.md',
-        'TOOL_ACCESS_STANDARDIZATION_SUMMARY.md'
-    }
+class CapabilityExtractor:
+    """CPU-bound capability extraction, shared by every execution mode."""
 
     # Capability categorization keywords
     CAPABILITY_KEYWORDS = {
@@ -286,80 +271,50 @@ class ParallelCapabilityScanner:
         }
     }
 
-    def __init__(self, cache_dir: Path, max_workers: int = 8):
+    def __init__(self, use_sections: bool = True):
         self.pattern_compiler = PatternCompiler()
-        self.cache = CapabilityCache(cache_dir)
-        self.max_workers = max_workers
-        self.executor = ThreadPoolExecutor(max_workers=max_workers)
+        # False runs every pattern over the whole content (the reference behaviour)
+        self.use_sections = use_sections
 
-    async def extract_agent_info_async(self, file_path: Path) -> AgentCapabilityInfo:
-        """Extract agent information with async operations and caching."""
-        start_time = time.time()
-
-        # Check cache first
-        cached_info = self.cache.get(file_path)
-        if cached_info:
-            logger.debug(f"Cache hit for {file_path.name}")
-            return cached_info
-
-        # Read file asynchronously
-        try:
-            async with aiofiles.open(file_path, 'r', encoding='utf-8') as f:
-                content = await f.read()
-        except Exception as e:
-            logger.error(f"Failed to read {file_path}: {e}")
-            return AgentCapabilityInfo(
-                name=file_path.stem,
-                file=file_path.name,
-                processing_time=time.time() - start_time,
-                file_size=0
-            )
-
-        # Process content in executor for CPU-intensive operations
-        loop = asyncio.get_event_loop()
-        agent_info = await loop.run_in_executor(
-            self.executor, self._extract_content_info, file_path, content, start_time
-        )
-
-        # Cache result
-        self.cache.put(file_path, agent_info)
-
-        return agent_info
-
-    def _extract_content_info(self, file_path: Path, content: str, start_time: float) -> AgentCapabilityInfo:
+    def extract(self, file_path: Path, document: ParsedDocument, start_time: Optional[float] = None) -> AgentCapabilityInfo:
         """Extract comprehensive agent information from content."""
-        agent_info = AgentCapabilityInfo(
-            name=file_path.stem,
-            file=file_path.name,
-            file_size=len(content),
-            processing_time=time.time() - start_time
-        )
+        with span('extract', file=file_path.name):
+            return self._extract(file_path, document, start_time)
+
+    def _extract(self, file_path: Path, document: ParsedDocument, start_time: Optional[float]) -> AgentCapabilityInfo:
+        if start_time is None:
+            start_time = time.time()
+        # Fields are gathered as plain lists and packed into the compact record once at the end
+        fields: Dict[str, Any] = {}
 
         # Extract YAML frontmatter
-        yaml_match = self.pattern_compiler.patterns['yaml_section'].match(content)
-        if yaml_match:
-            yaml_content = yaml_match.group(1)
-            self._extract_yaml_info(yaml_content, agent_info)
+        if document.has_front_matter:
+            self._extract_yaml_info(document.front_matter_text, fields)
 
         # Extract capabilities from various sections
-        self._extract_capabilities(content, agent_info)
+        self._extract_capabilities(document, fields)
 
         # Extract when to use patterns
-        self._extract_when_to_use(content, agent_info)
+        self._extract_when_to_use(document, fields)
 
         # Extract coordination patterns
-        self._extract_coordination_patterns(content, agent_info)
+        self._extract_coordination_patterns(document, fields)
 
         # Extract orchestration and security notes
-        self._extract_orchestration_notes(content, agent_info)
+        self._extract_orchestration_notes(document, fields)
 
         # Categorize and deduplicate
-        self._clean_and_categorize(agent_info)
+        self._clean_and_categorize(fields)
 
-        agent_info.processing_time = time.time() - start_time
-        return agent_info
+        return AgentCapabilityInfo(
+            name=fields.pop('name', file_path.stem),
+            file=file_path.name,
+            file_size=len(document.content),
+            processing_time=time.time() - start_time,
+            **fields
+        )
 
-    def _extract_yaml_info(self, yaml_content: str, agent_info: AgentCapabilityInfo):
+    def _extract_yaml_info(self, yaml_content: str, fields: Dict[str, Any]):
         """Extract information from YAML frontmatter."""
         patterns = self.pattern_compiler.patterns
 
@@ -372,79 +327,77 @@ class ParallelCapabilityScanner:
         ]:
             match = patterns[pattern].search(yaml_content)
             if match:
-                setattr(agent_info, field, match.group(1).strip())
+                fields[field] = match.group(1).strip()
 
         # Extract tools
         tools_match = patterns['yaml_tools_section'].search(yaml_content)
         if tools_match:
             tools = patterns['yaml_tool_items'].findall(tools_match.group(1))
-            agent_info.tools = [tool.strip() for tool in tools]
-
-    def _extract_capabilities(self, content: str, agent_info: AgentCapabilityInfo):
+            fields['tools'] = [tool.strip() for tool in tools]
+
+    def _find_all(self, pattern_name: str, document: ParsedDocument) -> List[str]:
+        """``findall`` for a pattern, on boundary slices when it is a section pattern."""
+        if self.use_sections:
+            section_pattern = self.pattern_compiler.section_patterns.get(pattern_name)
+            if section_pattern is not None:
+                return section_pattern.captures(document)
+            folded = self.pattern_compiler.folded_patterns.get(pattern_name)
+            if folded is not None and document.folded is not None:
+                # Spans line up with the original content; slice the capture from it
+                return [document.content[match.start(1):match.end(1)]
+                        for match in folded.finditer(document.folded)]
+        return self.pattern_compiler.patterns[pattern_name].findall(document.content)
+
+    def _contains(self, pattern_name: str, document: ParsedDocument) -> bool:
+        """Whether a pattern occurs anywhere in the content."""
+        if self.use_sections:
+            folded = self.pattern_compiler.folded_patterns.get(pattern_name)
+            if folded is not None and document.folded is not None:
+                return folded.search(document.folded) is not None
+        return self.pattern_compiler.patterns[pattern_name].search(document.content) is not None
+
+    def _collect_bullets(self, pattern_names: List[str], document: ParsedDocument, items: List[str]) -> List[str]:
+        """Append the bullet points of every section matched by ``pattern_names`` to ``items``."""
+        bullet_points = self.pattern_compiler.patterns['bullet_points']
+        for pattern_name in pattern_names:
+            for match in self._find_all(pattern_name, document):
+                items.extend(bullet.strip() for bullet in bullet_points.findall(match) if bullet.strip())
+        return items
+
+    def _extract_capabilities(self, document: ParsedDocument, fields: Dict[str, Any]):
         """Extract capabilities from content sections."""
-        patterns = self.pattern_compiler.patterns
-
-        # Extract from different capability sections
-        capability_patterns = [
-            'capabilities_sections',
-            'technical_capabilities',
-            'you_statements'
-        ]
-
-        for pattern_name in capability_patterns:
-            matches = patterns[pattern_name].findall(content)
-            for match in matches:
-                bullets = patterns['bullet_points'].findall(match)
-                agent_info.capabilities.extend(bullet.strip() for bullet in bullets if bullet.strip())
+        fields['capabilities'] = self._collect_bullets(
+            ['capabilities_sections', 'technical_capabilities', 'you_statements'], document, [])
 
-    def _extract_when_to_use(self, content: str, agent_info: AgentCapabilityInfo):
+    def _extract_when_to_use(self, document: ParsedDocument, fields: Dict[str, Any]):
         """Extract when to use patterns."""
-        patterns = self.pattern_compiler.patterns
-
-        when_patterns = ['when_to_use', 'when_to_engage']
+        fields['when_to_use'] = self._collect_bullets(['when_to_use', 'when_to_engage'], document, [])
 
-        for pattern_name in when_patterns:
-            matches = patterns[pattern_name].findall(content)
-            for match in matches:
-                bullets = patterns['bullet_points'].findall(match)
-                agent_info.when_to_use.extend(bullet.strip() for bullet in bullets if bullet.strip())
-
-    def _extract_coordination_patterns(self, content: str, agent_info: AgentCapabilityInfo):
+    def _extract_coordination_patterns(self, document: ParsedDocument, fields: Dict[str, Any]):
         """Extract coordination patterns."""
-        patterns = self.pattern_compiler.patterns
-
-        coord_patterns = ['coordination', 'parallel_execution']
+        fields['coordination_patterns'] = self._collect_bullets(['coordination', 'parallel_execution'], document, [])
 
-        for pattern_name in coord_patterns:
-            matches = patterns[pattern_name].findall(content)
-            for match in matches:
-                bullets = patterns['bullet_points'].findall(match)
-                agent_info.coordination_patterns.extend(bullet.strip() for bullet in bullets if bullet.strip())
-
-    def _extract_orchestration_notes(self, content: str, agent_info: AgentCapabilityInfo):
+    def _extract_orchestration_notes(self, document: ParsedDocument, fields: Dict[str, Any]):
         """Extract orchestration and security notes."""
-        patterns = self.pattern_compiler.patterns
+        notes = []
 
         # Check for SYSTEM BOUNDARY
-        if patterns['system_boundary'].search(content):
-            agent_info.orchestration_notes.append("SYSTEM BOUNDARY protection enforced")
+        if self._contains('system_boundary', document):
+            notes.append("SYSTEM BOUNDARY protection enforced")
 
         # Check for Task tool restrictions
-        if patterns['task_tool_restriction'].search(content):
-            agent_info.orchestration_notes.append("Task tool access properly restricted")
+        if self._contains('task_tool_restriction', document):
+            notes.append("Task tool access properly restricted")
 
         # Extract orchestration-related content
-        matches = patterns['orchestration_notes'].findall(content)
-        for match in matches:
-            bullets = patterns['bullet_points'].findall(match)
-            agent_info.orchestration_notes.extend(bullet.strip() for bullet in bullets if bullet.strip())
+        fields['orchestration_notes'] = self._collect_bullets(['orchestration_notes'], document, notes)
 
-    def _clean_and_categorize(self, agent_info: AgentCapabilityInfo):
+    def _clean_and_categorize(self, fields: Dict[str, Any]):
         """Clean and categorize extracted information."""
         # Deduplicate all lists
         for field in ['capabilities', 'tools', 'coordination_patterns',
                      'when_to_use', 'orchestration_notes']:
-            items = getattr(agent_info, field, [])
+            items = fields.get(field)
             if items:
                 # Remove duplicates while preserving order
                 seen = set()
@@ -453,11 +406,11 @@ class ParallelCapabilityScanner:
                     if item.lower() not in seen:
                         seen.add(item.lower())
                         unique_items.append(item)
-                setattr(agent_info, field, unique_items)
+                fields[field] = unique_items
 
         # Categorize capabilities by domain
-        if agent_info.capabilities:
-            agent_info.unique_expertise = self._categorize_capabilities(agent_info.capabilities)
+        if fields.get('capabilities'):
+            fields['unique_expertise'] = self._categorize_capabilities(fields['capabilities'])
 
     def _categorize_capabilities(self, capabilities: List[str]) -> List[str]:
         """Categorize capabilities by domain expertise."""
@@ -473,47 +426,283 @@ class ParallelCapabilityScanner:
 
         return sorted(list(categorized))
 
-    async def scan_agents_parallel(self, agents_dir: Path) -> Tuple[List[AgentCapabilityInfo], CapabilityScanResult]:
-        """Scan all agents with maximum parallelism."""
-        # Get agent files
-        agent_files = [
-            f for f in agents_dir.glob('*.md')
-            if f.name not in self.SKIP_FILES
-        ]
+# Process-pool workers build their extractor once; compiled patterns are never pickled
+_worker_extractor: Optional[CapabilityExtractor] = None
+
+def extract_chunk(chunk: List[Tuple[str, str]]) -> List[Tuple[str, tuple]]:
+    """Process-pool entry point: extract (path, content) pairs into compact (path, field tuple) rows."""
+    global _worker_extractor
+    if _worker_extractor is None:
+        _worker_extractor = CapabilityExtractor()
+
+    # Chunk-local document cache so worker memory does not grow across chunks
+    documents = DocumentCache()
+    rows = []
+    for path, content in chunk:
+        info = _worker_extractor.extract(Path(path), documents.parse(content))
+        rows.append((path, info.to_row()))
+    return rows
+
+def extract_chunk_traced(chunk: List[Tuple[str, str]]) -> Tuple[List[Tuple[str, tuple]], tuple]:
+    """``extract_chunk`` recording spans in the worker; returns the rows and the worker's spans."""
+    # A forked worker inherits the parent's tracer and its events: start from a fresh one
+    stop_tracing()
+    start_tracing()
+    try:
+        with span('extract_chunk', files=len(chunk)):
+            rows = extract_chunk(chunk)
+        return rows, get_tracer().collect()
+    finally:
+        stop_tracing()
+
+def balance_chunks(items: List[Tuple[str, str]], chunk_count: int) -> List[List[Tuple[str, str]]]:
+    """Split (path, content) pairs into chunks of similar total size, largest files first."""
+    chunk_count = max(1, min(chunk_count, len(items)))
+    loads = [(0, index) for index in range(chunk_count)]
+    chunks: List[List[Tuple[str, str]]] = [[] for _ in range(chunk_count)]
+    for item in sorted(items, key=lambda item: len(item[1]), reverse=True):
+        load, index = heapq.heappop(loads)
+        chunks[index].append(item)
+        heapq.heappush(loads, (load + len(item[1]), index))
+    return [chunk for chunk in chunks if chunk]
 
-        logger.info(f"Scanning {len(agent_files)} agent files with {self.max_workers} workers...")
+class ParallelCapabilityScanner:
+    """High-performance parallel capability scanner."""
 
-        # Create scanning tasks
-        start_time = time.time()
-        tasks = [self.extract_agent_info_async(file_path) for file_path in agent_files]
+    # Files per process-pool task when streaming through the pipeline
+    PROCESS_BATCH_SIZE = 16
 
-        # Execute all scans concurrently
-        agent_infos = await asyncio.gather(*tasks, return_exceptions=True)
-        total_time = time.time() - start_time
+    # Non-agent files to skip
+    SKIP_FILES = {
+        'README.md', 'AGENT_CATEGORIES.md', 'AGENT_TEMPLATE.md',
+        'AUDIT_VERIFICATION_PROTOCOL.md', 'development/AGENT_SELECTION_GUIDE.md',
+        'ENHANCEMENT_SUMMARY.md', 'performance/PARALLEL_EXECUTION_GUIDE.md',
+        'development/SECURITY_ACCESS_PATTERNS.md', 'development/TOOL_ACCESS_GUIDE.md',
+        'TOOL_ACCESS_STANDARDIZATION_SUMMARY.md'
+    }
 
-        # Process results
-        valid_infos = []
-        for i, info in enumerate(agent_infos):
-            if isinstance(info, Exception):
-                logger.error(f"Failed to scan {agent_files[i].name}: {info}")
-                # Create error info
-                error_info = AgentCapabilityInfo(
-                    name=agent_files[i].stem,
-                    file=agent_files[i].name,
-                    capabilities=[f"Scan error: {info}"]
-                )
-                valid_infos.append(error_info)
+    def __init__(self, cache_dir: Path, max_workers: int = 8, mode: str = 'thread'):
+        if mode not in EXTRACTION_MODES:
+            raise ValueError(f"Unknown extraction mode '{mode}'. Must be one of: {', '.join(EXTRACTION_MODES)}")
+        self.extractor = CapabilityExtractor()
+        self.cache = CapabilityCache(cache_dir)
+        self.max_workers = max_workers
+        self.mode = mode
+        # File I/O always goes through the thread pool (except inline); extraction only in thread mode
+        self.executor = ThreadPoolExecutor(max_workers=max_workers) if mode != 'inline' else None
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def process_pool(self) -> ProcessPoolExecutor:
+        """Extraction worker processes, started on first use."""
+        if self._process_pool is None:
+            self._process_pool = ProcessPoolExecutor(max_workers=self.max_workers)
+        return self._process_pool
+
+    async def _run_io(self, func, *args):
+        if self.executor is None:
+            return func(*args)
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def _extract_many(self, items: List[Tuple[Path, ParsedDocument]],
+                            chunk_count: Optional[int] = None) -> List[Union[AgentCapabilityInfo, Exception]]:
+        """Run extraction on the configured backend, results aligned with ``items``."""
+        if self.mode == 'inline':
+            results = []
+            for file_path, document in items:
+                try:
+                    results.append(self.extractor.extract(file_path, document))
+                except Exception as e:
+                    results.append(e)
+            return results
+
+        loop = asyncio.get_running_loop()
+        if self.mode == 'thread':
+            return await asyncio.gather(*(
+                loop.run_in_executor(self.executor, self.extractor.extract, file_path, document)
+                for file_path, document in items
+            ), return_exceptions=True)
+
+        # Process mode: ship content only, in size-balanced chunks (several per worker)
+        chunks = balance_chunks([(str(path), document.content) for path, document in items],
+                                chunk_count or self.max_workers * 4)
+        tracer = get_tracer()
+        chunk_results = await asyncio.gather(*(
+            loop.run_in_executor(self.process_pool, extract_chunk_traced if tracer else extract_chunk, chunk)
+            for chunk in chunks
+        ), return_exceptions=True)
+        if tracer is not None:
+            # Fold worker spans into this process's trace
+            for index, result in enumerate(chunk_results):
+                if not isinstance(result, Exception):
+                    chunk_results[index], (events, lane_names) = result
+                    tracer.merge(events, lane_names)
+
+        by_path: Dict[str, Union[AgentCapabilityInfo, Exception]] = {}
+        for chunk, rows in zip(chunks, chunk_results):
+            if isinstance(rows, Exception):
+                by_path.update((path, rows) for path, _ in chunk)
             else:
-                valid_infos.append(info)
+                by_path.update((path, AgentCapabilityInfo(*row)) for path, row in rows)
+        return [by_path[str(path)] for path, _ in items]
 
-        # Generate scan result
-        scan_result = self._generate_scan_result(valid_infos, total_time)
+    async def _read_stage(self, file_path: Path) -> Union[AgentCapabilityInfo, Tuple[Path, ParsedDocument]]:
+        """Pipeline stage: read and hash a file, serving result-store hits directly."""
+        start_time = time.time()
+        try:
+            document = await self._run_io(load_document, file_path)
+        except Exception as e:
+            logger.error(f"Failed to read {file_path}: {e}")
+            return AgentCapabilityInfo(
+                name=file_path.stem,
+                file=file_path.name,
+                processing_time=time.time() - start_time,
+                file_size=0
+            )
+
+        # Check cache first; the content hash comes from the parsed document
+        with span('cache_lookup', file=file_path.name):
+            cached_info = self.cache.get(file_path, document.content_hash)
+        if cached_info:
+            logger.debug(f"Cache hit for {file_path.name}")
+            return cached_info
+        return (file_path, document)
+
+    async def _extract_stage(self, items: List[Union[AgentCapabilityInfo, Tuple[Path, ParsedDocument]]],
+                             chunk_count: Optional[int] = None) -> List[AgentCapabilityInfo]:
+        """Pipeline stage: extract cache misses on the configured backend and store the results."""
+        results: List[Any] = list(items)
+        pending = [(index, item) for index, item in enumerate(items) if isinstance(item, tuple)]
+        if not pending:
+            return results
+
+        extracted = await self._extract_many([item for _, item in pending], chunk_count)
+        with span('cache_store', files=len(pending)):
+            for (index, (file_path, document)), info in zip(pending, extracted):
+                if isinstance(info, Exception):
+                    info = self._error_info(file_path, info)
+                else:
+                    self.cache.put(file_path, info, document.content_hash)
+                results[index] = info
+        return results
+
+    async def extract_agents_async(self, file_paths: List[Path]) -> List[AgentCapabilityInfo]:
+        """Extract a known set of files (e.g. a watch batch), results aligned with ``file_paths``."""
+        items = await asyncio.gather(*(self._read_stage(file_path) for file_path in file_paths))
+        return await self._extract_stage(list(items))
+
+    async def extract_agent_info_async(self, file_path: Path) -> AgentCapabilityInfo:
+        """Extract agent information with async operations and caching."""
+        [agent_info] = await self.extract_agents_async([file_path])
+        return agent_info
+
+    def discover_agent_files(self, agents_dir: Path) -> Iterator[Path]:
+        """Lazily yield agent files from a single directory scan."""
+        with os.scandir(agents_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.md') and entry.name not in self.SKIP_FILES and entry.is_file():
+                    yield Path(entry.path)
+
+    def _in_flight_limit(self, max_in_flight: Optional[int]) -> int:
+        """``max_in_flight`` or, by default, enough to keep every worker busy with a full batch."""
+        if max_in_flight is not None:
+            return max_in_flight
+        batch_size = self.PROCESS_BATCH_SIZE if self.mode == 'process' else 1
+        return max(64, self.max_workers * batch_size * 2)
+
+    async def _run_scan(self, files: Union[Iterable[Path], AsyncIterator[Path]], sink: Callable[[AgentCapabilityInfo], None],
+                        max_in_flight: Optional[int]) -> float:
+        """Feed ``files`` through the bounded read -> extract pipeline into ``sink``; returns the wall time."""
+        batch_size = self.PROCESS_BATCH_SIZE if self.mode == 'process' else 1
+        max_in_flight = self._in_flight_limit(max_in_flight)
+
+        logger.info(f"Scanning agent files with {self.max_workers} {self.mode} workers "
+                    f"({max_in_flight} in flight)...")
 
-        logger.info(f"Scanning completed in {total_time:.2f}s")
+        start_time = time.time()
+        with span('scan_agents', 'run'):
+            pipeline_stats = await run_pipeline(
+                files,
+                [
+                    Stage('read', self._read_stage, workers=self.max_workers),
+                    # A micro-batch is already sized for one worker: ship it as a single chunk
+                    Stage('extract', lambda items: self._extract_stage(items, chunk_count=1),
+                          workers=self.max_workers, batch_size=batch_size),
+                ],
+                sink,
+                max_in_flight=max_in_flight,
+                on_error=self._error_info
+            )
+        total_time = time.time() - start_time
+
+        logger.info(f"Scanning completed in {total_time:.2f}s ({pipeline_stats.items} agents, "
+                    f"peak in flight: {pipeline_stats.peak_in_flight})")
         logger.info(f"Cache performance: {self.cache.get_stats()}")
+        return total_time
+
+    async def scan_agents_parallel(self, agents_dir: Path,
+                                   max_in_flight: Optional[int] = None) -> Tuple[List[AgentCapabilityInfo], CapabilityScanResult]:
+        """Scan all agents through a bounded read -> extract pipeline."""
+        valid_infos: List[AgentCapabilityInfo] = []
+        total_time = await self._run_scan(self.discover_agent_files(agents_dir), valid_infos.append, max_in_flight)
 
+        # Results arrive in completion order; keep reports deterministic
+        valid_infos.sort(key=lambda info: info.name)
+
+        # Generate scan result
+        scan_result = self._generate_scan_result(valid_infos, total_time)
         return valid_infos, scan_result
 
+    async def scan_agents_streaming(self, agents_dir: Path, writer: 'CapabilityReportWriter',
+                                    max_in_flight: Optional[int] = None) -> CapabilityScanResult:
+        """Scan all agents straight into ``writer`` without keeping their records.
+
+        Agents are written in file-name order: results that complete ahead of
+        an earlier file wait in a reorder buffer. A file is only admitted
+        while it is fewer than ``max_in_flight`` places past the next one to
+        write, so one slow file stalls discovery instead of growing the
+        buffer.
+        """
+        files = sorted(self.discover_agent_files(agents_dir))
+        position = {path.name: index for index, path in enumerate(files)}
+        window = self._in_flight_limit(max_in_flight)
+        waiting: Dict[int, AgentCapabilityInfo] = {}
+        next_index = 0
+        advanced = asyncio.Event()
+
+        async def admit() -> AsyncIterator[Path]:
+            for index, path in enumerate(files):
+                while index >= next_index + window:
+                    advanced.clear()
+                    await advanced.wait()
+                yield path
+
+        def emit(info: AgentCapabilityInfo) -> None:
+            nonlocal next_index
+            index = position.get(info.file)
+            if index is None:
+                writer.add(info)
+                return
+            waiting[index] = info
+            while next_index in waiting:
+                writer.add(waiting.pop(next_index))
+                next_index += 1
+                advanced.set()
+
+        total_time = await self._run_scan(admit(), emit, window)
+        for index in sorted(waiting):
+            writer.add(waiting.pop(index))
+        return writer.scan_result(total_time)
+
+    def _error_info(self, file_path: Path, error: Exception) -> AgentCapabilityInfo:
+        """Placeholder entry for an agent that failed to scan."""
+        logger.error(f"Failed to scan {file_path.name}: {error}")
+        return AgentCapabilityInfo(
+            name=file_path.stem,
+            file=file_path.name,
+            capabilities=[f"Scan error: {error}"]
+        )
+
     def _generate_scan_result(self, agent_infos: List[AgentCapabilityInfo], processing_time: float) -> CapabilityScanResult:
         """Generate comprehensive scan result."""
         # Count capabilities
@@ -547,95 +736,310 @@ class ParallelCapabilityScanner:
 
     def _identify_parallel_opportunities(self, agent_infos: List[AgentCapabilityInfo]) -> List[str]:
         """Identify parallel execution opportunities."""
-        opportunities = []
-
         # Group by category
         by_category = {}
         for info in agent_infos:
-            category = info.color or 'unknown'
-            if category not in by_category:
-                by_category[category] = []
-            by_category[category].append(info.name)
-
-        # Identify parallel patterns
-        for category, agents in by_category.items():
-            if len(agents) > 1:
-                opportunities.append(f"Multiple {category} agents: {', '.join(agents)}")
-
-        # Cross-functional opportunities
-        if 'blue' in by_category and 'green' in by_category:
-            opportunities.append("Development + Quality validation (blue + green agents)")
-
-        if 'blue' in by_category and 'yellow' in by_category:
-            opportunities.append("Development + Infrastructure deployment (blue + yellow agents)")
-
-        if 'purple' in by_category and 'blue' in by_category:
-            opportunities.append("Architecture + Implementation (purple + blue agents)")
-
-        return opportunities
+            by_category.setdefault(info.color or 'unknown', []).append(info.name)
+        return identify_parallel_opportunities(by_category)
 
     def cleanup(self):
         """Cleanup resources and save cache."""
         self.cache.save_cache()
-        self.executor.shutdown(wait=True)
+        if self.executor is not None:
+            self.executor.shutdown(wait=True)
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=True)
 
 async def main():
     """Main execution function."""
+    parser = argparse.ArgumentParser(description='High-performance agent capability scanning')
+    parser.add_argument('--watch', action='store_true',
+                        help='Stay running and update the capability matrix as agents are saved')
+    parser.add_argument('--poll-interval', type=float, default=0.5,
+                        help='Polling interval in seconds when inotify is unavailable')
+    parser.add_argument('--mode', choices=EXTRACTION_MODES, default='thread',
+                        help='Extraction backend: thread pool, process pool, or inline')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker count (default: 8 threads, or one process per CPU)')
+    parser.add_argument('--format', choices=REPORT_FORMATS, default='json',
+                        help='Capability matrix format: one JSON document, or one agent per line (NDJSON)')
+
     # Setup paths
     script_dir = Path(__file__).parent.parent
     project_root = script_dir.parent
     agents_dir = project_root / 'system-configs' / '.claude' / 'agents'
     cache_dir = project_root / '.cache'
 
+    add_trace_argument(parser, project_root / '.tmp' / 'reports' / 'capability-scan-trace.json')
+    args = parser.parse_args()
+
     if not agents_dir.exists():
         print(f"Error: Agents directory not found at {agents_dir}")
         sys.exit(1)
 
+    if args.trace:
+        start_tracing()
+
     # Initialize scanner
-    scanner = ParallelCapabilityScanner(cache_dir, max_workers=8)
+    workers = args.workers or ((os.cpu_count() or 1) if args.mode == 'process' else 8)
+    scanner = ParallelCapabilityScanner(cache_dir, max_workers=workers, mode=args.mode)
+    attach_section_index(cache_dir)
 
     try:
         print("High-Performance Agent Capability Scanning")
         print("=" * 60)
 
-        # Scan all agents
-        agent_infos, scan_result = await scanner.scan_agents_parallel(agents_dir)
+        if args.watch:
+            # Watch mode keeps every agent in memory to rebuild the matrix on each change
+            agent_infos, scan_result = await scanner.scan_agents_parallel(agents_dir)
+            with span('report'):
+                await generate_capability_reports(agent_infos, scan_result, project_root, args.format)
+            print_scan_summary(scan_result, scanner.cache.get_stats())
+            await watch_capabilities(scanner, agents_dir, project_root, agent_infos, args.poll_interval, args.format)
+        else:
+            # Agents are written out as they finish scanning
+            writer = CapabilityReportWriter(project_root, args.format)
+            try:
+                scan_result = await scanner.scan_agents_streaming(agents_dir, writer)
+                with span('report'):
+                    matrix_path, markdown_path = writer.finish(scan_result)
+            finally:
+                writer.close()
+            print(f"\n📊 Capability matrix saved to: {matrix_path}")
+            print(f"📋 Analysis report saved to: {markdown_path}")
+            print_scan_summary(scan_result, scanner.cache.get_stats())
 
-        # Generate reports
-        await generate_capability_reports(agent_infos, scan_result, project_root)
+    finally:
+        scanner.cleanup()
+        finish_tracing(args.trace)
 
-        # Print summary
-        print_scan_summary(agent_infos, scan_result, scanner.cache.get_stats())
+async def watch_capabilities(scanner: ParallelCapabilityScanner, agents_dir: Path, project_root: Path,
+                             agent_infos: List[AgentCapabilityInfo], poll_interval: float,
+                             report_format: str = 'json'):
+    """Keep agent capabilities in memory and re-scan only the agents that change."""
+    infos_by_path = {agents_dir / info.file: info for info in agent_infos}
+    watcher = FileWatcher(corpus_directories(project_root), poll_interval=poll_interval)
+    print(f"\n👀 Watching {len(watcher.directories)} directories ({watcher.backend}) - Ctrl-C to stop")
 
+    try:
+        async for changed in watcher.changes():
+            start_time = time.perf_counter()
+            affected = sorted(
+                path for path in changed
+                if path.parent == agents_dir and path.name not in scanner.SKIP_FILES
+            )
+            if not affected:
+                continue
+
+            present = [path for path in affected if path.exists()]
+            for path in affected:
+                if path not in present:
+                    infos_by_path.pop(path, None)
+                    scanner.cache.table.delete(str(path))
+
+            updated = await scanner.extract_agents_async(present)
+            for path, info in zip(present, updated):
+                infos_by_path[path] = info
+
+            # Matrix is rebuilt from the in-memory records; only changed agents were re-read
+            current_infos = list(infos_by_path.values())
+            if not current_infos:
+                continue
+            scan_result = scanner._generate_scan_result(current_infos, time.perf_counter() - start_time)
+            await generate_capability_reports(current_infos, scan_result, project_root, report_format)
+            scanner.cache.save_cache()
+
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            print(f"🔄 {', '.join(path.stem for path in affected)}: "
+                  f"capability matrix updated in {elapsed_ms:.1f}ms")
     finally:
-        scanner.cleanup()
+        watcher.close()
+
+CATEGORY_NAMES = {
+    'blue': 'Development & Implementation',
+    'green': 'Quality & Testing',
+    'purple': 'Architecture & Analysis',
+    'pink': 'Design',
+    'yellow': 'Infrastructure & Operations',
+    'orange': 'Documentation & Support',
+    'white': 'Specialized Support'
+}
+
+REPORT_FORMATS = ('json', 'ndjson')
+
+
+def identify_parallel_opportunities(by_category: Dict[str, List[str]]) -> List[str]:
+    """Parallel execution opportunities from agent names grouped by category (color)."""
+    opportunities = []
+
+    # Identify parallel patterns
+    for category, agents in by_category.items():
+        if len(agents) > 1:
+            opportunities.append(f"Multiple {category} agents: {', '.join(agents)}")
+
+    # Cross-functional opportunities
+    if 'blue' in by_category and 'green' in by_category:
+        opportunities.append("Development + Quality validation (blue + green agents)")
+
+    if 'blue' in by_category and 'yellow' in by_category:
+        opportunities.append("Development + Infrastructure deployment (blue + yellow agents)")
+
+    if 'purple' in by_category and 'blue' in by_category:
+        opportunities.append("Architecture + Implementation (purple + blue agents)")
+
+    return opportunities
+
+
+def _markdown_agent_section(agent: AgentCapabilityInfo) -> str:
+    lines = [f"#### {agent.name}", f"- **Description**: {agent.description or 'N/A'}"]
+    if agent.capabilities:
+        lines.append(f"- **Key Capabilities** ({len(agent.capabilities)}):")
+        lines.extend(f"  - {cap}" for cap in agent.capabilities[:5])  # Top 5 capabilities
+        if len(agent.capabilities) > 5:
+            lines.append(f"  - *...and {len(agent.capabilities)-5} more*")
+    if agent.tools:
+        lines.append(f"- **Tools**: {', '.join(agent.tools)}")
+    if agent.when_to_use:
+        lines.append(f"- **When to use**: {agent.when_to_use[0]}")
+    processing_indicator = " (cached)" if agent.cached else f" ({agent.processing_time:.3f}s)"
+    lines.append(f"- **Processing time**: {processing_indicator}")
+    return '\n'.join(lines) + '\n\n'
+
+
+def _hit_rate(scan_result: CapabilityScanResult) -> float:
+    return scan_result.cache_hits / scan_result.agents_scanned * 100 if scan_result.agents_scanned else 0.0
+
+
+class CapabilityReportWriter:
+    """Streams the capability matrix and markdown analysis to disk as agents are added.
+
+    Each agent is serialized the moment it arrives: its JSON record goes to a
+    spill file (or straight out as one NDJSON line) and its markdown section
+    to a per-category spill file. Only counters and agent names stay in
+    memory, so report generation does not grow with the corpus; ``finish``
+    stitches the spills between the header and the analysis and renames the
+    results into place.
+
+    Formats:
+    - ``json``: ``agent-capability-matrix.json``, same layout as before
+    - ``ndjson``: ``agent-capability-matrix.ndjson``, one agent object per
+      line followed by one ``{"scan_metadata": ..., "analysis": ...}`` line
+    """
+
+    def __init__(self, project_root: Path, report_format: str = 'json'):
+        if report_format not in REPORT_FORMATS:
+            raise ValueError(f"Unknown report format '{report_format}'. Must be one of: {', '.join(REPORT_FORMATS)}")
+        self.report_format = report_format
+        self.matrix_path = project_root / f"agent-capability-matrix.{report_format}"
+        self.markdown_path = project_root / '.tmp' / 'reports' / 'performance-capability-analysis.md'
+        self._agents = tempfile.TemporaryFile('w+', encoding='utf-8') if report_format == 'json' else \
+            open(self._partial(self.matrix_path), 'w', encoding='utf-8')
+        self._sections: Dict[str, Any] = {}
+        self._section_counts: Dict[str, int] = {}
+        # Aggregates for the scan summary
+        self.agents_added = 0
+        self.total_capabilities = 0
+        self.cache_hits = 0
+        self.categories: Dict[str, int] = {}
+        self.names_by_category: Dict[str, List[str]] = {}
+        self.coordination_patterns: Dict[str, int] = {}
+
+    @staticmethod
+    def _partial(path: Path) -> Path:
+        return path.with_name(path.name + '.partial')
+
+    def add(self, info: AgentCapabilityInfo) -> None:
+        """Serialize one agent and fold it into the summary counters."""
+        record = info.to_dict()
+        if self.report_format == 'ndjson':
+            self._agents.write(json.dumps(record) + '\n')
+        else:
+            if self.agents_added:
+                self._agents.write(',\n')
+            # Indented to sit inside the matrix's "agents" list
+            self._agents.write('\n'.join('    ' + line for line in json.dumps(record, indent=2).splitlines()))
 
-async def generate_capability_reports(agent_infos: List[AgentCapabilityInfo], scan_result: CapabilityScanResult, project_root: Path):
-    """Generate comprehensive capability reports."""
-
-    # Detailed JSON report
-    json_data = {
-        'scan_metadata': {
-            'agents_scanned': scan_result.agents_scanned,
-            'total_capabilities': scan_result.total_capabilities,
-            'processing_time': scan_result.processing_time,
-            'cache_hit_rate': f"{scan_result.cache_hits/scan_result.agents_scanned*100:.1f}%",
-            'generated_at': time.strftime('%Y-%m-%d %H:%M:%S')
-        },
-        'agents': [asdict(info) for info in agent_infos],
-        'analysis': {
-            'categories': scan_result.categories_identified,
-            'parallel_opportunities': scan_result.parallel_opportunities,
-            'coordination_patterns': scan_result.coordination_patterns
-        }
-    }
+        color = info.color or 'unknown'
+        spill = self._sections.get(color)
+        if spill is None:
+            spill = self._sections[color] = tempfile.TemporaryFile('w+', encoding='utf-8')
+        spill.write(_markdown_agent_section(info))
+        self._section_counts[color] = self._section_counts.get(color, 0) + 1
+
+        self.agents_added += 1
+        self.total_capabilities += len(info.capabilities)
+        self.cache_hits += info.cached
+        if info.color:
+            self.categories[info.color] = self.categories.get(info.color, 0) + 1
+        self.names_by_category.setdefault(color, []).append(info.name)
+        for pattern in info.coordination_patterns:
+            self.coordination_patterns[pattern] = self.coordination_patterns.get(pattern, 0) + 1
+
+    def scan_result(self, processing_time: float) -> CapabilityScanResult:
+        """Scan summary for everything added so far."""
+        return CapabilityScanResult(
+            agents_scanned=self.agents_added,
+            total_capabilities=self.total_capabilities,
+            cache_hits=self.cache_hits,
+            processing_time=processing_time,
+            categories_identified=dict(self.categories),
+            parallel_opportunities=identify_parallel_opportunities(self.names_by_category),
+            coordination_patterns=dict(self.coordination_patterns)
+        )
 
-    json_path = project_root / 'agent-capability-matrix.json'
-    async with aiofiles.open(json_path, 'w') as f:
-        await f.write(json.dumps(json_data, indent=2))
+    def finish(self, scan_result: CapabilityScanResult) -> Tuple[Path, Path]:
+        """Write the final matrix and markdown report; returns their paths."""
+        try:
+            metadata = {
+                'agents_scanned': scan_result.agents_scanned,
+                'total_capabilities': scan_result.total_capabilities,
+                'processing_time': scan_result.processing_time,
+                'cache_hit_rate': f"{_hit_rate(scan_result):.1f}%",
+                'generated_at': time.strftime('%Y-%m-%d %H:%M:%S')
+            }
+            analysis = {
+                'categories': scan_result.categories_identified,
+                'parallel_opportunities': scan_result.parallel_opportunities,
+                'coordination_patterns': scan_result.coordination_patterns
+            }
+            if self.report_format == 'ndjson':
+                self._agents.write(json.dumps({'scan_metadata': metadata, 'analysis': analysis}) + '\n')
+                self._agents.close()
+            else:
+                self._write_json_matrix(metadata, analysis)
+            os.replace(self._partial(self.matrix_path), self.matrix_path)
+            self._write_markdown(scan_result)
+        finally:
+            self.close()
+        return self.matrix_path, self.markdown_path
+
+    @staticmethod
+    def _dump_nested(value: Any, f) -> None:
+        """``json.dump(value, f, indent=2)`` one level deep inside an object, written chunk by chunk."""
+        for chunk in json.JSONEncoder(indent=2).iterencode(value):
+            # Newlines only occur between tokens (strings escape theirs)
+            f.write(chunk.replace('\n', '\n  '))
+
+    def _write_json_matrix(self, metadata: Dict[str, Any], analysis: Dict[str, Any]) -> None:
+        # Same layout as json.dumps(matrix, indent=2), without ever holding the document in memory
+        with open(self._partial(self.matrix_path), 'w', encoding='utf-8') as f:
+            f.write('{\n  "scan_metadata": ')
+            self._dump_nested(metadata, f)
+            if self.agents_added:
+                f.write(',\n  "agents": [\n')
+                self._agents.seek(0)
+                shutil.copyfileobj(self._agents, f)
+                f.write('\n  ],\n  "analysis": ')
+            else:
+                f.write(',\n  "agents": [],\n  "analysis": ')
+            self._dump_nested(analysis, f)
+            f.write('\n}')
 
-    # Markdown report
-    markdown_content = f"""# High-Performance Agent Capability Analysis
+    def _write_markdown(self, scan_result: CapabilityScanResult) -> None:
+        self.markdown_path.parent.mkdir(parents=True, exist_ok=True)
+        partial = self._partial(self.markdown_path)
+        with open(partial, 'w', encoding='utf-8') as f:
+            f.write(f"""# High-Performance Agent Capability Analysis
 
 Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}
 
@@ -644,71 +1048,32 @@ Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}
 - **Agents scanned**: {scan_result.agents_scanned}
 - **Total capabilities identified**: {scan_result.total_capabilities}
 - **Processing time**: {scan_result.processing_time:.3f}s
-- **Cache hit rate**: {scan_result.cache_hits}/{scan_result.agents_scanned} ({scan_result.cache_hits/scan_result.agents_scanned*100:.1f}%)
+- **Cache hit rate**: {scan_result.cache_hits}/{scan_result.agents_scanned} ({_hit_rate(scan_result):.1f}%)
 - **Performance improvement**: ~75% faster through parallel processing
 
 ## Agent Categories
 
-"""
-
-    # Group agents by color/category
-    by_color = {}
-    for info in agent_infos:
-        color = info.color or 'unknown'
-        if color not in by_color:
-            by_color[color] = []
-        by_color[color].append(info)
-
-    color_names = {
-        'blue': 'Development & Implementation',
-        'green': 'Quality & Testing',
-        'purple': 'Architecture & Analysis',
-        'pink': 'Design',
-        'yellow': 'Infrastructure & Operations',
-        'orange': 'Documentation & Support',
-        'white': 'Specialized Support'
-    }
-
-    for color, agents in sorted(by_color.items()):
-        category_name = color_names.get(color, f'{color.title()} Agents')
-        markdown_content += f"### {category_name} ({len(agents)} agents)\n\n"
-
-        for agent in sorted(agents, key=lambda x: x.name):
-            markdown_content += f"#### {agent.name}\n"
-            markdown_content += f"- **Description**: {agent.description or 'N/A'}\n"
-
-            if agent.capabilities:
-                markdown_content += f"- **Key Capabilities** ({len(agent.capabilities)}):\n"
-                for cap in agent.capabilities[:5]:  # Top 5 capabilities
-                    markdown_content += f"  - {cap}\n"
-                if len(agent.capabilities) > 5:
-                    markdown_content += f"  - *...and {len(agent.capabilities)-5} more*\n"
+""")
+            for color in sorted(self._sections):
+                category_name = CATEGORY_NAMES.get(color, f'{color.title()} Agents')
+                f.write(f"### {category_name} ({self._section_counts[color]} agents)\n\n")
+                spill = self._sections[color]
+                spill.seek(0)
+                shutil.copyfileobj(spill, f)
 
-            if agent.tools:
-                markdown_content += f"- **Tools**: {', '.join(agent.tools)}\n"
+            # Parallel execution opportunities
+            f.write("## Parallel Execution Opportunities\n\n")
+            for opportunity in scan_result.parallel_opportunities:
+                f.write(f"- {opportunity}\n")
 
-            if agent.when_to_use:
-                markdown_content += f"- **When to use**: {agent.when_to_use[0]}\n"
-
-            processing_indicator = " (cached)" if agent.cached else f" ({agent.processing_time:.3f}s)"
-            markdown_content += f"- **Processing time**: {processing_indicator}\n"
-            markdown_content += "\n"
-
-    # Parallel execution opportunities
-    markdown_content += """## Parallel Execution Opportunities
-
-"""
-    for opportunity in scan_result.parallel_opportunities:
-        markdown_content += f"- {opportunity}\n"
-
-    # Coordination patterns
-    if scan_result.coordination_patterns:
-        markdown_content += "\n## Common Coordination Patterns\n\n"
-        for pattern, count in sorted(scan_result.coordination_patterns.items(), key=lambda x: x[1], reverse=True):
-            markdown_content += f"- **{pattern}** ({count} agents)\n"
+            # Coordination patterns
+            if scan_result.coordination_patterns:
+                f.write("\n## Common Coordination Patterns\n\n")
+                for pattern, count in sorted(scan_result.coordination_patterns.items(), key=lambda x: x[1], reverse=True):
+                    f.write(f"- **{pattern}** ({count} agents)\n")
 
-    # Performance optimization summary
-    markdown_content += f"""
+            # Performance optimization summary
+            f.write(f"""
 ## Performance Optimizations Achieved
 
 ### Concurrent Processing
@@ -718,7 +1083,7 @@ Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}
 
 ### Advanced Caching
 - **Cache hits**: {scan_result.cache_hits} files served from cache
-- **Hit rate**: {scan_result.cache_hits/scan_result.agents_scanned*100:.1f}% (target: >60% for repeated operations)
+- **Hit rate**: {_hit_rate(scan_result):.1f}% (target: >60% for repeated operations)
 - **Intelligent invalidation**: File hash validation prevents stale cache
 
 ### Pattern Optimization
@@ -730,18 +1095,32 @@ Generated: {time.strftime('%Y-%m-%d %H:%M:%S')}
 - **Comprehensive extraction**: Capabilities, tools, coordination patterns
 - **Security validation**: SYSTEM BOUNDARY and orchestration compliance
 - **Parallel opportunity identification**: Cross-functional execution patterns
-"""
-
-    reports_dir = project_root / '.tmp' / 'reports'
-    reports_dir.mkdir(parents=True, exist_ok=True)
-    markdown_path = reports_dir / 'performance-capability-analysis.md'
-    async with aiofiles.open(markdown_path, 'w') as f:
-        await f.write(markdown_content)
-
-    print(f"\n📊 Capability matrix saved to: {json_path}")
+""")
+        os.replace(partial, self.markdown_path)
+
+    def close(self) -> None:
+        """Drop the spill files (and any partial NDJSON output)."""
+        self._agents.close()
+        for spill in self._sections.values():
+            spill.close()
+        self._sections.clear()
+        partial = self._partial(self.matrix_path)
+        if partial.exists():
+            partial.unlink()
+
+
+async def generate_capability_reports(agent_infos: List[AgentCapabilityInfo], scan_result: CapabilityScanResult,
+                                      project_root: Path, report_format: str = 'json'):
+    """Generate comprehensive capability reports from agents already in memory."""
+    writer = CapabilityReportWriter(project_root, report_format)
+    for info in sorted(agent_infos, key=lambda info: info.name):
+        writer.add(info)
+    matrix_path, markdown_path = writer.finish(scan_result)
+
+    print(f"\n📊 Capability matrix saved to: {matrix_path}")
     print(f"📋 Analysis report saved to: {markdown_path}")
 
-def print_scan_summary(agent_infos: List[AgentCapabilityInfo], scan_result: CapabilityScanResult, cache_stats: Dict):
+def print_scan_summary(scan_result: CapabilityScanResult, cache_stats: Dict):
     """Print scanning summary to console."""
     print(f"\n{'='*60}")
     print("CAPABILITY SCAN SUMMARY")
@@ -761,4 +1140,7 @@ def print_scan_summary(agent_infos: List[AgentCapabilityInfo], scan_result: Capa
     print(f"Coordination Patterns Found: {len(scan_result.coordination_patterns)}")
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    try:
+        run_profiled(lambda: asyncio.run(main()), 'parallel_capability_scanner')
+    except KeyboardInterrupt:
+        pass
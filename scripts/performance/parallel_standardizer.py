@@ -7,7 +7,9 @@ Optimizes agent standardization through:
 - Concurrent file processing with worker pools
 - Intelligent change detection to avoid redundant operations
 - Memory-efficient streaming for large operations
-- Batch processing with rollback capabilities
+- Batch processing with rollback capabilities: writes are staged and
+  committed together (temp file + os.replace, batched fsyncs, rollback
+  journal); content identical to the file on disk is never rewritten
 - Advanced caching and deduplication
 
 Performance improvements:
@@ -21,39 +23,51 @@ Maintains all security features:
 - Orchestration anti-pattern validation
 - Comprehensive audit logging
 - Security compliance verification
+
+Use --profile [cprofile|sample] to write a profile to .tmp/reports/.
 """
 
+import argparse
 import asyncio
 import aiofiles
 import hashlib
-import json
 import os
 import re
-import shutil
 import sys
 import time
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Set, Tuple, Any, Union
 import logging
 
+# Shared result store and pipeline
+sys.path.append(str(Path(__file__).parent))
+from compact_records import LABELS, CompactRecord, Field, Interned
+from file_transaction import FileTransaction, TransactionError, recover
+from result_store import open_result_store
+from pipeline import Stage, run_pipeline
+from profiling import run_profiled
+from tracing import add_trace_argument, finish_tracing, span, start_tracing
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-@dataclass
-class AgentProcessingResult:
-    """Result of agent processing operation."""
-    agent_name: str
-    operation: str  # 'created', 'updated', 'deprecated', 'skipped', 'error'
-    processing_time: float
-    file_size_before: int
-    file_size_after: int
-    changes_detected: bool
-    cached: bool = False
-    error_message: Optional[str] = None
+class AgentProcessingResult(CompactRecord):
+    """Result of agent processing operation (slotted; operation interned)."""
+    FIELDS = (
+        Field('agent_name'),
+        Interned('operation', LABELS),  # 'created', 'updated', 'deprecated', 'skipped', 'error'
+        Field('processing_time'),
+        Field('file_size_before'),
+        Field('file_size_after'),
+        Field('changes_detected'),
+        Field('cached', False),
+        Field('error_message', None)
+    )
+    __slots__ = CompactRecord.slots_for(FIELDS)
 
 @dataclass
 class BatchOperation:
@@ -66,70 +80,122 @@ class BatchOperation:
     content: Optional[str]
 
 class ChangeDetector:
-    """Intelligent change detection system."""
+    """Tiered change detection: stat metadata first, content hash only on mismatch."""
 
-    def __init__(self, cache_dir: Path):
-        self.cache_file = cache_dir / 'change_cache.json'
-        self.file_hashes: Dict[str, str] = {}
-        self.load_cache()
+    TABLE = 'change_detection'
+    VERSION = '1'
 
-    def load_cache(self):
-        """Load change detection cache."""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r') as f:
-                    self.file_hashes = json.load(f)
-                logger.info(f"Loaded {len(self.file_hashes)} file hashes from cache")
-            except Exception as e:
-                logger.warning(f"Failed to load change cache: {e}")
-                self.file_hashes = {}
+    def __init__(self, cache_dir: Path):
+        self.store = open_result_store(cache_dir)
+        self.table = self.store.table(self.TABLE, self.VERSION)
+        # Per-run memo: stat results from the directory scan and hashes by stat key
+        self._stats: Dict[str, os.stat_result] = {}
+        self._hashes: Dict[str, Tuple[Tuple[int, int, int], str]] = {}
+        self.stat_hits = 0
+        self.files_hashed = 0
 
     def save_cache(self):
-        """Save change detection cache."""
+        """Flush recorded hashes to the result store."""
         try:
-            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.cache_file, 'w') as f:
-                json.dump(self.file_hashes, f, indent=2)
+            self.store.flush()
         except Exception as e:
             logger.error(f"Failed to save change cache: {e}")
 
+    def scan_directory(self, directory: Path, suffix: str = '.md') -> List[Path]:
+        """Collect stat metadata for a directory in one os.scandir pass."""
+        files = []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(suffix) and entry.is_file():
+                        path = Path(entry.path)
+                        self._stats[str(path)] = entry.stat()
+                        files.append(path)
+        except FileNotFoundError:
+            pass
+        return files
+
+    def get_stat(self, file_path: Path) -> Optional[os.stat_result]:
+        """Stat from the directory scan, falling back to a single os.stat."""
+        file_key = str(file_path)
+        stat = self._stats.get(file_key)
+        if stat is None:
+            try:
+                stat = os.stat(file_key)
+            except FileNotFoundError:
+                return None
+            self._stats[file_key] = stat
+        return stat
+
+    @staticmethod
+    def _stat_key(stat: os.stat_result) -> Tuple[int, int, int]:
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
     def get_file_hash(self, file_path: Path) -> str:
-        """Calculate file hash efficiently."""
-        hasher = hashlib.md5()
+        """Calculate file hash efficiently, at most once per file per run."""
+        file_key = str(file_path)
+        stat = self.get_stat(file_path)
+        stat_key = self._stat_key(stat) if stat is not None else None
+        known = self._hashes.get(file_key)
+        if known is not None and known[0] == stat_key:
+            return known[1]
+
+        hasher = hashlib.blake2b(digest_size=16)
         try:
             with open(file_path, 'rb') as f:
                 # Process in chunks for memory efficiency
-                for chunk in iter(lambda: f.read(8192), b""):
+                for chunk in iter(lambda: f.read(65536), b""):
                     hasher.update(chunk)
-            return hasher.hexdigest()
         except Exception:
             return ""
 
+        self.files_hashed += 1
+        digest = hasher.hexdigest()
+        if stat_key is not None:
+            self._hashes[file_key] = (stat_key, digest)
+        return digest
+
     def has_changed(self, file_path: Path) -> bool:
         """Check if file has changed since last processing."""
-        if not file_path.exists():
+        stat = self.get_stat(file_path)
+        if stat is None:
             return False
 
         file_key = str(file_path)
+        stat_key = self._stat_key(stat)
+        stored = self.table.lookup(file_key)
+
+        # Tier 1: unchanged metadata means unchanged content - no read
+        if stored is not None and tuple(stored.payload.get('stat', ())) == stat_key:
+            self.stat_hits += 1
+            return False
+
+        # Tier 2: metadata moved, compare content
         current_hash = self.get_file_hash(file_path)
+        self.table.put(file_key, current_hash, {'stat': list(stat_key), 'seen_at': time.time()})
+        return stored is None or stored.content_hash != current_hash
 
-        if file_key not in self.file_hashes:
-            # New file
-            self.file_hashes[file_key] = current_hash
-            return True
+    def mark_processed(self, file_path: Path, content: Optional[str] = None):
+        """Mark file as processed; hashes ``content`` in memory when the caller just wrote it."""
+        file_key = str(file_path)
+        self._stats.pop(file_key, None)
+        stat = self.get_stat(file_path)
+        if stat is None:
+            return
 
-        if self.file_hashes[file_key] != current_hash:
-            # File changed
-            self.file_hashes[file_key] = current_hash
-            return True
+        stat_key = self._stat_key(stat)
+        if content is not None:
+            data = content.encode('utf-8')
+            if len(data) == stat.st_size:
+                digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+                self._hashes[file_key] = (stat_key, digest)
 
-        # No change detected
-        return False
+        self.table.put(file_key, self.get_file_hash(file_path),
+                       {'stat': list(stat_key), 'processed_at': time.time()})
 
-    def mark_processed(self, file_path: Path):
-        """Mark file as processed with current hash."""
-        file_key = str(file_path)
-        self.file_hashes[file_key] = self.get_file_hash(file_path)
+    def get_stats(self) -> Dict[str, int]:
+        """Stat-only decisions versus files actually read."""
+        return {'stat_hits': self.stat_hits, 'files_hashed': self.files_hashed}
 
 class ParallelAgentStandardizer:
     """High-performance parallel agent standardization system."""
@@ -197,13 +263,22 @@ class ParallelAgentStandardizer:
     def __init__(self, cache_dir: Path, max_workers: int = 8):
         self.change_detector = ChangeDetector(cache_dir)
         self.max_workers = max_workers
+        # Writes are staged here and applied together by commit_batch()
+        self.journal_path = cache_dir / 'standardization-journal.json'
+        recover(self.journal_path)
+        self.transaction = FileTransaction(self.journal_path)
         self.batch_operations: List[BatchOperation] = []
         self.processing_stats = {
             'files_processed': 0,
             'files_skipped': 0,
             'cache_hits': 0,
             'errors': 0,
-            'total_time': 0
+            'total_time': 0,
+            'files_written': 0,
+            'files_removed': 0,
+            'identical_writes_skipped': 0,
+            'fsyncs': 0,
+            'commit_time': 0
         }
 
         # Pre-compile templates for performance
@@ -386,11 +461,18 @@ class ParallelAgentStandardizer:
 
     async def process_agent_async(self, agent_name: str, agents_dir: Path, deprecated_dir: Path) -> AgentProcessingResult:
         """Process single agent with async operations."""
+        with span('process_agent', 'file', agent=agent_name) as agent_span:
+            result = await self._process_agent(agent_name, agents_dir, deprecated_dir)
+            agent_span.annotate(operation=result.operation)
+            return result
+
+    async def _process_agent(self, agent_name: str, agents_dir: Path, deprecated_dir: Path) -> AgentProcessingResult:
         start_time = time.time()
         file_path = agents_dir / f"{agent_name}.md"
 
-        # Get file size before processing
-        file_size_before = file_path.stat().st_size if file_path.exists() else 0
+        # Get file size before processing (stat comes from the directory scan)
+        file_stat = self.change_detector.get_stat(file_path)
+        file_size_before = file_stat.st_size if file_stat is not None else 0
 
         try:
             # Check if this is a deprecated agent
@@ -404,9 +486,11 @@ class ParallelAgentStandardizer:
             # Process final agent
             agent_info = self.FINAL_AGENTS[agent_name]
 
-            if file_path.exists():
+            if file_stat is not None:
                 # Check for changes first
-                if not self.change_detector.has_changed(file_path):
+                with span('change_detect'):
+                    changed = self.change_detector.has_changed(file_path)
+                if not changed:
                     self.processing_stats['cache_hits'] += 1
                     return AgentProcessingResult(
                         agent_name=agent_name,
@@ -443,9 +527,8 @@ class ParallelAgentStandardizer:
 
         if target is None and file_path.exists():
             # Move to deprecated
-            await asyncio.get_event_loop().run_in_executor(
-                None, shutil.move, str(file_path), str(deprecated_dir / f"{agent_name}.md")
-            )
+            with span('move'):
+                await self._stage_move(agent_name, 'deprecated', file_path, deprecated_dir / f"{agent_name}.md")
             return AgentProcessingResult(
                 agent_name=agent_name,
                 operation='deprecated',
@@ -456,10 +539,8 @@ class ParallelAgentStandardizer:
             )
         elif target and file_path.exists():
             # Consolidation - backup and remove
-            await asyncio.get_event_loop().run_in_executor(
-                None, shutil.copy, str(file_path), str(deprecated_dir / f"{agent_name}.md")
-            )
-            os.remove(file_path)
+            with span('move'):
+                await self._stage_move(agent_name, 'consolidated', file_path, deprecated_dir / f"{agent_name}.md")
             return AgentProcessingResult(
                 agent_name=agent_name,
                 operation='consolidated',
@@ -483,9 +564,8 @@ class ParallelAgentStandardizer:
         file_size = file_path.stat().st_size if file_path.exists() else 0
 
         if file_path.exists():
-            await asyncio.get_event_loop().run_in_executor(
-                None, shutil.move, str(file_path), str(deprecated_dir / f"{agent_name}.md")
-            )
+            with span('move'):
+                await self._stage_move(agent_name, 'deprecated', file_path, deprecated_dir / f"{agent_name}.md")
 
         return AgentProcessingResult(
             agent_name=agent_name,
@@ -498,31 +578,31 @@ class ParallelAgentStandardizer:
 
     async def _update_existing_agent(self, agent_name: str, agent_info: Dict, file_path: Path, start_time: float, file_size_before: int) -> AgentProcessingResult:
         """Update existing agent file."""
-        yaml_section, markdown_content = await self.extract_content_sections(file_path)
-        new_yaml = self.create_standardized_yaml(agent_name, agent_info, yaml_section)
+        with span('read_file'):
+            yaml_section, markdown_content = await self.extract_content_sections(file_path)
+        with span('render'):
+            new_yaml = self.create_standardized_yaml(agent_name, agent_info, yaml_section)
 
-        # Write updated content
+        # Stage updated content; identical content is not rewritten
         new_content = f"{new_yaml}\n{markdown_content}"
-        async with aiofiles.open(file_path, 'w') as f:
-            await f.write(new_content)
-
-        # Mark as processed
-        self.change_detector.mark_processed(file_path)
+        with span('write', bytes=len(new_content)):
+            staged = await self._stage_write(agent_name, 'updated', file_path, new_content)
 
         file_size_after = len(new_content)
 
         return AgentProcessingResult(
             agent_name=agent_name,
-            operation='updated',
+            operation='updated' if staged else 'skipped',
             processing_time=time.time() - start_time,
             file_size_before=file_size_before,
             file_size_after=file_size_after,
-            changes_detected=True
+            changes_detected=staged
         )
 
     async def _create_new_agent(self, agent_name: str, agent_info: Dict, file_path: Path, start_time: float) -> AgentProcessingResult:
         """Create new agent file."""
-        new_yaml = self.create_standardized_yaml(agent_name, agent_info)
+        with span('render'):
+            new_yaml = self.create_standardized_yaml(agent_name, agent_info)
 
         # Basic template content
         markdown_content = f"""
@@ -563,12 +643,9 @@ You are an expert {agent_name.replace('-', ' ')} specializing in {agent_info['ca
 
         new_content = f"{new_yaml}\n{markdown_content}"
 
-        # Write new file
-        async with aiofiles.open(file_path, 'w') as f:
-            await f.write(new_content)
-
-        # Mark as processed
-        self.change_detector.mark_processed(file_path)
+        # Stage new file
+        with span('write', bytes=len(new_content)):
+            await self._stage_write(agent_name, 'created', file_path, new_content)
 
         file_size_after = len(new_content)
 
@@ -581,46 +658,96 @@ You are an expert {agent_name.replace('-', ' ')} specializing in {agent_info['ca
             changes_detected=True
         )
 
-    async def standardize_agents_parallel(self, agents_dir: Path, deprecated_dir: Path) -> List[AgentProcessingResult]:
-        """Standardize all agents with maximum parallelism."""
+    async def _stage_write(self, agent_name: str, operation_type: str, file_path: Path, content: str) -> bool:
+        """Stage a write for the commit; returns False when the file already holds ``content``."""
+        staged = await asyncio.get_event_loop().run_in_executor(None, self.transaction.write, file_path, content)
+        if staged:
+            self.batch_operations.append(BatchOperation(agent_name, operation_type, None, file_path, None, content))
+        else:
+            # Nothing to write, but remember the file is already standardized
+            with span('mark_processed'):
+                self.change_detector.mark_processed(file_path, content)
+        return staged
+
+    async def _stage_move(self, agent_name: str, operation_type: str, source_path: Path, target_path: Path):
+        """Stage moving a file out of the agents directory."""
+        await asyncio.get_event_loop().run_in_executor(None, self.transaction.move, source_path, target_path)
+        self.batch_operations.append(BatchOperation(agent_name, operation_type, source_path, target_path, None, None))
+
+    async def commit_batch(self, results: List[AgentProcessingResult]):
+        """Apply every staged write and move at once; on failure roll back and mark those agents as errors."""
+        with span('commit', 'run', operations=len(self.batch_operations)):
+            try:
+                await asyncio.get_event_loop().run_in_executor(None, self.transaction.commit)
+            except TransactionError as e:
+                logger.error(f"Commit failed, no agent files were changed: {e}")
+                staged_agents = {operation.agent_name for operation in self.batch_operations}
+                for result in results:
+                    if result.agent_name in staged_agents:
+                        result.operation = 'error'
+                        result.changes_detected = False
+                        result.error_message = f"commit rolled back: {e}"
+            else:
+                with span('mark_processed'):
+                    for operation in self.batch_operations:
+                        if operation.content is not None:
+                            self.change_detector.mark_processed(operation.target_path, operation.content)
+        self.batch_operations.clear()
+
+        transaction_stats = self.transaction.get_stats()
+        self.processing_stats['files_written'] = transaction_stats['files_written']
+        self.processing_stats['files_removed'] = transaction_stats['files_removed']
+        self.processing_stats['identical_writes_skipped'] = transaction_stats['identical_skipped']
+        self.processing_stats['fsyncs'] = transaction_stats['fsyncs']
+        self.processing_stats['commit_time'] = transaction_stats['commit_time']
+
+    async def standardize_agents_parallel(self, agents_dir: Path, deprecated_dir: Path,
+                                          max_in_flight: int = 64) -> List[AgentProcessingResult]:
+        """Standardize all agents through a bounded, back-pressured pipeline."""
         # Create deprecated directory
         deprecated_dir.mkdir(parents=True, exist_ok=True)
 
         # Get all existing agent files
-        existing_agents = [f.stem for f in agents_dir.glob('*.md') if f.name != 'README.md']
+        # Single scandir pass also primes the change detector's stat cache
+        existing_agents = [f.stem for f in self.change_detector.scan_directory(agents_dir) if f.name != 'README.md']
 
         # Add missing final agents to processing list
         all_agents_to_process = set(existing_agents) | set(self.FINAL_AGENTS.keys())
 
         logger.info(f"Processing {len(all_agents_to_process)} agents with {self.max_workers} workers...")
 
-        # Create processing tasks
-        tasks = [
-            self.process_agent_async(agent_name, agents_dir, deprecated_dir)
-            for agent_name in sorted(all_agents_to_process)
-        ]
+        def on_error(agent_name: str, error: BaseException) -> AgentProcessingResult:
+            return AgentProcessingResult(
+                agent_name=agent_name,
+                operation='error',
+                processing_time=0,
+                file_size_before=0,
+                file_size_after=0,
+                changes_detected=False,
+                error_message=str(error)
+            )
 
-        # Execute all tasks concurrently
+        # Stream agents through a bounded pipeline; results reach the sink as they complete
         start_time = time.time()
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        processing_results: List[AgentProcessingResult] = []
+        try:
+            with span('standardize_agents', 'run'):
+                await run_pipeline(
+                    sorted(all_agents_to_process),
+                    [Stage('process', lambda agent_name: self.process_agent_async(agent_name, agents_dir, deprecated_dir),
+                           workers=self.max_workers)],
+                    processing_results.append,
+                    max_in_flight=max_in_flight,
+                    on_error=on_error
+                )
+            await self.commit_batch(processing_results)
+        except BaseException:
+            # Interrupted before the commit: drop the staged temp files, leave the agents untouched
+            self.transaction.rollback()
+            self.batch_operations.clear()
+            raise
         total_time = time.time() - start_time
-
-        # Process results
-        processing_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                agent_name = list(all_agents_to_process)[i]
-                processing_results.append(AgentProcessingResult(
-                    agent_name=agent_name,
-                    operation='error',
-                    processing_time=0,
-                    file_size_before=0,
-                    file_size_after=0,
-                    changes_detected=False,
-                    error_message=str(result)
-                ))
-            else:
-                processing_results.append(result)
+        processing_results.sort(key=lambda result: result.agent_name)
 
         # Update stats
         self.processing_stats['total_time'] = total_time
@@ -630,6 +757,8 @@ You are an expert {agent_name.replace('-', ' ')} specializing in {agent_info['ca
 
         logger.info(f"Processing completed in {total_time:.2f}s")
         logger.info(f"Cache hit rate: {self.processing_stats['cache_hits']}/{len(processing_results)}")
+        logger.info(f"Change detection: {self.change_detector.get_stats()}")
+        logger.info(f"Commit: {self.transaction.get_stats()}")
 
         return processing_results
 
@@ -646,10 +775,17 @@ async def main():
     deprecated_dir = project_root / 'system-configs' / '.claude' / 'deprecated' / 'agents'
     cache_dir = project_root / '.cache'
 
+    parser = argparse.ArgumentParser(description='High-performance parallel agent standardization')
+    add_trace_argument(parser, project_root / '.tmp' / 'reports' / 'standardization-trace.json')
+    args = parser.parse_args()
+
     if not agents_dir.exists():
         print(f"Error: Agents directory not found at {agents_dir}")
         sys.exit(1)
 
+    if args.trace:
+        start_tracing()
+
     # Initialize standardizer
     standardizer = ParallelAgentStandardizer(cache_dir, max_workers=8)
 
@@ -660,13 +796,15 @@ async def main():
         results = await standardizer.standardize_agents_parallel(agents_dir, deprecated_dir)
 
         # Generate comprehensive report
-        await generate_standardization_report(results, standardizer.processing_stats, project_root)
+        with span('report'):
+            await generate_standardization_report(results, standardizer.processing_stats, project_root)
 
         # Print summary
         print_processing_summary(results, standardizer.processing_stats)
 
     finally:
         standardizer.cleanup()
+        finish_tracing(args.trace)
 
 async def generate_standardization_report(results: List[AgentProcessingResult], stats: Dict, project_root: Path):
     """Generate comprehensive standardization report."""
@@ -807,9 +945,11 @@ def print_processing_summary(results: List[AgentProcessingResult], stats: Dict):
     print(f"Deprecated: {operations['deprecated']}")
     print(f"Skipped (cached): {operations['skipped']}")
     print(f"Errors: {operations['error']}")
+    print(f"Files written: {stats['files_written']} ({stats['identical_writes_skipped']} identical writes skipped, "
+          f"{stats['files_removed']} moved out, {stats['fsyncs']} fsyncs)")
     print(f"Total time: {stats['total_time']:.2f}s")
     print(f"Cache efficiency: {stats['cache_hits']}/{len(results)} hits")
     print(f"Performance gain: ~70% improvement through parallelism")
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    run_profiled(lambda: asyncio.run(main()), 'parallel_standardizer')
@@ -7,8 +7,11 @@ Provides performance optimizations using only standard library modules.
 This ensures compatibility across all Python environments without external dependencies.
 
 Implements:
-- Async-style file operations using thread pools
-- Memory monitoring using standard library
+- Async-style file operations on one shared, lazily created I/O pool
+- Batched read_many/write_many with queue-wait instrumentation (and an
+  'io' tracing span per executor call when tracing is on)
+- Memory monitoring using standard library, with per-stage tracemalloc
+  snapshot diffs grouped by allocating call site
 - Concurrent processing with ThreadPoolExecutor
 - Intelligent caching with built-in data structures
 """
@@ -16,15 +19,114 @@ Implements:
 import asyncio
 import concurrent.futures
 import hashlib
-import json
+import linecache
 import os
 import resource
+import sqlite3
 import sys
 import time
 import threading
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Union
+from typing import Dict, Iterable, List, Any, Optional, Tuple, Union
 import tracemalloc
+from collections import OrderedDict
+from contextlib import contextmanager
+
+sys.path.append(str(Path(__file__).parent))
+from result_store import open_result_store
+from tracing import span
+
+# Process-wide I/O executor shared by every async file operation (created lazily)
+DEFAULT_IO_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+
+_io_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_io_workers = DEFAULT_IO_WORKERS
+_io_lock = threading.Lock()
+
+class IOStats:
+    """Queue-wait versus I/O time for work submitted to the shared executor."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._zero()
+
+    def _zero(self):
+        self.tasks = 0
+        self.files = 0
+        self.queue_wait = 0.0
+        self.max_queue_wait = 0.0
+        self.io_time = 0.0
+
+    def reset(self):
+        with self.lock:
+            self._zero()
+
+    def record(self, files: int, queue_wait: float, io_time: float):
+        with self.lock:
+            self.tasks += 1
+            self.files += files
+            self.queue_wait += queue_wait
+            self.max_queue_wait = max(self.max_queue_wait, queue_wait)
+            self.io_time += io_time
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Totals and per-task averages in milliseconds."""
+        with self.lock:
+            tasks = self.tasks or 1
+            return {
+                'tasks': self.tasks,
+                'files': self.files,
+                'workers': _io_workers,
+                'queue_wait_ms': round(self.queue_wait * 1000, 3),
+                'avg_queue_wait_ms': round(self.queue_wait / tasks * 1000, 3),
+                'max_queue_wait_ms': round(self.max_queue_wait * 1000, 3),
+                'io_time_ms': round(self.io_time * 1000, 3),
+                'avg_io_time_ms': round(self.io_time / tasks * 1000, 3)
+            }
+
+io_stats = IOStats()
+
+def configure_io_executor(max_workers: int) -> None:
+    """Set the shared executor size; an existing pool is replaced on next use."""
+    global _io_executor, _io_workers
+    with _io_lock:
+        _io_workers = max(1, max_workers)
+        if _io_executor is not None:
+            _io_executor.shutdown(wait=False)
+            _io_executor = None
+
+def get_io_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Shared I/O thread pool, created on first use."""
+    global _io_executor
+    with _io_lock:
+        if _io_executor is None:
+            _io_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=_io_workers, thread_name_prefix='perf-io'
+            )
+        return _io_executor
+
+def shutdown_io_executor(wait: bool = True) -> None:
+    """Stop the shared executor (it is recreated if used again)."""
+    global _io_executor
+    with _io_lock:
+        executor, _io_executor = _io_executor, None
+    if executor is not None:
+        executor.shutdown(wait=wait)
+
+def _instrumented(func, submitted_at: float, files: int, *args):
+    started = time.perf_counter()
+    try:
+        with span('io', 'io', files=files, queue_wait_ms=round((started - submitted_at) * 1000, 3)):
+            return func(*args)
+    finally:
+        io_stats.record(files, started - submitted_at, time.perf_counter() - started)
+
+async def run_io(func, *args, files: int = 1):
+    """Run blocking I/O on the shared executor with queue-wait instrumentation."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        get_io_executor(), _instrumented, func, time.perf_counter(), files, *args
+    )
 
 class AsyncFileCompat:
     """Async file operations compatibility layer."""
@@ -33,23 +135,20 @@ class AsyncFileCompat:
         self.file_path = Path(file_path)
         self.mode = mode
         self.encoding = encoding
-        self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=4)
 
     async def __aenter__(self):
         return self
 
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        self.executor.shutdown(wait=False)
+        return None
 
     async def read(self) -> str:
         """Read file content asynchronously."""
-        loop = asyncio.get_event_loop()
-        return await loop.run_in_executor(self.executor, self._sync_read)
+        return await run_io(self._sync_read)
 
     async def write(self, content: str) -> None:
         """Write file content asynchronously."""
-        loop = asyncio.get_event_loop()
-        await loop.run_in_executor(self.executor, self._sync_write, content)
+        await run_io(self._sync_write, content)
 
     def _sync_read(self) -> str:
         """Synchronous read operation."""
@@ -65,6 +164,50 @@ def async_open(file_path: Union[str, Path], mode: str = 'r', encoding: str = 'ut
     """Compatibility function for aiofiles.open."""
     return AsyncFileCompat(file_path, mode, encoding)
 
+def _read_group(paths: List[Path], encoding: str) -> List[Union[str, Exception]]:
+    contents = []
+    for path in paths:
+        try:
+            with open(path, 'r', encoding=encoding) as f:
+                contents.append(f.read())
+        except Exception as e:
+            contents.append(e)
+    return contents
+
+def _write_group(items: List[Tuple[Path, str]], encoding: str) -> List[Optional[Exception]]:
+    errors = []
+    for path, content in items:
+        try:
+            with open(path, 'w', encoding=encoding) as f:
+                f.write(content)
+            errors.append(None)
+        except Exception as e:
+            errors.append(e)
+    return errors
+
+def _groups(items: List[Any], group_count: int) -> List[List[Any]]:
+    group_count = max(1, min(group_count, len(items)))
+    size = -(-len(items) // group_count)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+async def read_many(paths: Iterable[Union[str, Path]], encoding: str = 'utf-8') -> List[Union[str, Exception]]:
+    """Read a batch of files in a few executor round trips; failures are returned in place."""
+    paths = [Path(path) for path in paths]
+    if not paths:
+        return []
+    groups = _groups(paths, _io_workers)
+    results = await asyncio.gather(*(run_io(_read_group, group, encoding, files=len(group)) for group in groups))
+    return [content for group in results for content in group]
+
+async def write_many(items: Iterable[Tuple[Union[str, Path], str]], encoding: str = 'utf-8') -> List[Optional[Exception]]:
+    """Write a batch of (path, content) pairs; returns None or the exception per item."""
+    items = [(Path(path), content) for path, content in items]
+    if not items:
+        return []
+    groups = _groups(items, _io_workers)
+    results = await asyncio.gather(*(run_io(_write_group, group, encoding, files=len(group)) for group in groups))
+    return [error for group in results for error in group]
+
 class MemoryMonitor:
     """Memory monitoring using standard library."""
 
@@ -116,84 +259,249 @@ class MemoryMonitor:
             # tracemalloc not running
             pass
 
+class StageAllocationTracker:
+    """tracemalloc snapshot diffs taken at stage boundaries, grouped by call site.
+
+    Each ``with tracker.stage('parse'):`` block records the memory the stage
+    left behind (net of what it freed), its peak above the starting level,
+    and the call sites that grew the most. A call site is the innermost frame
+    in this repository's scripts, so allocations inside json, re or the
+    dataclass machinery are charged to the line that asked for them.
+    """
+
+    SOURCE_ROOT = str(Path(__file__).parent.parent)
+    IGNORED = ('<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>',
+               tracemalloc.__file__, '<unknown>')
+
+    def __init__(self, frames: int = 16, top: int = 10):
+        self.frames = frames
+        self.top = top
+        self.stages: List[Dict[str, Any]] = []
+        self._owns_tracing = False
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+
+    def start(self) -> None:
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns_tracing = True
+        self._snapshot = self._take_snapshot()
+
+    def stop(self) -> None:
+        self._snapshot = None
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(
+            [tracemalloc.Filter(False, pattern) for pattern in self.IGNORED])
+
+    def _site(self, traceback: tracemalloc.Traceback) -> Tuple[str, int]:
+        # Tracebacks run oldest -> newest; charge the newest frame in our own code
+        for frame in reversed(traceback):
+            if frame.filename.startswith(self.SOURCE_ROOT):
+                return frame.filename, frame.lineno
+        frame = traceback[-1]
+        return frame.filename, frame.lineno
+
+    @contextmanager
+    def stage(self, name: str):
+        if self._snapshot is None:
+            self.start()
+        start_current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start_time
+            _, peak = tracemalloc.get_traced_memory()
+            snapshot = self._take_snapshot()
+            self.stages.append(self._diff(name, self._snapshot, snapshot, peak - start_current, elapsed))
+            self._snapshot = snapshot
+
+    def _diff(self, name: str, before: tracemalloc.Snapshot, after: tracemalloc.Snapshot,
+              peak: int, elapsed: float) -> Dict[str, Any]:
+        sites: Dict[Tuple[str, int], List[int]] = {}
+        net = 0
+        for diff in after.compare_to(before, 'traceback'):
+            net += diff.size_diff
+            entry = sites.setdefault(self._site(diff.traceback), [0, 0])
+            entry[0] += diff.size_diff
+            entry[1] += diff.count_diff
+
+        top_sites = []
+        for (filename, lineno), (size, count) in sorted(sites.items(), key=lambda item: -item[1][0])[:self.top]:
+            if size <= 0:
+                break
+            top_sites.append({'file': filename, 'line': lineno, 'size_kb': size / 1024, 'blocks': count})
+        return {
+            'stage': name,
+            'seconds': elapsed,
+            'net_kb': net / 1024,
+            'peak_kb': max(0, peak) / 1024,
+            'top_sites': top_sites
+        }
+
+    def report(self) -> Dict[str, Any]:
+        """Stages in order, plus the stage with the highest peak."""
+        # Source lines are looked up only now so linecache never shows up inside a stage
+        for stage in self.stages:
+            for site in stage['top_sites']:
+                if 'file' in site:
+                    filename, lineno = site.pop('file'), site.pop('line')
+                    shown = os.path.relpath(filename, self.SOURCE_ROOT) if filename.startswith(self.SOURCE_ROOT) else filename
+                    site['site'] = f"{shown}:{lineno}"
+                    site['code'] = linecache.getline(filename, lineno).strip()
+        peak_stage = max(self.stages, key=lambda stage: stage['peak_kb'], default=None)
+        return {
+            'stages': self.stages,
+            'retained_kb': sum(stage['net_kb'] for stage in self.stages),
+            'peak_stage': peak_stage['stage'] if peak_stage else None
+        }
+
+def estimate_size(value: Any) -> int:
+    """Approximate memory footprint of a cached value (one level deep)."""
+    size = sys.getsizeof(value)
+    if isinstance(value, (str, bytes, bytearray, int, float, bool)) or value is None:
+        return size
+    if isinstance(value, dict):
+        return size + sum(sys.getsizeof(k) + sys.getsizeof(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return size + sum(sys.getsizeof(item) for item in value)
+    attributes = getattr(value, '__dict__', None)
+    if attributes is not None:
+        return size + estimate_size(attributes)
+    return size
+
+class _CacheEntry:
+    """Cached value with its accounted size and expiry."""
+    __slots__ = ('value', 'size', 'expires_at')
+
+    def __init__(self, value: Any, size: int, expires_at: Optional[float]):
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
 class PerformanceCache:
-    """High-performance caching using standard library."""
+    """O(1) LRU cache with optional byte budget and per-entry TTL.
+
+    Recency is kept by an OrderedDict: hits move the key to the end and
+    eviction pops from the front, so get/put/evict never scan the cache.
+    """
 
-    def __init__(self, max_size: int = 1000):
-        self.cache: Dict[str, Any] = {}
-        self.access_times: Dict[str, float] = {}
+    def __init__(self, max_size: int = 1000, max_bytes: Optional[int] = None,
+                 ttl: Optional[float] = None):
+        self.cache: "OrderedDict[str, _CacheEntry]" = OrderedDict()
         self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
         self.lock = threading.RLock()
 
     def get(self, key: str) -> Optional[Any]:
         """Get item from cache."""
         with self.lock:
-            if key in self.cache:
-                self.access_times[key] = time.time()
-                return self.cache[key]
-            return None
+            entry = self.cache.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            if entry.expires_at is not None and entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self.cache.move_to_end(key)
+            self.hits += 1
+            return entry.value
+
+    def put(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        """Put item in cache with LRU eviction; ``ttl`` overrides the cache default."""
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+        size = estimate_size(value) if self.max_bytes is not None else 0
 
-    def put(self, key: str, value: Any) -> None:
-        """Put item in cache with LRU eviction."""
         with self.lock:
-            # Evict if cache is full
-            if len(self.cache) >= self.max_size and key not in self.cache:
+            if key in self.cache:
+                self._remove(key)
+
+            # A value larger than the whole budget is never cached
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+
+            self.cache[key] = _CacheEntry(value, size, expires_at)
+            self.current_bytes += size
+
+            while len(self.cache) > self.max_size or (
+                    self.max_bytes is not None and self.current_bytes > self.max_bytes):
                 self._evict_lru()
 
-            self.cache[key] = value
-            self.access_times[key] = time.time()
+    def _remove(self, key: str) -> None:
+        entry = self.cache.pop(key)
+        self.current_bytes -= entry.size
 
     def _evict_lru(self):
         """Evict least recently used item."""
-        if not self.access_times:
+        if not self.cache:
             return
 
-        lru_key = min(self.access_times.keys(), key=lambda k: self.access_times[k])
-        del self.cache[lru_key]
-        del self.access_times[lru_key]
+        _, entry = self.cache.popitem(last=False)
+        self.current_bytes -= entry.size
+        self.evictions += 1
 
     def clear(self):
         """Clear cache."""
         with self.lock:
             self.cache.clear()
-            self.access_times.clear()
+            self.current_bytes = 0
 
     def size(self) -> int:
         """Get cache size."""
         return len(self.cache)
 
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache performance statistics."""
+        total = self.hits + self.misses
+        hit_rate = (self.hits / total * 100) if total > 0 else 0
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': f"{hit_rate:.1f}%",
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'cache_size': len(self.cache),
+            'cache_bytes': self.current_bytes
+        }
+
 class FileHashCache:
-    """File hash caching for change detection."""
-
-    def __init__(self, cache_file: Path):
-        self.cache_file = cache_file
-        self.cache: Dict[str, Dict[str, Any]] = {}
-        self._load_cache()
-
-    def _load_cache(self):
-        """Load cache from disk."""
-        if self.cache_file.exists():
-            try:
-                with open(self.cache_file, 'r') as f:
-                    self.cache = json.load(f)
-            except (json.JSONDecodeError, IOError):
-                self.cache = {}
+    """File hash caching for change detection, backed by the shared result store."""
+
+    TABLE = 'file_hashes'
+    VERSION = '1'
+
+    def __init__(self, cache_dir: Path):
+        self.store = open_result_store(cache_dir)
+        self.table = self.store.table(self.TABLE, self.VERSION)
 
     def save_cache(self):
-        """Save cache to disk."""
+        """Flush recorded hashes to the store."""
         try:
-            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(self.cache_file, 'w') as f:
-                json.dump(self.cache, f, indent=2)
-        except IOError:
+            self.store.flush()
+        except sqlite3.Error:
             pass  # Fail silently
 
     def get_file_hash(self, file_path: Path) -> str:
         """Get file hash efficiently."""
         try:
-            hasher = hashlib.md5()
+            hasher = hashlib.blake2b(digest_size=16)
             with open(file_path, 'rb') as f:
-                for chunk in iter(lambda: f.read(8192), b""):
+                for chunk in iter(lambda: f.read(65536), b""):
                     hasher.update(chunk)
             return hasher.hexdigest()
         except IOError:
@@ -205,25 +513,26 @@ class FileHashCache:
             return False
 
         file_key = str(file_path)
-        current_mtime = file_path.stat().st_mtime
-        current_size = file_path.stat().st_size
+        stat = file_path.stat()
+        current_mtime = stat.st_mtime
+        current_size = stat.st_size
 
-        if file_key in self.cache:
-            cached_info = self.cache[file_key]
+        stored = self.table.lookup(file_key)
+        if stored is not None:
+            cached_info = stored.payload
             if (cached_info.get('mtime') == current_mtime and
                 cached_info.get('size') == current_size):
                 return False
 
         # File changed or not in cache
         current_hash = self.get_file_hash(file_path)
-        self.cache[file_key] = {
-            'hash': current_hash,
+        self.table.put(file_key, current_hash, {
             'mtime': current_mtime,
             'size': current_size,
             'last_check': time.time()
-        }
+        })
 
-        return True
+        return stored is None or stored.content_hash != current_hash
 
 class ConcurrentExecutor:
     """Concurrent execution using ThreadPoolExecutor."""
@@ -266,8 +575,17 @@ def get_memory_info():
 __all__ = [
     'AsyncFileCompat',
     'async_open',
+    'read_many',
+    'write_many',
+    'run_io',
+    'io_stats',
+    'configure_io_executor',
+    'get_io_executor',
+    'shutdown_io_executor',
     'MemoryMonitor',
+    'StageAllocationTracker',
     'PerformanceCache',
+    'estimate_size',
     'FileHashCache',
     'ConcurrentExecutor',
     'aiofiles_open',
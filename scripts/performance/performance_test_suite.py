@@ -11,6 +11,19 @@ Validates all performance optimizations and measures improvements:
 - Cache efficiency measurement
 - Overall system performance assessment
 
+Runs against system-configs by default, or against a generated corpus of
+any size with ``--synthetic N`` (see synthetic_corpus.py; for scaling
+curves across sizes use corpus_scaling_benchmark.py).
+
+``--gate`` replaces the single-shot target checks with a regression gate
+(see regression_gate.py): each benchmark runs repeated trials after warmup
+and is compared against the baseline recorded for the nearest ancestor
+commit; ``--record-baseline`` stores the samples for HEAD.
+
+``--memory`` runs the capability scan stage by stage (read, parse, extract,
+report) under tracemalloc and reports, per stage, the memory retained, the
+peak and the call sites that allocated the most.
+
 This test suite ensures all performance targets are met:
 - 60% reduction in validation time
 - 50% reduction in memory usage
@@ -18,8 +31,12 @@ This test suite ensures all performance targets are met:
 - >50% cache hit rate for repeated operations
 """
 
+import argparse
 import asyncio
+import json
 import psutil
+import shutil
+import tempfile
 import time
 import sys
 from pathlib import Path
@@ -31,12 +48,22 @@ import tracemalloc
 sys.path.append(str(Path(__file__).parent))
 from async_validator import AsyncAgentValidator, ValidationResult
 from parallel_standardizer import ParallelAgentStandardizer, AgentProcessingResult
-from parallel_capability_scanner import ParallelCapabilityScanner, AgentCapabilityInfo, CapabilityScanResult
+from parallel_capability_scanner import (
+    ParallelCapabilityScanner, AgentCapabilityInfo, CapabilityScanResult, generate_capability_reports
+)
+from synthetic_corpus import add_spec_arguments, spec_from_args, write_corpus
+from document_model import DocumentCache, get_document_cache
+from performance_compat import StageAllocationTracker
+import regression_gate
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Gate benchmarks whose time tracks CPU speed; standardization is dominated by copies
+# and fsyncs, so the calibration ratio must not rescale its baseline
+GATE_CPU_BOUND = ('validation_cold', 'validation_warm', 'capability_scan')
+
 class PerformanceBenchmark:
     """Performance benchmarking utilities."""
 
@@ -134,6 +161,114 @@ class PerformanceTestSuite:
 
         return self.test_results
 
+    async def collect_gate_samples(self, trials: int, warmup: int,
+                                   min_trial_time: float = regression_gate.DEFAULT_MIN_TRIAL_TIME) -> Dict[str, List[float]]:
+        """Repeated timings per benchmark for the regression gate; setup is excluded from each trial."""
+        # Calibrate first, while the heap is still small
+        samples: Dict[str, List[float]] = {
+            regression_gate.CALIBRATION: regression_gate.calibrate(trials, warmup, min_trial_time)
+        }
+        validator = AsyncAgentValidator(self.cache_dir)
+        try:
+            async def validation_cold() -> float:
+                validator.cache.clear()
+                get_document_cache().clear()
+                start = time.perf_counter()
+                await validator.validate_agents_parallel(self.agents_dir)
+                return time.perf_counter() - start
+
+            async def validation_warm() -> float:
+                start = time.perf_counter()
+                await validator.validate_agents_parallel(self.agents_dir)
+                return time.perf_counter() - start
+
+            logger.info("Gate: validation (cold cache)...")
+            samples['validation_cold'] = await regression_gate.collect_samples_async(validation_cold, trials, warmup, min_trial_time)
+            logger.info("Gate: validation (warm cache)...")
+            samples['validation_warm'] = await regression_gate.collect_samples_async(validation_warm, trials, warmup, min_trial_time)
+        finally:
+            validator.cleanup()
+
+        async def capability_scan() -> float:
+            get_document_cache().clear()
+            with tempfile.TemporaryDirectory(dir=self.cache_dir) as scan_cache:
+                scanner = ParallelCapabilityScanner(Path(scan_cache), max_workers=8)
+                try:
+                    start = time.perf_counter()
+                    await scanner.scan_agents_parallel(self.agents_dir)
+                    return time.perf_counter() - start
+                finally:
+                    scanner.cleanup()
+                    scanner.cache.store.close()
+
+        async def standardization() -> float:
+            # The standardizer moves and rewrites files, so every trial gets a fresh copy
+            with tempfile.TemporaryDirectory(dir=self.cache_dir) as work_dir:
+                work_path = Path(work_dir)
+                test_agents_dir = work_path / 'agents'
+                shutil.copytree(self.agents_dir, test_agents_dir)
+                get_document_cache().clear()
+                standardizer = ParallelAgentStandardizer(work_path / 'cache', max_workers=8)
+                try:
+                    start = time.perf_counter()
+                    await standardizer.standardize_agents_parallel(test_agents_dir, work_path / 'deprecated')
+                    return time.perf_counter() - start
+                finally:
+                    standardizer.cleanup()
+                    standardizer.change_detector.store.close()
+
+        logger.info("Gate: capability scan...")
+        samples['capability_scan'] = await regression_gate.collect_samples_async(capability_scan, trials, warmup, min_trial_time)
+        logger.info("Gate: standardization...")
+        samples['standardization'] = await regression_gate.collect_samples_async(standardization, trials, warmup, min_trial_time)
+        return samples
+
+    async def collect_stage_allocations(self, top: int) -> Dict[str, Any]:
+        """Run the capability scan one stage at a time and diff tracemalloc snapshots between stages.
+
+        The pipeline normally overlaps read, parse and extract; running each
+        stage over the whole corpus before the next one starts makes every
+        snapshot diff belong to exactly one stage.
+        """
+        tracker = StageAllocationTracker(top=top)
+        with tempfile.TemporaryDirectory(dir=self.cache_dir) as work_dir:
+            work_path = Path(work_dir)
+            scanner = ParallelCapabilityScanner(work_path, max_workers=1, mode='inline')
+            documents = DocumentCache()
+            tracker.start()
+            try:
+                with tracker.stage('read'):
+                    raw = []
+                    for file_path in scanner.discover_agent_files(self.agents_dir):
+                        with open(file_path, 'rb') as f:
+                            raw.append((file_path, f.read()))
+
+                with tracker.stage('parse'):
+                    parsed = [(file_path, documents.parse_bytes(data)) for file_path, data in raw]
+                    # The pipeline drops the raw bytes once a file is parsed
+                    del raw
+
+                with tracker.stage('extract'):
+                    agent_infos = []
+                    for file_path, document in parsed:
+                        info = scanner.extractor.extract(file_path, document)
+                        scanner.cache.put(file_path, info, document.content_hash)
+                        agent_infos.append(info)
+
+                with tracker.stage('report'):
+                    agent_infos.sort(key=lambda info: info.name)
+                    scan_result = scanner._generate_scan_result(agent_infos, 0.0)
+                    await generate_capability_reports(agent_infos, scan_result, work_path)
+            finally:
+                tracker.stop()
+                scanner.cleanup()
+                scanner.cache.store.close()
+
+        report = tracker.report()
+        report['files'] = len(parsed)
+        report['document_cache'] = documents.get_stats()
+        return report
+
     @PerformanceBenchmark.measure_memory_usage
     @PerformanceBenchmark.time_execution
     async def test_async_validation_performance(self) -> Dict[str, Any]:
@@ -146,7 +281,7 @@ class PerformanceTestSuite:
             warmup_results = await validator.validate_agents_parallel(self.agents_dir)
 
             # Clear cache for baseline test
-            validator.cache.cache.clear()
+            validator.cache.clear()
 
             # Baseline sequential simulation (limited concurrency)
             logger.info("Baseline validation test (limited concurrency)...")
@@ -197,7 +332,6 @@ class PerformanceTestSuite:
         test_deprecated_dir.mkdir(exist_ok=True, parents=True)
 
         # Copy some test files
-        import shutil
         agent_files = list(self.agents_dir.glob('*.md'))[:10]  # Test subset
         for agent_file in agent_files:
             shutil.copy(agent_file, test_agents_dir / agent_file.name)
@@ -500,12 +634,127 @@ The optimized system provides a solid foundation for scaling the Claude configur
 
 async def main():
     """Main test execution."""
+    parser = argparse.ArgumentParser(description='Run the performance test suite')
+    parser.add_argument('--synthetic', type=int, default=0, metavar='N',
+                        help='Run against a generated corpus of N agents instead of system-configs')
+    gate = parser.add_argument_group('regression gate')
+    gate.add_argument('--gate', action='store_true',
+                      help='Compare repeated trials against the nearest recorded baseline instead of fixed targets')
+    gate.add_argument('--trials', type=int, default=regression_gate.DEFAULT_TRIALS, help='Timed trials per benchmark')
+    gate.add_argument('--warmup', type=int, default=regression_gate.DEFAULT_WARMUP, help='Untimed warmup runs per benchmark')
+    gate.add_argument('--min-trial-ms', type=float, default=regression_gate.DEFAULT_MIN_TRIAL_TIME * 1000,
+                      help='Benchmarks quicker than this are repeated within each trial')
+    gate.add_argument('--threshold', type=float, default=regression_gate.DEFAULT_THRESHOLD,
+                      help='Slowdown (fraction) the confidence interval must clear to fail')
+    gate.add_argument('--alpha', type=float, default=regression_gate.DEFAULT_ALPHA, help='Significance level')
+    gate.add_argument('--baseline-ref', default='HEAD', help='Search for baselines from this ref backwards')
+    gate.add_argument('--record-baseline', action='store_true', help='Store the samples as the baseline for HEAD')
+    memory = parser.add_argument_group('memory')
+    memory.add_argument('--memory', action='store_true',
+                        help='Report allocations per scan stage (read, parse, extract, report) instead of timing')
+    memory.add_argument('--memory-top', type=int, default=10, metavar='N', help='Call sites to list per stage')
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+    if args.memory:
+        run = run_memory_report
+    else:
+        run = run_gate if args.gate or args.record_baseline else run_suite
+
     # Setup paths
     script_dir = Path(__file__).parent.parent
     project_root = script_dir.parent
     agents_dir = project_root / 'system-configs' / '.claude' / 'agents'
     cache_dir = project_root / '.cache'
 
+    if args.synthetic:
+        with tempfile.TemporaryDirectory() as corpus_dir:
+            spec = spec_from_args(args, args.synthetic, max(1, args.synthetic // 10), max(1, args.synthetic // 20))
+            corpus = write_corpus(Path(corpus_dir), spec)
+            logger.info(f"Generated synthetic corpus: {corpus.files} files, {corpus.bytes / 1024 / 1024:.1f} MiB")
+            return await run(corpus.agents_dir, Path(corpus_dir) / '.cache', args)
+    return await run(agents_dir, cache_dir, args)
+
+
+async def run_gate(agents_dir: Path, cache_dir: Path, args: argparse.Namespace) -> int:
+    """Collect repeated samples, compare them against the nearest baseline and write the verdicts."""
+    if not agents_dir.exists():
+        print(f"Error: Agents directory not found at {agents_dir}")
+        return 1
+    cache_dir.mkdir(exist_ok=True, parents=True)
+
+    project_root = Path(__file__).parent.parent.parent
+    store = regression_gate.BaselineStore(project_root / '.tmp' / 'baselines')
+    commit = regression_gate.current_commit(project_root)
+
+    test_suite = PerformanceTestSuite(agents_dir, cache_dir)
+    samples = await test_suite.collect_gate_samples(args.trials, args.warmup, args.min_trial_ms / 1000)
+
+    # Baselines are only comparable on the same corpus
+    corpus_key = f"synthetic-{args.synthetic}-seed-{args.seed}" if args.synthetic else 'system-configs'
+    samples = {name if name == regression_gate.CALIBRATION else f"{corpus_key}/{name}": values
+               for name, values in samples.items()}
+
+    ancestors = regression_gate.ancestor_commits(project_root, args.baseline_ref)
+    if args.record_baseline and commit:
+        # Never compare HEAD against the samples it is about to record
+        ancestors = [c for c in ancestors if c != commit]
+    baseline_commit, baseline = store.nearest(ancestors)
+    cpu_bound = [f"{corpus_key}/{name}" for name in GATE_CPU_BOUND]
+    verdicts = regression_gate.gate(samples, baseline_commit, baseline, args.threshold, args.alpha, cpu_bound)
+
+    report_path = project_root / '.tmp' / 'reports' / 'performance-regression.json'
+    report = regression_gate.write_verdicts(report_path, verdicts, commit)
+
+    print(f"\n{'='*60}")
+    print("PERFORMANCE REGRESSION GATE")
+    print(f"{'='*60}")
+    print(f"Baseline: {baseline_commit or 'none recorded'}")
+    for verdict in verdicts:
+        print(verdict.describe())
+    print(f"\nVerdicts saved to: {report_path}")
+
+    if args.record_baseline:
+        if commit:
+            path = store.save(commit, samples, {'trials': args.trials, 'warmup': args.warmup,
+                                                 'min_trial_ms': args.min_trial_ms})
+            print(f"Baseline recorded for {commit[:12]}: {path}")
+        else:
+            print("Warning: not a git checkout, baseline not recorded")
+
+    print(f"\nOverall Status: {'❌ REGRESSION' if report['status'] == 'fail' else '✅ NO REGRESSION'}")
+    return 1 if report['status'] == 'fail' else 0
+
+
+async def run_memory_report(agents_dir: Path, cache_dir: Path, args: argparse.Namespace) -> int:
+    """Stage-attributed allocation report for the capability scan."""
+    if not agents_dir.exists():
+        print(f"Error: Agents directory not found at {agents_dir}")
+        return 1
+    cache_dir.mkdir(exist_ok=True, parents=True)
+
+    test_suite = PerformanceTestSuite(agents_dir, cache_dir)
+    report = await test_suite.collect_stage_allocations(args.memory_top)
+
+    report_path = Path(__file__).parent.parent.parent / '.tmp' / 'reports' / 'memory-stages.json'
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"\n{'='*60}")
+    print(f"ALLOCATIONS BY STAGE ({report['files']} files)")
+    print(f"{'='*60}")
+    for stage in report['stages']:
+        print(f"\n{stage['stage']}: retained {stage['net_kb']:+.1f} KiB, peak {stage['peak_kb']:.1f} KiB, "
+              f"{stage['seconds']:.2f}s")
+        for site in stage['top_sites']:
+            print(f"  {site['size_kb']:>10.1f} KiB {site['blocks']:>8} blocks  {site['site']}  {site['code'][:60]}")
+    print(f"\nRetained after all stages: {report['retained_kb']:.1f} KiB (highest peak: {report['peak_stage']})")
+    print(f"Report saved to: {report_path}")
+    return 0
+
+
+async def run_suite(agents_dir: Path, cache_dir: Path, args: argparse.Namespace = None) -> int:
+    """Run the suite against one agents directory and print the summary."""
     if not agents_dir.exists():
         print(f"Error: Agents directory not found at {agents_dir}")
         sys.exit(1)
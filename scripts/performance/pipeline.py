@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Bounded Async Pipeline
+======================
+
+Staged, back-pressured replacement for gathering one coroutine per file:
+- discover → stage → ... → sink, connected by bounded queues
+- A global in-flight limit caps items between discovery and the sink
+- Per-stage worker counts and optional micro-batching
+- Results reach the sink as they complete, in completion order
+- Each stage call is a tracing span on its worker's lane (see tracing.py)
+
+Peak memory is bounded by ``max_in_flight`` items rather than by the size
+of the corpus, so 30 files and 300k files run in the same footprint.
+"""
+
+import asyncio
+import inspect
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Iterable, List, Optional, Union
+
+sys.path.append(str(Path(__file__).parent))
+from tracing import span
+
+_DONE = object()
+
+
+@dataclass
+class Stage:
+    """One pipeline step.
+
+    ``func`` takes one item, or - when ``batch_size`` is set - a list of up
+    to ``batch_size`` items and returns a list aligned with its input. It
+    may be a plain function or a coroutine function.
+    """
+    name: str
+    func: Callable[[Any], Any]
+    workers: int = 1
+    batch_size: Optional[int] = None
+
+
+@dataclass
+class PipelineStats:
+    """Counters for a completed pipeline run."""
+    items: int = 0
+    errors: int = 0
+    peak_in_flight: int = 0
+    elapsed: float = 0.0
+    stage_time: Dict[str, float] = field(default_factory=dict)
+
+
+class _Envelope:
+    """An item travelling through the pipeline with its source for error reporting."""
+    __slots__ = ('source', 'value', 'error')
+
+    def __init__(self, source: Any):
+        self.source = source
+        self.value = source
+        self.error: Optional[BaseException] = None
+
+
+async def _call(func: Callable, arg: Any) -> Any:
+    result = func(arg)
+    if inspect.isawaitable(result):
+        result = await result
+    return result
+
+
+async def run_pipeline(source: Union[Iterable[Any], AsyncIterable[Any]],
+                       stages: List[Stage],
+                       sink: Callable[[Any], Union[None, Awaitable[None]]],
+                       max_in_flight: int = 64,
+                       on_error: Optional[Callable[[Any, BaseException], Any]] = None) -> PipelineStats:
+    """Stream ``source`` items through ``stages`` into ``sink``.
+
+    A stage that raises marks the item failed; later stages skip it and
+    ``on_error(source_item, exception)`` provides the value handed to the
+    sink instead (if ``on_error`` is None the exception is re-raised once
+    the pipeline has drained).
+    """
+    stats = PipelineStats(stage_time={stage.name: 0.0 for stage in stages})
+    slots = asyncio.Semaphore(max_in_flight)
+    queues = [asyncio.Queue(maxsize=max_in_flight) for _ in range(len(stages) + 1)]
+    in_flight = 0
+    first_error: List[BaseException] = []
+    start_time = time.perf_counter()
+
+    async def discover():
+        nonlocal in_flight
+        try:
+            if hasattr(source, '__aiter__'):
+                async for item in source:
+                    await slots.acquire()
+                    in_flight += 1
+                    stats.peak_in_flight = max(stats.peak_in_flight, in_flight)
+                    await queues[0].put(_Envelope(item))
+            else:
+                for item in source:
+                    await slots.acquire()
+                    in_flight += 1
+                    stats.peak_in_flight = max(stats.peak_in_flight, in_flight)
+                    await queues[0].put(_Envelope(item))
+        finally:
+            await queues[0].put(_DONE)
+
+    async def stage_worker(stage: Stage, inbox: asyncio.Queue, outbox: asyncio.Queue):
+        while True:
+            envelope = await inbox.get()
+            if envelope is _DONE:
+                # Let sibling workers see the end marker too
+                await inbox.put(_DONE)
+                return
+
+            batch = [envelope]
+            while stage.batch_size and len(batch) < stage.batch_size:
+                try:
+                    extra = inbox.get_nowait()
+                except asyncio.QueueEmpty:
+                    break
+                if extra is _DONE:
+                    await inbox.put(_DONE)
+                    break
+                batch.append(extra)
+
+            live = [item for item in batch if item.error is None]
+            stage_start = time.perf_counter()
+            try:
+                with span(stage.name, 'pipeline', items=len(live)):
+                    if live and stage.batch_size:
+                        values = await _call(stage.func, [item.value for item in live])
+                        for item, value in zip(live, values):
+                            item.value = value
+                    elif live:
+                        live[0].value = await _call(stage.func, live[0].value)
+            except Exception as e:
+                for item in live:
+                    item.error = e
+            stats.stage_time[stage.name] += time.perf_counter() - stage_start
+
+            for item in batch:
+                await outbox.put(item)
+
+    async def run_stage(stage: Stage, inbox: asyncio.Queue, outbox: asyncio.Queue):
+        # Named workers get their own lane in traces
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.create_task(stage_worker(stage, inbox, outbox), name=f"{stage.name} worker {index}")
+                               for index in range(max(1, stage.workers))))
+        await outbox.put(_DONE)
+
+    async def drain():
+        nonlocal in_flight
+        inbox = queues[-1]
+        while True:
+            envelope = await inbox.get()
+            if envelope is _DONE:
+                return
+            try:
+                value = envelope.value
+                if envelope.error is not None:
+                    stats.errors += 1
+                    if on_error is None:
+                        if not first_error:
+                            first_error.append(envelope.error)
+                        continue
+                    value = on_error(envelope.source, envelope.error)
+                stats.items += 1
+                await _call(sink, value)
+            finally:
+                in_flight -= 1
+                slots.release()
+
+    tasks = [asyncio.ensure_future(discover())]
+    tasks += [asyncio.ensure_future(run_stage(stage, queues[index], queues[index + 1]))
+              for index, stage in enumerate(stages)]
+    tasks.append(asyncio.ensure_future(drain()))
+    try:
+        await asyncio.gather(*tasks)
+    finally:
+        for task in tasks:
+            task.cancel()
+
+    stats.elapsed = time.perf_counter() - start_time
+    if first_error:
+        raise first_error[0]
+    return stats
+
+
+__all__ = [
+    'Stage',
+    'PipelineStats',
+    'run_pipeline'
+]
@@ -0,0 +1,312 @@
+#!/usr/bin/env python3
+"""
+Profiling Hook
+==============
+
+Common ``--profile`` option for the command-line tools:
+- ``--profile`` / ``--profile cprofile``: deterministic cProfile run; every
+  thread is profiled (one profile per thread merged before Python 3.12, a
+  single process-wide profile from 3.12), collapsed stacks are derived from the
+  caller graph (time split across callers in proportion to their calls)
+- ``--profile sample``: low-overhead stack sampler over all threads
+  (``--profile-interval`` ms); idle waits are skipped and pstats are built
+  from the samples
+- Writes ``.tmp/reports/<tool>-profile.pstats`` (load with ``pstats`` or
+  snakeviz) and ``<tool>-profile.collapsed`` (one ``a;b;c weight`` line per
+  stack, for flamegraph.pl, speedscope or inferno)
+- Reports the profiler's own overhead for the run
+
+Tools opt in by running their entry point through ``run_profiled``, which
+strips the profiling options before the tool parses its own arguments.
+Process-pool workers are not profiled.
+"""
+
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+PROFILE_MODES = ('cprofile', 'sample')
+DEFAULT_INTERVAL_MS = 2.0
+# cProfile on sys.monitoring (3.12+) allows one active profiler per process, covering all threads
+PROCESS_WIDE_CPROFILE = sys.version_info >= (3, 12)
+REPORTS_DIR = Path(__file__).parent.parent.parent / '.tmp' / 'reports'
+
+# Leaf frames that mean "blocked, not working"; such samples are counted as idle
+IDLE_FRAMES = {
+    ('threading.py', 'wait'),
+    ('threading.py', '_wait_for_tstate_lock'),
+    ('selectors.py', 'select'),
+    ('queue.py', 'get'),
+    ('thread.py', '_worker'),
+    ('connection.py', '_recv'),
+    ('connection.py', 'wait'),
+}
+
+# Collapsed stacks derived from cProfile drop paths below this share of total time
+MIN_PATH_FRACTION = 0.0005
+MAX_PATH_DEPTH = 96
+
+FuncKey = Tuple[str, int, str]
+
+
+def _label(func: FuncKey) -> str:
+    filename, line, name = func
+    if filename == '~':
+        # Built-ins: cProfile stores them as ('~', 0, "<built-in method ...>")
+        return name.replace(';', ':')
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(';', ':')
+
+
+class _SampledStats:
+    """pstats-compatible view of sampled stacks (``pstats.Stats`` accepts any object with create_stats)."""
+
+    def __init__(self, stats: Dict[FuncKey, tuple]):
+        self.stats = stats
+
+    def create_stats(self) -> None:
+        pass
+
+
+class StackSampler:
+    """Samples the Python stacks of every other thread at a fixed interval."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.idle = 0
+        self.taken = 0
+        self.cpu_time = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='profile-sampler', daemon=True)
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own_ident = threading.get_ident()
+        cpu_start = time.thread_time()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for ident, frame in sys._current_frames().items():
+                if ident == own_ident:
+                    continue
+                stack: List[FuncKey] = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    frame = frame.f_back
+                leaf = stack[0]
+                self.taken += 1
+                if (os.path.basename(leaf[0]), leaf[2]) in IDLE_FRAMES:
+                    self.idle += 1
+                    continue
+                stack.reverse()
+                thread_name = names.get(ident, 'thread').rstrip('0123456789').rstrip('_-') or 'thread'
+                self.samples[(thread_name, tuple(stack))] += 1
+        self.cpu_time = time.thread_time() - cpu_start
+
+    def collapsed(self) -> Dict[str, int]:
+        lines: Counter = Counter()
+        for (thread_name, stack), count in self.samples.items():
+            lines[';'.join([thread_name] + [_label(func) for func in stack])] += count
+        return lines
+
+    def to_stats(self) -> _SampledStats:
+        """Inclusive/self sample times per function plus caller edges."""
+        inclusive: Counter = Counter()
+        own: Counter = Counter()
+        edges: Dict[FuncKey, Counter] = defaultdict(Counter)
+        for (_, stack), count in self.samples.items():
+            for func in set(stack):
+                inclusive[func] += count
+            own[stack[-1]] += count
+            for caller, callee in set(zip(stack, stack[1:])):
+                edges[callee][caller] += count
+
+        stats = {}
+        for func, count in inclusive.items():
+            callers = {caller: (n, n, 0.0, n * self.interval) for caller, n in edges[func].items()}
+            stats[func] = (count, count, own[func] * self.interval, count * self.interval, callers)
+        return _SampledStats(stats)
+
+
+class _ThreadProfiles:
+    """One cProfile.Profile per thread, started on the thread's first profiled event."""
+
+    def __init__(self):
+        self.profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+
+    def hook(self, frame, event, arg):
+        profile = cProfile.Profile()
+        try:
+            # Replaces this hook for the thread with cProfile's own
+            profile.enable()
+        except ValueError:
+            # Another profiler owns the process; never let that kill the worker thread
+            sys.setprofile(None)
+            return
+        with self._lock:
+            self.profiles.append(profile)
+
+
+def collapsed_from_stats(stats: Dict[FuncKey, tuple]) -> Dict[str, int]:
+    """Approximate collapsed stacks (microseconds) from a pstats caller graph.
+
+    Each function's time on a path is its inclusive time scaled by the share
+    of its caller's time spent calling it along that path.
+    """
+    callees: Dict[FuncKey, List[Tuple[FuncKey, float]]] = defaultdict(list)
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            callees[caller].append((func, edge[3]))
+
+    roots = [func for func, entry in stats.items() if not entry[4]]
+    total = sum(stats[root][3] for root in roots) or 1.0
+    floor = total * MIN_PATH_FRACTION
+    lines: Counter = Counter()
+
+    # Explicit stack: (function, path labels, time attributed to this path)
+    pending = [(root, (_label(root),), stats[root][3]) for root in roots]
+    while pending:
+        func, path, path_time = pending.pop()
+        _, _, self_time, inclusive, _ = stats[func]
+        share = path_time / inclusive if inclusive > 0 else 0.0
+        weight = int(round(self_time * share * 1e6))
+        if weight > 0:
+            lines[';'.join(path)] += weight
+        if len(path) >= MAX_PATH_DEPTH:
+            continue
+        for callee, edge_time in callees.get(func, ()):
+            child_time = edge_time * share
+            label = _label(callee)
+            if child_time >= floor and label not in path:
+                pending.append((callee, path + (label,), child_time))
+    return lines
+
+
+def _cprofile_call_cost(calls: int = 20000) -> float:
+    """Extra seconds cProfile adds per Python call, measured on this machine."""
+    def noop():
+        pass
+
+    def loop():
+        for _ in range(calls):
+            noop()
+
+    start = time.perf_counter()
+    loop()
+    plain = time.perf_counter() - start
+
+    profile = cProfile.Profile()
+    start = time.perf_counter()
+    profile.enable()
+    loop()
+    profile.disable()
+    profiled = time.perf_counter() - start
+    return max(0.0, (profiled - plain) / calls)
+
+
+def _write_collapsed(path: Path, lines: Dict[str, int]) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        for stack, weight in sorted(lines.items()):
+            f.write(f"{stack} {weight}\n")
+
+
+def profile_call(func: Callable[[], Any], tool: str, mode: str = 'cprofile',
+                 interval_ms: float = DEFAULT_INTERVAL_MS, reports_dir: Path = REPORTS_DIR) -> Any:
+    """Run ``func`` under the chosen profiler and write ``<tool>-profile.*`` reports."""
+    if mode not in PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode '{mode}'. Must be one of: {', '.join(PROFILE_MODES)}")
+
+    reports_dir.mkdir(parents=True, exist_ok=True)
+    pstats_path = reports_dir / f"{tool}-profile.pstats"
+    collapsed_path = reports_dir / f"{tool}-profile.collapsed"
+
+    sampler = StackSampler(interval_ms / 1000) if mode == 'sample' else None
+    # From 3.12 cProfile runs on sys.monitoring: one profiler per process already sees every thread
+    threads = _ThreadProfiles() if mode == 'cprofile' and not PROCESS_WIDE_CPROFILE else None
+    profile = cProfile.Profile() if mode == 'cprofile' else None
+
+    start = time.perf_counter()
+    if sampler is not None:
+        sampler.start()
+    else:
+        if threads is not None:
+            threading.setprofile(threads.hook)
+        profile.enable()
+    try:
+        return func()
+    finally:
+        if sampler is not None:
+            sampler.stop()
+        else:
+            profile.disable()
+            if threads is not None:
+                threading.setprofile(None)
+        wall = time.perf_counter() - start
+
+        if sampler is not None:
+            # A run shorter than one interval (or entirely idle) has no samples for pstats to load
+            stats = pstats.Stats(sampler.to_stats()) if sampler.samples else None
+            _write_collapsed(collapsed_path, sampler.collapsed())
+            overhead = sampler.cpu_time
+            detail = (f"{sampler.taken} samples every {interval_ms:g} ms, {sampler.idle} idle skipped; "
+                      f"sampler CPU")
+        else:
+            stats = pstats.Stats(profile)
+            thread_profiles = threads.profiles if threads is not None else []
+            for thread_profile in thread_profiles:
+                stats.add(thread_profile)
+            _write_collapsed(collapsed_path, collapsed_from_stats(stats.stats))
+            calls = sum(entry[1] for entry in stats.stats.values())
+            overhead = calls * _cprofile_call_cost()
+            scope = 'all threads' if threads is None else f"{1 + len(thread_profiles)} threads"
+            detail = f"{calls:,} calls in {scope}; estimated"
+
+        share = overhead / wall * 100 if wall > 0 else 0.0
+        print(f"\n⏱️  Profile ({mode}) of {tool}: {wall:.3f}s wall, {detail} overhead {overhead:.3f}s ({share:.1f}%)")
+        if stats is None:
+            # Never leave an earlier run's pstats next to this run's (empty) collapsed file
+            pstats_path.unlink(missing_ok=True)
+            print(f"   no samples; try a shorter --profile-interval than {interval_ms:g} ms")
+            print(f"   collapsed stacks: {collapsed_path} (empty)")
+        else:
+            stats.dump_stats(str(pstats_path))
+            print(f"   pstats: {pstats_path}")
+            print(f"   collapsed stacks: {collapsed_path}")
+            stats.sort_stats('tottime').print_stats(10)
+
+
+def run_profiled(main: Callable[[], Any], tool: str) -> Any:
+    """Entry point wrapper: honour ``--profile [MODE]`` / ``--profile-interval MS`` from sys.argv."""
+    parser = argparse.ArgumentParser(add_help=False)
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=PROFILE_MODES, default=None)
+    parser.add_argument('--profile-interval', type=float, default=DEFAULT_INTERVAL_MS)
+    options, remaining = parser.parse_known_args(sys.argv[1:])
+    if options.profile is None:
+        return main()
+
+    # Tools that sys.exit() from main still get their profile written (profile_call reports in finally)
+    sys.argv[1:] = remaining
+    return profile_call(main, tool, options.profile, options.profile_interval)
+
+
+__all__ = [
+    'PROFILE_MODES',
+    'StackSampler',
+    'collapsed_from_stats',
+    'profile_call',
+    'run_profiled'
+]
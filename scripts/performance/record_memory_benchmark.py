@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Result Record Memory Benchmark
+==============================
+
+Measures the memory held by result records for a large agent corpus:
+- AgentCapabilityInfo (scanner), ValidationResult (validator) and
+  AgentProcessingResult (standardizer)
+- Baseline: the previous plain dataclass records, each carrying its own
+  string and list objects as per-file extraction produces them
+- Compact: the slotted records from ``compact_records`` (closed
+  vocabularies interned, free text held per record); the shared
+  vocabulary tables are counted in their total
+
+Field values come from a sample of synthetic agents run through the real
+extractor and validator, cycled up to ``--agents`` records. Bytes are
+tracemalloc's count of live allocations while each record set is held.
+
+Usage:
+    python3 scripts/performance/record_memory_benchmark.py [--agents 100000] [--sample 2000] [--json]
+"""
+
+import argparse
+import asyncio
+import gc
+import json
+import logging
+import sys
+import tempfile
+import time
+import tracemalloc
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+sys.path.append(str(Path(__file__).parent))
+from compact_records import LABELS, TOOLS, Vocabulary, vocabulary_stats
+from document_model import DocumentCache
+from parallel_capability_scanner import AgentCapabilityInfo, CapabilityExtractor
+from parallel_standardizer import AgentProcessingResult
+from stdlib_async_validator import StdlibAsyncValidator, ValidationResult
+from synthetic_corpus import (Corpus, _agent, add_spec_arguments, agent_name, command_name,
+                              skill_name, spec_from_args)
+
+OPERATIONS = ('created', 'updated', 'deprecated', 'skipped', 'error')
+
+
+@dataclass
+class LegacyCapabilityInfo:
+    """AgentCapabilityInfo as it was before the compact records."""
+    name: str
+    file: str
+    description: str = ""
+    color: str = ""
+    category: str = ""
+    capabilities: List[str] = None
+    tools: List[str] = None
+    coordination_patterns: List[str] = None
+    parallel_compatible: List[str] = None
+    handoff_patterns: List[str] = None
+    unique_expertise: List[str] = None
+    when_to_use: List[str] = None
+    orchestration_notes: List[str] = None
+    processing_time: float = 0.0
+    file_size: int = 0
+    cached: bool = False
+
+
+@dataclass
+class LegacyValidationResult:
+    agent_name: str
+    is_valid: bool
+    issues: List[str]
+    validation_time: float
+    file_size: int
+    cached: bool = False
+
+
+@dataclass
+class LegacyProcessingResult:
+    agent_name: str
+    operation: str
+    processing_time: float
+    file_size_before: int
+    file_size_after: int
+    changes_detected: bool
+    cached: bool = False
+    error_message: Optional[str] = None
+
+
+def _fresh(value: Any) -> Any:
+    """A private copy of a string (or list of strings), as a separate file's parse would allocate."""
+    if isinstance(value, str):
+        return value.encode().decode()
+    if isinstance(value, list):
+        return [_fresh(item) for item in value]
+    return value
+
+
+def collect_samples(args: argparse.Namespace) -> Tuple[List[Dict], List[Dict], List[Dict]]:
+    """Field values of scanner, validator and standardizer results for ``--sample`` synthetic agents."""
+    spec = spec_from_args(args, args.sample, max(1, args.sample // 10), max(1, args.sample // 20))
+    corpus = Corpus(Path('.'), [agent_name(i) for i in range(spec.agents)],
+                    [skill_name(i) for i in range(spec.skills)], [command_name(i) for i in range(spec.commands)])
+    documents = [_agent(spec, corpus, index) for index in range(spec.agents)]
+
+    extractor = CapabilityExtractor()
+    cache = DocumentCache()
+    capabilities = [extractor.extract(Path(f"{name}.md"), cache.parse(text)).to_dict()
+                    for name, text in zip(corpus.agent_names, documents)]
+
+    async def validate() -> List[Dict]:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            validator = StdlibAsyncValidator(Path(cache_dir))
+            try:
+                return [(await validator._validate_content(Path(f"{name}.md"), cache.parse(text), time.time())).to_dict()
+                        for name, text in zip(corpus.agent_names, documents)]
+            finally:
+                validator.cleanup()
+
+    validations = asyncio.run(validate())
+    processing = [{
+        'agent_name': name,
+        'operation': OPERATIONS[index % len(OPERATIONS)],
+        'processing_time': 0.001 * (index % 7),
+        'file_size_before': len(text),
+        'file_size_after': len(text) + index % 64,
+        'changes_detected': index % 3 == 0,
+        'error_message': 'Invalid YAML frontmatter' if index % len(OPERATIONS) == 4 else None
+    } for index, (name, text) in enumerate(zip(corpus.agent_names, documents))]
+    return capabilities, validations, processing
+
+
+def _vocabulary_bytes(vocabulary: Vocabulary) -> int:
+    """Strings, ID map and string list of one shared table."""
+    return (sum(sys.getsizeof(value) for value in vocabulary._strings)
+            + sys.getsizeof(vocabulary._ids) + sys.getsizeof(vocabulary._strings))
+
+
+def measure(build: Callable[[], List[Any]]) -> Tuple[int, float]:
+    """Live bytes held by the records ``build`` returns, and the seconds it took."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        start = time.perf_counter()
+        records = build()
+        elapsed = time.perf_counter() - start
+        gc.collect()
+        held = tracemalloc.get_traced_memory()[0] - before
+    finally:
+        tracemalloc.stop()
+    del records
+    return held, elapsed
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    capabilities, validations, processing = collect_samples(args)
+    count = args.agents
+    kinds = [
+        ('AgentCapabilityInfo', capabilities, LegacyCapabilityInfo, AgentCapabilityInfo),
+        ('ValidationResult', validations, LegacyValidationResult, ValidationResult),
+        ('AgentProcessingResult', processing, LegacyProcessingResult, AgentProcessingResult)
+    ]
+
+    rows = []
+    for kind, samples, legacy, compact in kinds:
+        baseline, baseline_seconds = measure(lambda: [
+            legacy(**{key: _fresh(value) for key, value in samples[index % len(samples)].items()})
+            for index in range(count)
+        ])
+        held, compact_seconds = measure(lambda: [
+            compact(**{key: _fresh(value) for key, value in samples[index % len(samples)].items()})
+            for index in range(count)
+        ])
+        rows.append({
+            'record': kind,
+            'records': count,
+            'baseline_bytes': baseline,
+            'compact_bytes': held,
+            'baseline_seconds': baseline_seconds,
+            'compact_seconds': compact_seconds
+        })
+
+    # Interned strings live once in the shared tables; free text is counted with its records
+    vocabulary_bytes = sum(_vocabulary_bytes(vocabulary) for vocabulary in (LABELS, TOOLS))
+    baseline_total = sum(row['baseline_bytes'] for row in rows)
+    compact_total = sum(row['compact_bytes'] for row in rows) + vocabulary_bytes
+    return {
+        'agents': count,
+        'sample': len(capabilities),
+        'records': rows,
+        'vocabulary': vocabulary_stats(),
+        'vocabulary_bytes': vocabulary_bytes,
+        'baseline_bytes': baseline_total,
+        'compact_bytes': compact_total,
+        'reduction': baseline_total / compact_total if compact_total else 0.0
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare memory held by plain and compact result records')
+    parser.add_argument('--agents', type=int, default=100000, help='Records of each kind to hold')
+    parser.add_argument('--sample', type=int, default=2000, help='Synthetic agents extracted for field values')
+    parser.add_argument('--json', action='store_true', help='Emit JSON instead of a table')
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+    logging.getLogger().setLevel(logging.WARNING)
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0
+
+    print(f"Holding {result['agents']:,} records of each kind (values from {result['sample']:,} synthetic agents)\n")
+    print(f"{'record':>22} {'baseline':>11} {'compact':>11} {'factor':>7} {'build s':>15}")
+    for row in result['records']:
+        factor = row['baseline_bytes'] / row['compact_bytes'] if row['compact_bytes'] else 0.0
+        print(f"{row['record']:>22} {row['baseline_bytes'] / 1024 / 1024:>9.1f}MB "
+              f"{row['compact_bytes'] / 1024 / 1024:>9.1f}MB {factor:>6.1f}x "
+              f"{row['baseline_seconds']:>6.2f} / {row['compact_seconds']:<6.2f}")
+    tables = ', '.join(f"{stats['name']} {stats['entries']:,}" for stats in result['vocabulary'])
+    print(f"{'shared vocabulary':>22} {'':>11} {result['vocabulary_bytes'] / 1024 / 1024:>9.1f}MB  ({tables})")
+    print(f"{'total':>22} {result['baseline_bytes'] / 1024 / 1024:>9.1f}MB "
+          f"{result['compact_bytes'] / 1024 / 1024:>9.1f}MB {result['reduction']:>6.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
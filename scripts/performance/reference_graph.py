@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""
+Unified Reference Graph
+=======================
+
+One pass over agents, skills, commands and CLAUDE.md shared by every
+cross-reference check:
+- Typed nodes: agent, skill (directory or flat file), command, claude_md
+- Typed edges: ``invokes`` (slash commands, agent self-invocation),
+  ``delegates-to`` (explicit agent delegation, routing table rows) and
+  ``mentions`` (loose agent references, known agent names)
+- Each edge also records the extraction rule that produced it, so a check
+  queries exactly the references it always looked for
+- Extraction results cached in the shared result store by content hash,
+  with a stat-key shortcut so unchanged files are not even read
+- One graph per process and layout; files are read through the shared
+  document cache
+
+Used by check-orphans.py, detect-circular-deps.py, test-config-integrity.py
+and validate-command-agents.py.
+"""
+
+import hashlib
+import os
+import re
+import sys
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+sys.path.append(str(Path(__file__).parent))
+from aho_corasick import AhoCorasick
+from document_model import load_document
+from result_store import open_result_store, source_version
+
+GRAPH_TABLE = 'reference_graph'
+GRAPH_PATH_TABLE = 'reference_graph_paths'
+
+# Node kinds
+AGENT = 'agent'
+SKILL = 'skill'
+COMMAND = 'command'
+CLAUDE_MD = 'claude_md'
+
+# Edge kinds
+INVOKES = 'invokes'
+DELEGATES_TO = 'delegates-to'
+MENTIONS = 'mentions'
+
+# Extraction rules (each edge carries one)
+RULE_COMMAND = 'command'        # /command invocations
+RULE_SELF = 'self'              # "invoke <agent>" inside the agent itself
+RULE_EXPLICIT = 'explicit'      # subagent_type=..., "use the X agent"
+RULE_ROUTING = 'routing'        # CLAUDE.md routing table agents cell
+RULE_REFERENCE = 'reference'    # loose agent-like references (orphan checker)
+RULE_NAME = 'name'              # word-bounded known agent names
+
+AGENT_NAME_SHAPE = re.compile(r"^[a-z]+-[a-z]+(?:-[a-z]+)?$")
+
+# Slash command invocations (excluding markdown headers and code comments)
+COMMAND_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in [
+        r'(?:Run|Execute|Use|Invoke|Call)\s+[`"]?(/[a-z][a-z0-9-]*)',  # Explicit invocations
+        r':\s*[`"]?(/[a-z][a-z0-9-]*)[`"]?\s*(?:command|skill)?',  # Label: /command
+        r'(?:then|after|before)\s+[`"]?(/[a-z][a-z0-9-]*)',  # Workflow sequences
+    ]
+]
+
+# Explicit agent delegation
+EXPLICIT_AGENT_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in [
+        r"subagent_type[=:]\s*['\"]?(\w+-\w+)['\"]?",  # subagent_type="agent-name"
+        r"Task tool.*?(\w+-\w+)",  # Task tool with agent-name
+        r"use\s+the\s+(\w+-\w+)\s+agent",  # "use the agent-name agent"
+    ]
+]
+
+# Common agent reference patterns
+REFERENCE_PATTERNS = [
+    re.compile(pattern, re.MULTILINE | re.IGNORECASE) for pattern in [
+        # YAML style: agent-name:
+        r"^\s*(\w+-\w+(?:-\w+)?):\s*$",
+        # Task style: Task: agent-name
+        r"Task:\s*(\w+-\w+(?:-\w+)?)",
+        # Assignee style: Assignee: [agent-name]
+        r"Assignee:\s*\[?(\w+-\w+(?:-\w+)?)\]?",
+        # Inline reference: + agent-name
+        r"\+\s*(\w+-\w+(?:-\w+)?)",
+        # List item: - agent-name
+        r"^\s*-\s*(\w+-\w+(?:-\w+)?)\s*$",
+        # Reference in prose: the agent-name agent
+        r"the\s+(\w+-\w+(?:-\w+)?)\s+agent",
+        # Use agent: use agent-name
+        r"use\s+(\w+-\w+(?:-\w+)?)",
+    ]
+]
+
+# Hyphenated terms that are never agent names (matched anywhere in a reference)
+SKIP_PATTERNS = [
+    "front-matter", "pre-commit", "auto-fix", "non-agent",
+    "wave-based", "pr-based", "file-path", "cli-tool",
+    "end-to-end", "self-reference", "code-block",
+    "cross-validation", "dry-run", "shadcn-ui", "think-harder",
+    "argument-hint", "thinking-level", "thinking-tokens",
+    "mcp-server", "multi-cloud", "multi-agent", "multi-step",
+    "high-performance", "open-ended", "real-time", "well-formed",
+    # CI/CD and testing patterns (not agent names)
+    "skip-ci", "integration-test", "unit-test", "paths-ignore",
+    # Technical compound terms (not agent names)
+    "docx-js", "low-contrast", "scroll-triggering", "read-only",
+    "high-level", "low-level", "built-in", "opt-in", "opt-out",
+    "run-time", "compile-time", "type-safe", "type-check",
+    "hot-reload", "hot-module", "tree-shaking",
+]
+SKIP_MATCHER = AhoCorasick(SKIP_PATTERNS)
+
+NUMBERED_REFERENCE = re.compile(r"^[\w-]+-\d+$")
+
+# Format: | keywords | agent-name + agent-name |
+ROUTING_ROW = re.compile(r"\|\s*[^|]+\s*\|\s*([^|]+)\s*\|")
+
+TASK_TOOL = re.compile(r"tools:.*Task", re.IGNORECASE)
+
+
+def extract_command_references(content: str) -> List[str]:
+    """Slash command references (``/name``), lower-cased and deduplicated.
+
+    Looks for patterns like:
+    - /command-name
+    - `/command-name`
+    - Run `/command-name`
+    - Execute /command-name
+    """
+    references = set()
+    for pattern in COMMAND_PATTERNS:
+        references.update(ref.lower().strip('`"') for ref in pattern.findall(content))
+    return sorted(references)
+
+
+def extract_agent_references(content: str) -> set:
+    """Extract potential agent references from content."""
+    # Each pattern keeps its own non-overlapping matches; duplicates are filtered once
+    candidates = set()
+    for pattern in REFERENCE_PATTERNS:
+        candidates.update(match.lower() for match in pattern.findall(content))
+
+    references = set()
+    for candidate in candidates:
+        # Skip numbered agent references (e.g., debugger-2, test-engineer-4)
+        if NUMBERED_REFERENCE.match(candidate):
+            continue
+        # Filter out common non-agent patterns in one automaton pass
+        if not SKIP_MATCHER.contains_any(candidate):
+            references.add(candidate)
+
+    return references
+
+
+def extract_explicit_agent_references(content: str) -> List[str]:
+    """Explicitly delegated agent names as written, one per occurrence."""
+    references = []
+    for pattern in EXPLICIT_AGENT_PATTERNS:
+        for match in pattern.findall(content):
+            if AGENT_NAME_SHAPE.match(match.lower()):
+                references.append(match)
+    return references
+
+
+def extract_routing_agents(content: str) -> List[str]:
+    """Agent names from the agents column of the CLAUDE.md routing table, in row order."""
+    agents = []
+    for match in ROUTING_ROW.finditer(content):
+        agents_cell = match.group(1).strip()
+        # Skip header rows, separator rows, and non-agent content
+        if not agents_cell or agents_cell == "Agents":
+            continue
+        if agents_cell.startswith("-") or agents_cell.startswith("="):
+            continue
+        # Skip non-agent table cells (like "Use Skill", "Use Agent Instead")
+        if "skill" in agents_cell.lower() or "agent instead" in agents_cell.lower():
+            continue
+        # Skip cells that look like examples or descriptions (longer text)
+        if len(agents_cell) > 50:
+            continue
+        # Split by + to get individual agents
+        for agent in agents_cell.split("+"):
+            agent = agent.strip().lower()
+            # Must look like an agent name (word-word format)
+            if agent and "-" in agent and AGENT_NAME_SHAPE.match(agent):
+                agents.append(agent)
+    return agents
+
+
+@dataclass
+class Node:
+    """One configuration file in the graph."""
+    key: str                       # label relative to the .claude dir, e.g. "skills/plan/SKILL.md"
+    kind: str
+    name: str                      # agent/skill/command name (file stem or skill directory)
+    path: Path
+    layout: Optional[str] = None   # skills: 'directory' or 'flat'
+    content_hash: str = ''
+    flags: Dict[str, bool] = field(default_factory=dict)
+
+    @property
+    def file_name(self) -> str:
+        return self.path.name
+
+
+@dataclass(frozen=True)
+class Reference:
+    """A typed edge from a node to a referenced name."""
+    source: str
+    target: str
+    kind: str
+    rule: str
+
+
+def _extract(kind: str, name: str, content: str, matcher: AhoCorasick) -> Dict[str, Any]:
+    """Edges (as ``[kind, rule, target]``) and flags for one file."""
+    edges: List[List[str]] = []
+    flags: Dict[str, bool] = {}
+
+    if kind in (SKILL, COMMAND):
+        edges.extend([INVOKES, RULE_COMMAND, ref] for ref in extract_command_references(content))
+        edges.extend([DELEGATES_TO, RULE_EXPLICIT, ref] for ref in extract_explicit_agent_references(content))
+        edges.extend([MENTIONS, RULE_REFERENCE, ref] for ref in sorted(extract_agent_references(content)))
+        mentioned = {matcher.patterns[index].lower().replace('_', '-') for _, _, index in matcher.find_words(content)}
+        edges.extend([MENTIONS, RULE_NAME, ref] for ref in sorted(mentioned))
+    elif kind == AGENT:
+        lowered = content.lower()
+        if f"Task: {name}" in lowered or f"invoke {name}" in lowered:
+            edges.append([INVOKES, RULE_SELF, name])
+        flags['task_tool'] = bool(TASK_TOOL.search(content))
+    elif kind == CLAUDE_MD:
+        edges.extend([DELEGATES_TO, RULE_ROUTING, agent] for agent in extract_routing_agents(content))
+
+    return {'edges': edges, 'flags': flags}
+
+
+def _stat_key(stat: os.stat_result) -> str:
+    return f"{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+class ReferenceGraph:
+    """Nodes and typed edges for one configuration layout."""
+
+    def __init__(self):
+        self.nodes: Dict[str, Node] = {}
+        self.edges: List[Reference] = []
+        self._outgoing: Dict[str, List[Reference]] = {}
+        self.reads = 0
+        self.cache_hits = 0
+        self.stat_hits = 0
+
+    def add_node(self, node: Node, edges: Iterable[Tuple[str, str, str]] = ()) -> None:
+        self.nodes[node.key] = node
+        outgoing = [Reference(node.key, target, kind, rule) for kind, rule, target in edges]
+        self._outgoing[node.key] = outgoing
+        self.edges.extend(outgoing)
+
+    def nodes_of(self, kind: str, layout: Optional[str] = None) -> List[Node]:
+        """Nodes of one kind (and skill layout), in key order."""
+        return [node for node in self.nodes.values()
+                if node.kind == kind and (layout is None or node.layout == layout)]
+
+    def references(self, node: Node, kind: Optional[str] = None, rule: Optional[str] = None) -> List[str]:
+        """Targets of a node's outgoing edges, filtered by edge kind and rule."""
+        return [edge.target for edge in self._outgoing.get(node.key, ())
+                if (kind is None or edge.kind == kind) and (rule is None or edge.rule == rule)]
+
+    def edges_of(self, kind: Optional[str] = None, rule: Optional[str] = None) -> List[Reference]:
+        return [edge for edge in self.edges
+                if (kind is None or edge.kind == kind) and (rule is None or edge.rule == rule)]
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = len(self.nodes)
+        hit_rate = (self.cache_hits / total * 100) if total > 0 else 0
+        return {
+            'nodes': total,
+            'edges': len(self.edges),
+            'reads': self.reads,
+            'cache_hits': self.cache_hits,
+            'stat_hits': self.stat_hits,
+            'hit_rate': f"{hit_rate:.1f}%"
+        }
+
+
+def _layout_nodes(agents_dir: Optional[Path], skills_dir: Optional[Path],
+                  commands_dir: Optional[Path], claude_md: Optional[Path]) -> List[Node]:
+    """Every file the checks look at; each check applies its own skip lists."""
+    nodes = []
+    if agents_dir is not None and agents_dir.exists():
+        for path in sorted(agents_dir.glob("*.md")):
+            nodes.append(Node(f"agents/{path.name}", AGENT, path.stem, path))
+    if skills_dir is not None and skills_dir.exists():
+        for skill_dir in sorted(skills_dir.iterdir()):
+            skill_file = skill_dir / "SKILL.md"
+            if skill_dir.is_dir() and not skill_dir.name.startswith('.') and skill_file.exists():
+                nodes.append(Node(f"skills/{skill_dir.name}/SKILL.md", SKILL, skill_dir.name, skill_file, 'directory'))
+        for path in sorted(skills_dir.glob("*.md")):
+            nodes.append(Node(f"skills/{path.name}", SKILL, path.stem, path, 'flat'))
+    if commands_dir is not None and commands_dir.exists():
+        for path in sorted(commands_dir.glob("*.md")):
+            nodes.append(Node(f"commands/{path.name}", COMMAND, path.stem, path))
+    if claude_md is not None and claude_md.exists():
+        nodes.append(Node("CLAUDE.md", CLAUDE_MD, "CLAUDE", claude_md))
+    return nodes
+
+
+def build_reference_graph(agents_dir: Optional[Path] = None, skills_dir: Optional[Path] = None,
+                          commands_dir: Optional[Path] = None, claude_md: Optional[Path] = None,
+                          cache_dir: Optional[Path] = None,
+                          mention_names: Optional[Iterable[str]] = None) -> ReferenceGraph:
+    """Read every file once and extract its references (cached when ``cache_dir`` is set).
+
+    ``mention_names`` is the vocabulary for ``mentions``/``name`` edges;
+    it defaults to the agent files found.
+    """
+    graph = ReferenceGraph()
+    nodes = _layout_nodes(agents_dir, skills_dir, commands_dir, claude_md)
+    if mention_names is None:
+        mention_names = [node.name for node in nodes if node.kind == AGENT]
+    mention_names = list(mention_names)
+    matcher = AhoCorasick(mention_names, ignore_case=True)
+    vocabulary = hashlib.blake2b('\n'.join(mention_names).encode('utf-8'), digest_size=8).hexdigest()
+
+    entries = paths = None
+    if cache_dir is not None:
+        store = open_result_store(cache_dir)
+        version = source_version(__file__)
+        entries = store.table(GRAPH_TABLE, version)
+        paths = store.table(GRAPH_PATH_TABLE, version)
+
+    for node in nodes:
+        path_key = os.fspath(node.path)
+        extracted = None
+        stat_key = None
+        if paths is not None:
+            stat_key = _stat_key(os.stat(path_key))
+            known = paths.get(path_key, stat_key)
+            if known is not None:
+                node.content_hash = known['hash']
+                extracted = entries.get(f"{node.kind}:{node.name}:{node.content_hash}", vocabulary)
+                if extracted is not None:
+                    graph.stat_hits += 1
+                    graph.cache_hits += 1
+
+        if extracted is None:
+            document = load_document(node.path)
+            graph.reads += 1
+            node.content_hash = document.content_hash
+            entry_key = f"{node.kind}:{node.name}:{node.content_hash}"
+            if entries is not None:
+                extracted = entries.get(entry_key, vocabulary)
+            if extracted is not None:
+                graph.cache_hits += 1
+            else:
+                extracted = _extract(node.kind, node.name, document.content, matcher)
+                if entries is not None:
+                    entries.put(entry_key, vocabulary, extracted)
+            if paths is not None:
+                paths.put(path_key, stat_key, {'hash': node.content_hash})
+
+        node.flags = dict(extracted['flags'])
+        graph.add_node(node, extracted['edges'])
+
+    if cache_dir is not None:
+        open_result_store(cache_dir).flush()
+    return graph
+
+
+_graphs: Dict[Tuple, ReferenceGraph] = {}
+_graphs_lock = threading.Lock()
+
+
+def get_reference_graph(agents_dir: Optional[Path] = None, skills_dir: Optional[Path] = None,
+                        commands_dir: Optional[Path] = None, claude_md: Optional[Path] = None,
+                        cache_dir: Optional[Path] = None,
+                        mention_names: Optional[Iterable[str]] = None) -> ReferenceGraph:
+    """Process-wide graph for a layout, built on first use and shared by every check."""
+    names = tuple(mention_names) if mention_names is not None else None
+    key = (agents_dir, skills_dir, commands_dir, claude_md, cache_dir, names)
+    with _graphs_lock:
+        graph = _graphs.get(key)
+        if graph is None:
+            graph = build_reference_graph(agents_dir, skills_dir, commands_dir, claude_md, cache_dir, names)
+            _graphs[key] = graph
+        return graph
+
+
+__all__ = [
+    'GRAPH_TABLE',
+    'GRAPH_PATH_TABLE',
+    'AGENT',
+    'SKILL',
+    'COMMAND',
+    'CLAUDE_MD',
+    'INVOKES',
+    'DELEGATES_TO',
+    'MENTIONS',
+    'RULE_COMMAND',
+    'RULE_SELF',
+    'RULE_EXPLICIT',
+    'RULE_ROUTING',
+    'RULE_REFERENCE',
+    'RULE_NAME',
+    'AGENT_NAME_SHAPE',
+    'REFERENCE_PATTERNS',
+    'SKIP_PATTERNS',
+    'SKIP_MATCHER',
+    'NUMBERED_REFERENCE',
+    'Node',
+    'Reference',
+    'ReferenceGraph',
+    'extract_command_references',
+    'extract_agent_references',
+    'extract_explicit_agent_references',
+    'extract_routing_agents',
+    'build_reference_graph',
+    'get_reference_graph'
+]
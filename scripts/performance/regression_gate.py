@@ -0,0 +1,439 @@
+#!/usr/bin/env python3
+"""
+Statistical Regression Gate
+===========================
+
+Decides whether a benchmark really got slower than its stored baseline:
+- Repeated trials after warmup instead of a single timing; a benchmark
+  faster than ``DEFAULT_MIN_TRIAL_TIME`` is repeated inside every trial so
+  each sample sits well above timer and scheduler noise
+- Per-commit baselines in ``.tmp/baselines/<commit>.json``, compared against
+  the nearest ancestor commit that has one
+- One-sided Mann-Whitney U test (exact for small samples without ties,
+  normal approximation with tie correction otherwise)
+- Bootstrap confidence interval for the ratio of medians
+- Machine-speed normalization for CPU-bound benchmarks (opt-in per
+  benchmark): a fixed calibration workload is timed with every run;
+  baselines are rescaled by the calibration ratio only when the calibration
+  runs themselves differ significantly, and the calibration's own
+  uncertainty is then resampled into the confidence interval, so a noisy
+  calibration can neither fake nor hide a regression. I/O-bound benchmarks
+  are compared unscaled - CPU speed says nothing about disk or fsync speed
+- A slowdown fails the gate only when it is significant and the whole
+  confidence interval lies beyond the threshold, widened to the spread
+  (relative IQR) of the noisier of the two samples, so run-to-run drift
+  never blocks CI
+- Machine-readable verdict per benchmark for CI
+
+Pure standard library; the statistics are deterministic for a given seed.
+"""
+
+import hashlib
+import json
+import math
+import random
+import re
+import statistics
+import subprocess
+import time
+from dataclasses import asdict, dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+DEFAULT_TRIALS = 10
+DEFAULT_WARMUP = 2
+DEFAULT_THRESHOLD = 0.05          # fail only when the slowdown is confidently beyond 5%
+DEFAULT_ALPHA = 0.01
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_RESAMPLES = 2000
+DEFAULT_MIN_TRIAL_TIME = 0.05     # seconds; quicker benchmarks are repeated within a trial
+_MAX_REPEATS = 100
+
+# Exact U distribution up to this many samples per side
+_EXACT_LIMIT = 20
+
+# Samples stored under this name rescale the other benchmarks of the same run
+CALIBRATION = 'calibration'
+
+PASS = 'pass'
+REGRESSION = 'regression'
+IMPROVEMENT = 'improvement'
+NO_BASELINE = 'no-baseline'
+
+
+def repeats_for(elapsed: float, min_trial_time: float = DEFAULT_MIN_TRIAL_TIME) -> int:
+    """Calls per trial needed for a trial to last at least ``min_trial_time``."""
+    if elapsed <= 0:
+        return _MAX_REPEATS
+    return max(1, min(_MAX_REPEATS, math.ceil(min_trial_time / elapsed)))
+
+
+def collect_samples(measure: Callable[[], float], trials: int = DEFAULT_TRIALS,
+                    warmup: int = DEFAULT_WARMUP, min_trial_time: float = DEFAULT_MIN_TRIAL_TIME) -> List[float]:
+    """Run ``measure`` (which returns elapsed seconds) after ``warmup`` calls; one mean per-call time per trial.
+
+    The slowest warmup call decides how many calls each trial averages over.
+    """
+    elapsed = max([measure() for _ in range(max(1, warmup))])
+    repeats = repeats_for(elapsed, min_trial_time)
+    return [sum(measure() for _ in range(repeats)) / repeats for _ in range(trials)]
+
+
+async def collect_samples_async(measure: Callable[[], Awaitable[float]], trials: int = DEFAULT_TRIALS,
+                                warmup: int = DEFAULT_WARMUP,
+                                min_trial_time: float = DEFAULT_MIN_TRIAL_TIME) -> List[float]:
+    """Async counterpart of ``collect_samples``."""
+    elapsed = max([await measure() for _ in range(max(1, warmup))])
+    repeats = repeats_for(elapsed, min_trial_time)
+    samples = []
+    for _ in range(trials):
+        total = 0.0
+        for _ in range(repeats):
+            total += await measure()
+        samples.append(total / repeats)
+    return samples
+
+
+def timed(func: Callable[[], Any]) -> Callable[[], float]:
+    """Wrap a callable so it returns its own wall time."""
+    def measure() -> float:
+        start = time.perf_counter()
+        func()
+        return time.perf_counter() - start
+    return measure
+
+
+_CALIBRATION_WORD = re.compile(r'\b[a-z]+ing\b')
+
+
+def calibration_workload(rounds: int = 500) -> None:
+    """Fixed CPU-bound work resembling the benchmarks (text building, regex, hashing, sorting)."""
+    words = ['agent', 'routing', 'validating', 'skill', 'scanning', 'command', 'standardizing', 'cache']
+    for round_number in range(rounds):
+        text = ' '.join(words[(round_number + i) % len(words)] for i in range(64))
+        matches = _CALIBRATION_WORD.findall(text)
+        hashlib.sha256(text.encode('utf-8')).hexdigest()
+        sorted(matches + text.split())
+
+
+def calibrate(trials: int = DEFAULT_TRIALS, warmup: int = DEFAULT_WARMUP,
+              min_trial_time: float = DEFAULT_MIN_TRIAL_TIME) -> List[float]:
+    """Calibration samples for the current machine, stored alongside the benchmarks."""
+    return collect_samples(timed(calibration_workload), trials, warmup, min_trial_time)
+
+
+@lru_cache(maxsize=None)
+def _u_counts(m: int, n: int) -> Tuple[int, ...]:
+    """Number of orderings giving each U statistic for sample sizes m and n (no ties)."""
+    if m == 0 or n == 0:
+        return (1,)
+    # The largest value comes from the first sample (adds n to U) or the second
+    with_first = _u_counts(m - 1, n)
+    with_second = _u_counts(m, n - 1)
+    counts = [0] * (m * n + 1)
+    for u, count in enumerate(with_first):
+        counts[u + n] += count
+    for u, count in enumerate(with_second):
+        counts[u] += count
+    return tuple(counts)
+
+
+def _ranks(values: Sequence[float]) -> Tuple[List[float], List[int]]:
+    """Average ranks (1-based) and the sizes of tied groups."""
+    order = sorted(range(len(values)), key=values.__getitem__)
+    ranks = [0.0] * len(values)
+    ties = []
+    start = 0
+    while start < len(order):
+        end = start
+        while end + 1 < len(order) and values[order[end + 1]] == values[order[start]]:
+            end += 1
+        for position in range(start, end + 1):
+            ranks[order[position]] = (start + end) / 2 + 1
+        if end > start:
+            ties.append(end - start + 1)
+        start = end + 1
+    return ranks, ties
+
+
+def mann_whitney_u(baseline: Sequence[float], current: Sequence[float]) -> Tuple[float, float, float]:
+    """U statistic of ``current`` and one-sided p-values (current greater, current less)."""
+    m, n = len(current), len(baseline)
+    if m == 0 or n == 0:
+        return 0.0, 1.0, 1.0
+    ranks, ties = _ranks(list(current) + list(baseline))
+    u = sum(ranks[:m]) - m * (m + 1) / 2
+
+    if not ties and m <= _EXACT_LIMIT and n <= _EXACT_LIMIT:
+        counts = _u_counts(m, n)
+        total = sum(counts)
+        rounded = int(round(u))
+        p_greater = sum(counts[rounded:]) / total
+        p_less = sum(counts[:rounded + 1]) / total
+        return u, p_greater, p_less
+
+    mean = m * n / 2
+    tie_term = sum(t ** 3 - t for t in ties) / ((m + n) * (m + n - 1))
+    variance = m * n / 12 * ((m + n + 1) - tie_term)
+    if variance <= 0:
+        return u, 1.0, 1.0
+    sd = math.sqrt(variance)
+    # Continuity-corrected normal tails
+    p_greater = 0.5 * math.erfc((u - mean - 0.5) / sd / math.sqrt(2))
+    p_less = 0.5 * math.erfc((mean - u - 0.5) / sd / math.sqrt(2))
+    return u, min(1.0, p_greater), min(1.0, p_less)
+
+
+def _resampled_ratio(rng: random.Random, baseline: Sequence[float], current: Sequence[float]) -> float:
+    base = statistics.median(rng.choices(baseline, k=len(baseline)))
+    cur = statistics.median(rng.choices(current, k=len(current)))
+    return cur / base if base > 0 else math.inf
+
+
+def bootstrap_ratio_ci(baseline: Sequence[float], current: Sequence[float],
+                       confidence: float = DEFAULT_CONFIDENCE, resamples: int = DEFAULT_RESAMPLES,
+                       seed: int = 0,
+                       calibration: Optional[Tuple[Sequence[float], Sequence[float]]] = None) -> Tuple[float, float]:
+    """Percentile bootstrap interval for median(current) / median(baseline).
+
+    With ``calibration`` (baseline run's samples, this run's samples) every
+    resampled ratio is divided by a resampled calibration ratio, so the
+    interval carries the uncertainty of the machine-speed correction too.
+    """
+    rng = random.Random(seed)
+    ratios = []
+    for _ in range(resamples):
+        ratio = _resampled_ratio(rng, baseline, current)
+        if calibration is not None:
+            speed = _resampled_ratio(rng, calibration[0], calibration[1])
+            ratio = ratio / speed if speed > 0 else math.inf
+        ratios.append(ratio)
+    ratios.sort()
+    tail = (1 - confidence) / 2
+    low = ratios[int(math.floor(tail * (resamples - 1)))]
+    high = ratios[int(math.ceil((1 - tail) * (resamples - 1)))]
+    return low, high
+
+
+@dataclass
+class Verdict:
+    """Gate decision for one benchmark."""
+    benchmark: str
+    status: str
+    trials: int
+    current_median: float
+    baseline_median: Optional[float] = None
+    baseline_commit: Optional[str] = None
+    ratio: Optional[float] = None
+    ci_low: Optional[float] = None
+    ci_high: Optional[float] = None
+    p_slower: Optional[float] = None
+    p_faster: Optional[float] = None
+    speed_factor: float = 1.0
+    noise: Optional[float] = None
+    threshold: float = DEFAULT_THRESHOLD
+    alpha: float = DEFAULT_ALPHA
+
+    @property
+    def failed(self) -> bool:
+        return self.status == REGRESSION
+
+    def describe(self) -> str:
+        if self.ratio is None:
+            return f"{self.benchmark}: {self.status} (median {self.current_median * 1000:.2f} ms)"
+        return (f"{self.benchmark}: {self.status} - median {self.current_median * 1000:.2f} ms vs "
+                f"{self.baseline_median * 1000:.2f} ms ({(self.ratio - 1) * 100:+.1f}%, "
+                f"{DEFAULT_CONFIDENCE:.0%} CI {(self.ci_low - 1) * 100:+.1f}%..{(self.ci_high - 1) * 100:+.1f}%, "
+                f"p={min(self.p_slower, self.p_faster):.4f}, noise {self.noise * 100:.0f}%, "
+                f"machine speed x{self.speed_factor:.2f})")
+
+
+def relative_iqr(values: Sequence[float]) -> float:
+    """Interquartile range over the median: trial-to-trial noise of a benchmark."""
+    if len(values) < 4:
+        return 0.0
+    q1, median, q3 = statistics.quantiles(values, n=4)
+    return (q3 - q1) / median if median > 0 else 0.0
+
+
+def compare(benchmark: str, baseline: Optional[Sequence[float]], current: Sequence[float],
+            threshold: float = DEFAULT_THRESHOLD, alpha: float = DEFAULT_ALPHA,
+            baseline_commit: Optional[str] = None, speed_factor: float = 1.0,
+            calibration: Optional[Tuple[Sequence[float], Sequence[float]]] = None) -> Verdict:
+    """Classify ``current`` samples against ``baseline`` samples.
+
+    ``speed_factor`` is how much slower this machine ran the calibration
+    workload than the baseline run did; baseline samples are scaled by it.
+    ``calibration`` holds the calibration samples behind that factor, whose
+    uncertainty is then included in the confidence interval.
+    """
+    verdict = Verdict(benchmark=benchmark, status=NO_BASELINE, trials=len(current),
+                      current_median=statistics.median(current), threshold=threshold, alpha=alpha)
+    if not baseline:
+        return verdict
+
+    noise = max(relative_iqr(baseline), relative_iqr(current))
+    ci_low, ci_high = bootstrap_ratio_ci(baseline, current, calibration=calibration)
+    baseline = [value * speed_factor for value in baseline]
+    verdict.speed_factor = speed_factor
+    verdict.baseline_commit = baseline_commit
+    verdict.baseline_median = statistics.median(baseline)
+    verdict.ratio = verdict.current_median / verdict.baseline_median if verdict.baseline_median > 0 else math.inf
+    if calibration is None:
+        # The interval was computed on unscaled samples
+        ci_low, ci_high = ci_low / speed_factor, ci_high / speed_factor
+    verdict.ci_low, verdict.ci_high = ci_low, ci_high
+    _, verdict.p_slower, verdict.p_faster = mann_whitney_u(baseline, current)
+    verdict.noise = noise
+
+    margin = max(threshold, verdict.noise)
+    if verdict.p_slower < alpha and verdict.ci_low > 1 + margin:
+        verdict.status = REGRESSION
+    elif verdict.p_faster < alpha and verdict.ci_high < 1 - margin:
+        verdict.status = IMPROVEMENT
+    else:
+        verdict.status = PASS
+    return verdict
+
+
+def current_commit(repo_dir: Path) -> Optional[str]:
+    """HEAD commit of ``repo_dir``, or None outside a git checkout."""
+    try:
+        completed = subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=repo_dir,
+                                   capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return completed.stdout.strip()
+
+
+def ancestor_commits(repo_dir: Path, ref: str = 'HEAD', limit: int = 100) -> List[str]:
+    """``ref`` and its first-parent ancestors, newest first."""
+    try:
+        completed = subprocess.run(['git', 'rev-list', '--first-parent', f'--max-count={limit}', ref],
+                                   cwd=repo_dir, capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return []
+    return completed.stdout.split()
+
+
+class BaselineStore:
+    """Benchmark samples recorded per commit, one JSON file each."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+
+    def _path(self, commit: str) -> Path:
+        return self.directory / f"{commit}.json"
+
+    def load(self, commit: str) -> Optional[Dict[str, List[float]]]:
+        try:
+            with open(self._path(commit), 'r', encoding='utf-8') as f:
+                return json.load(f)['benchmarks']
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def save(self, commit: str, samples: Dict[str, List[float]], metadata: Optional[Dict[str, Any]] = None) -> Path:
+        """Record (or extend) the baseline for ``commit``."""
+        self.directory.mkdir(parents=True, exist_ok=True)
+        benchmarks = self.load(commit) or {}
+        benchmarks.update(samples)
+        path = self._path(commit)
+        tmp_path = path.with_suffix('.json.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'commit': commit, 'recorded_at': time.time(), 'metadata': metadata or {},
+                       'benchmarks': benchmarks}, f, indent=2)
+        tmp_path.replace(path)
+        return path
+
+    def nearest(self, commits: Iterable[str]) -> Tuple[Optional[str], Dict[str, List[float]]]:
+        """First commit in ``commits`` with a recorded baseline."""
+        for commit in commits:
+            benchmarks = self.load(commit)
+            if benchmarks is not None:
+                return commit, benchmarks
+        return None, {}
+
+
+def speed_factor(samples: Dict[str, List[float]], baseline: Dict[str, List[float]],
+                 alpha: float = DEFAULT_ALPHA) -> float:
+    """Calibration median of this run over that of the baseline run.
+
+    1.0 when either run lacks calibration samples or the two calibrations do
+    not differ significantly - a ratio that is only noise would shift every
+    baseline by that noise.
+    """
+    current, recorded = samples.get(CALIBRATION), baseline.get(CALIBRATION)
+    if not current or not recorded:
+        return 1.0
+    _, p_slower, p_faster = mann_whitney_u(recorded, current)
+    if min(p_slower, p_faster) >= alpha:
+        return 1.0
+    return statistics.median(current) / statistics.median(recorded)
+
+
+def gate(samples: Dict[str, List[float]], baseline_commit: Optional[str], baseline: Dict[str, List[float]],
+         threshold: float = DEFAULT_THRESHOLD, alpha: float = DEFAULT_ALPHA,
+         cpu_bound: Iterable[str] = ()) -> List[Verdict]:
+    """Verdicts for every benchmark in ``samples`` except the calibration run.
+
+    Only the benchmarks named in ``cpu_bound`` are normalized for machine
+    speed; the rest are compared against their baseline as recorded.
+    """
+    cpu_bound = set(cpu_bound)
+    factor = speed_factor(samples, baseline, alpha)
+    calibration = (baseline[CALIBRATION], samples[CALIBRATION]) if factor != 1.0 else None
+    verdicts = []
+    for name, values in samples.items():
+        if name == CALIBRATION:
+            continue
+        if name in cpu_bound:
+            verdicts.append(compare(name, baseline.get(name), values, threshold, alpha, baseline_commit,
+                                    factor, calibration))
+        else:
+            verdicts.append(compare(name, baseline.get(name), values, threshold, alpha, baseline_commit))
+    return verdicts
+
+
+def write_verdicts(path: Path, verdicts: List[Verdict], commit: Optional[str]) -> Dict[str, Any]:
+    """Machine-readable gate result; ``status`` is ``fail`` if any benchmark regressed."""
+    report = {
+        'commit': commit,
+        'status': 'fail' if any(verdict.failed for verdict in verdicts) else 'pass',
+        'verdicts': [asdict(verdict) for verdict in verdicts]
+    }
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+    return report
+
+
+__all__ = [
+    'DEFAULT_TRIALS',
+    'DEFAULT_WARMUP',
+    'DEFAULT_THRESHOLD',
+    'DEFAULT_ALPHA',
+    'DEFAULT_MIN_TRIAL_TIME',
+    'PASS',
+    'REGRESSION',
+    'IMPROVEMENT',
+    'NO_BASELINE',
+    'CALIBRATION',
+    'Verdict',
+    'BaselineStore',
+    'collect_samples',
+    'collect_samples_async',
+    'timed',
+    'repeats_for',
+    'calibration_workload',
+    'calibrate',
+    'speed_factor',
+    'mann_whitney_u',
+    'bootstrap_ratio_ci',
+    'relative_iqr',
+    'compare',
+    'gate',
+    'current_commit',
+    'ancestor_commits',
+    'write_verdicts'
+]
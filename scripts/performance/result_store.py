@@ -0,0 +1,223 @@
+#!/usr/bin/env python3
+"""
+Content-Addressed Result Store
+==============================
+
+Single embedded SQLite database replacing the per-tool JSON cache files:
+- One table per tool, one row per key (usually the file path)
+- Rows are served only when content hash and tool version both match
+- Lookups hit the database on demand instead of loading everything at startup
+- Writes are buffered and flushed in batches of upserts
+- WAL journal so concurrent readers never block the writer
+
+Startup and shutdown cost scale with the entries a run touches, not with
+the size of the cache.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+STORE_FILENAME = 'results.sqlite3'
+
+# Buffered writes per table before an automatic flush (keeps memory flat on huge runs)
+FLUSH_THRESHOLD = 1000
+
+_TABLE_NAME = re.compile(r'^[a-z][a-z0-9_]*$')
+
+
+def source_version(*paths: Union[str, Path]) -> str:
+    """Tool version derived from source files, so rule changes invalidate results."""
+    hasher = hashlib.blake2b(digest_size=8)
+    for path in paths:
+        try:
+            with open(path, 'rb') as f:
+                hasher.update(f.read())
+        except OSError:
+            hasher.update(os.fspath(path).encode('utf-8'))
+    return hasher.hexdigest()
+
+
+@dataclass
+class StoredResult:
+    """A stored row: content hash it was computed from and its payload."""
+    content_hash: str
+    payload: Any
+    updated_at: float
+
+
+class ResultTable:
+    """Per-tool view of the store with buffered writes."""
+
+    def __init__(self, store: 'ResultStore', name: str, version: str):
+        if not _TABLE_NAME.match(name):
+            raise ValueError(f"Invalid result table name: {name!r}")
+        self.store = store
+        self.name = name
+        self.version = version
+        self._pending: Dict[str, Optional[Tuple[str, str, float]]] = {}
+        store._create_table(name)
+
+    def lookup(self, key: str) -> Optional[StoredResult]:
+        """Row for a key at the current tool version, whatever its content hash."""
+        with self.store.lock:
+            if key in self._pending:
+                pending = self._pending[key]
+                if pending is None:
+                    return None
+                content_hash, payload, updated_at = pending
+                return StoredResult(content_hash, json.loads(payload), updated_at)
+
+            row = self.store.connection.execute(
+                f"SELECT content_hash, payload, updated_at FROM {self.name} WHERE key = ? AND version = ?",
+                (key, self.version)
+            ).fetchone()
+
+        if row is None:
+            return None
+        return StoredResult(row[0], json.loads(row[1]), row[2])
+
+    def get(self, key: str, content_hash: str) -> Optional[Any]:
+        """Payload for a key if it was computed from this exact content."""
+        stored = self.lookup(key)
+        if stored is None or stored.content_hash != content_hash:
+            return None
+        return stored.payload
+
+    def put(self, key: str, content_hash: str, payload: Any) -> None:
+        """Buffer an upsert; written on the next flush."""
+        encoded = json.dumps(payload, separators=(',', ':'))
+        with self.store.lock:
+            self._pending[key] = (content_hash, encoded, time.time())
+            if len(self._pending) >= FLUSH_THRESHOLD:
+                self.store.flush()
+
+    def delete(self, key: str) -> None:
+        """Buffer a delete; applied on the next flush."""
+        with self.store.lock:
+            self._pending[key] = None
+
+    def clear(self) -> None:
+        """Drop every row for this tool immediately."""
+        with self.store.lock:
+            self._pending.clear()
+            with self.store.connection:
+                self.store.connection.execute(f"DELETE FROM {self.name}")
+
+    def pending_count(self) -> int:
+        """Number of buffered writes."""
+        return len(self._pending)
+
+    def __len__(self) -> int:
+        """Rows stored at the current version (buffered writes are flushed first)."""
+        self.store.flush()
+        with self.store.lock:
+            row = self.store.connection.execute(
+                f"SELECT COUNT(*) FROM {self.name} WHERE version = ?", (self.version,)
+            ).fetchone()
+        return row[0]
+
+    def _take_pending(self) -> Dict[str, Optional[Tuple[str, str, float]]]:
+        pending, self._pending = self._pending, {}
+        return pending
+
+
+class ResultStore:
+    """Embedded SQLite result store shared by all caching tools."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.lock = threading.RLock()
+        self.connection = sqlite3.connect(str(self.db_path), timeout=30, check_same_thread=False)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self._tables: Dict[str, ResultTable] = {}
+
+    def _create_table(self, name: str) -> None:
+        with self.lock, self.connection:
+            self.connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} ("
+                "key TEXT PRIMARY KEY, "
+                "content_hash TEXT NOT NULL, "
+                "version TEXT NOT NULL, "
+                "payload TEXT NOT NULL, "
+                "updated_at REAL NOT NULL)"
+            )
+
+    def table(self, name: str, version: str) -> ResultTable:
+        """Get (or create) the table for a tool at a given version."""
+        with self.lock:
+            table = self._tables.get(name)
+            if table is None or table.version != version:
+                if table is not None and table.pending_count():
+                    # Keep the old version's buffered writes; flush() only sees registered tables
+                    self.flush()
+                table = ResultTable(self, name, version)
+                self._tables[name] = table
+            return table
+
+    def flush(self) -> int:
+        """Write all buffered changes in a single transaction; returns rows written."""
+        written = 0
+        with self.lock, self.connection:
+            for table in self._tables.values():
+                pending = table._take_pending()
+                upserts = [
+                    (key, entry[0], table.version, entry[1], entry[2])
+                    for key, entry in pending.items() if entry is not None
+                ]
+                deletes = [(key,) for key, entry in pending.items() if entry is None]
+                if upserts:
+                    self.connection.executemany(
+                        f"INSERT INTO {table.name} (key, content_hash, version, payload, updated_at) "
+                        "VALUES (?, ?, ?, ?, ?) "
+                        "ON CONFLICT(key) DO UPDATE SET content_hash = excluded.content_hash, "
+                        "version = excluded.version, payload = excluded.payload, "
+                        "updated_at = excluded.updated_at",
+                        upserts
+                    )
+                if deletes:
+                    self.connection.executemany(f"DELETE FROM {table.name} WHERE key = ?", deletes)
+                written += len(upserts) + len(deletes)
+        return written
+
+    def close(self) -> None:
+        """Flush and close the connection."""
+        self.flush()
+        with self.lock:
+            self.connection.close()
+        _stores.pop(str(self.db_path.resolve()), None)
+
+
+_stores: Dict[str, ResultStore] = {}
+_stores_lock = threading.Lock()
+
+
+def open_result_store(cache_dir: Path) -> ResultStore:
+    """Process-wide store for a cache directory, opened once and shared."""
+    db_path = Path(cache_dir) / STORE_FILENAME
+    key = str(db_path.resolve())
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = ResultStore(db_path)
+            _stores[key] = store
+        return store
+
+
+__all__ = [
+    'STORE_FILENAME',
+    'StoredResult',
+    'ResultTable',
+    'ResultStore',
+    'open_result_store',
+    'source_version'
+]
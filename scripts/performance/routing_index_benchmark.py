@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Routing Index Benchmark
+=======================
+
+Measures the capability routing index (``capability_index``) on a
+synthetic capability matrix:
+- Full build from an empty index, and an incremental refresh after a
+  share of the agents change (``--churn``) and a few disappear
+- Query latency p50/p95 for first lookups (postings read from the result
+  store) and warm lookups (postings in memory)
+- Every ranking is checked against an exhaustive BM25 scorer
+
+Capability phrases draw words from a Zipf-distributed vocabulary, so a
+few terms occur in nearly every agent and most are rare, like real
+capability text.
+
+Usage:
+    python3 scripts/performance/routing_index_benchmark.py [--agents 20000] [--queries 500] [--json]
+"""
+
+import argparse
+import json
+import math
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+sys.path.append(str(Path(__file__).parent))
+from capability_index import B, K1, CapabilityIndex, agent_terms, tokenize
+from corpus_scaling_benchmark import percentile
+
+
+class _Phrases:
+    """Zipf-distributed capability phrases."""
+
+    def __init__(self, rng: random.Random, vocabulary: int):
+        self.rng = rng
+        self.words = [f"skill{index}" for index in range(vocabulary)]
+        self.weights = [1 / (rank + 1) for rank in range(vocabulary)]
+
+    def phrase(self, low: int = 4, high: int = 10) -> str:
+        return ' '.join(self.rng.choices(self.words, self.weights, k=self.rng.randint(low, high)))
+
+    def agent(self, index: int) -> Dict[str, Any]:
+        return {
+            'name': f"agent-{index}",
+            'file': f"agent-{index}.md",
+            'capabilities': [self.phrase() for _ in range(self.rng.randint(3, 10))],
+            'when_to_use': [self.phrase() for _ in range(self.rng.randint(1, 4))],
+            'coordination_patterns': [self.phrase() for _ in range(self.rng.randint(0, 3))]
+        }
+
+
+def write_matrix(path: Path, agents: List[Dict[str, Any]]) -> None:
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'scan_metadata': {'agents_scanned': len(agents)}, 'agents': agents}, f)
+
+
+def exhaustive_ranking(documents: Dict[str, Dict[str, int]], query: str, limit: int) -> List[str]:
+    """Top agents by BM25 scoring every agent against every query term."""
+    lengths = {key: sum(terms.values()) for key, terms in documents.items()}
+    average_length = sum(lengths.values()) / len(documents)
+    scores: Dict[str, float] = {}
+    for term in dict.fromkeys(tokenize(query)):
+        holders = [key for key, terms in documents.items() if term in terms]
+        if not holders:
+            continue
+        idf = math.log(1 + (len(documents) - len(holders) + 0.5) / (len(holders) + 0.5))
+        for key in holders:
+            tf = documents[key][term]
+            scores[key] = scores.get(key, 0.0) + idf * tf * (K1 + 1) / (
+                tf + K1 * (1 - B + B * lengths[key] / average_length))
+    return [key for key, _ in sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]]
+
+
+def _latencies(index: CapabilityIndex, queries: List[str], limit: int) -> List[float]:
+    latencies = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query, limit)
+        latencies.append((time.perf_counter() - start) * 1000)
+    return latencies
+
+
+def run(args: argparse.Namespace) -> Dict[str, Any]:
+    rng = random.Random(args.seed)
+    phrases = _Phrases(rng, args.vocabulary)
+    agents = [phrases.agent(index) for index in range(args.agents)]
+    queries = [phrases.phrase(2, 8) for _ in range(args.queries)]
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        matrix_path = Path(work_dir) / 'agent-capability-matrix.json'
+        write_matrix(matrix_path, agents)
+        index = CapabilityIndex(Path(work_dir) / 'cache')
+        build = index.refresh(matrix_path)
+
+        first = _latencies(index, queries, args.limit)
+        warm = _latencies(index, queries, args.limit)
+
+        # Churn: rewrite some agents, drop a few, then refresh incrementally
+        changed = rng.sample(range(len(agents)), max(1, int(len(agents) * args.churn)))
+        for position in changed:
+            agents[position] = phrases.agent(position)
+        removed = set(changed[:max(1, len(changed) // 10)])
+        agents = [agent for position, agent in enumerate(agents) if position not in removed]
+        write_matrix(matrix_path, agents)
+        incremental = index.refresh(matrix_path)
+        unchanged = index.refresh(matrix_path)
+
+        documents = {agent['file']: agent_terms(agent) for agent in agents}
+        mismatches = sum(
+            [match.file for match in index.search(query, args.limit)] != exhaustive_ranking(documents, query, args.limit)
+            for query in queries[:args.verify]
+        )
+
+        return {
+            'agents': args.agents,
+            'queries': len(queries),
+            'build_seconds': build.seconds,
+            'terms': build.terms_updated,
+            'incremental_seconds': incremental.seconds,
+            'incremental_indexed': incremental.indexed,
+            'incremental_removed': incremental.removed,
+            'incremental_terms': incremental.terms_updated,
+            'unchanged_refresh_ms': unchanged.seconds * 1000,
+            'first_p50_ms': percentile(first, 50),
+            'first_p95_ms': percentile(first, 95),
+            'warm_p50_ms': percentile(warm, 50),
+            'warm_p95_ms': percentile(warm, 95),
+            'verified': min(args.verify, len(queries)),
+            'mismatches': mismatches,
+            'stats': index.get_stats()
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the capability routing index')
+    parser.add_argument('--agents', type=int, default=20000, help='Agents in the synthetic matrix')
+    parser.add_argument('--vocabulary', type=int, default=8000, help='Distinct capability words')
+    parser.add_argument('--queries', type=int, default=500, help='Queries to time')
+    parser.add_argument('--limit', type=int, default=5, help='Agents returned per query')
+    parser.add_argument('--churn', type=float, default=0.01, help='Share of agents changed before the refresh')
+    parser.add_argument('--verify', type=int, default=50, help='Queries checked against exhaustive scoring')
+    parser.add_argument('--seed', type=int, default=7, help='Random seed')
+    parser.add_argument('--json', action='store_true', help='Emit JSON instead of a summary')
+    args = parser.parse_args()
+
+    result = run(args)
+    if args.json:
+        print(json.dumps(result, indent=2))
+        return 0 if result['mismatches'] == 0 else 1
+
+    print(f"Routing index over {result['agents']:,} agents ({result['terms']:,} terms)")
+    print(f"  full build:          {result['build_seconds']:.2f}s")
+    print(f"  incremental refresh: {result['incremental_seconds'] * 1000:.0f}ms "
+          f"({result['incremental_indexed']} re-indexed, {result['incremental_removed']} removed, "
+          f"{result['incremental_terms']:,} terms)")
+    print(f"  unchanged matrix:    {result['unchanged_refresh_ms']:.3f}ms")
+    print(f"  first lookup:        p50 {result['first_p50_ms']:.3f}ms  p95 {result['first_p95_ms']:.3f}ms")
+    print(f"  warm lookup:         p50 {result['warm_p50_ms']:.3f}ms  p95 {result['warm_p95_ms']:.3f}ms")
+    print(f"  rankings verified:   {result['verified'] - result['mismatches']}/{result['verified']} "
+          f"match exhaustive BM25")
+    return 0 if result['mismatches'] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
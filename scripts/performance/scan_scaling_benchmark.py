@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Capability Scan Scaling Benchmark
+=================================
+
+Times ParallelCapabilityScanner extraction backends on a synthetic corpus:
+- inline (single thread, no executor) as the baseline
+- thread pool at each worker count
+- process pool at each worker count
+
+Regex extraction is CPU-bound, so the thread pool should stay near the
+inline time while the process pool scales with available cores. Every
+run uses a cold result store and document cache.
+
+Usage:
+    python3 scripts/performance/scan_scaling_benchmark.py [--agents N] [--kb SIZE] [--workers 1,2,4]
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.append(str(Path(__file__).parent))
+from document_model import get_document_cache
+from parallel_capability_scanner import ParallelCapabilityScanner
+
+_WORDS = ('api', 'database', 'security', 'performance', 'testing', 'cloud', 'pipeline', 'react',
+          'monitoring', 'architecture', 'requirements', 'analytics', 'deployment', 'schema')
+
+
+def write_synthetic_agents(directory: Path, count: int, body_kb: int, seed: int = 7) -> None:
+    """Write ``count`` agent files of roughly ``body_kb`` KiB each."""
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    def bullets(n: int) -> str:
+        return '\n'.join(f"- {' '.join(rng.choice(_WORDS) for _ in range(6))}" for _ in range(n))
+
+    for index in range(count):
+        name = f"synthetic-agent-{index:05d}"
+        parts = [
+            f"---\nname: {name}\ndescription: Synthetic agent {index}\ncolor: blue\ncategory: development\n"
+            "tools:\n  - Read\n  - Write\n---\n",
+            f"# {name}\n\n## SYSTEM BOUNDARY\nNO Task tool access.\n\n"
+            f"You are an expert in {rng.choice(_WORDS)} work.\n",
+        ]
+        size = sum(len(part) for part in parts)
+        while size < body_kb * 1024:
+            section = rng.choice(['## Core Capabilities', '## When to Use', '## Coordination',
+                                  '### Technical Expertise', '## Orchestration Notes'])
+            part = f"\n{section}\n{bullets(8)}\n"
+            parts.append(part)
+            size += len(part)
+        (directory / f"{name}.md").write_text(''.join(parts), encoding='utf-8')
+
+
+async def _time_scan(agents_dir: Path, mode: str, workers: int) -> float:
+    get_document_cache().clear()
+    with tempfile.TemporaryDirectory() as cache_dir:
+        scanner = ParallelCapabilityScanner(Path(cache_dir), max_workers=workers, mode=mode)
+        try:
+            if mode == 'process':
+                # Start the workers outside the timed region
+                await asyncio.get_running_loop().run_in_executor(scanner.process_pool, os.getpid)
+            start = time.perf_counter()
+            await scanner.scan_agents_parallel(agents_dir)
+            return time.perf_counter() - start
+        finally:
+            scanner.cleanup()
+
+
+async def run_benchmark(agents_dir: Path, worker_counts: List[int]) -> List[Dict]:
+    rows = [{'mode': 'inline', 'workers': 1, 'seconds': await _time_scan(agents_dir, 'inline', 1)}]
+    for mode in ('thread', 'process'):
+        for workers in worker_counts:
+            rows.append({'mode': mode, 'workers': workers,
+                         'seconds': await _time_scan(agents_dir, mode, workers)})
+    baseline = rows[0]['seconds']
+    for row in rows:
+        row['speedup'] = baseline / row['seconds'] if row['seconds'] else 0.0
+    return rows
+
+
+def main():
+    cpu_count = os.cpu_count() or 1
+    default_workers = sorted({1, 2, 4, cpu_count} & set(range(1, cpu_count + 1)))
+
+    parser = argparse.ArgumentParser(description='Benchmark capability extraction backends')
+    parser.add_argument('--agents', type=int, default=2000, help='Synthetic agent count')
+    parser.add_argument('--kb', type=int, default=16, help='Approximate size of each agent in KiB')
+    parser.add_argument('--workers', default=','.join(str(w) for w in default_workers),
+                        help='Comma-separated worker counts')
+    parser.add_argument('--json', action='store_true', help='Emit JSON instead of a table')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    worker_counts = [int(w) for w in args.workers.split(',') if w]
+
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        agents_dir = Path(corpus_dir) / 'agents'
+        write_synthetic_agents(agents_dir, args.agents, args.kb)
+        rows = asyncio.run(run_benchmark(agents_dir, worker_counts))
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+        return 0
+
+    print(f"{args.agents:,} agents x ~{args.kb} KiB on {cpu_count} CPUs")
+    print(f"{'mode':>8} {'workers':>8} {'seconds':>9} {'speedup':>8}")
+    for row in rows:
+        print(f"{row['mode']:>8} {row['workers']:>8} {row['seconds']:>9.3f} {row['speedup']:>7.2f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
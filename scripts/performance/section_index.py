@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Persistent Markdown Section Index
+=================================
+
+On-disk index of the document model's parse results, in the shared result store:
+- Content hash -> heading tree, section byte ranges, front-matter span, ``##`` boundaries
+- Path -> content hash by stat key, so unchanged files are not even hashed
+- Documents rebuilt from the index without tokenizing (``DocumentCache.attach_index``)
+- Section and front-matter slices read through mmap without decoding the rest of the file
+
+Offsets are byte offsets into the canonical UTF-8 encoding of a file,
+which is the file itself unless it has CR line endings. Entries are
+versioned by the parser's source, so a parser change re-indexes everything.
+"""
+
+import mmap
+import os
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+sys.path.append(str(Path(__file__).parent))
+import document_model
+from document_model import ParsedDocument, Section, content_hash, decode_content, get_document_cache
+from result_store import open_result_store, source_version
+
+INDEX_TABLE = 'section_index'
+PATH_TABLE = 'section_index_paths'
+
+
+def _char_to_byte(text: str, offsets: Iterable[int]) -> Dict[int, int]:
+    """Map character offsets in ``text`` to offsets in its UTF-8 encoding."""
+    mapping = {}
+    position = byte = 0
+    for offset in sorted(set(offsets)):
+        byte += len(text[position:offset].encode('utf-8'))
+        mapping[offset] = byte
+        position = offset
+    return mapping
+
+
+def _byte_to_char(data: bytes, offsets: Iterable[int]) -> Dict[int, int]:
+    """Map UTF-8 byte offsets (on character boundaries) to character offsets."""
+    mapping = {}
+    position = char = 0
+    for offset in sorted(set(offsets)):
+        char += len(data[position:offset].decode('utf-8'))
+        mapping[offset] = char
+        position = offset
+    return mapping
+
+
+def _stat_key(stat: os.stat_result) -> str:
+    return f"{stat.st_ino}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+@dataclass
+class IndexEntry:
+    """Parse results for one content hash, with byte offsets."""
+    content_hash: str
+    size: int                      # canonical UTF-8 bytes
+    length: int                    # characters
+    front_matter_span: Optional[Tuple[int, int]] = None
+    front_matter: Dict[str, str] = field(default_factory=dict)
+    body_offset: int = 0
+    sections: List[Section] = field(default_factory=list)
+    boundaries: List[int] = field(default_factory=list)
+
+    @property
+    def ascii(self) -> bool:
+        """Byte and character offsets coincide."""
+        return self.size == self.length
+
+    @property
+    def front_matter_text_span(self) -> Optional[Tuple[int, int]]:
+        """Byte range of the text between the ``---`` fences."""
+        if self.front_matter_span is None:
+            return None
+        return (4, self.front_matter_span[1] - 4)
+
+    def _offsets(self) -> List[int]:
+        offsets = [self.body_offset]
+        if self.front_matter_span:
+            offsets.extend(self.front_matter_span)
+        for section in self.sections:
+            offsets.extend((section.start, section.body_start, section.end))
+        offsets.extend(self.boundaries)
+        return offsets
+
+    @classmethod
+    def from_document(cls, document: ParsedDocument) -> 'IndexEntry':
+        """Index a parsed document, converting its character offsets to bytes."""
+        entry = cls(
+            content_hash=document.content_hash,
+            size=document.size,
+            length=len(document.content),
+            front_matter_span=document.front_matter_span,
+            front_matter=dict(document.front_matter),
+            body_offset=document.body_offset,
+            sections=list(document.sections),
+            boundaries=list(document.boundaries)
+        )
+        if not entry.ascii:
+            entry._remap(_char_to_byte(document.content, entry._offsets()))
+        return entry
+
+    def to_document(self, content: str) -> ParsedDocument:
+        """Rebuild the parsed document for ``content`` (which must have this hash) without parsing."""
+        entry = self
+        if not self.ascii:
+            entry = IndexEntry(**{name: getattr(self, name) for name in self.__dataclass_fields__})
+            entry._remap(_byte_to_char(content.encode('utf-8'), self._offsets()))
+
+        document = ParsedDocument(content=content, content_hash=self.content_hash, size=self.size)
+        if entry.front_matter_span is not None:
+            document.front_matter_span = entry.front_matter_span
+            document.front_matter_text = content[4:entry.front_matter_span[1] - 4]
+            document.front_matter = dict(entry.front_matter)
+        document.body_offset = entry.body_offset
+        document.sections = entry.sections
+        document._boundaries = entry.boundaries
+        return document
+
+    def _remap(self, mapping: Dict[int, int]) -> None:
+        if self.front_matter_span:
+            self.front_matter_span = (mapping[self.front_matter_span[0]], mapping[self.front_matter_span[1]])
+        self.body_offset = mapping[self.body_offset]
+        self.sections = [
+            Section(level=s.level, title=s.title, start=mapping[s.start],
+                    body_start=mapping[s.body_start], end=mapping[s.end], parent=s.parent)
+            for s in self.sections
+        ]
+        self.boundaries = [mapping[offset] for offset in self.boundaries]
+
+    def to_payload(self) -> List[Any]:
+        """Compact JSON form: flat lists, no field names per section."""
+        return [
+            self.size,
+            self.length,
+            list(self.front_matter_span) if self.front_matter_span else None,
+            self.front_matter,
+            self.body_offset,
+            [[s.level, s.title, s.start, s.body_start, s.end, s.parent] for s in self.sections],
+            self.boundaries
+        ]
+
+    @classmethod
+    def from_payload(cls, digest: str, payload: List[Any]) -> 'IndexEntry':
+        size, length, front_matter_span, front_matter, body_offset, sections, boundaries = payload
+        return cls(
+            content_hash=digest,
+            size=size,
+            length=length,
+            front_matter_span=tuple(front_matter_span) if front_matter_span else None,
+            front_matter=front_matter,
+            body_offset=body_offset,
+            sections=[Section(level=s[0], title=s[1], start=s[2], body_start=s[3], end=s[4], parent=s[5])
+                      for s in sections],
+            boundaries=boundaries
+        )
+
+
+class IndexedFile:
+    """A file on disk and its index entry; slices are read on demand."""
+
+    def __init__(self, path: Path, entry: IndexEntry, normalized: bool = False):
+        self.path = Path(path)
+        self.entry = entry
+        # CR line endings: offsets refer to the normalized text, not the raw file
+        self.normalized = normalized
+
+    @property
+    def sections(self) -> List[Section]:
+        return self.entry.sections
+
+    def find_sections(self, predicate: Callable[[Section], bool]) -> List[Section]:
+        """Sections matching a predicate, in document order."""
+        return [section for section in self.entry.sections if predicate(section)]
+
+    def read_bytes(self, start: int, end: int) -> bytes:
+        """Canonical bytes ``[start, end)`` of the file."""
+        if self.normalized:
+            with open(self.path, 'rb') as f:
+                return decode_content(f.read()).encode('utf-8')[start:end]
+        if end <= start:
+            return b''
+        with open(self.path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return mapped[start:end]
+
+    def read_text(self, start: int, end: int) -> str:
+        return self.read_bytes(start, end).decode('utf-8')
+
+    def section_text(self, section: Section) -> str:
+        """Content owned by a section, excluding its heading line."""
+        return self.read_text(section.body_start, section.end)
+
+    @property
+    def front_matter_text(self) -> Optional[str]:
+        span = self.entry.front_matter_text_span
+        return self.read_text(*span) if span else None
+
+    @property
+    def front_matter(self) -> Dict[str, str]:
+        return self.entry.front_matter
+
+
+class SectionIndex:
+    """Persistent section index shared by every tool using one cache directory."""
+
+    def __init__(self, cache_dir: Path):
+        self.store = open_result_store(cache_dir)
+        version = source_version(__file__, document_model.__file__)
+        self.entries = self.store.table(INDEX_TABLE, version)
+        self.paths = self.store.table(PATH_TABLE, version)
+        self.hits = 0
+        self.misses = 0
+        self.stat_hits = 0
+
+    def get(self, digest: str) -> Optional[IndexEntry]:
+        """Entry for a content hash, if indexed."""
+        payload = self.entries.get(digest, digest)
+        if payload is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return IndexEntry.from_payload(digest, payload)
+
+    def put(self, entry: IndexEntry) -> None:
+        self.entries.put(entry.content_hash, entry.content_hash, entry.to_payload())
+
+    # DocumentCache hooks
+    def document_for(self, content: str, digest: str) -> Optional[ParsedDocument]:
+        """Rebuild a parsed document from the index, or None if the content is new."""
+        entry = self.get(digest)
+        return entry.to_document(content) if entry is not None else None
+
+    def record(self, document: ParsedDocument) -> None:
+        """Index a freshly parsed document."""
+        self.put(IndexEntry.from_document(document))
+
+    def lookup(self, file_path: Union[str, Path]) -> IndexedFile:
+        """Index entry for a file; unchanged files are served from their stat key alone."""
+        path_key = os.fspath(file_path)
+        stat_key = _stat_key(os.stat(path_key))
+        known = self.paths.get(path_key, stat_key)
+        if known is not None:
+            entry = self.get(known['hash'])
+            if entry is not None:
+                self.stat_hits += 1
+                return IndexedFile(Path(path_key), entry, known['normalized'])
+
+        with open(path_key, 'rb') as f:
+            data = f.read()
+        normalized = b'\r' in data
+        text = decode_content(data)
+        canonical = text.encode('utf-8') if normalized else data
+        digest = content_hash(canonical)
+
+        entry = self.get(digest)
+        if entry is None:
+            # Reuses an in-memory parse of the same content when there is one
+            document = get_document_cache().parse_bytes(data)
+            entry = IndexEntry.from_document(document)
+            self.put(entry)
+        self.paths.put(path_key, stat_key, {'hash': digest, 'normalized': normalized})
+        return IndexedFile(Path(path_key), entry, normalized)
+
+    def save(self) -> None:
+        """Flush buffered index writes."""
+        self.store.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        hit_rate = (self.hits / total * 100) if total > 0 else 0
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'stat_hits': self.stat_hits,
+            'hit_rate': f"{hit_rate:.1f}%"
+        }
+
+
+def attach_section_index(cache_dir: Path) -> SectionIndex:
+    """Back the process-wide document cache with the persistent index for ``cache_dir``."""
+    index = SectionIndex(cache_dir)
+    get_document_cache().attach_index(index)
+    return index
+
+
+__all__ = [
+    'INDEX_TABLE',
+    'PATH_TABLE',
+    'IndexEntry',
+    'IndexedFile',
+    'SectionIndex',
+    'attach_section_index'
+]
@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Section Scan Benchmark
+======================
+
+Compares capability extraction with whole-content regexes against the
+boundary-sliced section scan:
+- Identical output check on the real agents (when present) and every synthetic file
+- Per-file time as files grow from a few KiB to hundreds of KiB, both for the
+  pattern phase alone and for the whole extraction (which also categorizes)
+- The tokenizer (heading tree + boundary index) is included in the sliced time
+
+Exits non-zero if any file extracts differently, so it doubles as a guard
+for keeping ``PatternCompiler`` section heads in step with their patterns.
+
+Usage:
+    python3 scripts/performance/section_scan_benchmark.py [--sizes 4,64,512] [--agents N] [--repeat N]
+"""
+
+import argparse
+import json
+import logging
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+sys.path.append(str(Path(__file__).parent))
+from document_model import DocumentCache
+from parallel_capability_scanner import CapabilityExtractor, ParallelCapabilityScanner
+from scan_scaling_benchmark import write_synthetic_agents
+
+DEFAULT_SIZES = [4, 64, 512]
+
+
+def _comparable(info) -> Dict:
+    fields = info.to_dict()
+    fields.pop('processing_time')
+    return fields
+
+
+def _load_corpus(paths: List[Path]) -> List[Tuple[Path, str]]:
+    return [(path, path.read_text(encoding='utf-8')) for path in paths]
+
+
+def _extract_patterns(extractor: CapabilityExtractor, path: Path, document) -> None:
+    """Only the section pattern work of ``extract`` (no front matter or categorization)."""
+    fields: Dict[str, Any] = {}
+    extractor._extract_capabilities(document, fields)
+    extractor._extract_when_to_use(document, fields)
+    extractor._extract_coordination_patterns(document, fields)
+    extractor._extract_orchestration_notes(document, fields)
+
+
+def _time_extraction(extractor: CapabilityExtractor, corpus: List[Tuple[Path, str]], repeat: int,
+                     patterns_only: bool = False) -> float:
+    """Best-of-``repeat`` seconds to parse and extract the corpus from cold documents."""
+    best = float('inf')
+    for _ in range(repeat):
+        # A fresh cache per round: tokenizing is part of the cost being measured
+        documents = DocumentCache()
+        start = time.perf_counter()
+        for path, content in corpus:
+            if patterns_only:
+                _extract_patterns(extractor, path, documents.parse(content))
+            else:
+                extractor.extract(path, documents.parse(content))
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def check_identical(corpus: List[Tuple[Path, str]]) -> List[str]:
+    """Names of files whose extraction differs between the two paths."""
+    regex = CapabilityExtractor(use_sections=False)
+    sliced = CapabilityExtractor(use_sections=True)
+    mismatches = []
+    for path, content in corpus:
+        expected = _comparable(regex.extract(path, DocumentCache().parse(content)))
+        actual = _comparable(sliced.extract(path, DocumentCache().parse(content)))
+        if expected != actual:
+            mismatches.append(path.name)
+    return mismatches
+
+
+def benchmark_corpus(label: str, corpus: List[Tuple[Path, str]], repeat: int) -> Dict:
+    regex, sliced = CapabilityExtractor(use_sections=False), CapabilityExtractor(use_sections=True)
+    row = {'corpus': label, 'files': len(corpus), 'bytes': sum(len(content) for _, content in corpus)}
+    for phase, patterns_only in (('patterns', True), ('extract', False)):
+        regex_seconds = _time_extraction(regex, corpus, repeat, patterns_only)
+        section_seconds = _time_extraction(sliced, corpus, repeat, patterns_only)
+        row[f'{phase}_regex_ms_per_file'] = regex_seconds / len(corpus) * 1000
+        row[f'{phase}_section_ms_per_file'] = section_seconds / len(corpus) * 1000
+        row[f'{phase}_speedup'] = regex_seconds / section_seconds if section_seconds else 0.0
+    row['mismatches'] = check_identical(corpus)
+    return row
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark section-sliced capability extraction')
+    parser.add_argument('--sizes', default=','.join(str(s) for s in DEFAULT_SIZES),
+                        help='Comma-separated synthetic file sizes in KiB')
+    parser.add_argument('--agents', type=int, default=20, help='Synthetic agents per size')
+    parser.add_argument('--repeat', type=int, default=3, help='Timing rounds (best is reported)')
+    parser.add_argument('--json', action='store_true', help='Emit JSON instead of a table')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    project_root = Path(__file__).parent.parent.parent
+    agents_dir = project_root / 'system-configs' / '.claude' / 'agents'
+
+    rows = []
+    if agents_dir.is_dir():
+        scanner_skip = ParallelCapabilityScanner.SKIP_FILES
+        real = sorted(path for path in agents_dir.glob('*.md') if path.name not in scanner_skip)
+        if real:
+            rows.append(benchmark_corpus('real agents', _load_corpus(real), args.repeat))
+
+    with tempfile.TemporaryDirectory() as corpus_dir:
+        for size in [int(s) for s in args.sizes.split(',') if s]:
+            directory = Path(corpus_dir) / f"{size}kb"
+            write_synthetic_agents(directory, args.agents, size)
+            corpus = _load_corpus(sorted(directory.glob('*.md')))
+            rows.append(benchmark_corpus(f"synthetic {size} KiB", corpus, args.repeat))
+
+    if args.json:
+        print(json.dumps(rows, indent=2))
+    else:
+        print(f"{'':>27}{'patterns (ms/file)':^30}{'full extract (ms/file)':^30}")
+        print(f"{'corpus':>20} {'files':>6} " + f"{'regex':>9} {'section':>9} {'speedup':>9} " * 2 + " output")
+        for row in rows:
+            status = 'identical' if not row['mismatches'] else f"DIFFERS: {', '.join(row['mismatches'][:5])}"
+            timings = ''.join(
+                f"{row[f'{phase}_regex_ms_per_file']:>9.3f} {row[f'{phase}_section_ms_per_file']:>9.3f} "
+                f"{row[f'{phase}_speedup']:>8.2f}x "
+                for phase in ('patterns', 'extract')
+            )
+            print(f"{row['corpus']:>20} {row['files']:>6} {timings} {status}")
+
+    return 1 if any(row['mismatches'] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -12,6 +12,7 @@ Provides 60% performance improvement using only standard library modules:
 No external dependencies required - uses Python standard library only.
 """
 
+import argparse
 import asyncio
 import concurrent.futures
 import hashlib
@@ -21,31 +22,37 @@ import re
 import sys
 import time
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple, Any, Pattern
+from typing import Any, Callable, Dict, Iterator, List, Optional, Pattern, Tuple, Union
 import logging
 
 # Import compatibility layer
 sys.path.append(str(Path(__file__).parent))
 from performance_compat import (
-    async_open, MemoryMonitor, PerformanceCache,
+    async_open, read_many, io_stats, configure_io_executor, MemoryMonitor, PerformanceCache,
     FileHashCache, ConcurrentExecutor
 )
+from compact_records import CompactRecord, Field, TextList
+from document_model import ParsedDocument, parse_document
+from section_index import attach_section_index
+from file_watcher import FileWatcher, corpus_directories
+from pipeline import Stage, run_pipeline
+from tracing import add_trace_argument, finish_tracing, span, start_tracing, traced
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-class ValidationResult:
-    """Validation result with performance metrics."""
-
-    def __init__(self, agent_name: str, is_valid: bool, issues: List[str],
-                 validation_time: float, file_size: int, cached: bool = False):
-        self.agent_name = agent_name
-        self.is_valid = is_valid
-        self.issues = issues
-        self.validation_time = validation_time
-        self.file_size = file_size
-        self.cached = cached
+class ValidationResult(CompactRecord):
+    """Validation result with performance metrics (slotted; issues kept as plain text)."""
+    FIELDS = (
+        Field('agent_name'),
+        Field('is_valid'),
+        TextList('issues'),
+        Field('validation_time'),
+        Field('file_size'),
+        Field('cached', False)
+    )
+    __slots__ = CompactRecord.slots_for(FIELDS)
 
 class StdlibAsyncValidator:
     """High-performance validator using standard library only."""
@@ -71,7 +78,7 @@ class StdlibAsyncValidator:
 
         # Initialize caches
         self.result_cache = PerformanceCache(max_size=500)
-        self.file_cache = FileHashCache(cache_dir / 'validation_cache.json')
+        self.file_cache = FileHashCache(cache_dir)
 
         # Pre-compile regex patterns
         self.patterns = self._compile_patterns()
@@ -90,7 +97,6 @@ class StdlibAsyncValidator:
     def _compile_patterns(self) -> Dict[str, Pattern]:
         """Pre-compile regex patterns for performance."""
         return {
-            'yaml_section': re.compile(r'^---\n(.*?)\n---', re.DOTALL),
             'name_field': re.compile(r'^name:\s*(.+)$', re.MULTILINE),
             'description_field': re.compile(r'^description:\s*(.+)$', re.MULTILINE),
             'color_field': re.compile(r'^color:\s*(.+)$', re.MULTILINE),
@@ -106,61 +112,92 @@ class StdlibAsyncValidator:
 
     async def validate_file_async(self, file_path: Path) -> ValidationResult:
         """Validate single file with caching."""
-        start_time = time.time()
+        [item] = await self._read_stage([file_path])
+        return await self._validate_stage(await self._parse_stage(item))
+
+    async def _read_stage(self, file_paths: List[Path]) -> List[Union[ValidationResult, Tuple[Path, Any, str, float]]]:
+        """Pipeline stage: serve cached results, then read the remaining files in one batch."""
+        items: List[Any] = []
+        to_read = []
+        for file_path in file_paths:
+            start_time = time.time()
+
+            # Check cache first
+            with span('cache_lookup', file=file_path.name):
+                cache_key = self._get_cache_key(file_path)
+                cached_result = self.result_cache.get(cache_key)
+            if cached_result:
+                self.stats['cache_hits'] += 1
+                cached_result.cached = True
+                items.append(cached_result)
+                continue
+
+            self.stats['cache_misses'] += 1
+
+            # Skip non-agent files
+            if file_path.name in self.NON_AGENT_FILES:
+                result = ValidationResult(
+                    agent_name=file_path.stem,
+                    is_valid=True,
+                    issues=[],
+                    validation_time=time.time() - start_time,
+                    file_size=0
+                )
+                self.result_cache.put(cache_key, result)
+                items.append(result)
+                continue
+
+            items.append(None)
+            to_read.append((len(items) - 1, file_path, cache_key, start_time))
+
+        # One batched round trip to the shared I/O executor
+        contents = await read_many(file_path for _, file_path, _, _ in to_read)
+        for (index, file_path, cache_key, start_time), content in zip(to_read, contents):
+            if isinstance(content, Exception):
+                items[index] = ValidationResult(
+                    agent_name=file_path.stem,
+                    is_valid=False,
+                    issues=[f"Failed to read file: {content}"],
+                    validation_time=time.time() - start_time,
+                    file_size=0
+                )
+            else:
+                items[index] = (file_path, content, cache_key, start_time)
 
-        # Check cache first
-        cache_key = self._get_cache_key(file_path)
-        cached_result = self.result_cache.get(cache_key)
-        if cached_result:
-            self.stats['cache_hits'] += 1
-            cached_result.cached = True
-            return cached_result
+        return items
 
-        self.stats['cache_misses'] += 1
+    async def _parse_stage(self, item: Union[ValidationResult, Tuple[Path, Any, str, float]]):
+        """Pipeline stage: parse once through the shared document cache."""
+        if isinstance(item, ValidationResult):
+            return item
+        file_path, content, cache_key, start_time = item
+        return (file_path, parse_document(content), cache_key, start_time)
 
-        # Skip non-agent files
-        if file_path.name in self.NON_AGENT_FILES:
-            result = ValidationResult(
-                agent_name=file_path.stem,
-                is_valid=True,
-                issues=[],
-                validation_time=time.time() - start_time,
-                file_size=0
-            )
-            self.result_cache.put(cache_key, result)
-            return result
-
-        # Read and validate file
-        try:
-            async with async_open(file_path, 'r') as f:
-                content = await f.read()
-        except Exception as e:
-            result = ValidationResult(
-                agent_name=file_path.stem,
-                is_valid=False,
-                issues=[f"Failed to read file: {e}"],
-                validation_time=time.time() - start_time,
-                file_size=0
-            )
-            return result
+    async def _validate_stage(self, item: Union[ValidationResult, Tuple[Path, Any, str, float]]) -> ValidationResult:
+        """Pipeline stage: run the validation rules and cache the result."""
+        if isinstance(item, ValidationResult):
+            return item
+        file_path, document, cache_key, start_time = item
 
         # Perform validation
-        result = await self._validate_content(file_path, content, start_time)
+        with span('rules', file=file_path.name):
+            result = await self._validate_content(file_path, document, start_time)
 
         # Cache result
-        self.result_cache.put(cache_key, result)
+        with span('cache_store'):
+            self.result_cache.put(cache_key, result)
 
         return result
 
-    async def _validate_content(self, file_path: Path, content: str, start_time: float) -> ValidationResult:
+    async def _validate_content(self, file_path: Path, document: ParsedDocument, start_time: float) -> ValidationResult:
         """Validate file content."""
         agent_name = file_path.stem
         issues = []
+        content = document.content
         file_size = len(content)
 
-        # Extract YAML section
-        yaml_match = self.patterns['yaml_section'].match(content)
-        if not yaml_match:
+        # YAML section comes from the shared document parse
+        if not document.has_front_matter:
             issues.append("No YAML front-matter found (missing --- delimiters)")
             return ValidationResult(
                 agent_name=agent_name,
@@ -170,7 +207,7 @@ class StdlibAsyncValidator:
                 file_size=file_size
             )
 
-        yaml_section = yaml_match.group(1)
+        yaml_section = document.front_matter_text
 
         # Run validation checks concurrently
         loop = asyncio.get_event_loop()
@@ -201,6 +238,7 @@ class StdlibAsyncValidator:
             file_size=file_size
         )
 
+    @traced(category='rule')
     def _validate_required_fields(self, yaml_section: str) -> List[str]:
         """Validate required YAML fields."""
         issues = []
@@ -218,6 +256,7 @@ class StdlibAsyncValidator:
 
         return issues
 
+    @traced(category='rule')
     def _validate_field_values(self, yaml_section: str) -> List[str]:
         """Validate specific field values."""
         issues = []
@@ -231,6 +270,7 @@ class StdlibAsyncValidator:
 
         return issues
 
+    @traced(category='rule')
     def _validate_name_consistency(self, agent_name: str, yaml_section: str) -> List[str]:
         """Validate name field matches filename."""
         issues = []
@@ -243,6 +283,7 @@ class StdlibAsyncValidator:
 
         return issues
 
+    @traced(category='rule')
     def _validate_description_length(self, yaml_section: str) -> List[str]:
         """Validate description length."""
         issues = []
@@ -255,6 +296,7 @@ class StdlibAsyncValidator:
 
         return issues
 
+    @traced(category='rule')
     def _validate_domain_expertise(self, yaml_section: str) -> List[str]:
         """Validate domain expertise list."""
         issues = []
@@ -265,6 +307,7 @@ class StdlibAsyncValidator:
 
         return issues
 
+    @traced(category='rule')
     def _validate_security_boundaries(self, content: str) -> List[str]:
         """Validate SYSTEM BOUNDARY protection."""
         issues = []
@@ -277,38 +320,54 @@ class StdlibAsyncValidator:
 
         return issues
 
-    async def validate_agents_parallel(self, agents_dir: Path) -> List[ValidationResult]:
-        """Validate all agents with maximum parallelism."""
-        # Get all agent files
-        agent_files = [
-            f for f in agents_dir.glob('*.md')
-            if f.name not in self.NON_AGENT_FILES
-        ]
+    def discover_agent_files(self, agents_dir: Path) -> Iterator[Path]:
+        """Lazily yield agent files from a single directory scan."""
+        with os.scandir(agents_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.md') and entry.name not in self.NON_AGENT_FILES and entry.is_file():
+                    yield Path(entry.path)
+
+    async def validate_agents_parallel(self, agents_dir: Path, max_in_flight: int = 64,
+                                       on_result: Optional[Callable[[ValidationResult], None]] = None) -> List[ValidationResult]:
+        """Validate all agents through a bounded read -> parse -> validate pipeline.
 
-        logger.info(f"Validating {len(agent_files)} agent files with parallel execution...")
+        At most ``max_in_flight`` files are held between discovery and the
+        sink; ``on_result`` sees each result as soon as it completes.
+        """
+        logger.info(f"Validating agent files with a pipeline of {max_in_flight} in flight...")
 
         # Track performance
         start_time = time.time()
 
-        # Create validation tasks
-        tasks = [self.validate_file_async(agent_file) for agent_file in agent_files]
+        validation_results: List[ValidationResult] = []
 
-        # Execute all validations concurrently
-        results = await asyncio.gather(*tasks, return_exceptions=True)
+        def sink(result: ValidationResult):
+            validation_results.append(result)
+            if on_result is not None:
+                on_result(result)
 
-        # Process results
-        validation_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                validation_results.append(ValidationResult(
-                    agent_name=agent_files[i].stem,
-                    is_valid=False,
-                    issues=[f"Validation exception: {result}"],
-                    validation_time=0,
-                    file_size=0
-                ))
-            else:
-                validation_results.append(result)
+        def on_error(file_path: Path, error: BaseException) -> ValidationResult:
+            return ValidationResult(
+                agent_name=file_path.stem,
+                is_valid=False,
+                issues=[f"Validation exception: {error}"],
+                validation_time=0,
+                file_size=0
+            )
+
+        with span('validate_agents', 'run'):
+            pipeline_stats = await run_pipeline(
+                self.discover_agent_files(agents_dir),
+                [
+                    Stage('read', self._read_stage, workers=4, batch_size=16),
+                    Stage('parse', self._parse_stage),
+                    Stage('validate', self._validate_stage, workers=8),
+                ],
+                sink,
+                max_in_flight=max_in_flight,
+                on_error=on_error
+            )
+        logger.info(f"Validated {pipeline_stats.items} agent files (peak in flight: {pipeline_stats.peak_in_flight})")
 
         # Update stats
         total_time = time.time() - start_time
@@ -319,6 +378,7 @@ class StdlibAsyncValidator:
         hit_rate = (self.stats['cache_hits'] / (self.stats['cache_hits'] + self.stats['cache_misses']) * 100) if (self.stats['cache_hits'] + self.stats['cache_misses']) > 0 else 0
         logger.info(f"Validation completed in {total_time:.2f}s")
         logger.info(f"Cache hit rate: {hit_rate:.1f}%")
+        logger.info(f"I/O queue wait vs read time: {io_stats.get_stats()}")
 
         return validation_results
 
@@ -333,7 +393,9 @@ class StdlibAsyncValidator:
             'hit_rate': f"{hit_rate:.1f}%",
             'total_validations': self.stats['total_validations'],
             'total_time': self.stats['total_time'],
-            'cache_size': self.result_cache.size()
+            'cache_size': self.result_cache.size(),
+            'cache_evictions': self.result_cache.evictions,
+            'io': io_stats.get_stats()
         }
 
     def cleanup(self):
@@ -343,18 +405,36 @@ class StdlibAsyncValidator:
 
 async def main():
     """Main execution function."""
+    parser = argparse.ArgumentParser(description='High-performance agent validation (standard library)')
+    parser.add_argument('--watch', action='store_true',
+                        help='Stay running and re-validate agents as they are saved')
+    parser.add_argument('--poll-interval', type=float, default=0.5,
+                        help='Polling interval in seconds when inotify is unavailable')
+    parser.add_argument('--io-workers', type=int, default=None,
+                        help='Size of the shared file I/O thread pool')
+
     # Setup paths
     script_dir = Path(__file__).parent.parent
     project_root = script_dir.parent
     agents_dir = project_root / 'system-configs' / '.claude' / 'agents'
     cache_dir = project_root / '.cache'
 
+    add_trace_argument(parser, project_root / '.tmp' / 'reports' / 'stdlib-validation-trace.json')
+    args = parser.parse_args()
+
+    if args.io_workers:
+        configure_io_executor(args.io_workers)
+
     if not agents_dir.exists():
         print(f"Error: Agents directory not found at {agents_dir}")
         sys.exit(1)
 
-    # Initialize validator
+    if args.trace:
+        start_tracing()
+
+    # Initialize validator; unchanged agents are rebuilt from the section index, not re-parsed
     validator = StdlibAsyncValidator(cache_dir)
+    attach_section_index(cache_dir)
 
     try:
         print("High-Performance Agent Validation (Standard Library)")
@@ -364,11 +444,16 @@ async def main():
         results = await validator.validate_agents_parallel(agents_dir)
 
         # Generate report
-        await generate_validation_report(results, validator.get_stats(), project_root)
+        with span('report'):
+            await generate_validation_report(results, validator.get_stats(), project_root)
 
         # Print summary
         print_validation_summary(results, validator.get_stats())
 
+        if args.watch:
+            await watch_agents(validator, agents_dir, project_root, results, args.poll_interval)
+            return 0
+
         # Check if all validations passed
         failed_count = sum(1 for r in results if not r.is_valid)
 
@@ -381,6 +466,53 @@ async def main():
 
     finally:
         validator.cleanup()
+        finish_tracing(args.trace)
+
+async def watch_agents(validator: StdlibAsyncValidator, agents_dir: Path, project_root: Path,
+                       results: List[ValidationResult], poll_interval: float):
+    """Keep the corpus hot and re-validate only the agents that change."""
+    results_by_path = {agents_dir / f"{r.agent_name}.md": r for r in results}
+    watcher = FileWatcher(corpus_directories(project_root), poll_interval=poll_interval)
+    print(f"\n👀 Watching {len(watcher.directories)} directories ({watcher.backend}) - Ctrl-C to stop")
+
+    try:
+        async for changed in watcher.changes():
+            start_time = time.perf_counter()
+            affected = sorted(
+                path for path in changed
+                if path.parent == agents_dir and path.name not in validator.NON_AGENT_FILES
+            )
+            if not affected:
+                continue
+
+            present = [path for path in affected if path.exists()]
+            for path in affected:
+                if path not in present and results_by_path.pop(path, None) is not None:
+                    print(f"🗑️  {path.stem}: removed")
+
+            updated = await asyncio.gather(
+                *(validator.validate_file_async(path) for path in present), return_exceptions=True
+            )
+            for path, result in zip(present, updated):
+                if isinstance(result, Exception):
+                    result = ValidationResult(
+                        agent_name=path.stem,
+                        is_valid=False,
+                        issues=[f"Validation exception: {result}"],
+                        validation_time=0,
+                        file_size=0
+                    )
+                results_by_path[path] = result
+                print(f"{'✅' if result.is_valid else '❌'} {result.agent_name}")
+                for issue in result.issues:
+                    print(f"   - {issue}")
+
+            elapsed_ms = (time.perf_counter() - start_time) * 1000
+            failing = sum(1 for r in results_by_path.values() if not r.is_valid)
+            print(f"   {len(present)} re-validated in {elapsed_ms:.1f}ms - "
+                  f"{failing}/{len(results_by_path)} agents with issues")
+    finally:
+        watcher.close()
 
 async def generate_validation_report(results: List[ValidationResult], stats: Dict, project_root: Path):
     """Generate validation report."""
@@ -483,5 +615,8 @@ def print_validation_summary(results: List[ValidationResult], stats: Dict):
     print(f"Performance: ~60% improvement through concurrency")
 
 if __name__ == '__main__':
-    exit_code = asyncio.run(main())
+    try:
+        exit_code = asyncio.run(main())
+    except KeyboardInterrupt:
+        exit_code = 0
     sys.exit(exit_code)
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Synthetic Corpus Generator
+==========================
+
+Deterministic agent, skill and command markdown for scaling tests:
+- Same layout as ``system-configs`` (``.claude/agents``, ``.claude/skills/<name>/SKILL.md``,
+  ``.claude/commands``, ``CLAUDE.md`` routing table)
+- Agents follow AGENT_TEMPLATE.md (front matter, required sections, SYSTEM BOUNDARY),
+  with a configurable share carrying the defects the validators look for
+- Log-normal file size distribution (median, spread, cap)
+- Weighted mix of extra sections: capability bullets, prose, coordination, code blocks
+- Cross-references (Task:, "use the X agent", /commands) at a configurable density per KiB,
+  with a small share pointing at agents that do not exist
+
+Output depends only on the spec: every file draws from its own seeded
+stream, so two runs with the same spec write byte-identical trees.
+
+Usage:
+    python3 scripts/performance/synthetic_corpus.py OUTPUT_DIR [--agents N] [--skills N] [--commands N]
+"""
+
+import argparse
+import math
+import random
+import sys
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List
+
+_DOMAINS = ('backend', 'frontend', 'data', 'platform', 'security', 'mobile', 'cloud', 'api', 'test', 'ml')
+_ROLES = ('engineer', 'architect', 'auditor', 'analyst', 'reviewer', 'writer', 'designer', 'lead')
+_WORDS = ('api', 'database', 'security', 'performance', 'testing', 'cloud', 'pipeline', 'react',
+          'monitoring', 'architecture', 'requirements', 'analytics', 'deployment', 'schema',
+          'migration', 'latency', 'caching', 'kubernetes', 'observability', 'accessibility')
+_TOOLS = ('Read', 'Write', 'Edit', 'Grep', 'Glob', 'Bash', 'WebFetch')
+_COLORS = ('blue', 'green', 'purple', 'orange', 'red', 'cyan')
+_CATEGORIES = ('development', 'quality', 'infrastructure', 'analysis', 'documentation')
+
+DEFAULT_SECTION_MIX = {
+    'capabilities': 3.0,
+    'when_to_use': 2.0,
+    'coordination': 2.0,
+    'expertise': 2.0,
+    'orchestration': 1.0,
+    'prose': 2.0,
+    'code': 1.0
+}
+
+# Kinds of defect given to the ``invalid_ratio`` share of agents
+_DEFECTS = ('missing_description', 'deprecated_field', 'missing_boundary', 'missing_section')
+
+
+@dataclass
+class CorpusSpec:
+    """Shape of a synthetic corpus."""
+    agents: int = 100
+    skills: int = 20
+    commands: int = 10
+    median_kb: float = 1.6
+    size_sigma: float = 0.6          # log-normal spread of file sizes
+    max_kb: float = 256.0
+    section_mix: Dict[str, float] = field(default_factory=lambda: dict(DEFAULT_SECTION_MIX))
+    reference_density: float = 2.0   # cross-references per KiB
+    dangling_ratio: float = 0.02     # references to agents that do not exist
+    invalid_ratio: float = 0.05      # agents with a template defect
+    seed: int = 7
+
+
+@dataclass
+class Corpus:
+    """A generated corpus on disk."""
+    root: Path
+    agent_names: List[str]
+    skill_names: List[str]
+    command_names: List[str]
+    files: int = 0
+    bytes: int = 0
+
+    @property
+    def claude_dir(self) -> Path:
+        return self.root / 'system-configs' / '.claude'
+
+    @property
+    def agents_dir(self) -> Path:
+        return self.claude_dir / 'agents'
+
+    @property
+    def skills_dir(self) -> Path:
+        return self.claude_dir / 'skills'
+
+    @property
+    def commands_dir(self) -> Path:
+        return self.claude_dir / 'commands'
+
+    @property
+    def claude_md(self) -> Path:
+        return self.root / 'system-configs' / 'CLAUDE.md'
+
+
+def _letters(index: int) -> str:
+    """Index as lower-case letters (a, b, ..., z, ba, bb, ...), so names keep the word-word shape."""
+    letters = ''
+    while True:
+        index, digit = divmod(index, 26)
+        letters = chr(ord('a') + digit) + letters
+        if index == 0:
+            return letters
+
+
+def agent_name(index: int) -> str:
+    """Deterministic agent name for an index."""
+    return f"{_DOMAINS[index % len(_DOMAINS)]}-{_ROLES[index // len(_DOMAINS) % len(_ROLES)]}-{_letters(index)}"
+
+
+def skill_name(index: int) -> str:
+    return f"{_WORDS[index % len(_WORDS)]}-{_letters(index)}"
+
+
+def command_name(index: int) -> str:
+    return f"{_ROLES[index % len(_ROLES)]}-{_letters(index)}"
+
+
+class _Writer:
+    """Generates one file from its own random stream."""
+
+    def __init__(self, spec: CorpusSpec, corpus: Corpus, stream: str):
+        self.spec = spec
+        self.corpus = corpus
+        self.rng = random.Random(f"{spec.seed}:{stream}")
+        mix = [(name, weight) for name, weight in spec.section_mix.items() if weight > 0 and name in _SECTIONS]
+        self._section_names = [name for name, _ in mix]
+        self._section_weights = [weight for _, weight in mix]
+        self._references = 0.0
+
+    def target_bytes(self) -> int:
+        """File size drawn from the log-normal size distribution."""
+        kb = self.spec.median_kb * math.exp(self.spec.size_sigma * self.rng.gauss(0.0, 1.0))
+        return int(min(self.spec.max_kb, max(0.5, kb)) * 1024)
+
+    def words(self, count: int) -> str:
+        return ' '.join(self.rng.choice(_WORDS) for _ in range(count))
+
+    def agent_reference(self) -> str:
+        if not self.corpus.agent_names or self.rng.random() < self.spec.dangling_ratio:
+            return f"ghost-{self.rng.choice(_ROLES)}-{_letters(self.rng.randrange(26 ** 3))}"
+        return self.rng.choice(self.corpus.agent_names)
+
+    def reference(self) -> str:
+        """One cross-reference line."""
+        choice = self.rng.randrange(6)
+        if choice == 0 and self.corpus.command_names:
+            return f"Run /{self.rng.choice(self.corpus.command_names)} before {self.words(2)}."
+        if choice == 1 and self.corpus.skill_names:
+            return f"Then `/{self.rng.choice(self.corpus.skill_names)}` to finish {self.words(1)}."
+        name = self.agent_reference()
+        return (
+            f"Task: {name}",
+            f"Use the {name} agent for {self.words(2)} work.",
+            f"Assignee: [{name}]",
+            f"Pair with {self.agent_reference()} + {name} on {self.words(2)}.",
+            f"Use the {name} agent for {self.words(3)}.",
+            f"Task: {name}"
+        )[choice]
+
+    def with_references(self, lines: List[str]) -> List[str]:
+        """Interleave cross-references into ``lines`` at the configured density."""
+        size_kb = sum(len(line) + 1 for line in lines) / 1024
+        self._references += self.spec.reference_density * size_kb
+        result = list(lines)
+        while self._references >= 1.0:
+            result.insert(self.rng.randrange(len(result) + 1), self.reference())
+            self._references -= 1.0
+        return result
+
+    def section(self) -> str:
+        name = self.rng.choices(self._section_names, self._section_weights)[0]
+        return _SECTIONS[name](self)
+
+    def fill(self, parts: List[str], target: int) -> str:
+        """Append weighted extra sections until ``target`` bytes."""
+        size = sum(len(part) for part in parts)
+        while size < target and self._section_names:
+            part = self.section()
+            parts.append(part)
+            size += len(part)
+        return ''.join(parts)
+
+
+def _bullets(writer: _Writer, title: str, count: int) -> str:
+    lines = [f"- {writer.words(6)}" for _ in range(count)]
+    return f"\n{title}\n" + '\n'.join(writer.with_references(lines)) + '\n'
+
+
+def _prose(writer: _Writer) -> str:
+    sentences = [f"{writer.words(12).capitalize()}." for _ in range(writer.rng.randint(3, 8))]
+    return f"\n## {writer.words(2).title()}\n\n" + ' '.join(writer.with_references(sentences)) + '\n'
+
+
+def _code(writer: _Writer) -> str:
+    lines = [f"{writer.rng.choice(_WORDS)}_{index} = run('{writer.words(2)}')  # ## not a heading"
+             for index in range(writer.rng.randint(4, 12))]
+    return "\n### Example\n\n```python\n" + '\n'.join(lines) + "\n```\n"
+
+
+_SECTIONS: Dict[str, Callable[[_Writer], str]] = {
+    'capabilities': lambda w: _bullets(w, '## Core Capabilities', w.rng.randint(4, 10)),
+    'when_to_use': lambda w: _bullets(w, '## When to Use', w.rng.randint(3, 6)),
+    'coordination': lambda w: _bullets(w, '## Coordination', w.rng.randint(3, 6)),
+    'expertise': lambda w: _bullets(w, '### Technical Expertise', w.rng.randint(4, 8)),
+    'orchestration': lambda w: _bullets(w, '## Orchestration Notes', w.rng.randint(2, 5)),
+    'prose': _prose,
+    'code': _code
+}
+
+
+def _agent(spec: CorpusSpec, corpus: Corpus, index: int) -> str:
+    writer = _Writer(spec, corpus, f"agent:{index}")
+    rng = writer.rng
+    name = corpus.agent_names[index]
+    defect = rng.choice(_DEFECTS) if rng.random() < spec.invalid_ratio else None
+
+    front_matter = [f"name: {name}"]
+    if defect != 'missing_description':
+        front_matter.append(f"description: {writer.words(8).capitalize()}")
+    front_matter.append(f"tools: {', '.join(rng.sample(_TOOLS, rng.randint(2, 5)))}")
+    front_matter.append(f"color: {rng.choice(_COLORS)}")
+    front_matter.append(f"category: {rng.choice(_CATEGORIES)}")
+    if defect == 'deprecated_field':
+        front_matter.append(f"specialization_level: {rng.randint(1, 5)}")
+
+    sections = [
+        ('## Identity', [f"You are a {name.replace('-', ' ')} focused on {writer.words(4)}."]),
+        ('## Core Capabilities', [f"- {writer.words(6)}" for _ in range(5)]),
+        ('## When to Engage', [f"- {writer.words(5)}" for _ in range(4)]),
+        ('## When NOT to Engage', [f"- {writer.words(5)}" for _ in range(3)]),
+        ('## Coordination', writer.with_references([f"- {writer.words(5)}" for _ in range(3)])),
+        ('## SYSTEM BOUNDARY', ["This agent cannot invoke other agents or create Task calls.",
+                                "NO Task tool access allowed. Only Claude has orchestration authority."])
+    ]
+    if defect == 'missing_section':
+        sections.pop(rng.randrange(1, 4))
+    elif defect == 'missing_boundary':
+        sections[-1] = ('## Boundaries', [f"- {writer.words(5)}"])
+
+    parts = ['---\n' + '\n'.join(front_matter) + '\n---\n\n', f"# {name.replace('-', ' ').title()}\n"]
+    parts.extend(f"\n{title}\n\n" + '\n'.join(lines) + '\n' for title, lines in sections)
+    return writer.fill(parts, writer.target_bytes())
+
+
+def _skill(spec: CorpusSpec, corpus: Corpus, index: int) -> str:
+    writer = _Writer(spec, corpus, f"skill:{index}")
+    name = corpus.skill_names[index]
+    parts = [
+        f"---\nname: {name}\ndescription: {writer.words(8).capitalize()}\n---\n\n# {name}\n",
+        _bullets(writer, '## Workflow', writer.rng.randint(4, 8))
+    ]
+    return writer.fill(parts, writer.target_bytes())
+
+
+def _command(spec: CorpusSpec, corpus: Corpus, index: int) -> str:
+    writer = _Writer(spec, corpus, f"command:{index}")
+    name = corpus.command_names[index]
+    parts = [
+        f"---\ndescription: {writer.words(8).capitalize()}\nargument-hint: [{writer.words(1)}]\n---\n\n# /{name}\n",
+        _bullets(writer, '## Steps', writer.rng.randint(3, 6))
+    ]
+    return writer.fill(parts, writer.target_bytes())
+
+
+def _routing_table(spec: CorpusSpec, corpus: Corpus) -> str:
+    writer = _Writer(spec, corpus, 'claude-md')
+    rows = ["| Keywords | Agents |", "|---|---|"]
+    for _ in range(max(1, len(corpus.agent_names) // 2)):
+        agents = ' + '.join(writer.agent_reference() for _ in range(writer.rng.randint(1, 2)))
+        rows.append(f"| {writer.words(1)}, {writer.words(1)} | {agents} |")
+    return "# Claude Configuration\n\n## Routing\n\n" + '\n'.join(rows) + '\n'
+
+
+def write_corpus(root: Path, spec: CorpusSpec) -> Corpus:
+    """Write the corpus described by ``spec`` under ``root``."""
+    corpus = Corpus(
+        root=Path(root),
+        agent_names=[agent_name(index) for index in range(spec.agents)],
+        skill_names=[skill_name(index) for index in range(spec.skills)],
+        command_names=[command_name(index) for index in range(spec.commands)]
+    )
+    corpus.agents_dir.mkdir(parents=True, exist_ok=True)
+    corpus.skills_dir.mkdir(parents=True, exist_ok=True)
+    corpus.commands_dir.mkdir(parents=True, exist_ok=True)
+
+    def write(path: Path, content: str) -> None:
+        path.write_text(content, encoding='utf-8')
+        corpus.files += 1
+        corpus.bytes += len(content.encode('utf-8'))
+
+    for index, name in enumerate(corpus.agent_names):
+        write(corpus.agents_dir / f"{name}.md", _agent(spec, corpus, index))
+    for index, name in enumerate(corpus.skill_names):
+        (corpus.skills_dir / name).mkdir(exist_ok=True)
+        write(corpus.skills_dir / name / 'SKILL.md', _skill(spec, corpus, index))
+    for index, name in enumerate(corpus.command_names):
+        write(corpus.commands_dir / f"{name}.md", _command(spec, corpus, index))
+    write(corpus.claude_md, _routing_table(spec, corpus))
+    return corpus
+
+
+def parse_section_mix(text: str) -> Dict[str, float]:
+    """``name=weight,name=weight`` (unlisted sections keep their default weight)."""
+    mix = dict(DEFAULT_SECTION_MIX)
+    for item in filter(None, (part.strip() for part in text.split(','))):
+        name, _, weight = item.partition('=')
+        if name not in _SECTIONS:
+            raise ValueError(f"Unknown section kind: {name!r} (expected one of {', '.join(_SECTIONS)})")
+        mix[name] = float(weight)
+    return mix
+
+
+def add_spec_arguments(parser: argparse.ArgumentParser) -> None:
+    """Corpus shape options shared by the generator and the benchmarks."""
+    defaults = CorpusSpec()
+    parser.add_argument('--median-kb', type=float, default=defaults.median_kb, help='Median file size in KiB')
+    parser.add_argument('--size-sigma', type=float, default=defaults.size_sigma,
+                        help='Log-normal spread of file sizes (0 = all files the median size)')
+    parser.add_argument('--max-kb', type=float, default=defaults.max_kb, help='Largest file size in KiB')
+    parser.add_argument('--section-mix', default='',
+                        help=f"Extra section weights, e.g. prose=4,code=0 ({', '.join(DEFAULT_SECTION_MIX)})")
+    parser.add_argument('--reference-density', type=float, default=defaults.reference_density,
+                        help='Cross-references per KiB')
+    parser.add_argument('--invalid-ratio', type=float, default=defaults.invalid_ratio,
+                        help='Share of agents with a template defect')
+    parser.add_argument('--seed', type=int, default=defaults.seed, help='Corpus seed')
+
+
+def spec_from_args(args: argparse.Namespace, agents: int, skills: int, commands: int) -> CorpusSpec:
+    return CorpusSpec(
+        agents=agents,
+        skills=skills,
+        commands=commands,
+        median_kb=args.median_kb,
+        size_sigma=args.size_sigma,
+        max_kb=args.max_kb,
+        section_mix=parse_section_mix(args.section_mix),
+        reference_density=args.reference_density,
+        invalid_ratio=args.invalid_ratio,
+        seed=args.seed
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate a synthetic agent/skill/command corpus')
+    parser.add_argument('output', type=Path, help='Directory to write system-configs/ into')
+    parser.add_argument('--agents', type=int, default=100, help='Agent files')
+    parser.add_argument('--skills', type=int, default=20, help='Skill directories')
+    parser.add_argument('--commands', type=int, default=10, help='Command files')
+    add_spec_arguments(parser)
+    args = parser.parse_args()
+
+    try:
+        spec = spec_from_args(args, args.agents, args.skills, args.commands)
+    except ValueError as e:
+        parser.error(str(e))
+    corpus = write_corpus(args.output, spec)
+    print(f"Wrote {corpus.files} files ({corpus.bytes / 1024 / 1024:.1f} MiB) to {corpus.root / 'system-configs'}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
@@ -0,0 +1,295 @@
+#!/usr/bin/env python3
+"""
+Stage Tracing
+=============
+
+Lightweight nested timing spans for the validators, scanner and standardizer:
+- ``with span('read', file=name):`` records one stage; spans nest naturally
+- One lane per pipeline worker, per thread and per concurrently running
+  file task, so overlapping work shows up side by side
+- Spans recorded in worker processes are shipped back and merged
+- Chrome trace-event JSON export, viewable in Perfetto or chrome://tracing
+
+Tracing is off by default: ``span()`` then returns a shared no-op context
+manager, so instrumented code pays one global lookup per stage.
+"""
+
+import asyncio
+import functools
+import heapq
+import inspect
+import json
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# asyncio's default task names; such tasks share packed lanes instead of one lane each
+_DEFAULT_TASK_NAME = re.compile(r'^Task-\d+$')
+
+
+class _NoopSpan:
+    """Stand-in returned while tracing is disabled."""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def annotate(self, **args: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Span:
+    """One timed stage; records a complete ('X') trace event on exit."""
+    __slots__ = ('tracer', 'name', 'category', 'args', 'start_ns', 'lane')
+
+    def __init__(self, tracer: 'Tracer', name: str, category: str, args: Dict[str, Any]):
+        self.tracer = tracer
+        self.name = name
+        self.category = category
+        self.args = args
+        self.start_ns = 0
+        self.lane = 0
+
+    def __enter__(self) -> 'Span':
+        self.lane = self.tracer._enter()
+        self.start_ns = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        end_ns = time.perf_counter_ns()
+        if exc_type is not None:
+            self.args['error'] = exc_type.__name__
+        self.tracer._record(self, end_ns)
+        return False
+
+    def annotate(self, **args: Any) -> None:
+        """Attach results (cache hit, sizes, ...) to the span."""
+        self.args.update(args)
+
+
+class Tracer:
+    """Collects spans from every task and thread of one process."""
+
+    def __init__(self):
+        self.pid = os.getpid()
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        # Lane bookkeeping: key -> [lane id, open span depth]
+        self._lanes: Dict[Tuple[str, int], List[int]] = {}
+        self._lane_names: Dict[int, str] = {}
+        self._named_lanes: Dict[str, int] = {}
+        self._free_slots: List[int] = []
+        self._slot_count = 0
+        self._next_lane = 1
+        # Lanes of spans merged from worker processes: (pid, lane) -> name
+        self._remote_names: Dict[Tuple[int, int], str] = {}
+
+    def _lane_key(self) -> Tuple[Tuple[str, int], Optional[str]]:
+        """Identity of the caller's lane and, for named tasks/threads, its label."""
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is not None:
+            name = task.get_name()
+            return ('task', id(task)), (None if _DEFAULT_TASK_NAME.match(name) else name)
+        thread = threading.current_thread()
+        return ('thread', threading.get_ident()), thread.name
+
+    def _new_lane(self, name: str) -> int:
+        lane = self._next_lane
+        self._next_lane += 1
+        self._lane_names[lane] = name
+        return lane
+
+    def _enter(self) -> int:
+        key, name = self._lane_key()
+        with self._lock:
+            entry = self._lanes.get(key)
+            if entry is None:
+                if name is not None:
+                    lane = self._named_lanes.get(name)
+                    if lane is None:
+                        lane = self._named_lanes[name] = self._new_lane(name)
+                elif self._free_slots:
+                    lane = heapq.heappop(self._free_slots)
+                else:
+                    self._slot_count += 1
+                    lane = self._new_lane(f"task {self._slot_count}")
+                entry = self._lanes[key] = [lane, 0]
+            entry[1] += 1
+            return entry[0]
+
+    def _record(self, span: Span, end_ns: int) -> None:
+        key, name = self._lane_key()
+        event = {
+            'name': span.name,
+            'cat': span.category,
+            'ph': 'X',
+            'ts': span.start_ns / 1000,
+            'dur': (end_ns - span.start_ns) / 1000,
+            'pid': self.pid,
+            'tid': span.lane
+        }
+        if span.args:
+            event['args'] = span.args
+        with self._lock:
+            self.events.append(event)
+            entry = self._lanes.get(key)
+            if entry is not None:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._lanes[key]
+                    # Unnamed task lanes go back to the pool once their outermost span closes
+                    if name is None:
+                        heapq.heappush(self._free_slots, span.lane)
+
+    def merge(self, events: List[Dict[str, Any]], lane_names: Dict[int, str]) -> None:
+        """Add spans recorded by another process (see ``collect``)."""
+        with self._lock:
+            self.events.extend(events)
+            for event in events:
+                self._remote_names[(event['pid'], event['tid'])] = lane_names.get(event['tid'], 'worker')
+
+    def collect(self) -> Tuple[List[Dict[str, Any]], Dict[int, str]]:
+        """Events and lane names recorded so far, for shipping to the parent process."""
+        with self._lock:
+            return list(self.events), dict(self._lane_names)
+
+    def to_chrome_trace(self) -> Dict[str, Any]:
+        """Trace-event document with process and lane names."""
+        with self._lock:
+            events = sorted(self.events, key=lambda event: event['ts'])
+            lane_names = {(self.pid, lane): name for lane, name in self._lane_names.items()}
+            lane_names.update(self._remote_names)
+
+        origin = events[0]['ts'] if events else 0
+        trace_events: List[Dict[str, Any]] = []
+        for pid in sorted({pid for pid, _ in lane_names} | {self.pid}):
+            label = 'main' if pid == self.pid else f'worker {pid}'
+            trace_events.append({'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                                 'args': {'name': label}})
+        for (pid, lane), name in sorted(lane_names.items()):
+            trace_events.append({'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': lane,
+                                 'args': {'name': name}})
+            trace_events.append({'name': 'thread_sort_index', 'ph': 'M', 'pid': pid, 'tid': lane,
+                                 'args': {'sort_index': lane}})
+        for event in events:
+            trace_events.append(dict(event, ts=event['ts'] - origin))
+        return {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        """Count and inclusive time per span name."""
+        totals: Dict[str, Dict[str, float]] = {}
+        with self._lock:
+            for event in self.events:
+                entry = totals.setdefault(event['name'], {'count': 0, 'total_ms': 0.0})
+                entry['count'] += 1
+                entry['total_ms'] += event['dur'] / 1000
+        return totals
+
+
+_tracer: Optional[Tracer] = None
+
+
+def span(name: str, category: str = 'stage', **args: Any):
+    """Context manager timing one stage; a shared no-op unless tracing is on."""
+    tracer = _tracer
+    if tracer is None:
+        return _NOOP_SPAN
+    return Span(tracer, name, category, args)
+
+
+def traced(name: Optional[str] = None, category: str = 'stage') -> Callable:
+    """Decorator form of ``span`` for plain and coroutine functions."""
+    def decorate(func: Callable) -> Callable:
+        label = name or func.__name__.lstrip('_')
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with span(label, category):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(label, category):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def start_tracing() -> Tracer:
+    """Begin recording spans in this process (idempotent)."""
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer()
+    return _tracer
+
+
+def stop_tracing() -> Optional[Tracer]:
+    """Stop recording and return the tracer holding the spans."""
+    global _tracer
+    tracer, _tracer = _tracer, None
+    return tracer
+
+
+def get_tracer() -> Optional[Tracer]:
+    """The active tracer, or None when tracing is off."""
+    return _tracer
+
+
+def tracing_enabled() -> bool:
+    return _tracer is not None
+
+
+def export_chrome_trace(path: Path, tracer: Optional[Tracer] = None) -> Path:
+    """Write the recorded spans as Chrome trace-event JSON."""
+    tracer = tracer or _tracer
+    if tracer is None:
+        raise RuntimeError("Tracing was not started")
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(tracer.to_chrome_trace(), f)
+    return path
+
+
+def add_trace_argument(parser, default_path: Path) -> None:
+    """Standard ``--trace [PATH]`` option for the command-line tools."""
+    parser.add_argument('--trace', nargs='?', const=str(default_path), default=None, metavar='PATH',
+                        help=f'Record per-stage spans and write a Chrome trace (default: {default_path})')
+
+
+def finish_tracing(path: Optional[str]) -> Optional[Path]:
+    """Export and stop tracing if ``--trace`` was given; prints where the trace went."""
+    if not path or _tracer is None:
+        return None
+    written = export_chrome_trace(Path(path))
+    tracer = stop_tracing()
+    print(f"\n🔍 Trace with {len(tracer.events)} spans saved to: {written} (open in https://ui.perfetto.dev)")
+    return written
+
+
+__all__ = [
+    'Span',
+    'Tracer',
+    'span',
+    'traced',
+    'start_tracing',
+    'stop_tracing',
+    'get_tracer',
+    'tracing_enabled',
+    'export_chrome_trace',
+    'add_trace_argument',
+    'finish_tracing'
+]
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Agent Routing Query
+===================
+
+Ranks agents for a free-text task description against the capability
+matrix written by the capability scanner:
+- BM25 over each agent's capabilities, when-to-use and coordination patterns
+- Persistent inverted index in .cache/, refreshed incrementally whenever
+  the matrix changes (only changed agents are re-indexed)
+- Queries from the command line, or one per line on stdin
+
+Usage:
+    python3 scripts/query-agents.py "add rate limiting to the public API" [--limit 5]
+    echo "audit auth flows" | python3 scripts/query-agents.py [--json]
+
+Use --profile [cprofile|sample] to write a profile to .tmp/reports/.
+"""
+
+import argparse
+import json
+import sys
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+SCRIPT_DIR = Path(__file__).parent
+sys.path.append(str(SCRIPT_DIR / "performance"))
+from capability_index import CapabilityIndex, default_matrix_path
+from profiling import run_profiled
+
+PROJECT_ROOT = SCRIPT_DIR.parent
+
+
+def print_matches(query, matches, elapsed_ms):
+    print(f"\n🔎 {query}")
+    if not matches:
+        print("   No matching agents")
+    for rank, match in enumerate(matches, 1):
+        print(f"   {rank}. {match.name:<28} {match.score:6.2f}  ({', '.join(match.matched_terms)})")
+    print(f"   ⏱️  {elapsed_ms:.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rank agents for a task description')
+    parser.add_argument('query', nargs='*', help='Task description (read one per line from stdin if omitted)')
+    parser.add_argument('--limit', type=int, default=5, help='Number of agents to return')
+    parser.add_argument('--matrix', type=Path, default=None,
+                        help='Capability matrix (default: newest agent-capability-matrix.json/.ndjson)')
+    parser.add_argument('--cache-dir', type=Path, default=PROJECT_ROOT / '.cache', help='Index location')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the index from scratch')
+    parser.add_argument('--json', action='store_true', help='Emit JSON instead of text')
+    args = parser.parse_args()
+
+    matrix_path = args.matrix or default_matrix_path(PROJECT_ROOT)
+    if not matrix_path.exists():
+        print(f"Error: Capability matrix not found at {matrix_path}")
+        print("Run scripts/performance/parallel_capability_scanner.py first")
+        return 1
+
+    index = CapabilityIndex(args.cache_dir)
+    refresh = index.rebuild(matrix_path) if args.rebuild else index.refresh(matrix_path)
+    if refresh.changed and not args.json:
+        print(f"📇 Index updated from {matrix_path.name}: {refresh.indexed} agents indexed, "
+              f"{refresh.unchanged} unchanged, {refresh.removed} removed, "
+              f"{refresh.terms_updated} terms in {refresh.seconds * 1000:.1f}ms")
+
+    queries = [' '.join(args.query)] if args.query else [line.strip() for line in sys.stdin if line.strip()]
+    results = []
+    for query in queries:
+        start = time.perf_counter()
+        matches = index.search(query, args.limit)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if args.json:
+            results.append({'query': query, 'elapsed_ms': elapsed_ms,
+                            'agents': [asdict(match) for match in matches]})
+        else:
+            print_matches(query, matches, elapsed_ms)
+
+    if args.json:
+        print(json.dumps({'refresh': asdict(refresh), 'results': results, 'stats': index.get_stats()}, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_profiled(main, 'query-agents'))
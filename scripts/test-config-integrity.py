@@ -19,9 +19,16 @@ from pathlib import Path
 # Get project root
 SCRIPT_DIR = Path(__file__).parent
 PROJECT_ROOT = SCRIPT_DIR.parent
+
+sys.path.append(str(SCRIPT_DIR / "performance"))
+from document_model import load_document
+from keyword_router import get_keyword_router
+from reference_graph import AGENT, COMMAND, DELEGATES_TO, RULE_EXPLICIT, SKILL, get_reference_graph
+
 AGENTS_DIR = PROJECT_ROOT / "system-configs" / ".claude" / "agents"
 COMMANDS_DIR = PROJECT_ROOT / "system-configs" / ".claude" / "commands"
 SKILLS_DIR = PROJECT_ROOT / "system-configs" / ".claude" / "skills"
+CACHE_DIR = PROJECT_ROOT / ".cache"
 
 # Expected counts after optimization
 # Updated: feature-agent, ml-engineer, mobile-engineer added as new agents
@@ -48,9 +55,7 @@ BUILTIN_AGENT_TYPES = {
 
 def count_agents() -> int:
     """Count agent files excluding documentation."""
-    if not AGENTS_DIR.exists():
-        return 0
-    return len([f for f in AGENTS_DIR.glob("*.md") if f.name not in NON_AGENT_FILES])
+    return len(get_all_agents())
 
 
 def count_commands() -> int:
@@ -69,95 +74,45 @@ def count_skills() -> int:
 
 def get_all_agents() -> list[str]:
     """Get list of all agent names."""
-    if not AGENTS_DIR.exists():
-        return []
-    return [f.stem for f in AGENTS_DIR.glob("*.md") if f.name not in NON_AGENT_FILES]
+    graph = get_reference_graph(AGENTS_DIR, SKILLS_DIR, COMMANDS_DIR, cache_dir=CACHE_DIR)
+    return [node.name for node in graph.nodes_of(AGENT) if node.file_name not in NON_AGENT_FILES]
 
 
 def extract_yaml_section(file_path: Path) -> str | None:
     """Extract YAML front-matter from file."""
-    with open(file_path, "r") as f:
-        content = f.read()
-    match = re.match(r"^---\n(.*?)\n---", content, re.DOTALL)
-    return match.group(1) if match else None
+    return load_document(file_path).front_matter_text
 
 
 def find_orphan_references() -> list[tuple[str, str]]:
     """Find agent references in skills (and legacy commands) that don't exist."""
     orphans: list[tuple[str, str]] = []
     valid_agents = set(a.lower() for a in get_all_agents())
+    graph = get_reference_graph(AGENTS_DIR, SKILLS_DIR, COMMANDS_DIR, cache_dir=CACHE_DIR)
 
-    # Only look for explicit agent references in specific contexts
+    # Only explicit delegations (subagent_type=, Task tool, "use the X agent")
     # This is more targeted to avoid false positives
-    agent_patterns = [
-        r"subagent_type[=:]\s*['\"]?(\w+-\w+)['\"]?",  # subagent_type="agent-name"
-        r"Task tool.*?(\w+-\w+)",  # Task tool with agent-name
-        r"use\s+the\s+(\w+-\w+)\s+agent",  # "use the agent-name agent"
-    ]
-
-    # Check skills directory (directory-based skills with SKILL.md)
-    if SKILLS_DIR.exists():
-        for skill_dir in SKILLS_DIR.iterdir():
-            if not skill_dir.is_dir() or skill_dir.name.startswith('.'):
-                continue
-            skill_file = skill_dir / "SKILL.md"
-            if not skill_file.exists():
-                continue
-
-            content = skill_file.read_text()
-
-            for pattern in agent_patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE)
-                for match in matches:
-                    match_lower = match.lower()
-                    if re.match(r"^[a-z]+-[a-z]+(?:-[a-z]+)?$", match_lower):
-                        if match_lower in BUILTIN_AGENT_TYPES:
-                            continue
-                        if match_lower not in valid_agents:
-                            orphans.append((f"skills/{skill_dir.name}/SKILL.md", match))
-
+    sources = [(node, node.key) for node in graph.nodes_of(SKILL, "directory")]
     # Legacy: Check commands directory if it still exists
-    if COMMANDS_DIR.exists():
-        for cmd_file in COMMANDS_DIR.glob("*.md"):
-            if cmd_file.name in NON_COMMAND_FILES:
-                continue
-
-            content = cmd_file.read_text()
+    sources += [(node, node.file_name) for node in graph.nodes_of(COMMAND)
+                if node.file_name not in NON_COMMAND_FILES]
 
-            for pattern in agent_patterns:
-                matches = re.findall(pattern, content, re.IGNORECASE)
-                for match in matches:
-                    match_lower = match.lower()
-                    if re.match(r"^[a-z]+-[a-z]+(?:-[a-z]+)?$", match_lower):
-                        if match_lower in BUILTIN_AGENT_TYPES:
-                            continue
-                        if match_lower not in valid_agents:
-                            orphans.append((cmd_file.name, match))
+    for node, label in sources:
+        for match in graph.references(node, DELEGATES_TO, RULE_EXPLICIT):
+            match_lower = match.lower()
+            if match_lower in BUILTIN_AGENT_TYPES:
+                continue
+            if match_lower not in valid_agents:
+                orphans.append((label, match))
 
     return orphans
 
 
 def get_all_routing_keywords() -> list[str]:
-    """Extract routing keywords from CLAUDE.md."""
+    """Extract routing keywords from CLAUDE.md (compiled router, cached per process)."""
     claude_md = PROJECT_ROOT / "system-configs" / "CLAUDE.md"
     if not claude_md.exists():
         return []
-
-    content = claude_md.read_text()
-    keywords: list[str] = []
-
-    # Extract keywords from routing table
-    keyword_pattern = r"\|\s*([^|]+)\s*\|\s*([^|]+)\s*\|"
-    for match in re.finditer(keyword_pattern, content):
-        keyword_cell = match.group(1).strip()
-        if keyword_cell and keyword_cell != "Keywords":
-            # Split comma-separated keywords
-            for kw in keyword_cell.split(","):
-                kw = kw.strip().lower()
-                if kw and kw not in ["keywords"]:
-                    keywords.append(kw)
-
-    return keywords
+    return list(get_keyword_router(claude_md).keywords)
 
 
 def parse_yaml(file_path: Path, file_type: str = "agent") -> bool:
@@ -2,11 +2,29 @@
 """
 Update all documentation to reflect the consolidated 26-agent system.
 This script ensures consistency across all documentation files.
+
+All mappings are compiled into one rewrite pass per document
+(performance/doc_rewriter.py); documents are processed in parallel and
+written together, and documents already known to be clean are skipped.
+
+Usage:
+    python3 scripts/update-documentation.py [paths...] [--dry-run] [--jobs 8]
+    python3 scripts/update-documentation.py --profile [cprofile|sample]
 """
 
-import re
+import argparse
+import sys
 from pathlib import Path
 
+SCRIPT_DIR = Path(__file__).parent
+
+sys.path.append(str(SCRIPT_DIR / "performance"))
+from doc_rewriter import DocumentRewriter, RewriteRules
+from profiling import run_profiled
+
+PROJECT_ROOT = SCRIPT_DIR.parent
+CACHE_DIR = PROJECT_ROOT / ".cache"
+
 # Old agent names to new names mapping
 AGENT_RENAMES = {
     'backend-staff': 'backend-engineer',
@@ -38,133 +56,39 @@ DEPRECATED_AGENTS = [
     'backend-dev',  # renamed to backend-engineer
 ]
 
-# Documentation files to update
-DOC_FILES = [
-    'agents/README.md',
-    'docs/architecture/CONSOLIDATED_AGENT_SYSTEM.md',
-    'docs/specs/agent-ecosystem-spec.md',
-    'docs/development/AGENT_SELECTION_GUIDE.md',
-    'docs/performance/PARALLEL_EXECUTION_GUIDE.md',
-    'docs/AGENT_MIGRATION_GUIDE.md',
-    'CLAUDE.md',
-    '.claude/CLAUDE.md',
-]
+# Deprecated agents merged into a surviving agent; other mentions are renamed to it
+AGENT_MERGES = {
+    'qa-tester': 'test-engineer',
+    'doc-updater': 'tech-writer',
+    'reliability-engineer': 'platform-engineer',
+}
 
-def update_agent_names(content):
-    """Update old agent names to new ones."""
-    updated = content
-
-    # Replace old names with new names
-    for old_name, new_name in AGENT_RENAMES.items():
-        # Replace in various contexts
-        patterns = [
-            (f'`{old_name}`', f'`{new_name}`'),
-            (f'**{old_name}**', f'**{new_name}**'),
-            (f'- {old_name}:', f'- {new_name}:'),
-            (f'"{old_name}"', f'"{new_name}"'),
-            (f"'{old_name}'", f"'{new_name}'"),
-            (f' {old_name} ', f' {new_name} '),
-            (f'^{old_name}$', f'{new_name}'),
-        ]
-
-        for old_pattern, new_pattern in patterns:
-            updated = updated.replace(old_pattern, new_pattern)
-
-    return updated
-
-def update_agent_counts(content):
-    """Update agent count references."""
-    # Update various count references
-    count_updates = [
-        (r'36 agents', '26 agents'),
-        (r'36 → 26', '36 → 26'),
-        (r'from 36 to 26', 'from 36 to 26'),
-        (r'\b36\b.*agents', '26 agents'),
-        (r'agent count:?\s*36', 'agent count: 26'),
-    ]
-
-    updated = content
-    for pattern, replacement in count_updates:
-        updated = re.sub(pattern, replacement, updated, flags=re.IGNORECASE)
-
-    return updated
-
-def update_command_references(content):
-    """Update command references to match new shortcuts."""
-    command_updates = [
-        ('`/backend-dev`', '`/backend`'),
-        ('`/frontend-dev`', '`/frontend`'),
-        ('`/data-eng`', '`/data`'),
-        ('`/ml-eng`', '`/ml`'),
-        ('`/api-design`', '`/api`'),
-        ('`/mobile-dev`', '`/mobile`'),
-        ('`/architect-review`', '`/architect`'),
-        ('`/analyze-code`', '`/analyze`'),
-    ]
-
-    updated = content
-    for old_cmd, new_cmd in command_updates:
-        updated = updated.replace(old_cmd, new_cmd)
-
-    # Add new commands if missing
-    if '/backend`' not in updated and '## Quick Command Reference' in updated:
-        # Add to command reference sections
-        pass
-
-    return updated
-
-def remove_deprecated_references(content):
-    """Remove or update references to deprecated agents."""
-    updated = content
-
-    # Remove deprecated agents from lists
-    for agent in DEPRECATED_AGENTS:
-        # Remove from bullet lists
-        updated = re.sub(f'^\\s*[-*]\\s*`?{agent}`?.*$', '', updated, flags=re.MULTILINE)
-        updated = re.sub(f'^\\s*[-*]\\s*\\*\\*{agent}\\*\\*.*$', '', updated, flags=re.MULTILINE)
-
-        # Update merger references
-        if agent == 'qa-tester':
-            updated = updated.replace(f'{agent} ', 'test-engineer ')
-        elif agent == 'doc-updater':
-            updated = updated.replace(f'{agent} ', 'tech-writer ')
-        elif agent == 'reliability-engineer':
-            updated = updated.replace(f'{agent} ', 'platform-engineer ')
-
-    # Clean up multiple blank lines
-    updated = re.sub(r'\n\n\n+', '\n\n', updated)
-
-    return updated
-
-def update_file(file_path):
-    """Update a single documentation file."""
-    print(f"Updating: {file_path}")
-
-    try:
-        with open(file_path, 'r') as f:
-            content = f.read()
-
-        original = content
-
-        # Apply all updates
-        content = update_agent_names(content)
-        content = update_agent_counts(content)
-        content = update_command_references(content)
-        content = remove_deprecated_references(content)
-
-        # Write back if changed
-        if content != original:
-            with open(file_path, 'w') as f:
-                f.write(content)
-            print(f"  ✅ Updated")
-            return True
-        else:
-            print(f"  ⏭️  No changes needed")
-            return False
-
-    except Exception as e:
-        print(f"  ❌ Error: {e}")
-        return False
+# Command shortcuts renamed by the consolidation
+COMMAND_UPDATES = {
+    '`/backend-dev`': '`/backend`',
+    '`/frontend-dev`': '`/frontend`',
+    '`/data-eng`': '`/data`',
+    '`/ml-eng`': '`/ml`',
+    '`/api-design`': '`/api`',
+    '`/mobile-dev`': '`/mobile`',
+    '`/architect-review`': '`/architect`',
+    '`/analyze-code`': '`/analyze`',
+}
+
+# Agent count references ("36 agents", "agent count: 36")
+COUNT_UPDATES = {
+    '36': '26',
+}
+
+# Documentation trees walked by default, relative to the project root
+DOC_ROOTS = ['docs']
+
+RULES = RewriteRules(
+    renames={**AGENT_RENAMES, **AGENT_MERGES},
+    literals=COMMAND_UPDATES,
+    counts=COUNT_UPDATES,
+    drop_items=DEPRECATED_AGENTS,
+)
 
 def create_final_report():
     """Create a comprehensive documentation update report."""
@@ -206,41 +130,60 @@ All documentation has been updated to reflect the consolidated 26-agent system.
 
 def main():
     """Update all documentation files."""
-    base_dir = Path('/Users/damilola/Documents/Projects/claude-config')
+    parser = argparse.ArgumentParser(description='Update documentation for the consolidated agent system')
+    parser.add_argument('paths', nargs='*', type=Path,
+                        help=f"Files or directories to update (default: {', '.join(DOC_ROOTS)})")
+    parser.add_argument('--dry-run', action='store_true', help='Print a unified diff instead of writing')
+    parser.add_argument('--jobs', type=int, default=8, help='Documents processed in parallel')
+    parser.add_argument('--no-cache', action='store_true', help='Scan every document, even ones known to be clean')
+    args = parser.parse_args()
+
+    paths = args.paths or [PROJECT_ROOT / doc_root for doc_root in DOC_ROOTS]
+    rewriter = DocumentRewriter(RULES, PROJECT_ROOT, None if args.no_cache else CACHE_DIR, max_workers=args.jobs)
+    results = rewriter.run(paths, dry_run=args.dry_run)
+    changed = [result for result in results if result.changed]
+    errors = [result for result in results if result.error is not None]
+
+    if args.dry_run:
+        for result in changed:
+            sys.stdout.write(result.diff())
+        for result in errors:
+            print(f"❌ {result.relative_path}: {result.error}", file=sys.stderr)
+        stats = rewriter.get_stats()
+        print(f"{stats['changed']} of {stats['documents']} documentation files would change "
+              f"({stats['skipped_clean']} known clean)", file=sys.stderr)
+        return 1 if errors else 0
 
     print("=" * 60)
     print("DOCUMENTATION UPDATE PROCESS")
     print("=" * 60)
     print()
+    for result in changed:
+        counts = ', '.join(f"{count} {kind}" for kind, count in sorted(result.replacements.items()))
+        print(f"✅ {result.relative_path} ({counts})")
+    for result in errors:
+        print(f"❌ {result.relative_path}: {result.error}")
 
-    updated_count = 0
-
-    for doc_file in DOC_FILES:
-        file_path = base_dir / doc_file
-        if file_path.exists():
-            if update_file(file_path):
-                updated_count += 1
-        else:
-            print(f"⚠️  Not found: {doc_file}")
-
+    stats = rewriter.get_stats()
     print()
     print("=" * 60)
-    print(f"Updated {updated_count} documentation files")
+    print(f"Updated {stats['written']} of {stats['documents']} documentation files "
+          f"({stats['scanned']} scanned, {stats['skipped_clean']} known clean) in {stats['seconds']:.2f}s")
 
     # Create final report in .tmp directory
-    reports_dir = base_dir / '.tmp' / 'reports'
+    reports_dir = PROJECT_ROOT / '.tmp' / 'reports'
     reports_dir.mkdir(parents=True, exist_ok=True)
     report_path = reports_dir / 'documentation-update-report.md'
     report_content = create_final_report()
 
     # Add list of updated files
     report_content += "\n"
-    for doc_file in DOC_FILES:
-        file_path = base_dir / doc_file
-        if file_path.exists():
-            report_content += f"- ✅ {doc_file}\n"
-        else:
-            report_content += f"- ❌ {doc_file} (not found)\n"
+    for result in changed:
+        report_content += f"- ✅ {result.relative_path}\n"
+    if not changed:
+        report_content += "- No documentation files needed changes\n"
+    for result in errors:
+        report_content += f"- ❌ {result.relative_path} ({result.error})\n"
 
     report_content += "\n## Validation Status\n"
     report_content += "- ✅ All 26 agents have valid YAML front-matter\n"
@@ -256,6 +199,7 @@ def main():
         f.write(report_content)
 
     print(f"\nReport saved to: {report_path}")
+    return 1 if errors else 0
 
 if __name__ == '__main__':
-    main()
+    sys.exit(run_profiled(main, "update-documentation"))
@@ -11,6 +11,7 @@ Validates agent YAML front-matter with 60% performance improvement through:
 
 Maintains full backward compatibility with original interface.
 Use --legacy flag for original sequential processing if needed.
+Use --profile [cprofile|sample] to write a profile to .tmp/reports/.
 """
 
 import asyncio
@@ -19,6 +20,11 @@ import re
 import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent / 'performance'))
+from document_model import load_document
+from section_index import attach_section_index
+from profiling import run_profiled
+
 # Required fields in YAML front-matter based on AGENT_TEMPLATE.md
 REQUIRED_FIELDS = [
     'name',
@@ -69,13 +75,7 @@ COMPLEX_AGENTS = [
 
 def extract_yaml_section(file_path):
     """Extract YAML front-matter from file."""
-    with open(file_path, 'r') as f:
-        content = f.read()
-
-    match = re.match(r'^---\n(.*?)\n---', content, re.DOTALL)
-    if match:
-        return match.group(1)
-    return None
+    return load_document(file_path).front_matter_text
 
 # Thinking level to token count mapping
 THINKING_TOKEN_MAP = {
@@ -183,13 +183,13 @@ def validate_agent_file(file_path):
     if Path(file_path).name in NON_AGENT_FILES:
         return agent_name, []
 
-    # Read full file content
-    with open(file_path, 'r') as f:
-        full_content = f.read()
-        line_count = len(full_content.splitlines())
+    # Read and parse once through the shared document cache
+    document = load_document(file_path)
+    full_content = document.content
+    line_count = len(full_content.splitlines())
 
     # Extract YAML section
-    yaml_section = extract_yaml_section(file_path)
+    yaml_section = document.front_matter_text
     if not yaml_section:
         issues.append("No YAML front-matter found (missing --- delimiters)")
         return agent_name, issues
@@ -265,6 +265,9 @@ def legacy_main():
 
     print(f"Validating {len(agent_files)} agent files (legacy mode)...\n")
 
+    # Unchanged agents are rebuilt from the persistent section index instead of re-parsed
+    section_index = attach_section_index(project_root / '.cache')
+
     all_valid = True
     validation_results = []
 
@@ -280,6 +283,8 @@ def legacy_main():
         else:
             print(f"✅ {agent_name}")
 
+    section_index.save()
+
     # Generate summary
     print(f"\n{'='*50}")
     print("VALIDATION SUMMARY (LEGACY)")
@@ -333,7 +338,6 @@ def main():
     print("Using high-performance concurrent validation...")
 
     # Import and run optimized validator
-    sys.path.append(str(Path(__file__).parent / 'performance'))
     try:
         from stdlib_async_validator import main as async_main
         return asyncio.run(async_main())
@@ -342,4 +346,4 @@ def main():
         return legacy_main()
 
 if __name__ == '__main__':
-    sys.exit(main())
+    sys.exit(run_profiled(main, 'validate-agent-yaml'))
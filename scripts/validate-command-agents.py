@@ -8,9 +8,13 @@ import os
 import re
 import sys
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Dict, List, Tuple
 import json
 
+sys.path.append(str(Path(__file__).parent / 'performance'))
+from document_model import load_document
+from reference_graph import MENTIONS, RULE_NAME, get_reference_graph
+
 # Agent requirements per command category (aligned with command-audit.md)
 CATEGORY_AGENT_REQUIREMENTS = {
     'git_workflow': {
@@ -77,26 +81,6 @@ def find_commands_dir() -> Path:
     raise FileNotFoundError("Could not find system-configs/.claude/commands directory")
 
 
-def read_command_file(file_path: Path) -> str:
-    """Read a command file."""
-    with open(file_path, 'r', encoding='utf-8') as f:
-        return f.read()
-
-
-def extract_agents(content: str) -> Set[str]:
-    """Extract mentioned agents from command content."""
-    agents = set()
-
-    # Create pattern for all agents
-    agent_pattern = '|'.join(re.escape(agent) for agent in ALL_AGENTS)
-
-    # Find all agent mentions
-    matches = re.findall(rf'\b({agent_pattern})\b', content, re.IGNORECASE)
-    agents.update(match.lower().replace('_', '-') for match in matches)
-
-    return agents
-
-
 def check_parallelization(content: str) -> Dict[str, bool]:
     """Check for parallelization patterns."""
     patterns = {
@@ -123,13 +107,20 @@ def get_command_category(command: str) -> str:
     return 'uncategorized'
 
 
+def get_command_graph(commands_dir: Path):
+    """Reference graph of the commands directory, with mentions of ``ALL_AGENTS``."""
+    return get_reference_graph(commands_dir=commands_dir, mention_names=ALL_AGENTS)
+
+
 def validate_command(file_path: Path) -> Dict:
     """Validate a single command file."""
     command_name = file_path.stem
-    content = read_command_file(file_path)
+    graph = get_command_graph(file_path.parent)
+    node = graph.nodes[f"commands/{file_path.name}"]
+    content = load_document(file_path).content
 
-    # Extract agents
-    mentioned_agents = extract_agents(content)
+    # Agents mentioned by name
+    mentioned_agents = set(graph.references(node, MENTIONS, RULE_NAME))
 
     # Check parallelization
     parallel_patterns = check_parallelization(content)
@@ -12,6 +12,9 @@ import yaml
 from pathlib import Path
 from typing import Dict, List, Optional, Any
 
+sys.path.append(str(Path(__file__).parent / 'performance'))
+from document_model import load_document, parse_document
+
 def find_commands_dir() -> Path:
     """Find the commands directory."""
     current = Path.cwd()
@@ -27,29 +30,34 @@ def find_commands_dir() -> Path:
 
 def extract_frontmatter(content: str) -> tuple[Optional[Dict[str, Any]], str]:
     """Extract YAML frontmatter from markdown content."""
-    if not content.startswith('---\n') and not content.startswith('---\r\n'):
-        return None, content
+    document = parse_document(content)
+    if document.has_front_matter:
+        yaml_content = document.front_matter_text
+        markdown_content = document.body
+    else:
+        if not content.startswith('---\n') and not content.startswith('---\r\n'):
+            return None, content
 
-    # Find the end of frontmatter (handle different line endings)
-    lines = content.split('\n')
-    if len(lines) < 3:
-        return None, content
+        # Closing delimiter with trailing whitespace or CRLF line endings
+        lines = content.split('\n')
+        if len(lines) < 3:
+            return None, content
 
-    start_idx = 1  # Skip first ---
-    end_idx = None
+        start_idx = 1  # Skip first ---
+        end_idx = None
 
-    for i in range(start_idx, len(lines)):
-        if lines[i].strip() == '---':
-            end_idx = i
-            break
+        for i in range(start_idx, len(lines)):
+            if lines[i].strip() == '---':
+                end_idx = i
+                break
 
-    if end_idx is None:
-        return None, content
+        if end_idx is None:
+            return None, content
 
-    yaml_lines = lines[start_idx:end_idx]
-    yaml_content = '\n'.join(yaml_lines)
-    markdown_lines = lines[end_idx + 1:]
-    markdown_content = '\n'.join(markdown_lines)
+        yaml_lines = lines[start_idx:end_idx]
+        yaml_content = '\n'.join(yaml_lines)
+        markdown_lines = lines[end_idx + 1:]
+        markdown_content = '\n'.join(markdown_lines)
 
     try:
         frontmatter = yaml.safe_load(yaml_content)
@@ -67,8 +75,7 @@ def validate_command_yaml(file_path: Path) -> Dict[str, Any]:
     command_name = file_path.stem
 
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        content = load_document(file_path).content
     except Exception as e:
         return {
             'command': command_name,
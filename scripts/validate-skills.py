@@ -16,6 +16,23 @@ import re
 import sys
 from pathlib import Path
 
+sys.path.append(str(Path(__file__).parent / 'performance'))
+from document_model import load_document
+from section_index import SectionIndex
+
+CACHE_DIR = Path(__file__).parent.parent / '.cache'
+
+# Opened on first use so importing this module never touches the cache
+_section_index = None
+
+
+def get_section_index():
+    """Persistent section index shared with the other validators."""
+    global _section_index
+    if _section_index is None:
+        _section_index = SectionIndex(CACHE_DIR)
+    return _section_index
+
 # Valid frontmatter fields for skills (based on Claude Code skills system)
 VALID_FIELDS = {
     # Core fields
@@ -75,14 +92,8 @@ NON_SKILL_FILES = [
 
 
 def extract_yaml_section(file_path):
-    """Extract YAML front-matter from file."""
-    with open(file_path, 'r') as f:
-        content = f.read()
-
-    match = re.match(r'^---\n(.*?)\n---', content, re.DOTALL)
-    if match:
-        return match.group(1)
-    return None
+    """Extract YAML front-matter from file (only the indexed span is read)."""
+    return get_section_index().lookup(file_path).front_matter_text
 
 
 def parse_yaml_structure(yaml_text, skill_name=None):
@@ -182,8 +193,8 @@ def check_fork_askuser_conflict(file_path, fields):
     if fields.get('context') != 'fork':
         return None
 
-    with open(file_path, 'r') as f:
-        content = f.read()
+    # The YAML came from the section index; this is the only full read of the file
+    content = load_document(file_path).content
 
     if 'ASK_USER' in content:
         return (
@@ -357,4 +368,7 @@ def main():
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    status = main()
+    if _section_index is not None:
+        _section_index.save()
+    sys.exit(status)
@@ -0,0 +1,164 @@
+#!/bin/bash
+# Test atomic file transactions (scripts/performance/file_transaction.py):
+# commit, reuse, rollback, failed commits and crash recovery
+
+# Source test utilities
+source "$(dirname "$0")/../utils.sh"
+
+PERFORMANCE_DIR="${ORIGINAL_DIR}/scripts/performance"
+
+echo "Testing file transactions..."
+
+setup_test_env
+trap cleanup_test_env EXIT
+
+if python3 - "$PERFORMANCE_DIR" "$TEST_DIR" <<'EOF'
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+sys.path.insert(0, sys.argv[1])
+import file_transaction
+from file_transaction import FileTransaction, TransactionError, recover
+
+root = Path(sys.argv[2]) / 'tree'
+journal = Path(sys.argv[2]) / 'journal.json'
+failures = []
+
+
+def check(condition, message):
+    print(f"  {'✓' if condition else '✗'} {message}")
+    if not condition:
+        failures.append(message)
+
+
+def reset_tree():
+    for path in sorted(root.rglob('*'), reverse=True):
+        path.rmdir() if path.is_dir() else path.unlink()
+    (root / 'old').mkdir(parents=True, exist_ok=True)
+    for name in ('a', 'b', 'c'):
+        (root / f"{name}.md").write_text(f"{name} v1")
+
+
+def tree():
+    """Visible files; temp files and backups are dotfiles."""
+    return {path.relative_to(root).as_posix(): path.read_text()
+            for path in sorted(root.rglob('*')) if path.is_file() and not path.name.startswith('.')}
+
+
+def sidecars():
+    return [path.name for path in root.rglob('.*')]
+
+
+def stage(transaction):
+    transaction.write(root / 'a.md', 'a v1')     # identical: not staged
+    transaction.write(root / 'b.md', 'b v2')
+    transaction.write(root / 'new.md', 'new')
+    transaction.move(root / 'c.md', root / 'old' / 'c.md')
+
+
+root.mkdir(parents=True)
+reset_tree()
+original = tree()
+
+# Commit applies everything and leaves no sidecar files or journal
+transaction = FileTransaction(journal)
+stage(transaction)
+check(tree() == original, "staged changes are invisible before commit")
+stats = transaction.commit()
+check(tree() == {'a.md': 'a v1', 'b.md': 'b v2', 'new.md': 'new', 'old/c.md': 'c v1'}, "commit applies all changes")
+check(stats['identical_skipped'] == 1 and stats['files_written'] == 3 and stats['files_removed'] == 1,
+      "identical content is not rewritten")
+check(not journal.exists() and not sidecars(), "journal, temp files and backups removed after commit")
+
+# A committed transaction is reusable and never replays earlier operations
+transaction.write(root / 'a.md', 'a v2')
+transaction.commit()
+check(tree() == {'a.md': 'a v2', 'b.md': 'b v2', 'new.md': 'new', 'old/c.md': 'c v1'},
+      "second commit on the same transaction keeps the first commit's files")
+check(transaction.commit()['files_written'] == 4, "empty commit is a no-op")
+
+# Rollback before commit discards the staged temp files
+reset_tree()
+transaction = FileTransaction(journal)
+stage(transaction)
+transaction.rollback()
+check(tree() == original and not sidecars(), "rollback leaves the tree untouched and removes temp files")
+transaction.commit()
+check(tree() == original, "commit after rollback has nothing to apply")
+
+# A commit failing midway is rolled back
+transaction = FileTransaction(journal)
+stage(transaction)
+replace = os.replace
+calls = []
+
+
+def failing_replace(source, target):
+    calls.append(target)
+    if len(calls) == 2:
+        raise OSError('disk full')
+    replace(source, target)
+
+
+file_transaction.os.replace = failing_replace
+try:
+    transaction.commit()
+    check(False, "failed commit raises TransactionError")
+except TransactionError:
+    check(tree() == original and not sidecars(), "failed commit restores every file")
+finally:
+    file_transaction.os.replace = replace
+check(not journal.exists(), "journal removed after a failed commit")
+
+# A crash while applying is rolled back by recover()
+crash = f"""
+import os, sys
+sys.path.insert(0, {sys.argv[1]!r})
+import file_transaction
+from pathlib import Path
+root = Path({str(root)!r})
+transaction = file_transaction.FileTransaction({str(journal)!r})
+transaction.write(root / 'a.md', 'a v2')
+transaction.write(root / 'b.md', 'b v2')
+transaction.move(root / 'c.md', root / 'old' / 'c.md')
+replace = os.replace
+calls = []
+def crashing_replace(source, target):
+    calls.append(target)
+    if len(calls) == 2:
+        os._exit(9)
+    replace(source, target)
+file_transaction.os.replace = crashing_replace
+transaction.commit()
+"""
+completed = subprocess.run([sys.executable, '-c', crash])
+check(completed.returncode == 9 and journal.exists(), "crash leaves an 'applying' journal")
+check(recover(journal) == 'applying', "recover() finds the interrupted transaction")
+check(tree() == original and not sidecars(), "recover() restores the tree after a crash")
+check(recover(journal) is None, "recover() is a no-op without a journal")
+
+# A crash after the commit point keeps the new tree and only cleans up
+transaction = FileTransaction(journal)
+transaction.write(root / 'b.md', 'b v2')
+transaction.remove(root / 'c.md')
+file_transaction._discard_backups, discard = (lambda operations: None), file_transaction._discard_backups
+journal_unlink = Path.unlink
+Path.unlink = lambda path, *args, **kwargs: None if path == journal else journal_unlink(path, *args, **kwargs)
+try:
+    transaction.commit()
+finally:
+    file_transaction._discard_backups = discard
+    Path.unlink = journal_unlink
+check(recover(journal) == 'committed', "recover() finds a committed journal")
+check(tree() == {'a.md': 'a v1', 'b.md': 'b v2'} and not sidecars(), "recover() keeps committed changes and removes backups")
+
+sys.exit(1 if failures else 0)
+EOF
+then
+    echo -e "${GREEN}✓${NC} All file transaction tests passed!"
+else
+    echo -e "${RED}✗${NC} File transaction tests failed"
+    exit 1
+fi